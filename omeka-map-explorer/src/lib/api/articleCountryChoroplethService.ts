@@ -9,11 +9,13 @@
  */
 
 import { base } from '$app/paths';
+import { decodeCountryCounts } from './worldMapCacheService';
 
 export interface ArticleCountryChoroplethData {
 	type: 'article_country_choropleth';
 	articleCountry: string;
-	counts: Record<string, number>; // locationCountry -> unique article count
+	counts: Record<string, number>; // locationCountry -> unique article count (decoded to names)
+	countryKeys?: string;
 	total_location_countries: number;
 	total_unique_articles: number;
 	updatedAt: string;
@@ -41,6 +43,7 @@ export async function loadArticleCountryChoroplethData(
 		}
 		
 		const data = await response.json();
+		data.counts = await decodeCountryCounts(data);
 		console.log(`✅ Loaded choropleth cache for ${articleCountry}:`, {
 			countries: Object.keys(data.counts).length,
 			totalArticles: data.total_unique_articles
@@ -0,0 +1,168 @@
+import { base } from '$app/paths';
+
+/**
+ * Date-sharded article store (scripts/article_shards.py, data/articles/).
+ *
+ * Articles are split by publication period into shards of minimal table rows, listed in
+ * chronological order in manifest.json (undated shards last). Tables fetch only the
+ * shards a page overlaps, and id lookups go through ids.json (article id -> shard) so
+ * only the shards holding the requested ids are downloaded:
+ *
+ *   const { rows, total } = await loadArticlePage(0, 50, { order: 'desc' });
+ *   const byId = await resolveArticles(entity.relatedArticleIds);
+ */
+export interface ArticleRow {
+	id: string;
+	title: string;
+	newspaper: string;
+	country: string;
+	pubDate: string; // YYYY-MM-DD, '' when undated
+}
+
+export interface ArticleShardEntry {
+	file: string;
+	from: string | null;
+	to: string | null;
+	count: number;
+	bytes: number;
+}
+
+export interface ArticleShardManifest {
+	version: number;
+	period: string;
+	fields: string[];
+	total: number;
+	idTable: string;
+	shards: ArticleShardEntry[];
+}
+
+interface IdTable {
+	encoding: 'delta' | 'string';
+	ids: Array<number | string>;
+	shard: number[];
+}
+
+let manifestPromise: Promise<ArticleShardManifest | null> | null = null;
+let idTablePromise: Promise<Map<string, number> | null> | null = null;
+const shardCache = new Map<number, Promise<ArticleRow[]>>();
+let prefix = 'data';
+
+export function loadArticleManifest(basePath = 'data'): Promise<ArticleShardManifest | null> {
+	if (!manifestPromise) {
+		prefix = basePath;
+		manifestPromise = fetch(`${base}/${basePath}/articles/manifest.json`)
+			.then((res) => (res.ok ? (res.json() as Promise<ArticleShardManifest>) : null))
+			.then((json) => (json && Array.isArray(json.shards) ? json : null))
+			.catch(() => null);
+	}
+	return manifestPromise;
+}
+
+/** Rows of one shard (by position in manifest.shards); fetched once and cached. */
+export async function loadShard(index: number): Promise<ArticleRow[]> {
+	let rows = shardCache.get(index);
+	if (!rows) {
+		rows = (async () => {
+			const manifest = await loadArticleManifest(prefix);
+			const entry = manifest?.shards[index];
+			if (!manifest || !entry) return [];
+			const res = await fetch(`${base}/${prefix}/articles/${entry.file}`);
+			if (!res.ok) throw new Error(`Failed to load article shard ${entry.file}: ${res.status}`);
+			const col = (name: string) => manifest.fields.indexOf(name);
+			const [id, title, newspaper, country, pubDate] = ['o:id', 'title', 'newspaper', 'country', 'pub_date'].map(col);
+			return ((await res.json()) as string[][]).map((r) => ({
+				id: r[id],
+				title: r[title],
+				newspaper: r[newspaper],
+				country: r[country],
+				pubDate: r[pubDate]
+			}));
+		})();
+		rows.catch(() => shardCache.delete(index));
+		shardCache.set(index, rows);
+	}
+	return rows;
+}
+
+/**
+ * One page of articles in publication order ('asc', the store order) or newest first
+ * ('desc'); undated articles come last either way. Only the overlapping shards load.
+ */
+export async function loadArticlePage(
+	page: number,
+	pageSize: number,
+	options: { order?: 'asc' | 'desc'; basePath?: string } = {}
+): Promise<{ rows: ArticleRow[]; total: number } | null> {
+	const manifest = await loadArticleManifest(options.basePath);
+	if (!manifest) return null;
+	const shards = manifest.shards.map((entry, index) => ({ entry, index }));
+	const dated = shards.filter((s) => s.entry.from !== null);
+	const undated = shards.filter((s) => s.entry.from === null);
+	const desc = options.order === 'desc';
+	const ordered = [...(desc ? dated.reverse() : dated), ...undated];
+
+	const start = page * pageSize;
+	const end = start + pageSize;
+	const needed: { index: number; lo: number; hi: number; reverse: boolean }[] = [];
+	let offset = 0;
+	for (const { entry, index } of ordered) {
+		const lo = Math.max(start - offset, 0);
+		const hi = Math.min(end - offset, entry.count);
+		if (lo < hi) needed.push({ index, lo, hi, reverse: desc && entry.from !== null });
+		offset += entry.count;
+		if (offset >= end) break;
+	}
+	const parts = await Promise.all(
+		needed.map(async ({ index, lo, hi, reverse }) => {
+			const rows = await loadShard(index);
+			return reverse ? rows.slice(rows.length - hi, rows.length - lo).reverse() : rows.slice(lo, hi);
+		})
+	);
+	return { rows: parts.flat(), total: manifest.total };
+}
+
+function loadIdTable(): Promise<Map<string, number> | null> {
+	if (!idTablePromise) {
+		idTablePromise = (async () => {
+			const manifest = await loadArticleManifest(prefix);
+			if (!manifest) return null;
+			const res = await fetch(`${base}/${prefix}/articles/${manifest.idTable}`);
+			if (!res.ok) return null;
+			const table = (await res.json()) as IdTable;
+			const map = new Map<string, number>();
+			let value = 0;
+			table.ids.forEach((id, i) => {
+				const key = table.encoding === 'delta' ? String((value += id as number)) : String(id);
+				map.set(key, table.shard[i]);
+			});
+			return map;
+		})().catch(() => null);
+	}
+	return idTablePromise;
+}
+
+/** Article rows for the given ids, fetching only the shards that contain them. */
+export async function resolveArticles(ids: Iterable<string>): Promise<Map<string, ArticleRow>> {
+	const out = new Map<string, ArticleRow>();
+	const table = await loadIdTable();
+	if (!table) return out;
+	const wanted = new Set<string>();
+	const shards = new Set<number>();
+	for (const id of ids) {
+		const shard = table.get(String(id));
+		if (shard === undefined) continue;
+		wanted.add(String(id));
+		shards.add(shard);
+	}
+	const loadedShards = await Promise.all([...shards].map((s) => loadShard(s)));
+	for (const rows of loadedShards) {
+		for (const row of rows) if (wanted.has(row.id)) out.set(row.id, row);
+	}
+	return out;
+}
+
+export function clearArticleShardCache(): void {
+	manifestPromise = null;
+	idTablePromise = null;
+	shardCache.clear();
+}
@@ -7,6 +7,8 @@ export interface CountryAdminCounts {
   level: AdminLevel;
   countsMentions?: Record<string, number>;
   countsArticles?: Record<string, number>;
+  years?: { start: number; end: number } | null;
+  yearPrefix?: Record<string, number[]>;
   updatedAt?: string;
 }
 
@@ -32,3 +34,23 @@ export async function loadAdminCounts(country: string, level: AdminLevel): Promi
     return null;
   }
 }
+
+/**
+ * Distinct-article counts per admin unit for an inclusive year range,
+ * using the cumulative yearPrefix arrays (one subtraction per unit).
+ */
+export function countsForYearRange(
+  data: CountryAdminCounts,
+  fromYear: number,
+  toYear: number
+): Record<string, number> {
+  if (!data.years || !data.yearPrefix) return data.countsArticles || data.countsMentions || {};
+  const { start, end } = data.years;
+  const lo = Math.max(fromYear, start);
+  const hi = Math.min(toYear, end);
+  const out: Record<string, number> = {};
+  for (const [unit, prefix] of Object.entries(data.yearPrefix)) {
+    out[unit] = hi < lo ? 0 : prefix[hi - start + 1] - prefix[lo - start];
+  }
+  return out;
+}
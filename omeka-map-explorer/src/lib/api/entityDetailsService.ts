@@ -0,0 +1,151 @@
+import { base } from '$app/paths';
+import type { LocationEntity } from '$lib/types';
+
+/**
+ * Precomputed per-entity drill-down payloads (scripts/build_entity_details.py).
+ *
+ * Payloads are sharded per entity type; an entity page needs the manifest (loaded
+ * once) and a single shard file:
+ *   entities/details/manifest.json
+ *   entities/details/<dir>/<shard:03d>.json   { "<entity id>": EntityDetails }
+ */
+export type EntityDetailsType = 'person' | 'organization' | 'event' | 'subject' | 'location';
+
+/** Entity type names used by appState.selectedEntity -> payload type */
+export const ENTITY_DETAILS_TYPE: Record<string, EntityDetailsType> = {
+  Personnes: 'person',
+  Organisations: 'organization',
+  Événements: 'event',
+  Sujets: 'subject',
+  Lieux: 'location'
+};
+
+/** [entity id, name, shared article count] */
+export type RelatedEntity = [string, string, number];
+
+export interface EntityDetails {
+  id: string;
+  type: EntityDetailsType;
+  name: string;
+  articleCount: number;
+  /** Per-year article counts, counts[i] is year start + i. */
+  years: { start: number; counts: number[] } | null;
+  articleCountries: Record<string, number>;
+  locationCountries: Record<string, number>;
+  newspapers: Record<string, number>;
+  /** Every location mentioned in the entity's articles, most mentioned first */
+  locations: RelatedEntity[];
+  related: Partial<Record<EntityDetailsType, RelatedEntity[]>>;
+}
+
+/** A mentioned location placed on the map: [lat, lng] from locations.json */
+export interface EntityLocationPoint {
+  lat: number;
+  lng: number;
+  count: number;
+  name: string;
+}
+
+export interface EntityDetailsManifest {
+  version: number;
+  topN: number;
+  types: Partial<Record<EntityDetailsType, { dir: string; shards: number; entities: number }>>;
+  updatedAt?: string;
+}
+
+let manifest: EntityDetailsManifest | null = null;
+let manifestLoading: Promise<EntityDetailsManifest | null> | null = null;
+const shardCache = new Map<string, Promise<Record<string, EntityDetails> | null>>();
+
+export async function loadEntityDetailsManifest(basePath = 'data'): Promise<EntityDetailsManifest | null> {
+  if (manifest) return manifest;
+  if (!manifestLoading) {
+    manifestLoading = (async () => {
+      try {
+        const res = await fetch(`${base}/${basePath}/entities/details/manifest.json`);
+        if (!res.ok) return null;
+        const json = (await res.json()) as EntityDetailsManifest;
+        if (!json || !json.types) return null;
+        manifest = json;
+        return json;
+      } catch {
+        return null;
+      } finally {
+        manifestLoading = null;
+      }
+    })();
+  }
+  return manifestLoading;
+}
+
+/** Shard of an entity id (mirrors shard_of in build_entity_details.py). */
+export function shardOf(id: string, shards: number): number {
+  if (/^\d+$/.test(id)) return Number(id) % shards;
+  let sum = 0;
+  for (const ch of id) sum += ch.codePointAt(0) ?? 0;
+  return sum % shards;
+}
+
+async function loadShard(basePath: string, dir: string, shard: number): Promise<Record<string, EntityDetails> | null> {
+  const url = `${base}/${basePath}/entities/details/${dir}/${String(shard).padStart(3, '0')}.json`;
+  let pending = shardCache.get(url);
+  if (!pending) {
+    pending = (async () => {
+      try {
+        const res = await fetch(url);
+        if (!res.ok) return null;
+        return (await res.json()) as Record<string, EntityDetails>;
+      } catch {
+        return null;
+      }
+    })();
+    shardCache.set(url, pending);
+    // Let a failed shard be retried on the next request
+    pending.then((json) => {
+      if (!json) shardCache.delete(url);
+    });
+  }
+  return pending;
+}
+
+export async function loadEntityDetails(
+  type: EntityDetailsType,
+  id: string | number,
+  basePath = 'data'
+): Promise<EntityDetails | null> {
+  const m = await loadEntityDetailsManifest(basePath);
+  const info = m?.types[type];
+  if (!info) return null;
+  const key = String(id);
+  const shard = await loadShard(basePath, info.dir, shardOf(key, info.shards));
+  return shard?.[key] ?? null;
+}
+
+/** First and last year with articles, or null when no article is dated. */
+export function yearRange(details: EntityDetails): { min: number; max: number } | null {
+  if (!details.years) return null;
+  const { start, counts } = details.years;
+  const first = counts.findIndex((n) => n > 0);
+  if (first < 0) return null;
+  let last = counts.length - 1;
+  while (counts[last] === 0) last--;
+  return { min: start + first, max: start + last };
+}
+
+/** Mentioned locations with coordinates (locations without coordinates are skipped). */
+export function locationPoints(details: EntityDetails, locations: LocationEntity[]): EntityLocationPoint[] {
+  const byId = new Map(locations.map((l) => [String(l.id), l]));
+  const points: EntityLocationPoint[] = [];
+  for (const [id, name, count] of details.locations ?? []) {
+    const coords = byId.get(id)?.coordinates;
+    if (coords) points.push({ lat: coords[0], lng: coords[1], count, name });
+  }
+  return points;
+}
+
+/** Year histogram as a dated series (years without articles included as zeros). */
+export function yearSeries(details: EntityDetails): { year: number; count: number }[] {
+  if (!details.years) return [];
+  const { start, counts } = details.years;
+  return counts.map((count, i) => ({ year: start + i, count }));
+}
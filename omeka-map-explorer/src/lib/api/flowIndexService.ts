@@ -0,0 +1,169 @@
+import { base } from '$app/paths';
+import { loadCountryNames } from './worldMapCacheService';
+
+/**
+ * Newspaper-origin x destination flow index (scripts/build_flow_index.py).
+ *
+ * Origins are (newspaper, article country) pairs; destinations are location countries
+ * (ISO 3166-1 alpha-2 keys) or regions. Matrices are CSR by origin: entries
+ * offsets[o]..offsets[o + 1] of dest / year / count hold distinct-article counts, with
+ * year = calendar year - years.start (-1 for undated articles). Counts are additive over
+ * origins and years, so flow views aggregate here without touching articles.json:
+ *
+ *   const idx = await loadFlowIndex();
+ *   flowCounts(idx, { countries: ['BF'], yearFrom: 1990, groupBy: 'newspaper' });
+ */
+export type FlowLevel = 'country' | 'region';
+export type FlowGroupBy = 'newspaper' | 'country' | null;
+
+interface FlowMatrix {
+  offsets: number[];
+  dest: number[];
+  year: number[];
+  count: number[];
+}
+
+export interface FlowIndex {
+  countryKeys?: string;
+  years: { start: number; end: number } | null;
+  origins: { newspaper: string[]; country: string[] };
+  destinations: { country: string[]; region: { country: string[]; name: string[] } };
+  flows: Record<FlowLevel, FlowMatrix>;
+  totals: Omit<FlowMatrix, 'dest'>;
+  updatedAt?: string;
+}
+
+export interface FlowQuery {
+  level?: FlowLevel;
+  /** Newspaper titles; omitted = all */
+  newspapers?: string[];
+  /** Article countries as ISO keys or display names; omitted = all */
+  countries?: string[];
+  yearFrom?: number;
+  yearTo?: number;
+  groupBy?: FlowGroupBy;
+}
+
+const UNDATED = -1;
+
+let loaded: FlowIndex | null = null;
+let loading: Promise<FlowIndex | null> | null = null;
+let keysByName: Map<string, string> | null = null;
+
+export async function loadFlowIndex(basePath = 'data'): Promise<FlowIndex | null> {
+  if (loaded) return loaded;
+  if (!loading) {
+    loading = (async () => {
+      try {
+        const res = await fetch(`${base}/${basePath}/flows/index.json`);
+        if (!res.ok) return null;
+        const json = (await res.json()) as FlowIndex;
+        if (!json || !json.origins || !json.flows?.country) return null;
+        const names = await loadCountryNames();
+        keysByName = new Map(Object.entries(names).map(([key, name]) => [name, key]));
+        loaded = json;
+        return json;
+      } catch {
+        return null;
+      } finally {
+        loading = null;
+      }
+    })();
+  }
+  return loading;
+}
+
+/** The index if it has already been loaded (synchronous access for derived state). */
+export function getFlowIndex(): FlowIndex | null {
+  return loaded;
+}
+
+function countryKeyOf(country: string): string {
+  return keysByName?.get(country) ?? country;
+}
+
+/** Origin positions matching the newspaper and article-country filters. */
+export function selectOrigins(index: FlowIndex, query: FlowQuery = {}): number[] {
+  const papers = query.newspapers ? new Set(query.newspapers) : null;
+  const keys = query.countries ? new Set(query.countries.map(countryKeyOf)) : null;
+  const out: number[] = [];
+  index.origins.newspaper.forEach((paper, o) => {
+    if (papers && !papers.has(paper)) return;
+    if (keys && !keys.has(index.origins.country[o])) return;
+    out.push(o);
+  });
+  return out;
+}
+
+/** Destination labels: country keys, or "KEY:Region" for regions. */
+export function destinationLabels(index: FlowIndex, level: FlowLevel): string[] {
+  if (level === 'country') return index.destinations.country;
+  const { country, name } = index.destinations.region;
+  return name.map((region, i) => `${country[i]}:${region}`);
+}
+
+function yearTest(index: FlowIndex, query: FlowQuery): (y: number) => boolean {
+  if (query.yearFrom === undefined && query.yearTo === undefined) return () => true;
+  const start = index.years?.start ?? 0;
+  const lo = query.yearFrom !== undefined ? query.yearFrom - start : 0;
+  const hi = query.yearTo !== undefined ? query.yearTo - start : Infinity;
+  return (y) => y !== UNDATED && y >= lo && y <= hi;
+}
+
+function groupLabel(index: FlowIndex, o: number, groupBy: FlowGroupBy | undefined): string {
+  if (groupBy === 'newspaper') return index.origins.newspaper[o];
+  if (groupBy === 'country') return index.origins.country[o];
+  return '';
+}
+
+/** { group: { destination: distinct articles } } for the selected origins and years. */
+export function flowCounts(index: FlowIndex, query: FlowQuery = {}): Record<string, Record<string, number>> {
+  const level = query.level ?? 'country';
+  const matrix = index.flows[level];
+  const labels = destinationLabels(index, level);
+  const inRange = yearTest(index, query);
+  const out: Record<string, Record<string, number>> = {};
+  for (const o of selectOrigins(index, query)) {
+    const group = (out[groupLabel(index, o, query.groupBy)] ??= {});
+    for (let k = matrix.offsets[o]; k < matrix.offsets[o + 1]; k++) {
+      if (!inRange(matrix.year[k])) continue;
+      const dest = labels[matrix.dest[k]];
+      group[dest] = (group[dest] ?? 0) + matrix.count[k];
+    }
+  }
+  return out;
+}
+
+/** { group: distinct articles } of the selected origins (denominators for flow shares). */
+export function originTotals(index: FlowIndex, query: FlowQuery = {}): Record<string, number> {
+  const { totals } = index;
+  const inRange = yearTest(index, query);
+  const out: Record<string, number> = {};
+  for (const o of selectOrigins(index, query)) {
+    const group = groupLabel(index, o, query.groupBy);
+    for (let k = totals.offsets[o]; k < totals.offsets[o + 1]; k++) {
+      if (inRange(totals.year[k])) out[group] = (out[group] ?? 0) + totals.count[k];
+    }
+  }
+  return out;
+}
+
+/**
+ * Yearly article counts for one origin selection -> destination pair (e.g. Burkina Faso
+ * newspapers -> Côte d'Ivoire), as [year, count] pairs in ascending year order.
+ */
+export function flowSeries(index: FlowIndex, destination: string, query: FlowQuery = {}): [number, number][] {
+  const level = query.level ?? 'country';
+  const matrix = index.flows[level];
+  const target = destinationLabels(index, level).indexOf(level === 'country' ? countryKeyOf(destination) : destination);
+  if (target < 0 || !index.years) return [];
+  const byYear = new Map<number, number>();
+  for (const o of selectOrigins(index, query)) {
+    for (let k = matrix.offsets[o]; k < matrix.offsets[o + 1]; k++) {
+      if (matrix.dest[k] !== target || matrix.year[k] === UNDATED) continue;
+      const year = index.years.start + matrix.year[k];
+      byYear.set(year, (byYear.get(year) ?? 0) + matrix.count[k]);
+    }
+  }
+  return [...byYear.entries()].sort((a, b) => a[0] - b[0]);
+}
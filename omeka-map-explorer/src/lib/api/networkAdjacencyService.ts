@@ -0,0 +1,95 @@
+import { base } from '$app/paths';
+
+/**
+ * CSR adjacency of the global network (scripts/network_csr.py, networks/global.csr.bin).
+ *
+ * Node i is global.json `nodes[i]`; its neighbours are indices[offsets[i]..offsets[i + 1])
+ * sorted by weight (descending), with parallel `weights` and `edges` (index into
+ * global.json `edges`). Every section is a Uint32Array view on the fetched buffer.
+ */
+export interface CsrAdjacency {
+  nodeCount: number;
+  offsets: Uint32Array;
+  indices: Uint32Array;
+  weights: Uint32Array;
+  edges: Uint32Array;
+}
+
+const MAGIC = 'CSR1';
+const HEADER_WORDS = 4;
+
+export function parseCsrAdjacency(buffer: ArrayBuffer): CsrAdjacency | null {
+  if (buffer.byteLength < HEADER_WORDS * 4) return null;
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) return null;
+  const view = new DataView(buffer);
+  const n = view.getUint32(4, true);
+  const m = view.getUint32(8, true);
+  if (buffer.byteLength < (HEADER_WORDS + n + 1 + 3 * m) * 4) return null;
+  let offset = HEADER_WORDS * 4;
+  const take = (len: number) => {
+    const arr = new Uint32Array(buffer, offset, len);
+    offset += len * 4;
+    return arr;
+  };
+  return { nodeCount: n, offsets: take(n + 1), indices: take(m), weights: take(m), edges: take(m) };
+}
+
+export async function loadCsrAdjacency(pathPrefix = 'data', file = 'global.csr.bin'): Promise<CsrAdjacency | null> {
+  try {
+    const res = await fetch(`${base}/${pathPrefix}/networks/${file}`, { cache: 'no-cache' });
+    if (!res.ok) return null;
+    return parseCsrAdjacency(await res.arrayBuffer());
+  } catch {
+    return null;
+  }
+}
+
+/** Up to k strongest neighbours of node i as [neighbour index, weight, edge index]. */
+export function csrNeighbors(adj: CsrAdjacency, i: number, k = Infinity): [number, number, number][] {
+  const lo = adj.offsets[i];
+  const hi = Math.min(adj.offsets[i + 1], lo + k);
+  const out: [number, number, number][] = [];
+  for (let j = lo; j < hi; j++) out.push([adj.indices[j], adj.weights[j], adj.edges[j]]);
+  return out;
+}
+
+/**
+ * Ego network of node i: nodes within `hops` (following each node's top-k neighbours)
+ * and the indices of the edges among them.
+ */
+export function csrEgoNetwork(
+  adj: CsrAdjacency,
+  i: number,
+  hops = 1,
+  k = Infinity
+): { nodes: number[]; edges: number[] } {
+  const seen = new Set<number>([i]);
+  const order = [i];
+  let frontier = [i];
+  for (let h = 0; h < hops; h++) {
+    const next: number[] = [];
+    for (const u of frontier) {
+      const lo = adj.offsets[u];
+      const hi = Math.min(adj.offsets[u + 1], lo + k);
+      for (let j = lo; j < hi; j++) {
+        const v = adj.indices[j];
+        if (!seen.has(v)) {
+          seen.add(v);
+          order.push(v);
+          next.push(v);
+        }
+      }
+    }
+    frontier = next;
+  }
+  const edges: number[] = [];
+  for (const u of order) {
+    for (let j = adj.offsets[u]; j < adj.offsets[u + 1]; j++) {
+      const v = adj.indices[j];
+      if (u < v && seen.has(v)) edges.push(adj.edges[j]);
+    }
+  }
+  edges.sort((a, b) => a - b);
+  return { nodes: order, edges };
+}
@@ -0,0 +1,176 @@
+import { base } from '$app/paths';
+import { loadCsrAdjacency, type CsrAdjacency } from './networkAdjacencyService';
+
+/**
+ * Level-of-detail hierarchy of the global network (scripts/network_coarsen.py,
+ * networks/levels/). Level 0 is global.json; level k merges level k-1 nodes into
+ * supernodes by heavy-edge matching, with summed edge weights. Show the coarsest level
+ * first, then expand a supernode into its children:
+ *
+ *   const manifest = await loadLevelsManifest();
+ *   const top = await loadLevel(manifest.levels.length - 1);
+ *   const region = await expandSupernode(top.level, s); // children + their links
+ *
+ * Level 0 nodes (children of level 1) are described by nodes.json, so drilling down
+ * never needs global.json; state/networkData.svelte.ts builds the view this way.
+ */
+export interface LevelsManifest {
+  version: number;
+  method: string;
+  maxGroup: number;
+  baseNodes?: string; // nodes.json (version 2+)
+  levels: { level: number; file: string; nodes: number; edges: number; seconds?: number; bytes?: number }[];
+}
+
+export interface NetworkLevel {
+  level: number;
+  nodes: {
+    label: string[];
+    type: string[];
+    size: number[]; // base nodes merged into the supernode
+    internal: number[]; // summed weight of the edges inside it
+    strength: number[];
+    rep: number[]; // representative node (index into global.json nodes)
+  };
+  edges: { source: number[]; target: number[]; weight: number[] };
+  children: { offsets: number[]; index: number[] };
+}
+
+/** global.json nodes as parallel arrays (networks/levels/nodes.json) */
+export interface BaseNodes {
+  id: string[];
+  label: string[];
+  type: string[];
+  count: number[];
+  centrality: number[];
+}
+
+export interface ExpandedRegion {
+  /** level k-1 node indices (global.json positions when k = 1) */
+  children: number[];
+  /** [child, child, weight] edges inside the region */
+  edges: [number, number, number][];
+  /** [child, level-k supernode, summed weight] links to the rest of the level-k graph */
+  links: [number, number, number][];
+}
+
+let manifestPromise: Promise<LevelsManifest | null> | null = null;
+const levelCache = new Map<number, Promise<NetworkLevel | null>>();
+let baseNodesPromise: Promise<BaseNodes | null> | null = null;
+const parentCache = new Map<number, Int32Array>();
+
+export function loadLevelsManifest(pathPrefix = 'data'): Promise<LevelsManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${base}/${pathPrefix}/networks/levels/manifest.json`, { cache: 'no-cache' })
+      .then((res) => (res.ok ? (res.json() as Promise<LevelsManifest>) : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+/** A coarsened level (k >= 1); fetched once and cached. */
+export function loadLevel(level: number, pathPrefix = 'data'): Promise<NetworkLevel | null> {
+  let pending = levelCache.get(level);
+  if (!pending) {
+    pending = fetch(`${base}/${pathPrefix}/networks/levels/level_${level}.json`)
+      .then((res) => (res.ok ? (res.json() as Promise<NetworkLevel>) : null))
+      .catch(() => null);
+    pending.then((json) => {
+      if (!json) levelCache.delete(level);
+    });
+    levelCache.set(level, pending);
+  }
+  return pending;
+}
+
+/** Level 0 node table; null when the levels predate nodes.json. */
+export function loadBaseNodes(pathPrefix = 'data'): Promise<BaseNodes | null> {
+  if (!baseNodesPromise) {
+    baseNodesPromise = loadLevelsManifest(pathPrefix)
+      .then((manifest) =>
+        manifest?.baseNodes ? fetch(`${base}/${pathPrefix}/networks/levels/${manifest.baseNodes}`) : null
+      )
+      .then((res) => (res?.ok ? (res.json() as Promise<BaseNodes>) : null))
+      .catch(() => null);
+  }
+  return baseNodesPromise;
+}
+
+/** Supernode of level k-1 node `i` at level k. */
+export function parentOf(level: NetworkLevel, i: number): number {
+  return parentsOf(level)[i];
+}
+
+/** Supernode of every level k-1 node at level k. */
+function parentsOf(level: NetworkLevel): Int32Array {
+  let parent = parentCache.get(level.level);
+  if (!parent) {
+    const { offsets, index } = level.children;
+    parent = new Int32Array(index.length);
+    for (let s = 0; s + 1 < offsets.length; s++) {
+      for (let j = offsets[s]; j < offsets[s + 1]; j++) parent[index[j]] = s;
+    }
+    parentCache.set(level.level, parent);
+  }
+  return parent;
+}
+
+/** Weighted neighbours of a node at level k-1 (the CSR adjacency for level 0). */
+function finerNeighbours(
+  finer: NetworkLevel | null,
+  csr: CsrAdjacency | null
+): (i: number, visit: (j: number, w: number) => void) => void {
+  if (csr) {
+    return (i, visit) => {
+      for (let j = csr.offsets[i]; j < csr.offsets[i + 1]; j++) visit(csr.indices[j], csr.weights[j]);
+    };
+  }
+  const rows = new Map<number, [number, number][]>();
+  if (finer) {
+    const { source, target, weight } = finer.edges;
+    for (let e = 0; e < source.length; e++) {
+      (rows.get(source[e]) ?? rows.set(source[e], []).get(source[e])!).push([target[e], weight[e]]);
+      (rows.get(target[e]) ?? rows.set(target[e], []).get(target[e])!).push([source[e], weight[e]]);
+    }
+  }
+  return (i, visit) => {
+    for (const [j, w] of rows.get(i) ?? []) visit(j, w);
+  };
+}
+
+/** Replace supernode `s` of level k by its children and their links to the other supernodes. */
+export async function expandSupernode(level: number, s: number, pathPrefix = 'data'): Promise<ExpandedRegion | null> {
+  const coarse = await loadLevel(level, pathPrefix);
+  if (!coarse) return null;
+  const [finer, csr] =
+    level === 1
+      ? [null, await loadCsrAdjacency(pathPrefix)]
+      : [await loadLevel(level - 1, pathPrefix), null];
+  if (!finer && !csr) return null;
+  const { offsets, index } = coarse.children;
+  const children = index.slice(offsets[s], offsets[s + 1]);
+  const inRegion = new Set(children);
+  const parent = parentsOf(coarse);
+  const neighbours = finerNeighbours(finer, csr);
+  const edges: [number, number, number][] = [];
+  const links: [number, number, number][] = [];
+  for (const c of children) {
+    const summed = new Map<number, number>();
+    neighbours(c, (j, w) => {
+      if (inRegion.has(j)) {
+        if (c < j) edges.push([c, j, w]);
+      } else {
+        summed.set(parent[j], (summed.get(parent[j]) ?? 0) + w);
+      }
+    });
+    for (const [t, w] of summed) links.push([c, t, w]);
+  }
+  return { children, edges, links };
+}
+
+export function clearNetworkLevelsCache(): void {
+  manifestPromise = null;
+  baseNodesPromise = null;
+  levelCache.clear();
+  parentCache.clear();
+}
@@ -0,0 +1,237 @@
+import { base } from '$app/paths';
+import { dayOrdinal } from './temporalIndexService';
+
+/**
+ * Bitmap posting lists (scripts/posting_bitmaps.py, postings/bitmaps.bin).
+ *
+ * Articles are numbered 0..n-1 in publication order. Every entity ("person:123"),
+ * entity type, article country and newspaper has a roaring-style compressed bitmap of
+ * article ordinals; decoded bitmaps are dense bitsets (Uint32Array, one bit per article)
+ * so filters combine with word-wise AND / OR / AND NOT:
+ *
+ *   const idx = await loadPostingBitmaps();
+ *   const hits = and(idx.get('country', 'Burkina Faso'), idx.get('entity', 'organization:12'), idx.years(1990, 2000));
+ *   idx.articleIds(hits);
+ */
+export type PostingKind = 'entity' | 'entityType' | 'country' | 'newspaper';
+export type Bitset = Uint32Array;
+
+interface PostingHeader {
+	version: number;
+	articleCount: number;
+	articleIdEncoding: 'delta' | 'string';
+	articleIds: Array<number | string>;
+	undated: number;
+	days: number[];
+	years: Record<string, [number, number]>;
+	postings: Record<string, { keys: string[]; lengths: number[] }>;
+}
+
+const MAGIC = 'IWPB';
+const ARRAY = 0;
+const BITSET = 1;
+const RUN = 2;
+
+export class PostingBitmaps {
+	readonly size: number;
+	private readonly ids: string[];
+	private readonly dayStarts: number[] = []; // distinct days, ascending
+	private readonly dayOrdinals: number[] = []; // first ordinal of each day
+	private readonly offsets = new Map<string, [number, number]>();
+	private readonly decoded = new Map<string, Bitset>();
+
+	constructor(
+		private readonly header: PostingHeader,
+		private readonly view: DataView
+	) {
+		this.size = header.articleCount;
+		if (header.articleIdEncoding === 'delta') {
+			let value = 0;
+			this.ids = header.articleIds.map((d) => String((value += d as number)));
+		} else {
+			this.ids = header.articleIds.map(String);
+		}
+		let day = 0;
+		let ordinal = header.undated;
+		for (let i = 0; i < header.days.length; i += 2) {
+			day += header.days[i];
+			this.dayStarts.push(day);
+			this.dayOrdinals.push(ordinal);
+			ordinal += header.days[i + 1];
+		}
+		let offset = 0;
+		for (const [kind, { keys, lengths }] of Object.entries(header.postings)) {
+			keys.forEach((key, i) => {
+				this.offsets.set(`${kind}\u0000${key}`, [offset, lengths[i]]);
+				offset += lengths[i];
+			});
+		}
+	}
+
+	keys(kind: PostingKind): string[] {
+		return this.header.postings[kind]?.keys ?? [];
+	}
+
+	/** Bitmap for a key (empty when unknown); decoded once and cached. */
+	get(kind: PostingKind, key: string): Bitset {
+		const id = `${kind}\u0000${key}`;
+		const cached = this.decoded.get(id);
+		if (cached) return cached;
+		const entry = this.offsets.get(id);
+		const bits = entry ? this.decode(entry[0]) : emptyBitset(this.size);
+		this.decoded.set(id, bits);
+		return bits;
+	}
+
+	all(): Bitset {
+		return rangeBitset(this.size, 0, this.size);
+	}
+
+	/** Articles published in [start, end] (inclusive years). */
+	years(start?: number, end?: number): Bitset {
+		return this.dates(
+			start !== undefined ? new Date(start, 0, 1) : undefined,
+			end !== undefined ? new Date(end, 11, 31) : undefined
+		);
+	}
+
+	/** Articles published between two dates (inclusive, local calendar days like the year filter). */
+	dates(start?: Date, end?: Date): Bitset {
+		const lo = start ? this.firstOrdinalFrom(dayOrdinal(start)) : this.header.undated;
+		const hi = end ? this.firstOrdinalFrom(dayOrdinal(end) + 1) : this.size;
+		return rangeBitset(this.size, lo, hi);
+	}
+
+	articleIds(bits: Bitset): string[] {
+		const out: string[] = [];
+		forEachOrdinal(bits, (i) => out.push(this.ids[i]));
+		return out;
+	}
+
+	private firstOrdinalFrom(day: number): number {
+		let lo = 0;
+		let hi = this.dayStarts.length;
+		while (lo < hi) {
+			const mid = (lo + hi) >> 1;
+			if (this.dayStarts[mid] < day) lo = mid + 1;
+			else hi = mid;
+		}
+		return lo < this.dayOrdinals.length ? this.dayOrdinals[lo] : this.size;
+	}
+
+	private decode(offset: number): Bitset {
+		const bits = emptyBitset(this.size);
+		const v = this.view;
+		let pos = offset;
+		const count = v.getUint16(pos, true);
+		pos += 2;
+		for (let c = 0; c < count; c++) {
+			const key = v.getUint16(pos, true);
+			const kind = v.getUint8(pos + 2);
+			const n = v.getUint16(pos + 3, true) + 1;
+			pos += 5;
+			const baseOrdinal = key << 16;
+			if (kind === ARRAY) {
+				for (let i = 0; i < n; i++, pos += 2) setBit(bits, baseOrdinal + v.getUint16(pos, true));
+			} else if (kind === BITSET) {
+				const word0 = baseOrdinal >>> 5;
+				for (let w = 0; w < 2048 && word0 + w < bits.length; w++) bits[word0 + w] = v.getUint32(pos + w * 4, true);
+				pos += 8192;
+			} else if (kind === RUN) {
+				for (let r = 0; r < n; r++, pos += 4) {
+					const start = baseOrdinal + v.getUint16(pos, true);
+					const length = v.getUint16(pos + 2, true) + 1;
+					for (let i = start; i < start + length; i++) setBit(bits, i);
+				}
+			}
+		}
+		return bits;
+	}
+}
+
+function emptyBitset(size: number): Bitset {
+	return new Uint32Array((size + 31) >>> 5);
+}
+
+function setBit(bits: Bitset, i: number): void {
+	bits[i >>> 5] |= 1 << (i & 31);
+}
+
+function rangeBitset(size: number, lo: number, hi: number): Bitset {
+	const bits = emptyBitset(size);
+	for (let i = lo; i < hi; i++) setBit(bits, i);
+	return bits;
+}
+
+export function and(first: Bitset, ...rest: Bitset[]): Bitset {
+	const out = first.slice();
+	for (const b of rest) for (let i = 0; i < out.length; i++) out[i] &= b[i];
+	return out;
+}
+
+export function or(first: Bitset, ...rest: Bitset[]): Bitset {
+	const out = first.slice();
+	for (const b of rest) for (let i = 0; i < out.length; i++) out[i] |= b[i];
+	return out;
+}
+
+export function andNot(a: Bitset, b: Bitset): Bitset {
+	const out = a.slice();
+	for (let i = 0; i < out.length; i++) out[i] &= ~b[i];
+	return out;
+}
+
+export function cardinality(bits: Bitset): number {
+	let count = 0;
+	for (let i = 0; i < bits.length; i++) {
+		let w = bits[i];
+		w -= (w >>> 1) & 0x55555555;
+		w = (w & 0x33333333) + ((w >>> 2) & 0x33333333);
+		count += (((w + (w >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+	}
+	return count;
+}
+
+export function forEachOrdinal(bits: Bitset, fn: (ordinal: number) => void): void {
+	for (let i = 0; i < bits.length; i++) {
+		let w = bits[i];
+		while (w !== 0) {
+			const t = w & -w;
+			fn((i << 5) + (31 - Math.clz32(t)));
+			w ^= t;
+		}
+	}
+}
+
+export function parsePostingBitmaps(buffer: ArrayBuffer): PostingBitmaps | null {
+	if (buffer.byteLength < 12) return null;
+	if (String.fromCharCode(...new Uint8Array(buffer, 0, 4)) !== MAGIC) return null;
+	const view = new DataView(buffer);
+	const headerLength = view.getUint32(8, true);
+	const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, headerLength))) as PostingHeader;
+	return new PostingBitmaps(header, new DataView(buffer, 12 + headerLength));
+}
+
+let bitmapsPromise: Promise<PostingBitmaps | null> | null = null;
+let loaded: PostingBitmaps | null = null;
+
+export function loadPostingBitmaps(pathPrefix = 'data'): Promise<PostingBitmaps | null> {
+	if (!bitmapsPromise) {
+		bitmapsPromise = (async () => {
+			try {
+				const res = await fetch(`${base}/${pathPrefix}/postings/bitmaps.bin`);
+				if (!res.ok) return null;
+				loaded = parsePostingBitmaps(await res.arrayBuffer());
+				return loaded;
+			} catch {
+				return null;
+			}
+		})();
+	}
+	return bitmapsPromise;
+}
+
+/** The bitmaps if they have already been loaded (synchronous access for derived state). */
+export function getPostingBitmaps(): PostingBitmaps | null {
+	return loaded;
+}
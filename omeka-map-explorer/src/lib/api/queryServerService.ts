@@ -0,0 +1,93 @@
+/**
+ * Client for the optional local aggregate query server (scripts/query_server.py).
+ *
+ * Enabled by setting VITE_IWAC_QUERY_SERVER (e.g. http://127.0.0.1:8765) when running the
+ * dev server. When unset, or when a request fails, callers fall back to the static
+ * world_cache files and client-side aggregation.
+ */
+import { decodeCountryCounts, type CoordinateCluster } from './worldMapCacheService';
+
+export interface QueryFilter {
+	countries?: string[];
+	newspapers?: string[];
+	/** Entity keys as "type:id"; type may be 'person', 'persons' or 'Personnes' */
+	entities?: string[];
+	entityTypes?: string[];
+	dateRange?: { start: Date; end: Date } | null;
+}
+
+export interface QueryChoropleth {
+	/** Keyed by world GeoJSON country name (the server's ISO keys are decoded) */
+	counts: Record<string, number>;
+	countryKeys?: string;
+	total_articles: number;
+	total_countries: number;
+	matched_articles: number;
+}
+
+export interface QueryCoordinates {
+	clusters: CoordinateCluster[];
+	total_clusters: number;
+	total_articles: number;
+	matched_articles: number;
+}
+
+export interface QuerySubnetwork {
+	nodes: Array<Record<string, any> & { id: string }>;
+	edges: Array<{ source: string; target: string; type: string; weight: number }>;
+	meta: { totalNodes: number; totalEdges: number; truncated: boolean; matched_articles: number };
+}
+
+const SERVER: string = (import.meta.env.VITE_IWAC_QUERY_SERVER ?? '').replace(/\/$/, '');
+
+export function isQueryServerEnabled(): boolean {
+	return SERVER.length > 0;
+}
+
+function toParams(filter: QueryFilter, extra: Record<string, string | number | undefined> = {}): URLSearchParams {
+	const params = new URLSearchParams();
+	if (filter.countries?.length) params.set('country', filter.countries.join(','));
+	if (filter.newspapers?.length) params.set('newspaper', filter.newspapers.join(','));
+	for (const e of filter.entities ?? []) params.append('entity', e);
+	if (filter.entityTypes?.length) params.set('entityType', filter.entityTypes.join(','));
+	if (filter.dateRange) {
+		params.set('from', filter.dateRange.start.toISOString().slice(0, 10));
+		params.set('to', filter.dateRange.end.toISOString().slice(0, 10));
+	}
+	for (const [k, v] of Object.entries(extra)) {
+		if (v !== undefined) params.set(k, String(v));
+	}
+	return params;
+}
+
+async function query<T>(endpoint: string, params: URLSearchParams): Promise<T | null> {
+	if (!SERVER) return null;
+	try {
+		const res = await fetch(`${SERVER}/api/${endpoint}?${params}`);
+		if (!res.ok) {
+			console.warn(`Query server ${endpoint} failed: ${res.status}`);
+			return null;
+		}
+		return (await res.json()) as T;
+	} catch (e) {
+		console.warn(`Query server ${endpoint} unavailable:`, e);
+		return null;
+	}
+}
+
+export async function queryChoropleth(filter: QueryFilter): Promise<QueryChoropleth | null> {
+	const result = await query<QueryChoropleth>('choropleth', toParams(filter));
+	if (result) result.counts = await decodeCountryCounts(result);
+	return result;
+}
+
+export function queryCoordinates(filter: QueryFilter): Promise<QueryCoordinates | null> {
+	return query<QueryCoordinates>('coordinates', toParams(filter));
+}
+
+export function querySubnetwork(
+	filter: QueryFilter,
+	options: { weightMin?: number; limit?: number; focus?: string } = {}
+): Promise<QuerySubnetwork | null> {
+	return query<QuerySubnetwork>('subnetwork', toParams(filter, options));
+}
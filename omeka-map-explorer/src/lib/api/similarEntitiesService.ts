@@ -0,0 +1,89 @@
+import { base } from '$app/paths';
+import { shardOf, type EntityDetailsType } from './entityDetailsService';
+
+/**
+ * Entities with similar article footprints (scripts/build_similar_entities.py).
+ *
+ * Top-K entities of any type by estimated Jaccard similarity of relatedArticleIds
+ * (MinHash + LSH), sharded like the drill-down payloads:
+ *   entities/similar/manifest.json
+ *   entities/similar/<dir>/<shard:03d>.json   { "<entity id>": SimilarEntity[] }
+ */
+
+/** [type, entity id, name, estimated Jaccard similarity] */
+export type SimilarEntity = [EntityDetailsType, string, string, number];
+
+export interface SimilarEntitiesManifest {
+  version: number;
+  numPerm: number;
+  bands: number;
+  rows: number;
+  threshold: number;
+  topK: number;
+  check: { meanAbsError: number; recallAtK: number | null; candidateRecall: number | null } | null;
+  types: Partial<Record<EntityDetailsType, { dir: string; shards: number; entities: number }>>;
+  updatedAt?: string;
+}
+
+let manifest: SimilarEntitiesManifest | null = null;
+let manifestLoading: Promise<SimilarEntitiesManifest | null> | null = null;
+const shardCache = new Map<string, Promise<Record<string, SimilarEntity[]> | null>>();
+
+export async function loadSimilarEntitiesManifest(basePath = 'data'): Promise<SimilarEntitiesManifest | null> {
+  if (manifest) return manifest;
+  if (!manifestLoading) {
+    manifestLoading = (async () => {
+      try {
+        const res = await fetch(`${base}/${basePath}/entities/similar/manifest.json`);
+        if (!res.ok) return null;
+        const json = (await res.json()) as SimilarEntitiesManifest;
+        if (!json || !json.types) return null;
+        manifest = json;
+        return json;
+      } catch {
+        return null;
+      } finally {
+        manifestLoading = null;
+      }
+    })();
+  }
+  return manifestLoading;
+}
+
+async function loadShard(basePath: string, dir: string, shard: number): Promise<Record<string, SimilarEntity[]> | null> {
+  const url = `${base}/${basePath}/entities/similar/${dir}/${String(shard).padStart(3, '0')}.json`;
+  let pending = shardCache.get(url);
+  if (!pending) {
+    pending = (async () => {
+      try {
+        const res = await fetch(url);
+        if (!res.ok) return null;
+        return (await res.json()) as Record<string, SimilarEntity[]>;
+      } catch {
+        return null;
+      }
+    })();
+    shardCache.set(url, pending);
+    // Let a failed shard be retried on the next request
+    pending.then((json) => {
+      if (!json) shardCache.delete(url);
+    });
+  }
+  return pending;
+}
+
+/** Similar entities, best first, optionally restricted to some types. */
+export async function loadSimilarEntities(
+  type: EntityDetailsType,
+  id: string | number,
+  options: { types?: EntityDetailsType[]; basePath?: string } = {}
+): Promise<SimilarEntity[]> {
+  const basePath = options.basePath ?? 'data';
+  const m = await loadSimilarEntitiesManifest(basePath);
+  const info = m?.types[type];
+  if (!info) return [];
+  const key = String(id);
+  const shard = await loadShard(basePath, info.dir, shardOf(key, info.shards));
+  const similar = shard?.[key] ?? [];
+  return options.types ? similar.filter(([t]) => options.types!.includes(t)) : similar;
+}
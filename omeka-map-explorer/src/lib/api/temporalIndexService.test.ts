@@ -0,0 +1,48 @@
+import { describe, test, expect, beforeAll, afterAll, vi } from 'vitest';
+
+vi.mock('$app/paths', () => ({ base: '' }));
+
+import {
+	articleIdsInRange,
+	dayOrdinal,
+	monthOrdinal,
+	type TemporalIndex
+} from './temporalIndexService';
+
+const MS_PER_DAY = 86_400_000;
+const utcDay = (y: number, m: number, d: number) => Date.UTC(y, m, d) / MS_PER_DAY;
+
+// Articles on the last day of 2019 and the first/last days of 2020.
+const index: TemporalIndex = {
+	months: null,
+	articleIds: ['a', 'b', 'c', 'd'],
+	day: [utcDay(2019, 11, 31), utcDay(2020, 0, 1), utcDay(2020, 11, 31), utcDay(2021, 0, 1)],
+	month: [],
+	monthOffsets: [],
+	undatedIds: [],
+	monthly: { total: [], byArticleCountry: {} }
+} as unknown as TemporalIndex;
+
+describe.each(['Europe/Berlin', 'America/New_York', 'Asia/Tokyo'])('temporal index in %s', (tz) => {
+	const previousTz = process.env.TZ;
+	beforeAll(() => {
+		process.env.TZ = tz;
+	});
+	afterAll(() => {
+		process.env.TZ = previousTz;
+	});
+
+	test('ordinals follow the local calendar date', () => {
+		expect(dayOrdinal(new Date(2020, 0, 1))).toBe(utcDay(2020, 0, 1));
+		expect(dayOrdinal(new Date(2020, 11, 31))).toBe(utcDay(2020, 11, 31));
+		expect(monthOrdinal(new Date(2020, 0, 1))).toBe(2020 * 12);
+		expect(monthOrdinal(new Date(2020, 11, 31))).toBe(2020 * 12 + 11);
+	});
+
+	test('a year filter selects exactly that year', () => {
+		expect(articleIdsInRange(index, new Date(2020, 0, 1), new Date(2020, 11, 31))).toEqual([
+			'b',
+			'c'
+		]);
+	});
+});
@@ -0,0 +1,125 @@
+import { base } from '$app/paths';
+
+/**
+ * Precomputed temporal index (scripts/build_temporal_index.py).
+ *
+ * Articles are sorted by publication date, so any date range maps to a contiguous
+ * slice of `articleIds` / `day` / `month`:
+ *  - day:   days since 1970-01-01 (UTC)
+ *  - month: year * 12 + (month - 1)
+ */
+export interface TemporalIndex {
+  months: { start: number; end: number; startLabel: string; endLabel: string } | null;
+  articleIds: string[];
+  day: number[];
+  month: number[];
+  monthOffsets: number[];
+  undatedIds: string[];
+  monthly: {
+    total: number[];
+    byArticleCountry: Record<string, number[]>;
+    byLocationCountry: Record<string, number[]>;
+  };
+  updatedAt?: string;
+}
+
+const MS_PER_DAY = 86_400_000;
+
+let loaded: TemporalIndex | null = null;
+let loading: Promise<TemporalIndex | null> | null = null;
+
+export async function loadTemporalIndex(basePath = 'data'): Promise<TemporalIndex | null> {
+  if (loaded) return loaded;
+  if (!loading) {
+    loading = (async () => {
+      try {
+        const res = await fetch(`${base}/${basePath}/temporal/index.json`);
+        if (!res.ok) return null;
+        const json = (await res.json()) as TemporalIndex;
+        if (!json || !Array.isArray(json.articleIds) || !Array.isArray(json.monthOffsets)) return null;
+        loaded = json;
+        return json;
+      } catch {
+        return null;
+      } finally {
+        loading = null;
+      }
+    })();
+  }
+  return loading;
+}
+
+/** The index if it has already been loaded (synchronous access for derived state). */
+export function getTemporalIndex(): TemporalIndex | null {
+  return loaded;
+}
+
+/**
+ * Day ordinal of a filter date. Filter bounds are built at local midnight
+ * (`new Date(y, 0, 1)`), so the calendar day is read with local getters.
+ */
+export function dayOrdinal(d: Date): number {
+  return Math.floor(Date.UTC(d.getFullYear(), d.getMonth(), d.getDate()) / MS_PER_DAY);
+}
+
+export function monthOrdinal(d: Date): number {
+  return d.getFullYear() * 12 + d.getMonth();
+}
+
+export function monthStartDate(month: number): Date {
+  return new Date(Date.UTC(Math.floor(month / 12), month % 12, 1));
+}
+
+function lowerBound(arr: number[], value: number): number {
+  let lo = 0;
+  let hi = arr.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (arr[mid] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+/** [lo, hi) positions of articles published between start and end (inclusive, by day). */
+export function daySlice(index: TemporalIndex, start: Date, end: Date): [number, number] {
+  const lo = lowerBound(index.day, dayOrdinal(start));
+  const hi = lowerBound(index.day, dayOrdinal(end) + 1);
+  return [lo, Math.max(lo, hi)];
+}
+
+/** [lo, hi) positions of articles published in months m1..m2 (inclusive), via monthOffsets. */
+export function monthSlice(index: TemporalIndex, m1: number, m2: number): [number, number] {
+  if (!index.months) return [0, 0];
+  const { start, end } = index.months;
+  const clamp = (m: number) => Math.min(Math.max(m, start), end + 1) - start;
+  const lo = clamp(m1);
+  const hi = Math.max(lo, clamp(m2 + 1));
+  return [index.monthOffsets[lo], index.monthOffsets[hi]];
+}
+
+export function articleIdsInRange(index: TemporalIndex, start: Date, end: Date): string[] {
+  const [lo, hi] = daySlice(index, start, end);
+  return index.articleIds.slice(lo, hi);
+}
+
+/**
+ * Monthly article counts as a dated series, optionally restricted to one article
+ * country or one location country (only months with articles are returned).
+ */
+export function monthlySeries(
+  index: TemporalIndex,
+  options: { articleCountry?: string; locationCountry?: string } = {}
+): { date: Date; month: number; count: number }[] {
+  if (!index.months) return [];
+  let counts = index.monthly.total;
+  if (options.articleCountry) counts = index.monthly.byArticleCountry[options.articleCountry] ?? [];
+  else if (options.locationCountry) counts = index.monthly.byLocationCountry[options.locationCountry] ?? [];
+  const out: { date: Date; month: number; count: number }[] = [];
+  for (let i = 0; i < counts.length; i++) {
+    if (!counts[i]) continue;
+    const month = index.months.start + i;
+    out.push({ date: monthStartDate(month), month, count: counts[i] });
+  }
+  return out;
+}
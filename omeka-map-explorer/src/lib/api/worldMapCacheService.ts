@@ -69,14 +69,15 @@ export async function loadChoroplethCache(options: {
 		}
 		
 		const data = await response.json();
+		data.counts = await decodeCountryCounts(data);
 		worldMapCache.set(cacheKey, data);
 		
 		console.log(`Successfully loaded cache: ${cacheFile}`, {
-			countries: Object.keys(data.counts || {}).length,
+			countries: Object.keys(data.counts).length,
 			totalArticles: data.total_articles
 		});
 		
-		return data.counts || {};
+		return data.counts;
 		
 	} catch (e) {
 		console.error('Failed to load choropleth cache:', e);
@@ -196,7 +197,7 @@ export async function loadArticleCountryCoordinateClusters(articleCountries: str
 		}
 
 		// Merge duplicates across countries by coordinate key (rounded for stability)
-		const merged = new Map<string, CoordinateCluster & { relatedArticleIds: string[] }>();
+		const merged = new Map<string, CoordinateCluster>();
 		for (const cl of allClusters) {
 			if (!cl || !cl.coordinates) continue;
 			const [lat, lng] = cl.coordinates;
@@ -204,14 +205,19 @@ export async function loadArticleCountryCoordinateClusters(articleCountries: str
 			const existing = merged.get(key);
 			if (existing) {
 				existing.articleCount += cl.articleCount;
-				// Union relatedArticleIds
-				if (cl.relatedArticleIds && cl.relatedArticleIds.length) {
-					const set = new Set(existing.relatedArticleIds);
+				// Keep every source's article list; resolved lazily by loadClusterArticleIds
+				existing.mergedPostings = [...(existing.mergedPostings ?? []), ...clusterPostings(cl)];
+				if (cl.relatedArticleIds?.length) {
+					const set = new Set(existing.relatedArticleIds ?? []);
 					for (const id of cl.relatedArticleIds) set.add(id);
 					existing.relatedArticleIds = Array.from(set);
 				}
 			} else {
-				merged.set(key, { ...cl, relatedArticleIds: cl.relatedArticleIds ? [...cl.relatedArticleIds] : [] });
+				merged.set(key, {
+					...cl,
+					mergedPostings: clusterPostings(cl),
+					relatedArticleIds: cl.relatedArticleIds ? [...cl.relatedArticleIds] : undefined
+				});
 			}
 		}
 		const mergedArr = Array.from(merged.values());
@@ -223,6 +229,91 @@ export async function loadArticleCountryCoordinateClusters(articleCountries: str
 	}
 }
 
+// Country names table (world_cache/countries.json) for ISO-keyed choropleth counts
+let countryNamesPromise: Promise<Record<string, string>> | null = null;
+
+export function loadCountryNames(): Promise<Record<string, string>> {
+	if (!countryNamesPromise) {
+		countryNamesPromise = fetch(`${base}/data/world_cache/countries.json`)
+			.then((response) => (response.ok ? response.json() : { names: {} }))
+			.then((data) => data.names ?? {})
+			.catch((e) => {
+				console.warn('Failed to load country names table:', e);
+				return {};
+			});
+	}
+	return countryNamesPromise;
+}
+
+/**
+ * Choropleth counts keyed by world GeoJSON country name. Cache v1.3 files (and the query
+ * server) key counts by ISO 3166-1 alpha-2 code and set `countryKeys`; older files are
+ * already keyed by name and returned as is.
+ */
+export async function decodeCountryCounts(data: {
+	counts?: Record<string, number>;
+	countryKeys?: string;
+}): Promise<Record<string, number>> {
+	const counts = data.counts ?? {};
+	if (!data.countryKeys) return counts;
+	const names = await loadCountryNames();
+	const out: Record<string, number> = {};
+	for (const [key, n] of Object.entries(counts)) {
+		const name = names[key] ?? key;
+		out[name] = (out[name] ?? 0) + n;
+	}
+	return out;
+}
+
+// Shared article id lists referenced by cluster.postings (coordinates/postings.json)
+let postingsPromise: Promise<string[][] | null> | null = null;
+
+function clusterPostings(cluster: CoordinateCluster): number[] {
+	if (cluster.mergedPostings) return [...cluster.mergedPostings];
+	return cluster.postings !== undefined ? [cluster.postings] : [];
+}
+
+async function loadPostings(): Promise<string[][] | null> {
+	if (!postingsPromise) {
+		postingsPromise = (async () => {
+			try {
+				const response = await fetch(`${base}/data/world_cache/coordinates/postings.json`);
+				if (!response.ok) return null;
+				const data: ArticlePostingsData = await response.json();
+				// Undo the delta encoding; 'delta-index' lists index into data.ids
+				return data.lists.map((deltas) => {
+					const out: string[] = new Array(deltas.length);
+					let value = 0;
+					for (let i = 0; i < deltas.length; i++) {
+						value += deltas[i];
+						out[i] = data.ids ? data.ids[value] : String(value);
+					}
+					return out;
+				});
+			} catch (e) {
+				console.warn('Failed to load article postings:', e);
+				return null;
+			}
+		})();
+	}
+	return postingsPromise;
+}
+
+/**
+ * Article ids of a coordinate cluster. Clusters reference a shared posting list by index
+ * (cache v1.2); older caches embed relatedArticleIds directly.
+ */
+export async function loadClusterArticleIds(cluster: CoordinateCluster): Promise<string[]> {
+	const refs = clusterPostings(cluster);
+	if (refs.length === 0) return cluster.relatedArticleIds ?? [];
+	const lists = await loadPostings();
+	if (!lists) return cluster.relatedArticleIds ?? [];
+	if (refs.length === 1) return lists[refs[0]] ?? [];
+	const ids = new Set<string>();
+	for (const ref of refs) for (const id of lists[ref] ?? []) ids.add(id);
+	return Array.from(ids);
+}
+
 /**
  * Convert cached coordinate clusters to ProcessedItem format for compatibility
  */
@@ -293,6 +384,8 @@ function normalizeCountryFilename(country: string): string {
 export function clearWorldMapCache(): void {
 	worldMapCache.clear();
 	cacheMetadata = null;
+	postingsPromise = null;
+	countryNamesPromise = null;
 }
 
 // Type definitions for cached data
@@ -304,12 +397,28 @@ export interface CoordinateCluster {
 	region: string;
 	prefecture: string;
 	articleCount: number;
-	relatedArticleIds: string[];
+	/** Index into coordinates/postings.json (cache v1.2) */
+	postings?: number;
+	/** Posting indices of clusters merged across article countries */
+	mergedPostings?: number[];
+	/** Inline article ids (cache v1.1) */
+	relatedArticleIds?: string[];
+}
+
+export interface ArticlePostingsData {
+	type: 'article_postings';
+	encoding: 'delta' | 'delta-index';
+	total_lists: number;
+	lists: number[][];
+	ids?: string[];
+	updatedAt: string;
 }
 
 export interface ChoroplethCacheData {
 	type: string;
+	/** ISO 3166-1 alpha-2 keys when countryKeys is set (cache v1.3); see decodeCountryCounts */
 	counts: Record<string, number>;
+	countryKeys?: string;
 	total_articles: number;
 	total_countries: number;
 	updatedAt: string;
@@ -0,0 +1,253 @@
+import { base } from '$app/paths';
+import { loadCoordinateCache, loadCountryNames, type CoordinateCluster } from './worldMapCacheService';
+
+/**
+ * Timeline playback frames (world_cache/frames/, scripts/build_world_map_cache.py).
+ *
+ * Frame f is the period `start + f` (a year, or year * 12 + month - 1). Its state is the
+ * article count of every marker (a position in coordinates/all_locations.json) and every
+ * country over the manifest's window (0: cumulative). Each chunk file holds a keyframe and
+ * the delta frames that lead to the next keyframe, so seeking fetches one chunk and
+ * playing applies small diffs instead of loading a by_year file per step:
+ *
+ *   const player = new FramePlayer();
+ *   await player.load('month');
+ *   await player.seek(0);
+ *   const change = await player.next(); // appeared / disappeared / changed markers
+ */
+
+/** [key delta, count, key delta, count, ...] */
+type EncodedPairs = number[];
+
+interface FrameDelta {
+	on?: EncodedPairs;
+	off?: number[];
+	inc?: EncodedPairs;
+}
+
+interface EncodedState {
+	l: EncodedPairs;
+	c: EncodedPairs;
+}
+
+type Frame = { l?: FrameDelta; c?: FrameDelta } | { k: EncodedState };
+
+interface FrameChunk {
+	frame: number;
+	period: number;
+	keyframe: EncodedState;
+	deltas: Frame[];
+}
+
+export type FrameGranularity = 'month' | 'year';
+
+export interface FramesManifest {
+	type: 'temporal_frames';
+	granularity: FrameGranularity;
+	window: number;
+	start: number;
+	end: number;
+	frames: number;
+	keyframeInterval: number;
+	locations: string;
+	countryKeys?: string;
+	countries: string[];
+	chunks: { file: string; frame: number; deltas: number; bytes: number }[];
+	sizes: Record<string, number>;
+}
+
+export interface FrameChange<K> {
+	appeared: Map<K, number>;
+	disappeared: K[];
+	changed: Map<K, number>; // new counts
+}
+
+export interface FrameStep {
+	frame: number;
+	label: string;
+	markers: FrameChange<CoordinateCluster>;
+	countries: FrameChange<string>;
+	/** The whole state was replaced (seek, or a full frame): redraw instead of patching */
+	reset: boolean;
+}
+
+function decodePairs(pairs: EncodedPairs | undefined, into = new Map<number, number>()): Map<number, number> {
+	let key = 0;
+	for (let i = 0; pairs && i < pairs.length; i += 2) {
+		key += pairs[i];
+		into.set(key, pairs[i + 1]);
+	}
+	return into;
+}
+
+const chunkCache = new Map<string, Promise<FrameChunk>>();
+
+export class FramePlayer {
+	manifest: FramesManifest | null = null;
+	/** marker position -> articles in the current frame */
+	markers = new Map<number, number>();
+	/** country index (manifest.countries) -> articles in the current frame */
+	countries = new Map<number, number>();
+	frame = -1;
+
+	private clusters: CoordinateCluster[] = [];
+	private countryNames: string[] = [];
+	private granularity: FrameGranularity = 'year';
+
+	async load(granularity: FrameGranularity): Promise<FramesManifest | null> {
+		const res = await fetch(`${base}/data/world_cache/frames/${granularity}/manifest.json`);
+		if (!res.ok) return null;
+		const manifest = (await res.json()) as FramesManifest;
+		const [clusters, names] = await Promise.all([loadCoordinateCache(), loadCountryNames()]);
+		this.manifest = manifest;
+		this.granularity = granularity;
+		this.clusters = clusters ?? [];
+		this.countryNames = manifest.countries.map((key) => (manifest.countryKeys ? names[key] ?? key : key));
+		this.frame = -1;
+		this.markers.clear();
+		this.countries.clear();
+		return manifest;
+	}
+
+	get frameCount(): number {
+		return this.manifest?.frames ?? 0;
+	}
+
+	/** 'YYYY' or 'YYYY-MM' for a frame. */
+	label(frame: number): string {
+		const period = (this.manifest?.start ?? 0) + frame;
+		if (this.granularity === 'year') return String(period);
+		return `${Math.floor(period / 12)}-${String((period % 12) + 1).padStart(2, '0')}`;
+	}
+
+	/** First day (UTC) of a frame's period. */
+	date(frame: number): Date {
+		const period = (this.manifest?.start ?? 0) + frame;
+		if (this.granularity === 'year') return new Date(Date.UTC(period, 0, 1));
+		return new Date(Date.UTC(Math.floor(period / 12), period % 12, 1));
+	}
+
+	private chunk(index: number): Promise<FrameChunk> {
+		const manifest = this.manifest!;
+		const url = `${base}/data/world_cache/frames/${manifest.granularity}/${manifest.chunks[index].file}`;
+		let pending = chunkCache.get(url);
+		if (!pending) {
+			pending = fetch(url).then((res) => {
+				if (!res.ok) throw new Error(`Failed to load frame chunk ${url}: ${res.status}`);
+				return res.json() as Promise<FrameChunk>;
+			});
+			pending.catch(() => chunkCache.delete(url));
+			chunkCache.set(url, pending);
+		}
+		return pending;
+	}
+
+	/** Jump to a frame: its chunk's keyframe plus the deltas up to it. */
+	async seek(frame: number): Promise<FrameStep | null> {
+		const manifest = this.manifest;
+		if (!manifest || frame < 0 || frame >= manifest.frames) return null;
+		const index = Math.floor(frame / manifest.keyframeInterval);
+		const chunk = await this.chunk(index);
+		const markers = decodePairs(chunk.keyframe.l);
+		const countries = decodePairs(chunk.keyframe.c);
+		for (const delta of chunk.deltas.slice(0, frame - chunk.frame)) {
+			this.apply(delta, markers, countries);
+		}
+		this.markers = markers;
+		this.countries = countries;
+		this.frame = frame;
+		if (index + 1 < manifest.chunks.length) this.chunk(index + 1).catch(() => {});
+		return {
+			frame,
+			label: this.label(frame),
+			markers: { appeared: this.resolve(markers, this.clusters), disappeared: [], changed: new Map() },
+			countries: { appeared: this.resolve(countries, this.countryNames), disappeared: [], changed: new Map() },
+			reset: true
+		};
+	}
+
+	/** Advance one frame, returning only what changed. */
+	async next(): Promise<FrameStep | null> {
+		const manifest = this.manifest;
+		if (!manifest || this.frame + 1 >= manifest.frames) return null;
+		if (this.frame < 0) return this.seek(0);
+		const index = Math.floor(this.frame / manifest.keyframeInterval);
+		const chunk = await this.chunk(index);
+		const delta = chunk.deltas[this.frame - chunk.frame];
+		this.frame += 1;
+		if (this.frame % manifest.keyframeInterval === 0 && index + 2 < manifest.chunks.length) {
+			this.chunk(index + 2).catch(() => {});
+		}
+		if ('k' in delta) {
+			this.markers = decodePairs(delta.k.l);
+			this.countries = decodePairs(delta.k.c);
+			return {
+				frame: this.frame,
+				label: this.label(this.frame),
+				markers: { appeared: this.resolve(this.markers, this.clusters), disappeared: [], changed: new Map() },
+				countries: { appeared: this.resolve(this.countries, this.countryNames), disappeared: [], changed: new Map() },
+				reset: true
+			};
+		}
+		return {
+			frame: this.frame,
+			label: this.label(this.frame),
+			markers: this.patch(this.markers, delta.l, this.clusters),
+			countries: this.patch(this.countries, delta.c, this.countryNames),
+			reset: false
+		};
+	}
+
+	/** Current country counts keyed like decodeCountryCounts (world GeoJSON names). */
+	countryCounts(): Record<string, number> {
+		const out: Record<string, number> = {};
+		for (const [i, n] of this.countries) {
+			const name = this.countryNames[i];
+			out[name] = (out[name] ?? 0) + n;
+		}
+		return out;
+	}
+
+	private apply(frame: Frame, markers: Map<number, number>, countries: Map<number, number>): void {
+		if ('k' in frame) {
+			markers.clear();
+			countries.clear();
+			decodePairs(frame.k.l, markers);
+			decodePairs(frame.k.c, countries);
+			return;
+		}
+		this.patch(markers, frame.l, null);
+		this.patch(countries, frame.c, null);
+	}
+
+	private patch<K>(state: Map<number, number>, delta: FrameDelta | undefined, keys: K[] | null): FrameChange<K> {
+		const change: FrameChange<K> = { appeared: new Map(), disappeared: [], changed: new Map() };
+		if (!delta) return change;
+		for (const [key, n] of decodePairs(delta.on)) {
+			state.set(key, n);
+			if (keys) change.appeared.set(keys[key], n);
+		}
+		let key = 0;
+		for (const step of delta.off ?? []) {
+			key += step;
+			state.delete(key);
+			if (keys) change.disappeared.push(keys[key]);
+		}
+		for (const [key, inc] of decodePairs(delta.inc)) {
+			const n = (state.get(key) ?? 0) + inc;
+			state.set(key, n);
+			if (keys) change.changed.set(keys[key], n);
+		}
+		return change;
+	}
+
+	private resolve<K>(state: Map<number, number>, keys: K[]): Map<K, number> {
+		const out = new Map<K, number>();
+		for (const [key, n] of state) if (keys[key] !== undefined) out.set(keys[key], n);
+		return out;
+	}
+}
+
+export function clearFrameCache(): void {
+	chunkCache.clear();
+}
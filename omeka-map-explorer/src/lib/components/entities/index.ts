@@ -3,6 +3,7 @@ export { default as EntityVisualization } from './entity-visualization.svelte';
 export { default as EntitySelector } from './entity-selector.svelte';
 export { default as EntityStatsCards } from './entity-stats-cards.svelte';
 export { default as EntityArticlesTable } from './entity-articles-table.svelte';
+export { default as EntitySimilarEntities } from './entity-similar-entities.svelte';
 export { default as EntityMap } from './EntityMap.svelte';
 
 // Entity-specific visualizations
@@ -57,6 +57,14 @@ function calculateNodeSize(count: number, minCount: number, maxCount: number): n
   return 6 + (20 - 6) * normalizedCount; // 6–20 size range
 }
 
+/**
+ * Node size from build-time centrality (PageRank scaled to 0..1); sqrt keeps mid-ranked
+ * nodes visible next to the hubs
+ */
+function calculateCentralitySize(centrality: number): number {
+  return 6 + (20 - 6) * Math.sqrt(Math.max(0, Math.min(1, centrality)));
+}
+
 /**
  * Calculate edge thickness with emphasis on minimal visual noise
  */
@@ -86,6 +94,7 @@ export function buildGraphologyGraph(Graph: any, networkData: NetworkData): any
   const counts = networkData.nodes.map(n => n.count);
   const minCount = Math.min(...counts);
   const maxCount = Math.max(...counts);
+  const topLabels = new Set(networkData.meta.labelPriorityTop ?? []);
 
   // Add nodes with enhanced styling and optimal initial positioning
   networkData.nodes.forEach(node => {
@@ -94,7 +103,10 @@ export function buildGraphologyGraph(Graph: any, networkData: NetworkData): any
     const baseColor = NODE_COLORS[nodeType as keyof typeof NODE_COLORS] || '#6b7280';
     
     // Calculate optimized node size
-    const baseSize = calculateNodeSize(node.count, minCount, maxCount);
+    const baseSize =
+      node.centrality !== undefined
+        ? calculateCentralitySize(node.centrality)
+        : calculateNodeSize(node.count, minCount, maxCount);
 
     // Generate initial position with gaussian distribution for better spread
     const seedX = gaussianRandom() * initialSpread;
@@ -118,6 +130,7 @@ export function buildGraphologyGraph(Graph: any, networkData: NetworkData): any
       entityType: nodeType,
       count: node.count,
       degree: node.degree || 0,
+      forceLabel: topLabels.has(node.id),
       // Border properties for bordered nodes
       borderColor: typeConfig.borderColor,
       borderSize: typeConfig.border ? 2 : 0,
@@ -5,7 +5,7 @@
 
 import type { NetworkNode } from '$lib/types';
 import { appState } from '$lib/state/appState.svelte';
-import { applyFilters } from '$lib/state/networkData.svelte';
+import { applyFilters, expandNode, isSupernode } from '$lib/state/networkData.svelte';
 
 export interface EntityMapping {
   type: string;
@@ -24,7 +24,7 @@ export class NetworkInteractionHandler {
   };
 
   /**
-   * Handle node selection - updates app state and applies filters
+   * Handle node selection - updates app state and applies filters (expands supernodes)
    */
   static handleNodeSelection(node: NetworkNode | null) {
     if (!node) {
@@ -34,6 +34,12 @@ export class NetworkInteractionHandler {
       return;
     }
 
+    // Supernodes of the level-of-detail view open into their children instead
+    if (isSupernode(node.id)) {
+      void expandNode(node.id);
+      return;
+    }
+
     // Update network selection
     appState.networkNodeSelected = { id: node.id };
 
@@ -3,6 +3,9 @@ import { timeData } from './timeData.svelte';
 import { filters } from './filters.svelte';
 import { mapData } from './mapData.svelte';
 import { appState } from './appState.svelte';
+import { articleIdsInRange, getTemporalIndex } from '$lib/api/temporalIndexService';
+import { and, getPostingBitmaps, or, type Bitset } from '$lib/api/postingBitmapService';
+import { ENTITY_DETAILS_TYPE } from '$lib/api/entityDetailsService';
 
 // Memoization cache for getVisibleData
 let visibleDataCache: {
@@ -91,6 +94,28 @@ function extractArticleId(itemId: string): string {
 	return articleId;
 }
 
+/**
+ * Article ids passing the entity, country, newspaper and date filters, as one AND of
+ * posting bitmaps (postings/bitmaps.bin); null without bitmaps, without such filters,
+ * or when the selected entity type has no posting lists.
+ */
+function articleIdsFromBitmaps(): string[] | null {
+	const bitmaps = getPostingBitmaps();
+	if (!bitmaps) return null;
+	const sel = filters.selected;
+	const entity = appState.selectedEntity;
+	const parts: Bitset[] = [];
+	if (entity && entity.relatedArticleIds?.length) {
+		const type = ENTITY_DETAILS_TYPE[entity.type];
+		if (!type) return null;
+		parts.push(bitmaps.get('entity', `${type}:${entity.id}`));
+	}
+	if (sel.countries.length) parts.push(or(...sel.countries.map((c) => bitmaps.get('country', c))));
+	if (sel.newspapers.length) parts.push(or(...sel.newspapers.map((n) => bitmaps.get('newspaper', n))));
+	if (sel.dateRange) parts.push(bitmaps.dates(sel.dateRange.start, sel.dateRange.end));
+	return parts.length ? bitmaps.articleIds(and(parts[0], ...parts.slice(1))) : null;
+}
+
 export function getVisibleData(): ProcessedItem[] {
 	// Check cache first
 	const currentHash = getFilterHash();
@@ -108,42 +133,87 @@ export function getVisibleData(): ProcessedItem[] {
 	const sel = filters.selected;
 	let filtered = items;
 
-	// Filter by selected entity (persons, organizations, etc.)
-	// Only apply once the entity is hydrated with at least one related article.
-	if (appState.selectedEntity && appState.selectedEntity.relatedArticleIds?.length) {
-		// Get articles that mention this entity
-		const entityArticleIds = new Set(appState.selectedEntity.relatedArticleIds);
-		filtered = filtered.filter((item) => {
-			// Use cached article ID extraction
-			const articleId = extractArticleId(item.id);
-			return entityArticleIds.has(articleId);
-		});
-	}
-
-	// Filter by countries (ARTICLE-level semantics). Selecting a country means:
-	// Include ALL locations belonging to articles whose articleCountry is in selection.
-	if (sel.countries.length) {
+	const articleIds = articleIdsFromBitmaps();
+	if (articleIds) {
+		// Article-level filters resolved on the posting bitmaps in one pass
 		ensureIndices();
-		const baseUnfiltered = filtered === items; // no prior narrowing yet
-		const allowedArticleIds = new Set<string>();
-		for (const c of sel.countries) {
-			const set = countryArticlesIndex?.get(c);
-			if (set) {
-				for (const id of set) allowedArticleIds.add(id);
+		const gathered: ProcessedItem[] = [];
+		for (const articleId of articleIds) {
+			const its = articleItemsIndex?.get(articleId);
+			if (its) gathered.push(...its);
+		}
+		filtered = gathered;
+	} else {
+		// Filter by selected entity (persons, organizations, etc.)
+		// Only apply once the entity is hydrated with at least one related article.
+		if (appState.selectedEntity && appState.selectedEntity.relatedArticleIds?.length) {
+			// Get articles that mention this entity
+			const entityArticleIds = new Set(appState.selectedEntity.relatedArticleIds);
+			filtered = filtered.filter((item) => {
+				// Use cached article ID extraction
+				const articleId = extractArticleId(item.id);
+				return entityArticleIds.has(articleId);
+			});
+		}
+
+		// Filter by countries (ARTICLE-level semantics). Selecting a country means:
+		// Include ALL locations belonging to articles whose articleCountry is in selection.
+		if (sel.countries.length) {
+			ensureIndices();
+			const baseUnfiltered = filtered === items; // no prior narrowing yet
+			const allowedArticleIds = new Set<string>();
+			for (const c of sel.countries) {
+				const set = countryArticlesIndex?.get(c);
+				if (set) {
+					for (const id of set) allowedArticleIds.add(id);
+				}
+			}
+			if (baseUnfiltered && articleItemsIndex) {
+				// Fast path: directly gather items from index (avoids scanning all items)
+				const gathered: ProcessedItem[] = [];
+				for (const articleId of allowedArticleIds) {
+					const its = articleItemsIndex.get(articleId);
+					if (its) gathered.push(...its);
+				}
+				filtered = gathered;
+			} else {
+				// Fallback: filter existing subset (entity/other filters already applied)
+				filtered = filtered.filter((i) => allowedArticleIds.has(extractArticleId(i.id)));
 			}
 		}
-		if (baseUnfiltered && articleItemsIndex) {
-			// Fast path: directly gather items from index (avoids scanning all items)
-			const gathered: ProcessedItem[] = [];
-			for (const articleId of allowedArticleIds) {
-				const its = articleItemsIndex.get(articleId);
-				if (its) gathered.push(...its);
+
+		// Filter by newspapers
+		if (sel.newspapers.length) {
+			filtered = filtered.filter((i) => sel.newspapers.includes(i.newspaperSource));
+		}
+
+		// Filter by date range (year range filter)
+		if (sel.dateRange) {
+			const { start, end } = sel.dateRange;
+			const temporalIndex = getTemporalIndex();
+			if (temporalIndex) {
+				// The range is one contiguous slice of the date-sorted article ids
+				const inRange = articleIdsInRange(temporalIndex, start, end);
+				if (filtered === items) {
+					ensureIndices();
+					const gathered: ProcessedItem[] = [];
+					for (const articleId of inRange) {
+						const its = articleItemsIndex?.get(articleId);
+						if (its) gathered.push(...its);
+					}
+					filtered = gathered;
+				} else {
+					const allowed = new Set(inRange);
+					filtered = filtered.filter((i) => allowed.has(extractArticleId(i.id)));
+				}
+			} else {
+				filtered = filtered.filter(
+					(i) => i.publishDate && i.publishDate >= start && i.publishDate <= end
+				);
 			}
-			filtered = gathered;
-		} else {
-			// Fallback: filter existing subset (entity/other filters already applied)
-			filtered = filtered.filter((i) => allowedArticleIds.has(extractArticleId(i.id)));
 		}
+		// Note: If no date range is selected, show ALL articles (don't filter by timeline date)
+		// Timeline filtering is only applied when the timeline is actively being used for animation
 	}
 
 	// Filter by regions
@@ -151,21 +221,6 @@ export function getVisibleData(): ProcessedItem[] {
 		filtered = filtered.filter((i) => i.region && sel.regions.includes(i.region));
 	}
 
-	// Filter by newspapers
-	if (sel.newspapers.length) {
-		filtered = filtered.filter((i) => sel.newspapers.includes(i.newspaperSource));
-	}
-
-	// Filter by date range (year range filter)
-	if (sel.dateRange) {
-		const { start, end } = sel.dateRange;
-		filtered = filtered.filter(
-			(i) => i.publishDate && i.publishDate >= start && i.publishDate <= end
-		);
-	}
-	// Note: If no date range is selected, show ALL articles (don't filter by timeline date)
-	// Timeline filtering is only applied when the timeline is actively being used for animation
-
 	// Filter by keywords
 	if (sel.keywords.length) {
 		filtered = filtered.filter(
@@ -1,6 +1,22 @@
 import { base } from '$app/paths';
-import type { NetworkData, NetworkEdge, NetworkNode } from '$lib/types';
+import type { NetworkData, NetworkEdge, NetworkNode, NetworkNodeType } from '$lib/types';
 import { appState } from '$lib/state/appState.svelte';
+import { csrNeighbors, loadCsrAdjacency, type CsrAdjacency } from '$lib/api/networkAdjacencyService';
+import {
+  expandSupernode,
+  loadBaseNodes,
+  loadLevel,
+  loadLevelsManifest,
+  parentOf,
+  type NetworkLevel
+} from '$lib/api/networkLevelsService';
+
+/** A supernode of the level-of-detail hierarchy (level >= 1) */
+export interface LodUnit {
+  level: number;
+  index: number;
+  label: string;
+}
 
 interface NetworkState {
   data: NetworkData | null;
@@ -8,6 +24,12 @@ interface NetworkState {
   typesEnabled: Record<string, boolean>; // toggles per node type
   weightMin: number;
   degreeCap?: number;
+  /**
+   * Level-of-detail view (networks/levels/): the coarsest level, with the supernodes of
+   * one drill-down path (top level first) replaced by their children. null when the
+   * full global.json is shown.
+   */
+  lod: { top: number; path: LodUnit[] } | null;
 }
 
 export const networkState = $state<NetworkState>({
@@ -15,18 +37,42 @@ export const networkState = $state<NetworkState>({
   filtered: null,
   typesEnabled: { person: true, organization: true, event: true, subject: true, location: true },
   weightMin: 2,
-  degreeCap: undefined
+  degreeCap: undefined,
+  lod: null
 });
 
 // Node -> articleIds (union across incident edges)
 export const nodeArticleIds = $state<Record<string, string[]>>({});
 
+// CSR adjacency over data.nodes order (optional; getNeighbors falls back to an edge scan)
+let adjacency: CsrAdjacency | null = null;
+let nodeIndex = new Map<string, number>();
+
+// Level-of-detail view: node id -> the supernode it stands for
+let supernodes = new Map<string, LodUnit>();
+let lodPrefix = 'data';
+let lodRequest = 0;
+
 export async function loadNetwork(pathPrefix = 'data') {
   if (networkState.data) return networkState.data;
   try {
+    // Coarsest level first; global.json only when the levels are missing
+    const manifest = await loadLevelsManifest(pathPrefix);
+    const top = manifest?.levels.at(-1)?.level ?? 0;
+    if (top > 0) {
+      lodPrefix = pathPrefix;
+      const view = await showLevelView(top, []);
+      if (view) {
+        appState.networkLoaded = true;
+        return view;
+      }
+    }
     const res = await fetch(`${base}/${pathPrefix}/networks/global.json`, { cache: 'no-cache' });
     if (!res.ok) throw new Error(`Failed to load network: ${res.status}`);
     const json = (await res.json()) as NetworkData;
+    const adj = json.meta.adjacency ? await loadCsrAdjacency(pathPrefix, json.meta.adjacency.file) : null;
+    adjacency = adj && adj.nodeCount === json.nodes.length ? adj : null;
+    nodeIndex = new Map(json.nodes.map((n, i) => [n.id, i]));
     networkState.data = json;
     networkState.filtered = json; // initial
     // Build node→articleIds map
@@ -52,13 +98,176 @@ export async function loadNetwork(pathPrefix = 'data') {
   }
 }
 
+/** Whether a node of the level-of-detail view is a supernode (expandable) */
+export function isSupernode(id: string): boolean {
+  return supernodes.has(id);
+}
+
+/**
+ * Replace a supernode by its children. Expansions stay on one drill-down path: expanding
+ * a node outside the current path collapses the other branches. Returns false for base
+ * nodes.
+ */
+export async function expandNode(id: string): Promise<boolean> {
+  const unit = supernodes.get(id);
+  const lod = networkState.lod;
+  if (!unit || !lod) return false;
+  // Path entries above the node are its ancestors
+  const view = await showLevelView(lod.top, [...lod.path.filter((u) => u.level > unit.level), unit]);
+  if (view) applyFilters();
+  return view !== null;
+}
+
+/** Keep the first `depth` expansions of the drill-down path (0: the coarsest level only). */
+export async function collapseLevels(depth = 0): Promise<void> {
+  const lod = networkState.lod;
+  if (!lod || depth >= lod.path.length) return;
+  if (await showLevelView(lod.top, lod.path.slice(0, depth))) applyFilters();
+}
+
+async function showLevelView(top: number, path: LodUnit[]): Promise<NetworkData | null> {
+  const request = ++lodRequest;
+  const built = await buildLevelView(top, path, lodPrefix);
+  if (!built || request !== lodRequest) return null;
+  const { view, units } = built;
+  supernodes = units;
+  adjacency = null;
+  nodeIndex = new Map(view.nodes.map((n, i) => [n.id, i]));
+  networkState.lod = { top, path };
+  networkState.data = view;
+  networkState.filtered = view;
+  return view;
+}
+
+/**
+ * Nodes and summed edges of the level-of-detail view. Links of an expanded region point
+ * at supernodes of its own level; each is attributed to the visible node containing it
+ * (a sibling of the region, or an ancestor on the path's side branches).
+ */
+async function buildLevelView(
+  top: number,
+  path: LodUnit[],
+  pathPrefix: string
+): Promise<{ view: NetworkData; units: Map<string, LodUnit> } | null> {
+  const deepest = Math.max(1, (path.at(-1)?.level ?? top) - 1);
+  const needed: number[] = [];
+  for (let k = deepest; k <= top; k++) needed.push(k);
+  const [manifest, baseNodes, loaded, regions] = await Promise.all([
+    loadLevelsManifest(pathPrefix),
+    loadBaseNodes(pathPrefix),
+    Promise.all(needed.map((k) => loadLevel(k, pathPrefix))),
+    Promise.all(path.map((u) => expandSupernode(u.level, u.index, pathPrefix)))
+  ]);
+  if (!manifest || !baseNodes || loaded.some((l) => !l) || regions.some((r) => !r)) return null;
+  const levels = new Map<number, NetworkLevel>(needed.map((k, i) => [k, loaded[i]!]));
+  const expandedAt = new Map(path.map((u) => [u.level, u.index]));
+  const units = new Map<string, LodUnit>();
+  const ids = new Map<string, string>();
+
+  const nodeAt = (level: number, i: number): NetworkNode => {
+    const lv = levels.get(level);
+    if (lv && lv.nodes.size[i] > 1) {
+      const rep = lv.nodes.rep[i];
+      const label = lv.nodes.label[i];
+      const id = `${lv.nodes.type[i]}:~${level}.${i}`;
+      units.set(id, { level, index: i, label });
+      return {
+        id,
+        type: lv.nodes.type[i] as NetworkNodeType,
+        label: `${label} (+${lv.nodes.size[i] - 1})`,
+        count: baseNodes.count[rep],
+        centrality: baseNodes.centrality[rep]
+      };
+    }
+    // A single base node (level 0, or a supernode that merged nothing)
+    const b = lv ? lv.nodes.rep[i] : i;
+    return {
+      id: baseNodes.id[b],
+      type: baseNodes.type[b] as NetworkNodeType,
+      label: baseNodes.label[b],
+      count: baseNodes.count[b],
+      centrality: baseNodes.centrality[b]
+    };
+  };
+  const nodes: NetworkNode[] = [];
+  const show = (level: number, i: number) => {
+    const node = nodeAt(level, i);
+    ids.set(`${level}.${i}`, node.id);
+    nodes.push(node);
+  };
+  const visible = (level: number, i: number): string => {
+    while (level < top) {
+      const parent = parentOf(levels.get(level + 1)!, i);
+      if (expandedAt.get(level + 1) === parent) break;
+      level += 1;
+      i = parent;
+    }
+    return ids.get(`${level}.${i}`)!;
+  };
+
+  const coarse = levels.get(top)!;
+  const skipTop = expandedAt.get(top);
+  for (let i = 0; i < coarse.nodes.label.length; i++) if (i !== skipTop) show(top, i);
+  path.forEach((u, p) => {
+    const next = expandedAt.get(u.level - 1);
+    for (const c of regions[p]!.children) if (c !== next) show(u.level - 1, c);
+  });
+
+  const summed = new Map<string, NetworkEdge>();
+  const link = (source: string, target: string, weight: number) => {
+    const key = source < target ? `${source}|${target}` : `${target}|${source}`;
+    const edge = summed.get(key);
+    if (edge) edge.weight += weight;
+    else summed.set(key, { source, target, weight, articleIds: [] });
+  };
+  const { source, target, weight } = coarse.edges;
+  for (let e = 0; e < source.length; e++) {
+    if (source[e] !== skipTop && target[e] !== skipTop) {
+      link(ids.get(`${top}.${source[e]}`)!, ids.get(`${top}.${target[e]}`)!, weight[e]);
+    }
+  }
+  path.forEach((u, p) => {
+    const child = u.level - 1;
+    const next = expandedAt.get(child);
+    const region = regions[p]!;
+    for (const [a, b, w] of region.edges) {
+      if (a !== next && b !== next) link(ids.get(`${child}.${a}`)!, ids.get(`${child}.${b}`)!, w);
+    }
+    for (const [c, t, w] of region.links) {
+      if (c !== next) link(ids.get(`${child}.${c}`)!, visible(u.level, t), w);
+    }
+  });
+
+  const edges = [...summed.values()];
+  const ranked = [...nodes].sort((a, b) => (b.centrality ?? 0) - (a.centrality ?? 0));
+  const view: NetworkData = {
+    nodes,
+    edges,
+    meta: {
+      generatedAt: '',
+      totalNodes: manifest.levels[0].nodes,
+      totalEdges: manifest.levels[0].edges,
+      supportedTypes: [...new Set(nodes.map((n) => n.type))],
+      labelPriorityTop: ranked.slice(0, 30).map((n) => n.id)
+    }
+  };
+  return { view, units };
+}
+
 export function getNodeById(id: string): NetworkNode | undefined {
+  const i = nodeIndex.get(id);
+  if (i !== undefined) return networkState.data?.nodes[i];
   return networkState.data?.nodes.find((n) => n.id === id);
 }
 
-export function getNeighbors(id: string): { node: NetworkNode; edge: NetworkEdge }[] {
+/** Neighbours of a node, strongest first (O(degree) with the CSR adjacency). */
+export function getNeighbors(id: string, k?: number): { node: NetworkNode; edge: NetworkEdge }[] {
   const data = networkState.data;
   if (!data) return [];
+  const i = nodeIndex.get(id);
+  if (adjacency && i !== undefined) {
+    return csrNeighbors(adjacency, i, k).map(([nb, , e]) => ({ node: data.nodes[nb], edge: data.edges[e] }));
+  }
   const neighbors: { node: NetworkNode; edge: NetworkEdge }[] = [];
   for (const e of data.edges) {
     if (e.source === id) {
@@ -69,7 +278,8 @@ export function getNeighbors(id: string): { node: NetworkNode; edge: NetworkEdge
       if (n) neighbors.push({ node: n, edge: e });
     }
   }
-  return neighbors;
+  neighbors.sort((a, b) => b.edge.weight - a.edge.weight);
+  return k === undefined ? neighbors : neighbors.slice(0, k);
 }
 
 export function applyFilters() {
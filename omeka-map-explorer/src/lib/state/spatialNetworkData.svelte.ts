@@ -8,7 +8,13 @@
  */
 
 import { base } from '$app/paths';
-import type { SpatialNetworkData, SpatialNetworkNode, SpatialNetworkEdge } from '$lib/types';
+import type {
+  SpatialFlowData,
+  SpatialFlowLevel,
+  SpatialNetworkData,
+  SpatialNetworkNode,
+  SpatialNetworkEdge
+} from '$lib/types';
 
 // Raw state for better Set performance (must be declared separately)
 let visibleCountries = $state.raw(new Set<string>());
@@ -182,18 +188,15 @@ export async function loadSpatialNetworkData(pathPrefix = 'data'): Promise<boole
 }
 
 /**
- * Apply filters to the spatial network data
+ * Country, edge weight and isolated-node filters shared by the point network and the
+ * aggregated flow levels
  */
-export function applySpatialFilters() {
-  if (!spatialNetworkState.data) {
-    spatialNetworkState.filtered = null;
-    return;
-  }
-  
-  const { data } = spatialNetworkState;
-  
+function filterSpatialGraph<N extends { id: string; country?: string }>(
+  nodes: N[],
+  edges: SpatialNetworkEdge[]
+): { nodes: N[]; edges: SpatialNetworkEdge[] } {
   // Filter nodes by country
-  let filteredNodes = data.nodes.filter(node => 
+  let filteredNodes = nodes.filter(node => 
     !node.country || getVisibleCountries().has(node.country)
   );
   
@@ -201,7 +204,7 @@ export function applySpatialFilters() {
   const visibleNodeIds = new Set(filteredNodes.map(node => node.id));
   
   // Filter edges by weight and visible nodes
-  let filteredEdges = data.edges.filter(edge => 
+  const filteredEdges = edges.filter(edge => 
     edge.weight >= spatialNetworkState.weightMin &&
     visibleNodeIds.has(edge.source) &&
     visibleNodeIds.has(edge.target)
@@ -219,6 +222,21 @@ export function applySpatialFilters() {
     filteredNodes = filteredNodes.filter(node => connectedNodeIds.has(node.id));
   }
   
+  return { nodes: filteredNodes, edges: filteredEdges };
+}
+
+/**
+ * Apply filters to the spatial network data
+ */
+export function applySpatialFilters() {
+  if (!spatialNetworkState.data) {
+    spatialNetworkState.filtered = null;
+    return;
+  }
+  
+  const { data } = spatialNetworkState;
+  const { nodes: filteredNodes, edges: filteredEdges } = filterSpatialGraph(data.nodes, data.edges);
+  
   // Update filtered data
   spatialNetworkState.filtered = {
     nodes: filteredNodes,
@@ -433,6 +451,64 @@ export function getSpatialNodeNeighbors(nodeId: string): string[] {
   return Array.from(neighbors);
 }
 
+// Aggregated flow networks (prefecture/region/country), loaded on demand per level
+const flowLevelCache = new Map<SpatialFlowLevel, Promise<SpatialFlowData | null>>();
+
+/**
+ * Load the aggregated flow network for one level (networks/spatial_<level>.json).
+ * Low zoom levels can draw country/region corridors instead of every point edge.
+ */
+export function loadSpatialFlowLevel(level: SpatialFlowLevel, pathPrefix = 'data'): Promise<SpatialFlowData | null> {
+  let pending = flowLevelCache.get(level);
+  if (!pending) {
+    const file = spatialNetworkState.data?.meta.flowLevels?.[level] ?? `spatial_${level}.json`;
+    pending = fetch(`${base}/${pathPrefix}/networks/${file}`)
+      .then((res) => (res.ok ? (res.json() as Promise<SpatialFlowData>) : null))
+      .catch((error) => {
+        console.error(`❌ Failed to load ${level} flow network:`, error);
+        return null;
+      })
+      .then((data) => {
+        if (!data) flowLevelCache.delete(level);
+        return data;
+      });
+    flowLevelCache.set(level, pending);
+  }
+  return pending;
+}
+
+// Map zoom at or below which each aggregated level replaces the point network
+const FLOW_LEVEL_MAX_ZOOM: [SpatialFlowLevel, number][] = [
+  ['country', 4],
+  ['region', 5]
+];
+
+/**
+ * Aggregated level to draw at a map zoom, or null for the point network
+ */
+export function flowLevelForZoom(zoom: number): SpatialFlowLevel | null {
+  return FLOW_LEVEL_MAX_ZOOM.find(([, maxZoom]) => zoom <= maxZoom)?.[0] ?? null;
+}
+
+/**
+ * A flow level with the current spatial filters applied, in the shape the map renders
+ */
+export function getSpatialFlowView(flows: SpatialFlowData): SpatialNetworkData | null {
+  if (!spatialNetworkState.data) return null;
+  const { nodes, edges } = filterSpatialGraph(flows.nodes, flows.edges);
+  return {
+    // Flow units carry the point node fields the map reads (coordinates, count, country)
+    nodes: nodes as unknown as SpatialNetworkNode[],
+    edges,
+    bounds: flows.bounds ?? spatialNetworkState.data.bounds,
+    meta: {
+      ...spatialNetworkState.data.meta,
+      totalNodes: nodes.length,
+      totalEdges: edges.length,
+    }
+  };
+}
+
 // Export the state for reactive access with separate sets
 export { 
   spatialNetworkState,
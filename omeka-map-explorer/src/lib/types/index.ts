@@ -84,6 +84,12 @@ export interface NetworkNode {
 	count: number;
 	degree?: number;
 	countryCounts?: Record<string, number>;
+	// Build-time centrality (global network, scripts/network_centrality.py)
+	pagerank?: number;
+	coreNumber?: number;
+	betweenness?: number;
+	centrality?: number; // PageRank scaled to 0..1, used for sizing
+	labelPriority?: number; // 1 = most important
 }
 
 export interface NetworkEdge {
@@ -99,6 +105,9 @@ export interface NetworkMeta {
 	totalNodes: number;
 	totalEdges: number;
 	supportedTypes: NetworkNodeType[];
+	labelPriorityTop?: string[];
+	/** CSR adjacency file in networks/ (global network only) */
+	adjacency?: { file: string; nodes: number; entries: number; bytes: number };
 }
 
 export interface NetworkData {
@@ -116,6 +125,7 @@ export interface SpatialNetworkNode extends NetworkNode {
 
 export interface SpatialNetworkEdge extends NetworkEdge {
 	weightNorm?: number; // normalized weight for visualization
+	distanceKm?: number; // great-circle distance between the endpoints
 }
 
 export interface GeographicBounds {
@@ -134,5 +144,39 @@ export interface SpatialNetworkData {
 		totalLocationsInData: number;
 		geocodingSuccessRate: number;
 		articlesWithMultipleLocations: number;
+		flowLevels?: Partial<Record<SpatialFlowLevel, string>>; // level -> file in networks/
+	};
+}
+
+// Aggregated spatial flows (networks/spatial_<level>.json)
+export type SpatialFlowLevel = 'prefecture' | 'region' | 'country';
+
+export interface SpatialFlowNode {
+	id: string; // e.g. 'region:Benin/Borgou'
+	type: SpatialFlowLevel;
+	level: SpatialFlowLevel;
+	label: string;
+	country: string;
+	region?: string;
+	prefecture?: string;
+	coordinates: [number, number]; // [lat, lng], article-weighted mean of member locations
+	count: number; // distinct articles mentioning the unit
+	locations: number;
+	degree: number;
+	strength: number;
+}
+
+export interface SpatialFlowData {
+	nodes: SpatialFlowNode[];
+	edges: SpatialNetworkEdge[]; // weight = distinct articles
+	bounds: GeographicBounds | null;
+	meta: {
+		generatedAt: string;
+		level: SpatialFlowLevel;
+		groupBy: string[];
+		totalNodes: number;
+		totalEdges: number;
+		weightMin: number;
+		weight: 'distinctArticles';
 	};
 }
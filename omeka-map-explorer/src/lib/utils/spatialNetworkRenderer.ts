@@ -12,6 +12,7 @@ export interface SpatialNetworkRendererOptions {
   data: SpatialNetworkData;
   onNodeSelect?: (node: SpatialNetworkNode | null) => void;
   onNodeHover?: (node: SpatialNetworkNode | null) => void;
+  onZoomChange?: (zoom: number) => void;
 }
 
 export interface SpatialNetworkRenderer {
@@ -221,6 +222,13 @@ export async function createSpatialNetworkRenderer(
         console.warn('Error scheduling fit to bounds:', e);
       }
 
+      // Report the map zoom so the caller can swap in aggregated flow levels
+      if (leafletBinding?.map && options.onZoomChange) {
+        const map = leafletBinding.map;
+        map.on('zoomend', () => options.onZoomChange?.(map.getZoom()));
+        map.whenReady(() => options.onZoomChange?.(map.getZoom()));
+      }
+
       // Set up event listeners
       setupEventListeners();
       
@@ -1,6 +1,8 @@
 import { base } from '$app/paths';
 import type { ProcessedItem, TemporalData } from '$lib/types';
 import { loadLocations } from './entityLoader';
+import { loadTemporalIndex, monthStartDate, type TemporalIndex } from '$lib/api/temporalIndexService';
+import { loadPostingBitmaps } from '$lib/api/postingBitmapService';
 
 // Global cache for places map to avoid rebuilding on every data load
 let placesMapCache: Map<string, { coords: [number, number]; country: string; name: string }> | null = null;
@@ -11,8 +13,8 @@ type ArticleRow = {
 	newspaper: string;
 	country: string;
 	pub_date: string; // YYYY-MM-DD
-	subject: string; // pipe-separated
-	spatial: string; // pipe-separated of place labels
+	subject: string[] | string; // names (legacy exports: pipe-separated string)
+	spatial: string[] | string; // place labels (legacy exports: pipe-separated string)
 };
 
 type LoadedData = {
@@ -24,9 +26,10 @@ type LoadedData = {
 	dateMax: Date | null;
 };
 
-function parsePipeList(s: string | null | undefined): string[] {
-	if (!s) return [];
-	return s
+function parseNameList(value: string[] | string | null | undefined): string[] {
+	if (!value) return [];
+	if (Array.isArray(value)) return value;
+	return value
 		.split('|')
 		.map((t) => t.trim())
 		.filter(Boolean);
@@ -93,9 +96,44 @@ function groupByMonth(items: ProcessedItem[]): TemporalData[] {
 	return Object.values(groups).sort((a, b) => a.date.getTime() - b.date.getTime());
 }
 
+/**
+ * Same result as groupByMonth, but from the precomputed temporal index: each month's
+ * articles are one slice of the date-sorted article ids, so no dates are parsed here.
+ */
+function groupByMonthFromIndex(items: ProcessedItem[], index: TemporalIndex): TemporalData[] {
+	if (!index.months) return [];
+	const itemsByArticle = new Map<string, ProcessedItem[]>();
+	for (const it of items) {
+		const articleId = it.id.split('-')[0];
+		let arr = itemsByArticle.get(articleId);
+		if (!arr) {
+			arr = [];
+			itemsByArticle.set(articleId, arr);
+		}
+		arr.push(it);
+	}
+	const out: TemporalData[] = [];
+	const { monthOffsets, articleIds } = index;
+	for (let i = 0; i + 1 < monthOffsets.length; i++) {
+		if (monthOffsets[i] === monthOffsets[i + 1]) continue;
+		const monthItems: ProcessedItem[] = [];
+		for (let k = monthOffsets[i]; k < monthOffsets[i + 1]; k++) {
+			const its = itemsByArticle.get(articleIds[k]);
+			if (its) monthItems.push(...its);
+		}
+		if (monthItems.length) {
+			out.push({ date: monthStartDate(index.months.start + i), count: monthItems.length, items: monthItems });
+		}
+	}
+	return out;
+}
+
 export async function loadStaticData(basePath = 'data'): Promise<LoadedData> {
-	const [articlesRes] = await Promise.all([
-		fetch(`${base}/${basePath}/articles.json`)
+	// Posting bitmaps back the article-level filters of getVisibleData
+	const [articlesRes, temporalIndex] = await Promise.all([
+		fetch(`${base}/${basePath}/articles.json`),
+		loadTemporalIndex(basePath),
+		loadPostingBitmaps(basePath)
 	]);
 	if (!articlesRes.ok) throw new Error(`Failed to load articles.json: ${articlesRes.status}`);
 
@@ -115,8 +153,8 @@ export async function loadStaticData(basePath = 'data'): Promise<LoadedData> {
 		const title = a.title || 'Untitled';
 		const country = a.country || '';
 		const newspaperSource = a.newspaper || '';
-		const keywords = parsePipeList(a.subject);
-		const spatialLabels = parsePipeList(a.spatial);
+		const keywords = parseNameList(a.subject);
+		const spatialLabels = parseNameList(a.spatial);
 
 		let publishDate: Date = new Date('');
 		if (a.pub_date) {
@@ -201,7 +239,7 @@ export async function loadStaticData(basePath = 'data'): Promise<LoadedData> {
 		}
 	}
 
-	const timeline = groupByMonth(items);
+	const timeline = temporalIndex ? groupByMonthFromIndex(items, temporalIndex) : groupByMonth(items);
 
 	return {
 		items,
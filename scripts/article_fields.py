@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+List-valued article fields (`subject`, `spatial`) shared by the export and every consumer.
+
+From the fetch step onward articles.json carries these fields as JSON arrays of names:
+
+    {"o:id": "123", ..., "subject": ["Hajj", "Moussa Traoré"], "spatial": ["Bobo-Dioulasso"]}
+
+Files written before that (or with `preprocess_all.py --pipe-strings`) use the legacy
+" | "-joined strings. Consumers read either form through `name_list`, and
+`to_legacy_article` is the compatibility emitter for the string format.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+LIST_FIELDS = ("subject", "spatial")
+PIPE_SEPARATOR = " | "
+
+
+def name_list(value: Any) -> List[str]:
+    """Names of a list field, from an array or a legacy pipe-separated string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split("|") if item.strip()]
+    return [item for item in value if item]
+
+
+def to_pipe_string(names: Any) -> str:
+    """Legacy string form of a list field (inverse of name_list for names without '|')."""
+    if isinstance(names, str):
+        return names
+    return PIPE_SEPARATOR.join(name for name in names or () if name)
+
+
+def to_legacy_article(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an article row with its list fields joined into pipe strings."""
+    out = dict(row)
+    for field in LIST_FIELDS:
+        if field in out:
+            out[field] = to_pipe_string(out[field])
+    return out
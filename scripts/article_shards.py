@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Date-sharded article store for the browser (static/data/articles/).
+
+articles.json has to be downloaded and parsed in full before the dashboard can show one
+article row or resolve one id from an entity or network edge. The sharded store splits
+the articles by publication period into small files of minimal table rows, so a table
+renders its first page from a single shard and id resolution fetches only the shards
+that hold the requested ids:
+
+    articles/manifest.json   {version, period, fields, total, idTable, shards: [
+                                 {file, from, to, count, bytes}, ...]}
+    articles/ids.json        article id -> shard: `ids` sorted by id (signed deltas of
+                             the integer ids when encoding is 'delta', strings when
+                             'string') and the parallel `shard` positions in manifest.shards
+    articles/<label>.json    [[o:id, title, newspaper, country, pub_date], ...] in
+                             publication order (date, then id); column order is
+                             manifest.fields
+
+Shards are in chronological order with the undated articles last (undated.json,
+from/to null), so row positions are global: shard k starts at the sum of the earlier
+counts. Periods are year (default), month or decade; consecutive periods are merged
+until a shard reaches min_rows (label "1990_1994") and a period above max_rows is cut
+into equal parts ("2005.1", "2005.2", ...).
+
+Usage:
+    from article_shards import write_article_shards
+
+    report = write_article_shards(articles, data_dir / "articles", period="year", max_rows=2000)
+    report.summary()   # shard count, bytes, rows per shard
+"""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from json_io import write_json
+
+SHARD_VERSION = 1
+SHARD_FIELDS = ("o:id", "title", "newspaper", "country", "pub_date")
+MANIFEST_FILE = "manifest.json"
+ID_TABLE_FILE = "ids.json"
+UNDATED_LABEL = "undated"
+
+PERIODS: Dict[str, Callable[[str], str]] = {
+    "year": lambda d: d[:4],
+    "month": lambda d: d[:7],
+    "decade": lambda d: d[:3] + "0s",
+}
+DEFAULT_PERIOD = "year"
+DEFAULT_MIN_ROWS = 250
+DEFAULT_MAX_ROWS = 2000
+
+
+@dataclass
+class Shard:
+    label: str
+    rows: List[List[str]]
+
+    @property
+    def file(self) -> str:
+        return f"{self.label}.json"
+
+
+@dataclass
+class ShardReport:
+    period: str
+    min_rows: int
+    max_rows: int
+    shards: int
+    rows: int
+    shard_bytes: int
+    min_shard_bytes: int
+    median_shard_bytes: int
+    max_shard_bytes: int
+    max_shard_rows: int
+    manifest_bytes: int
+    id_table_bytes: int
+    articles_json_bytes: Optional[int] = None
+
+    @property
+    def first_page_bytes(self) -> int:
+        """Bytes fetched before a table shows its first page (manifest + largest shard)."""
+        return self.manifest_bytes + self.max_shard_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "first_page_bytes": self.first_page_bytes}
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.shards} shards ({self.period}, {self.min_rows}..{self.max_rows} rows) for {self.rows} articles",
+            f"  shard bytes  total {self.shard_bytes:,} | min {self.min_shard_bytes:,} | "
+            f"median {self.median_shard_bytes:,} | max {self.max_shard_bytes:,} ({self.max_shard_rows} rows)",
+            f"  manifest {self.manifest_bytes:,} B | id table {self.id_table_bytes:,} B | "
+            f"first page <= {self.first_page_bytes:,} B",
+        ]
+        if self.articles_json_bytes:
+            lines.append(f"  articles.json {self.articles_json_bytes:,} B")
+        return "\n".join(lines)
+
+
+def _sort_key(row: List[str]) -> Tuple[str, int, str]:
+    aid = row[0]
+    return row[4], int(aid) if aid.isdigit() else 0, aid
+
+
+def shard_row(article: Dict[str, Any]) -> List[str]:
+    """Minimal table row in SHARD_FIELDS order."""
+    return [str(article.get(field) or "").strip() for field in SHARD_FIELDS]
+
+
+def plan_shards(
+    articles: List[Dict[str, Any]],
+    *,
+    period: str = DEFAULT_PERIOD,
+    min_rows: int = DEFAULT_MIN_ROWS,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> List[Shard]:
+    """Split articles into chronological shards (undated last)."""
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {sorted(PERIODS)}, got {period!r}")
+    if max_rows < 1 or min_rows > max_rows:
+        raise ValueError(f"need 1 <= max_rows and min_rows <= max_rows (got {min_rows}, {max_rows})")
+    period_of = PERIODS[period]
+
+    seen: set = set()
+    dated: List[List[str]] = []
+    undated: List[List[str]] = []
+    for a in articles:
+        row = shard_row(a)
+        if not row[0] or row[0] in seen:
+            continue
+        seen.add(row[0])
+        (dated if len(row[4]) >= 4 and row[4][:4].isdigit() else undated).append(row)
+    dated.sort(key=_sort_key)
+    undated.sort(key=_sort_key)
+
+    groups: List[Tuple[str, List[List[str]]]] = []
+    for row in dated:
+        key = period_of(row[4])
+        if groups and groups[-1][0] == key:
+            groups[-1][1].append(row)
+        else:
+            groups.append((key, [row]))
+
+    shards: List[Shard] = []
+    pending: List[Tuple[str, List[List[str]]]] = []
+
+    def flush() -> None:
+        if not pending:
+            return
+        rows = [r for _k, g in pending for r in g]
+        label = pending[0][0] if len(pending) == 1 else f"{pending[0][0]}_{pending[-1][0]}"
+        parts = math.ceil(len(rows) / max_rows)
+        if parts == 1:
+            shards.append(Shard(label, rows))
+        else:
+            size = math.ceil(len(rows) / parts)
+            for k in range(parts):
+                shards.append(Shard(f"{label}.{k + 1}", rows[k * size:(k + 1) * size]))
+        pending.clear()
+
+    for key, rows in groups:
+        pending_rows = sum(len(g) for _k, g in pending)
+        if pending and pending_rows + len(rows) > max_rows:
+            flush()
+        pending.append((key, rows))
+        if sum(len(g) for _k, g in pending) >= min_rows:
+            flush()
+    flush()
+    if undated:
+        parts = math.ceil(len(undated) / max_rows)
+        size = math.ceil(len(undated) / parts)
+        for k in range(parts):
+            label = UNDATED_LABEL if parts == 1 else f"{UNDATED_LABEL}.{k + 1}"
+            shards.append(Shard(label, undated[k * size:(k + 1) * size]))
+    return shards
+
+
+def _encode_ids(article_ids: List[str]) -> Tuple[str, List[Any]]:
+    """Integer ids as signed deltas; other ids as strings."""
+    if not all(a.isdigit() for a in article_ids):
+        return "string", list(article_ids)
+    values = [int(a) for a in article_ids]
+    return "delta", [v - prev for prev, v in zip([0] + values, values)]
+
+
+def id_table(shards: List[Shard]) -> Dict[str, Any]:
+    """Article id -> shard position, sorted by id (numerically when all ids are integers)."""
+    pairs = [(row[0], k) for k, shard in enumerate(shards) for row in shard.rows]
+    numeric = all(aid.isdigit() for aid, _k in pairs)
+    pairs.sort(key=(lambda p: int(p[0])) if numeric else (lambda p: p[0]))
+    encoding, ids = _encode_ids([aid for aid, _k in pairs])
+    return {"encoding": encoding, "ids": ids, "shard": [k for _aid, k in pairs]}
+
+
+def write_article_shards(
+    articles: List[Dict[str, Any]],
+    out_dir: Path,
+    *,
+    period: str = DEFAULT_PERIOD,
+    min_rows: int = DEFAULT_MIN_ROWS,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    compact: bool = True,
+    articles_json: Optional[Path] = None,
+) -> ShardReport:
+    """Write shards, the id table and the manifest to out_dir; stale shard files are removed."""
+    shards = plan_shards(articles, period=period, min_rows=min_rows, max_rows=max_rows)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    entries: List[Dict[str, Any]] = []
+    for shard in shards:
+        path = out_dir / shard.file
+        write_json(path, shard.rows, compact=compact)
+        dated = shard.label != UNDATED_LABEL and not shard.label.startswith(f"{UNDATED_LABEL}.")
+        entries.append({
+            "file": shard.file,
+            "from": shard.rows[0][4] if dated else None,
+            "to": shard.rows[-1][4] if dated else None,
+            "count": len(shard.rows),
+            "bytes": path.stat().st_size,
+        })
+
+    ids_path = out_dir / ID_TABLE_FILE
+    write_json(ids_path, id_table(shards), compact=compact)
+    manifest_path = out_dir / MANIFEST_FILE
+    write_json(manifest_path, {
+        "version": SHARD_VERSION,
+        "period": period,
+        "fields": list(SHARD_FIELDS),
+        "total": sum(e["count"] for e in entries),
+        "idTable": ID_TABLE_FILE,
+        "shards": entries,
+    }, compact=compact)
+
+    keep = {e["file"] for e in entries} | {ID_TABLE_FILE, MANIFEST_FILE}
+    for stale in out_dir.glob("*.json"):
+        if stale.name not in keep:
+            stale.unlink()
+
+    sizes = sorted(e["bytes"] for e in entries) or [0]
+    return ShardReport(
+        period=period,
+        min_rows=min_rows,
+        max_rows=max_rows,
+        shards=len(entries),
+        rows=sum(e["count"] for e in entries),
+        shard_bytes=sum(sizes),
+        min_shard_bytes=min(sizes),
+        median_shard_bytes=sizes[len(sizes) // 2],
+        max_shard_bytes=max(sizes),
+        max_shard_rows=max((e["count"] for e in entries), default=0),
+        manifest_bytes=manifest_path.stat().st_size,
+        id_table_bytes=ids_path.stat().st_size,
+        articles_json_bytes=articles_json.stat().st_size if articles_json and articles_json.exists() else None,
+    )
+
+
+def read_shard_rows(out_dir: Path) -> List[Dict[str, str]]:
+    """All rows back as dicts in store order (for checks against articles.json)."""
+    with (out_dir / MANIFEST_FILE).open("r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    rows: List[Dict[str, str]] = []
+    for entry in manifest["shards"]:
+        with (out_dir / entry["file"]).open("r", encoding="utf-8") as f:
+            rows += [dict(zip(manifest["fields"], r)) for r in json.load(f)]
+    return rows
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the add-countries step (bulk vs per-point classification).
+
+Generates uniformly random points inside a West Africa bounding box, then resolves
+Country/Region/Prefecture with:
+  - bulk:       classify_points_bulk (STRtree queries + hierarchical admin resolution)
+  - sequential: the former per-point scan (every country, then every region and every
+                prefecture of the matched country), run on a subsample
+
+Results are printed as points/second and the two paths are checked for agreement.
+
+Usage:
+  python scripts/bench_add_countries.py --points 100000
+  python scripts/bench_add_countries.py --world-geojson path/to/world_countries.geojson
+
+When world_countries.geojson is not available, the country layer is approximated by
+dissolving each target country's top admin layer, which is enough for throughput numbers.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+from preprocess_all import (
+    AdminLayer,
+    classify_points_bulk,
+    default_paths,
+    load_admin_layer,
+    load_admin_layers,
+    setup_logging,
+)
+
+# lat/lng box covering Benin, Burkina Faso, Côte d'Ivoire, Togo and neighbours
+WEST_AFRICA_BBOX = (4.0, 16.0, -9.0, 4.0)  # south, north, west, east
+
+
+def synthetic_points(n: int, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    south, north, west, east = WEST_AFRICA_BBOX
+    return rng.uniform(south, north, n), rng.uniform(west, east, n)
+
+
+def dissolved_country_layer(admin_layers: Dict[str, List[Tuple[str, AdminLayer]]]) -> AdminLayer:
+    names = list(admin_layers)
+    geoms = np.array([shapely.union_all(layers[0][1].geoms) for layers in admin_layers.values()], dtype=object)
+    shapely.prepare(geoms)
+    return AdminLayer(names=names, geoms=geoms, tree=STRtree(geoms))
+
+
+def classify_sequential(
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    countries: AdminLayer,
+    admin_layers: Dict[str, List[Tuple[str, AdminLayer]]],
+) -> Tuple[List[Optional[str]], Dict[str, List[Optional[str]]]]:
+    """Reference implementation mirroring the original per-point loops."""
+    n = len(lats)
+    out_countries: List[Optional[str]] = [None] * n
+    levels: Dict[str, List[Optional[str]]] = {}
+    for i in range(n):
+        pt = shapely.Point(lngs[i], lats[i])
+        country = next((countries.names[j] for j, g in enumerate(countries.geoms) if g.contains(pt)), None)
+        out_countries[i] = country
+        for level, layer in admin_layers.get(country, []) if country else []:
+            name = next((layer.names[j] for j, g in enumerate(layer.geoms) if g.intersects(pt)), None)
+            levels.setdefault(level, [None] * n)[i] = name
+    return out_countries, levels
+
+
+def main() -> None:
+    paths = default_paths(Path(__file__).resolve())
+    p = argparse.ArgumentParser(description="Benchmark bulk point classification for add-countries")
+    p.add_argument("--points", type=int, default=100_000, help="Synthetic points for the bulk path")
+    p.add_argument("--sequential-points", type=int, default=2_000, help="Subsample for the per-point reference path")
+    p.add_argument("--world-geojson", default=str(paths["world_geojson"]), help="Path to world_countries.geojson")
+    p.add_argument("--maps-dir", default=str(paths["maps_dir"]), help="Directory containing administrative GeoJSON files")
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+    setup_logging("WARNING")
+
+    admin_layers = load_admin_layers(Path(args.maps_dir))
+    world = Path(args.world_geojson)
+    if world.exists():
+        countries = load_admin_layer(world, ["name"])
+    else:
+        logging.warning("%s not found; using dissolved admin layers as country polygons", world)
+        countries = dissolved_country_layer(admin_layers)
+
+    lats, lngs = synthetic_points(args.points, args.seed)
+
+    t0 = time.perf_counter()
+    bulk_countries, bulk_levels = classify_points_bulk(lats, lngs, countries, admin_layers)
+    bulk_s = time.perf_counter() - t0
+
+    m = min(args.sequential_points, args.points)
+    t0 = time.perf_counter()
+    seq_countries, seq_levels = classify_sequential(lats[:m], lngs[:m], countries, admin_layers)
+    seq_s = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(bulk_countries[:m], seq_countries) if a != b)
+    for level, names in seq_levels.items():
+        bulk_names = bulk_levels.get(level, [None] * args.points)
+        mismatches += sum(1 for a, b in zip(bulk_names[:m], names) if a != b)
+
+    matched = sum(1 for c in bulk_countries if c)
+    print(f"countries={len(countries.names)} points={args.points} matched={matched}")
+    print(f"bulk:       {bulk_s:.3f}s  {args.points / bulk_s:,.0f} points/s")
+    print(f"sequential: {seq_s:.3f}s  {m / seq_s:,.0f} points/s  (n={m})")
+    print(f"speedup:    {(m / seq_s) and (args.points / bulk_s) / (m / seq_s):.1f}x  mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    main()
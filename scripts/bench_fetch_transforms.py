@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the fetch transforms (fetch_transforms.py).
+
+Feeds the same Arrow batches (snapshot row groups, or synthetic raw rows cut into
+--batch-size tables) through three paths and streams the result to a JSON array file,
+as the fetch step does:
+  - row:     batch.to_pylist() + transform_*_row per row + JsonArrayWriter.write
+  - columns: batch.to_pydict() + transform_*_batch on the column dict + write_many
+  - arrow:   transform_*_batch on the Arrow batch (compute kernels) + write_many
+and reports rows/s for the transform alone and including the write, plus whether the
+written bytes are identical to the row path.
+
+Usage:
+  python scripts/bench_fetch_transforms.py                          # 1M synthetic articles
+  python scripts/bench_fetch_transforms.py --rows 200000 --repeat 3
+  python scripts/bench_fetch_transforms.py --snapshot /tmp/iwac_snapshot
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pyarrow as pa
+
+from fetch_transforms import (
+    DEFAULT_TRANSFORM_BATCH,
+    transform_articles_batch,
+    transform_articles_row,
+    transform_index_batch,
+    transform_index_row,
+)
+from json_io import open_json_array
+
+TRANSFORMS = {
+    "articles": (transform_articles_row, transform_articles_batch),
+    "index": (transform_index_row, transform_index_batch),
+}
+
+
+def synthetic_tables(rows: int, batch_size: int) -> Dict[str, List[Any]]:
+    from generate_synthetic_corpus import BASE_ARTICLES, generate_raw_corpus
+
+    raw_articles, raw_index = generate_raw_corpus(rows / BASE_ARTICLES)
+    return {
+        subset: [pa.Table.from_pylist(raw[i:i + batch_size]) for i in range(0, len(raw), batch_size)]
+        for subset, raw in (("articles", raw_articles), ("index", raw_index))
+    }
+
+
+def snapshot_tables(snapshot_dir: Path) -> Dict[str, List[Any]]:
+    import dataset_snapshot
+
+    return {subset: [u.table() for u in dataset_snapshot.iter_units(snapshot_dir, subset)] for subset in TRANSFORMS}
+
+
+def _run(path: str, subset: str, tables: List[Any], out_path: Path) -> Tuple[float, float]:
+    """(transform seconds, total seconds) of one pass writing out_path."""
+    row_fn, batch_fn = TRANSFORMS[subset]
+    transform = 0.0
+    t_start = time.perf_counter()
+    with open_json_array(out_path, compact=True) as out:
+        for table in tables:
+            t0 = time.perf_counter()
+            if path == "row":
+                rows = [row_fn(r) for r in table.to_pylist()]
+            elif path == "columns":
+                rows = batch_fn(table.to_pydict())
+            else:
+                rows = batch_fn(table)
+            transform += time.perf_counter() - t0
+            if path == "row":
+                for row in rows:
+                    out.write(row)
+            else:
+                out.write_many(rows)
+    return transform, time.perf_counter() - t_start
+
+
+def _best_of(repeat: int, fn: Callable[[], Tuple[float, float]]) -> Tuple[float, float]:
+    runs = [fn() for _ in range(repeat)]
+    return min(r[0] for r in runs), min(r[1] for r in runs)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark per-row vs batched fetch transforms")
+    p.add_argument("--rows", type=int, default=1_000_000, help="Synthetic article rows (ignored with --snapshot)")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_TRANSFORM_BATCH, help="Rows per synthetic Arrow batch")
+    p.add_argument("--snapshot", default=None, help="Benchmark the row groups of a local snapshot instead")
+    p.add_argument("--repeat", type=int, default=1, help="Timing repetitions (best is reported)")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    if args.snapshot:
+        data = snapshot_tables(Path(args.snapshot))
+        source = f"snapshot {args.snapshot}"
+    else:
+        data = synthetic_tables(args.rows, args.batch_size)
+        source = f"synthetic, {args.batch_size}-row batches"
+    print(f"input: {source} (prepared in {time.perf_counter() - t0:.1f}s)")
+    print(f"{'subset':<10}{'rows':>10}{'path':>9}{'transform':>12}{'rows/s':>11}{'with write':>12}{'rows/s':>11}{'speedup':>9}{'identical':>11}")
+
+    with tempfile.TemporaryDirectory(prefix="iwac_fetch_") as tmp:
+        for subset, tables in data.items():
+            n = sum(t.num_rows for t in tables)
+            reference = Path(tmp) / f"{subset}_row.json"
+            baseline = 0.0
+            for path in ("row", "columns", "arrow"):
+                out_path = Path(tmp) / f"{subset}_{path}.json"
+                transform, total = _best_of(args.repeat, lambda: _run(path, subset, tables, out_path))
+                baseline = baseline or total
+                identical = out_path.read_bytes() == reference.read_bytes()
+                print(
+                    f"{subset:<10}{n:>10}{path:>9}{transform:>11.2f}s{n / transform:>11,.0f}"
+                    f"{total:>11.2f}s{n / total:>11,.0f}{baseline / total:>8.2f}x{'yes' if identical else 'NO':>11}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Encode/write benchmark for the JSON backends in json_io.py.
+
+For each document (networks/global.json and every entities/*.json by default) and each
+installed backend, measures:
+  - encode: json_io.dumps of the whole document, in the mode the pipeline writes it
+            (global.json pretty, entity files compact)
+  - write:  json_io.write_json to a temporary file (streamed, includes disk I/O)
+and checks that the bytes are identical to the stdlib output.
+
+Usage:
+  python scripts/bench_json_backends.py
+  python scripts/bench_json_backends.py --data-dir /tmp/iwac_x10 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import json_io
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def load_documents(data_dir: Path) -> List[Tuple[str, Any, bool]]:
+    docs: List[Tuple[str, Any, bool]] = []
+    global_path = data_dir / "networks" / "global.json"
+    if global_path.exists():
+        docs.append(("networks/global.json", json.loads(global_path.read_text(encoding="utf-8")), False))
+    for p in sorted((data_dir / "entities").glob("*.json")):
+        docs.append((f"entities/{p.name}", json.loads(p.read_text(encoding="utf-8")), True))
+    return docs
+
+
+def main() -> None:
+    default_data = Path(os.environ.get("IWAC_DATA_DIR", Path(__file__).resolve().parents[1] / "omeka-map-explorer" / "static" / "data"))
+    p = argparse.ArgumentParser(description="Benchmark JSON backends on pipeline outputs")
+    p.add_argument("--data-dir", default=str(default_data), help="Directory containing networks/ and entities/")
+    p.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = p.parse_args()
+
+    docs = load_documents(Path(args.data_dir))
+    if not docs:
+        raise SystemExit(f"No networks/global.json or entities/*.json under {args.data_dir}")
+    backends = json_io.available_backends()
+    print(f"backends: {', '.join(backends)}")
+    print(f"{'document':<36}{'mode':>8}{'size':>10}" + "".join(f"{b + ' enc':>13}{b + ' write':>15}" for b in backends) + f"{'identical':>11}")
+
+    totals = {b: [0.0, 0.0] for b in backends}
+    with tempfile.TemporaryDirectory(prefix="iwac_json_") as tmp:
+        out_path = Path(tmp) / "out.json"
+        for name, data, compact in docs:
+            cells: List[str] = []
+            identical = True
+            json_io.set_backend("json")
+            reference = json_io.dumps(data, compact=compact)
+            for backend in backends:
+                json_io.set_backend(backend)
+                enc = _best_of(args.repeat, lambda: json_io.dumps(data, compact=compact))
+                wr = _best_of(args.repeat, lambda: json_io.write_json(out_path, data, compact=compact))
+                identical = identical and out_path.read_bytes() == reference
+                totals[backend][0] += enc
+                totals[backend][1] += wr
+                cells.append(f"{enc * 1000:>10.1f}ms{wr * 1000:>13.1f}ms")
+            mode = "compact" if compact else "pretty"
+            print(f"{name:<36}{mode:>8}{len(reference) / 1024:>8.0f}kB" + "".join(cells) + f"{'yes' if identical else 'NO':>11}")
+
+    print("-" * 60)
+    for backend, (enc, wr) in totals.items():
+        speedup = totals["json"][0] / enc if enc else 0.0
+        print(f"{backend:<10} encode {enc * 1000:8.1f}ms  write {wr * 1000:8.1f}ms  encode speedup vs json {speedup:.1f}x")
+    json_io.set_backend("auto")
+
+
+if __name__ == "__main__":
+    main()
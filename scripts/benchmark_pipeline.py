@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the IWAC data pipeline on synthetic corpora.
+
+For every scale factor, generate_synthetic_corpus.py builds a corpus in a work directory
+and each pipeline stage runs as its own process (so module-level scripts run unchanged and
+memory is measured per stage) against that directory via --out-dir / IWAC_DATA_DIR. Every
+stage writes an instrumentation run report; the harness collects wall time, CPU time,
+peak RSS and bytes written into time/memory curves per stage.
+
+Stages (in pipeline order):
+  fetch-transform   raw dataset rows -> articles.json / index.json (transform + write)
+  add-countries     preprocess_all.py --steps add-countries
+  entities          preprocess_all.py --steps entities
+  article-shards    preprocess_all.py --steps article-shards
+  country-focus     build_country_focus_counts.py
+  temporal-index    build_temporal_index.py
+  entity-details    build_entity_details.py
+  similar-entities  build_similar_entities.py
+  world-cache       build_world_map_cache.py
+  networks          build_networks.py
+  spatial-networks  build_spatial_networks.py
+  posting-bitmaps   build_posting_bitmaps.py
+  flow-index        build_flow_index.py
+
+Usage:
+  python scripts/benchmark_pipeline.py --scales 1 2 5 10
+  python scripts/benchmark_pipeline.py --scales 1 10 100 --stages entities networks --keep
+
+Results go to scripts/logs/benchmark_results.json (override with --output).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from json_io import write_json
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = SCRIPTS_DIR / "logs" / "benchmark_results.json"
+
+StageCommand = Callable[[Path], List[str]]
+
+STAGES: Dict[str, StageCommand] = {
+    "fetch-transform": lambda d: ["generate_synthetic_corpus.py", "--export-from-raw", str(d)],
+    "add-countries": lambda d: [
+        "preprocess_all.py", "--steps", "add-countries", "--out-dir", str(d),
+        "--maps-dir", str(d / "maps"), "--world-geojson", str(d / "maps" / "world_countries.geojson"),
+    ],
+    "entities": lambda d: [
+        "preprocess_all.py", "--steps", "entities", "--out-dir", str(d), "--entities-dir", str(d / "entities"),
+    ],
+    "article-shards": lambda d: ["preprocess_all.py", "--steps", "article-shards", "--out-dir", str(d)],
+    "country-focus": lambda d: ["build_country_focus_counts.py"],
+    "temporal-index": lambda d: ["build_temporal_index.py"],
+    "entity-details": lambda d: ["build_entity_details.py"],
+    "similar-entities": lambda d: ["build_similar_entities.py"],
+    "world-cache": lambda d: ["build_world_map_cache.py"],
+    "networks": lambda d: ["build_networks.py"],
+    "spatial-networks": lambda d: ["build_spatial_networks.py"],
+    "posting-bitmaps": lambda d: ["build_posting_bitmaps.py"],
+    "flow-index": lambda d: ["build_flow_index.py"],
+}
+
+
+def run_stage(stage: str, data_dir: Path, report_dir: Path, extra_args: List[str]) -> Dict[str, Any]:
+    """Run one stage as a subprocess and summarise its run report."""
+    report_path = report_dir / f"{stage}.json"
+    script, *args = STAGES[stage](data_dir)
+    cmd = [sys.executable, str(SCRIPTS_DIR / script), *args, "--report", str(report_path), *extra_args]
+    env = dict(os.environ, IWAC_DATA_DIR=str(data_dir))
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    elapsed = time.perf_counter() - t0
+    (report_dir / f"{stage}.log").write_text(proc.stdout + proc.stderr, encoding="utf-8")
+    if proc.returncode != 0:
+        logging.error("Stage %s failed (exit %d); see %s", stage, proc.returncode, report_dir / f"{stage}.log")
+        return {"ok": False, "processSeconds": round(elapsed, 3)}
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    return {
+        "ok": True,
+        "processSeconds": round(elapsed, 3),
+        "wallSeconds": report["wallSeconds"],
+        "cpuSeconds": report["cpuSeconds"],
+        "rssPeakBytes": report["rssHighWaterBytes"],
+        "bytesWritten": sum(s["bytesWritten"] for s in report["steps"]),
+        "steps": {s["name"]: s["wallSeconds"] for s in report["steps"]},
+    }
+
+
+def generate(scale: float, data_dir: Path, seed: int) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, str(SCRIPTS_DIR / "generate_synthetic_corpus.py"),
+        "--scale", str(scale), "--out-dir", str(data_dir), "--seed", str(seed), "--raw-only", "--log-level", "WARNING",
+    ]
+    t0 = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    elapsed = time.perf_counter() - t0
+    with (data_dir / "articles_raw.jsonl").open("rb") as f:
+        n_articles = sum(1 for _ in f)
+    with (data_dir / "index_raw.jsonl").open("rb") as f:
+        n_index = sum(1 for _ in f)
+    return {"scale": scale, "articles": n_articles, "index": n_index, "generateSeconds": round(elapsed, 3)}
+
+
+def print_table(results: Dict[str, Any]) -> None:
+    scales = [c["scale"] for c in results["corpus"]]
+    header = f"{'stage':<18}" + "".join(f"{f'x{s:g}':>20}" for s in scales)
+    print(header)
+    print("-" * len(header))
+    for stage, curve in results["stages"].items():
+        cells = []
+        for wall, rss in zip(curve["wallSeconds"], curve["rssPeakMB"]):
+            cell = "failed" if wall is None else f"{wall:.2f}s" + (f" {rss:.0f}MB" if rss else "")
+            cells.append(f"{cell:>20}")
+        print(f"{stage:<18}" + "".join(cells))
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic corpora")
+    p.add_argument("--scales", type=float, nargs="+", default=[1, 2, 5, 10], help="Corpus scale factors (1 = current dataset)")
+    p.add_argument("--stages", nargs="*", choices=list(STAGES), help="Limit to these stages (prerequisites are your responsibility)")
+    p.add_argument("--work-dir", default=None, help="Where corpora are generated (default: a temporary directory)")
+    p.add_argument("--keep", action="store_true", help="Keep generated corpora and stage outputs")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Benchmark results JSON")
+    p.add_argument("--trace-memory", action="store_true", help="Pass --trace-memory to every stage")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s", datefmt="%H:%M:%S")
+    stages = args.stages or list(STAGES)
+    extra = ["--trace-memory"] if args.trace_memory else []
+    work_root = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix="iwac_bench_"))
+
+    results: Dict[str, Any] = {
+        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "corpus": [],
+        "stages": {s: {"wallSeconds": [], "cpuSeconds": [], "rssPeakMB": [], "bytesWritten": [], "steps": []} for s in stages},
+    }
+    try:
+        for scale in args.scales:
+            data_dir = work_root / f"x{scale:g}"
+            report_dir = data_dir / "reports"
+            report_dir.mkdir(parents=True, exist_ok=True)
+            corpus = generate(scale, data_dir, args.seed)
+            results["corpus"].append(corpus)
+            logging.info("Scale x%g: %d articles, %d index rows", scale, corpus["articles"], corpus["index"])
+            for stage in stages:
+                res = run_stage(stage, data_dir, report_dir, extra)
+                curve = results["stages"][stage]
+                rss: Optional[int] = res.get("rssPeakBytes")
+                curve["wallSeconds"].append(res.get("wallSeconds"))
+                curve["cpuSeconds"].append(res.get("cpuSeconds"))
+                curve["rssPeakMB"].append(round(rss / 2**20, 1) if rss else None)
+                curve["bytesWritten"].append(res.get("bytesWritten"))
+                curve["steps"].append(res.get("steps"))
+                logging.info("  %-16s %s", stage, f"{res['wallSeconds']:.2f}s" if res["ok"] else "FAILED")
+            if not args.keep:
+                shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    out = Path(args.output)
+    write_json(out, results)
+    print_table(results)
+    print(f"Results -> {out}")
+
+
+if __name__ == "__main__":
+    main()
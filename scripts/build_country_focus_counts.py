@@ -2,18 +2,27 @@
 """
 Build precomputed per-admin counts for Country Focus (FAST + ACCURATE).
 
-Reads location entities data from:
-- omeka-map-explorer/static/data/entities/locations.json
+Reads:
+- omeka-map-explorer/static/data/entities/locations.json (location -> relatedArticleIds)
+- omeka-map-explorer/static/data/articles.json (article -> pub_date), optional
 
-This provides accurate article counts per location since the entities file
-contains the actual relationships between locations and articles, unlike
-index.json which only contains raw location mentions.
+Location entities carry the actual relationships between locations and articles,
+unlike index.json which only contains raw location mentions.
 
 What this script does:
-- For the four focus countries, aggregate article counts per Region and per Prefecture from location entities.
-- Use the articleCount field from each location entity for accurate totals.
+- For the four focus countries, collect the DISTINCT set of articles per Region and per
+  Prefecture (an article mentioning both Parakou and Nikki counts once for Borgou).
+- Join those article ids to their publication year and store per-unit cumulative year
+  counts (prefix sums), so any year range is a single subtraction on the client:
+      count(y1..y2) = prefix[y2 - startYear + 1] - prefix[y1 - startYear]
 - Write compact JSONs to static/data/country_focus/ matching frontend loader naming.
 
+Output fields per file:
+- countsArticles: distinct articles per unit (all years, including undated articles)
+- countsMentions: sum of location articleCount per unit (location-article pairs)
+- years: { start, end } or null when no dated articles are available
+- yearPrefix: unit -> [0, c(start), c(start)+c(start+1), ...] (length end - start + 2)
+
 Outputs (to omeka-map-explorer/static/data/country_focus/):
 - benin_regions_counts.json
 - benin_prefectures_counts.json
@@ -25,83 +34,131 @@ Outputs (to omeka-map-explorer/static/data/country_focus/):
 - togo_prefectures_counts.json
 """
 from __future__ import annotations
+import argparse
 import json
+import os
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
-import unicodedata
+from typing import Dict, List, Optional, Set
+
+from gazetteer import country_file_stem
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from json_io import write_json
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / 'omeka-map-explorer' / 'static' / 'data'
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
 OUT_DIR = DATA_DIR / 'country_focus'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 COUNTRIES = ['Benin', 'Burkina Faso', "Côte d'Ivoire", 'Togo']
-
-
-def norm_country_for_file(name: str) -> str:
-    s = unicodedata.normalize('NFD', name)
-    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')  # strip diacritics
-    s = s.replace("'", '').replace('’', '').replace('`', '')
-    s = '_'.join(s.split()).lower()
-    return s
+LEVELS = {'regions': 'region', 'prefectures': 'prefecture'}
 
 
 def load_json(path: Path):
     with path.open('r', encoding='utf-8') as f:
         return json.load(f)
 
+
+def pub_year(date_str: str) -> Optional[int]:
+    """Year of a normalised YYYY[-MM[-DD]] pub_date, or None."""
+    head = (date_str or '')[:4]
+    return int(head) if len(head) == 4 and head.isdigit() else None
+
+
+def build_year_prefix(article_ids: Set[str], article_year: Dict[str, int], start: int, end: int) -> List[int]:
+    """Cumulative distinct-article counts: prefix[i] = articles published before start + i."""
+    per_year = [0] * (end - start + 1)
+    for aid in article_ids:
+        year = article_year.get(aid)
+        if year is not None:
+            per_year[year - start] += 1
+    prefix = [0]
+    for c in per_year:
+        prefix.append(prefix[-1] + c)
+    return prefix
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build per-region/prefecture counts for Country Focus")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
 def main():
-    # Load location entities which have the accurate article counts
-    locations_data = load_json(DATA_DIR / 'entities' / 'locations.json')
-
-    # Prepare counters:
-    # - articles: count from relatedArticleIds
-    # - mentions: use articleCount from entities (more accurate)
-    reg_articles = {c: defaultdict(int) for c in COUNTRIES}  # name -> article count
-    pre_articles = {c: defaultdict(int) for c in COUNTRIES}
-    reg_mentions = {c: defaultdict(int) for c in COUNTRIES}  # name -> article count (same as articles for entities)
-    pre_mentions = {c: defaultdict(int) for c in COUNTRIES}
-
-    for location in locations_data:
-        country = location.get('country', '')
-        if country not in COUNTRIES:
-            continue
-        
-        region = location.get('region', '')
-        prefecture = location.get('prefecture', '')
-        article_count = location.get('articleCount', 0)
-        
-        if region:
-            reg_articles[country][region] += article_count
-            reg_mentions[country][region] += article_count
-        if prefecture:
-            pre_articles[country][prefecture] += article_count
-            pre_mentions[country][prefecture] += article_count
-
-    now = datetime.utcnow().isoformat()
-    for country in COUNTRIES:
-        norm = norm_country_for_file(country)
-        reg_out = {
-            'country': country,
-            'level': 'regions',
-            'countsMentions': {k: v for k, v in sorted(reg_mentions[country].items())},
-            'countsArticles': {k: v for k, v in sorted(reg_articles[country].items())},
-            'updatedAt': now,
-        }
-        pre_out = {
-            'country': country,
-            'level': 'prefectures',
-            'countsMentions': {k: v for k, v in sorted(pre_mentions[country].items())},
-            'countsArticles': {k: v for k, v in sorted(pre_articles[country].items())},
-            'updatedAt': now,
+    args = parse_args()
+    start_run('build_country_focus_counts', args)
+
+    with step_timer('Load locations and article years') as rec:
+        locations_data = load_json(DATA_DIR / 'entities' / 'locations.json')
+
+        articles_path = DATA_DIR / 'articles.json'
+        article_year: Dict[str, int] = {}
+        if articles_path.exists():
+            for a in load_json(articles_path):
+                year = pub_year(a.get('pub_date', ''))
+                if year is not None:
+                    article_year[str(a.get('o:id', ''))] = year
+        else:
+            print(f"articles.json not found at {articles_path}; writing totals without year prefixes")
+        rec.rows_in = len(locations_data)
+
+    with step_timer('Aggregate distinct articles per unit and year'):
+        # country -> level -> unit name -> distinct article ids / mention totals
+        unit_articles = {c: {lvl: defaultdict(set) for lvl in LEVELS} for c in COUNTRIES}
+        unit_mentions = {c: {lvl: defaultdict(int) for lvl in LEVELS} for c in COUNTRIES}
+
+        for location in locations_data:
+            country = location.get('country', '')
+            if country not in COUNTRIES:
+                continue
+            related = [str(aid) for aid in location.get('relatedArticleIds', []) or []]
+            article_count = location.get('articleCount', len(related))
+            for level, field in LEVELS.items():
+                unit = location.get(field, '')
+                if not unit:
+                    continue
+                unit_articles[country][level][unit].update(related)
+                unit_mentions[country][level][unit] += article_count
+
+        # One shared year axis for every file keeps client-side slicing uniform
+        used_years = {
+            article_year[aid]
+            for by_level in unit_articles.values()
+            for by_unit in by_level.values()
+            for ids in by_unit.values()
+            for aid in ids
+            if aid in article_year
         }
-        with (OUT_DIR / f"{norm}_regions_counts.json").open('w', encoding='utf-8') as f:
-            json.dump(reg_out, f, ensure_ascii=False, indent=2)
-        with (OUT_DIR / f"{norm}_prefectures_counts.json").open('w', encoding='utf-8') as f:
-            json.dump(pre_out, f, ensure_ascii=False, indent=2)
+        start = min(used_years) if used_years else None
+        end = max(used_years) if used_years else None
+
+    with step_timer('Write country focus files') as rec:
+        now = datetime.utcnow().isoformat()
+        units_written = 0
+        for country in COUNTRIES:
+            norm = country_file_stem(country)
+            for level in LEVELS:
+                by_unit = unit_articles[country][level]
+                out = {
+                    'country': country,
+                    'level': level,
+                    'countsMentions': {k: v for k, v in sorted(unit_mentions[country][level].items())},
+                    'countsArticles': {k: len(v) for k, v in sorted(by_unit.items())},
+                    'years': {'start': start, 'end': end} if start is not None else None,
+                    'yearPrefix': {
+                        k: build_year_prefix(v, article_year, start, end) for k, v in sorted(by_unit.items())
+                    } if start is not None else {},
+                    'updatedAt': now,
+                }
+                out_path = OUT_DIR / f"{norm}_{level}_counts.json"
+                write_json(out_path, out, compact=True)
+                units_written += len(out['countsArticles'])
+        rec.rows_out = units_written
 
     print(f"Wrote precomputed counts to {OUT_DIR}")
+    finish_run()
 
 
 if __name__ == '__main__':
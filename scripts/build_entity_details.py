@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Build precomputed per-entity drill-down payloads for entity pages.
+
+Reads:
+- omeka-map-explorer/static/data/entities/*.json (entity -> relatedArticleIds)
+- omeka-map-explorer/static/data/articles.json (article -> pub_date, country)
+
+For every person, organization, event, subject and location this computes:
+- years: per-year distinct-article histogram { start, counts } (dense from start)
+- articleCountries: distinct articles per article country (the `country` field)
+- locationCountries: distinct articles per country of the locations they mention
+- newspapers: distinct articles per newspaper
+- locations: every location mentioned in those articles (the entity itself included
+  for a location), [id, name, articles], most mentioned first; the client places them
+  with the coordinates of locations.json
+- related: top-N co-occurring entities per type, [id, name, sharedArticles]
+  (ties broken by name)
+
+Entity pages render their stats, map and location cloud from the payload alone.
+
+Payloads are sharded so an entity page needs one small fetch:
+    entities/details/manifest.json                 { types: { person: { dir, shards } } }
+    entities/details/<dir>/<shard:03d>.json        { "<entity id>": payload, ... }
+with shard = int(id) % shards (sum of character codes for non-numeric ids). The shard
+count per type keeps files around --shard-size entities.
+
+--update-ids recomputes only the listed entities and those sharing an article from
+--update-articles, rewriting just their shard files (watch_pipeline.py after entity
+edits); it falls back to a full build when the shard layout no longer matches.
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from json_io import write_json
+
+ROOT = Path(__file__).resolve().parents[1]
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
+ENT_DIR = DATA_DIR / 'entities'
+OUT_DIR = ENT_DIR / 'details'
+
+# entity type -> entities file stem (also the output sub-directory)
+ENTITY_FILES = {
+    'person': 'persons',
+    'organization': 'organizations',
+    'event': 'events',
+    'subject': 'subjects',
+    'location': 'locations',
+}
+DEFAULT_TOP_N = 10
+PAYLOAD_VERSION = 2  # 2: newspapers and locations
+DEFAULT_SHARD_SIZE = 64
+
+EntityKey = Tuple[str, int]  # (type, position in that type's entity list)
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pub_year(date_str: str) -> Optional[int]:
+    """Year of a normalised YYYY[-MM[-DD]] pub_date, or None."""
+    head = (date_str or '')[:4]
+    return int(head) if len(head) == 4 and head.isdigit() else None
+
+
+def shard_of(entity_id: str, shards: int) -> int:
+    """Shard of an entity id (mirrored by entityDetailsService.ts)."""
+    if entity_id.isdigit():
+        return int(entity_id) % shards
+    return sum(ord(ch) for ch in entity_id) % shards
+
+
+def year_histogram(article_ids: List[str], article_year: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    years = [article_year[a] for a in article_ids if a in article_year]
+    if not years:
+        return None
+    start = min(years)
+    counts = [0] * (max(years) - start + 1)
+    for y in years:
+        counts[y - start] += 1
+    return {'start': start, 'counts': counts}
+
+
+def top_related(
+    co_counts: Counter,
+    entities: Dict[str, List[Dict[str, Any]]],
+    top_n: int,
+) -> Dict[str, List[List[Any]]]:
+    by_type: Dict[str, List[Tuple[int, str, str]]] = defaultdict(list)
+    for (etype, pos), shared in co_counts.items():
+        ent = entities[etype][pos]
+        by_type[etype].append((shared, ent['name'], ent['id']))
+    related: Dict[str, List[List[Any]]] = {}
+    for etype in ENTITY_FILES:
+        ranked = sorted(by_type.get(etype, ()), key=lambda t: (-t[0], t[1]))[:top_n]
+        if ranked:
+            related[etype] = [[eid, name, shared] for shared, name, eid in ranked]
+    return related
+
+
+def mentioned_locations(co_counts: Counter, locations: List[Dict[str, Any]]) -> List[List[Any]]:
+    """[id, name, articles] of every co-occurring location, most mentioned first."""
+    ranked = sorted(
+        ((shared, locations[pos]['name'], locations[pos]['id'])
+         for (etype, pos), shared in co_counts.items() if etype == 'location'),
+        key=lambda t: (-t[0], t[1]),
+    )
+    return [[eid, name, shared] for shared, name, eid in ranked]
+
+
+def load_entities() -> Dict[str, List[Dict[str, Any]]]:
+    entities: Dict[str, List[Dict[str, Any]]] = {}
+    for etype, stem in ENTITY_FILES.items():
+        path = ENT_DIR / f'{stem}.json'
+        entities[etype] = [
+            {'id': str(e.get('id')), 'name': e.get('name', ''), 'country': (e.get('country') or '').strip(),
+             'articles': [str(a) for a in e.get('relatedArticleIds', []) or []]}
+            for e in (load_json(path) if path.exists() else [])
+        ]
+    return entities
+
+
+class ArticleFields:
+    """Per-article year, country and newspaper, plus the entities each article mentions."""
+
+    def __init__(self, articles: List[Dict[str, Any]], entities: Dict[str, List[Dict[str, Any]]]):
+        self.year: Dict[str, int] = {}
+        self.country: Dict[str, str] = {}
+        self.newspaper: Dict[str, str] = {}
+        for a in articles:
+            aid = str(a.get('o:id', ''))
+            year = pub_year(a.get('pub_date', ''))
+            if year is not None:
+                self.year[aid] = year
+            country = (a.get('country') or '').strip()
+            if country:
+                self.country[aid] = country
+            newspaper = (a.get('newspaper') or '').strip()
+            if newspaper:
+                self.newspaper[aid] = newspaper
+        self.entities: Dict[str, List[EntityKey]] = defaultdict(list)
+        self.location_countries: Dict[str, set] = defaultdict(set)
+        for etype, ents in entities.items():
+            for pos, ent in enumerate(ents):
+                for aid in ent['articles']:
+                    self.entities[aid].append((etype, pos))
+                    if etype == 'location' and ent['country']:
+                        self.location_countries[aid].add(ent['country'])
+
+
+def entity_payload(
+    key: EntityKey,
+    entities: Dict[str, List[Dict[str, Any]]],
+    fields: ArticleFields,
+    top_n: int,
+) -> Dict[str, Any]:
+    etype, pos = key
+    ent = entities[etype][pos]
+    article_ids = ent['articles']
+    co_counts: Counter = Counter()
+    countries: Counter = Counter()
+    loc_countries: Counter = Counter()
+    newspapers: Counter = Counter()
+    for aid in article_ids:
+        co_counts.update(fields.entities.get(aid, ()))
+        c = fields.country.get(aid)
+        if c:
+            countries[c] += 1
+        n = fields.newspaper.get(aid)
+        if n:
+            newspapers[n] += 1
+        loc_countries.update(fields.location_countries.get(aid, ()))
+    locations = mentioned_locations(co_counts, entities['location'])
+    co_counts.pop(key, None)
+    return {
+        'id': ent['id'],
+        'type': etype,
+        'name': ent['name'],
+        'articleCount': len(article_ids),
+        'years': year_histogram(article_ids, fields.year),
+        'articleCountries': dict(countries.most_common()),
+        'locationCountries': dict(loc_countries.most_common()),
+        'newspapers': dict(newspapers.most_common()),
+        'locations': locations,
+        'related': top_related(co_counts, entities, top_n),
+    }
+
+
+def type_shards(count: int, shard_size: int) -> int:
+    return max(1, math.ceil(count / max(1, shard_size)))
+
+
+def affected_entities(
+    entities: Dict[str, List[Dict[str, Any]]],
+    fields: ArticleFields,
+    update_ids: List[str],
+    update_articles: List[str],
+) -> Tuple[Set[EntityKey], Set[Tuple[str, str]]]:
+    """Entities whose payload may change, and (type, id) keys no longer in the entity files.
+
+    A payload depends on the entity's own record and on the records of every entity it
+    shares an article with, so the callers pass the changed entities and the articles
+    they mention before and after the change (see watch_pipeline.py).
+    """
+    positions = {etype: {ent['id']: pos for pos, ent in enumerate(ents)} for etype, ents in entities.items()}
+    keys: Set[EntityKey] = set()
+    removed: Set[Tuple[str, str]] = set()
+    for entity_key in update_ids:
+        etype, _, eid = entity_key.partition(':')
+        if etype not in positions:
+            raise SystemExit(f"Unknown entity type in --update-ids: {entity_key}")
+        pos = positions[etype].get(eid)
+        if pos is None:
+            removed.add((etype, eid))
+        else:
+            keys.add((etype, pos))
+    for aid in update_articles:
+        keys.update(fields.entities.get(aid, ()))
+    return keys, removed
+
+
+def update_payloads(
+    entities: Dict[str, List[Dict[str, Any]]],
+    fields: ArticleFields,
+    keys: Set[EntityKey],
+    removed: Set[Tuple[str, str]],
+    args,
+) -> Optional[int]:
+    """Rewrite only the shards holding these entities; None when a full build is needed.
+
+    The existing layout is reused when it was built with the same payload version, top-N
+    and per-type shard counts (the shard of an entity depends on the shard count).
+    """
+    manifest_path = OUT_DIR / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+    manifest = load_json(manifest_path)
+    if manifest.get('version') != PAYLOAD_VERSION or manifest.get('topN') != args.top_n:
+        return None
+    for etype, ents in entities.items():
+        entry = manifest.get('types', {}).get(etype)
+        if not entry or entry.get('shards') != type_shards(len(ents), args.shard_size):
+            return None
+
+    changes: Dict[Tuple[str, int], Dict[str, Optional[Dict[str, Any]]]] = defaultdict(dict)
+    for etype, pos in keys:
+        payload = entity_payload((etype, pos), entities, fields, args.top_n)
+        changes[etype, shard_of(payload['id'], manifest['types'][etype]['shards'])][payload['id']] = payload
+    for etype, eid in removed:
+        changes[etype, shard_of(eid, manifest['types'][etype]['shards'])][eid] = None
+
+    for (etype, shard), updates in sorted(changes.items()):
+        path = OUT_DIR / ENTITY_FILES[etype] / f'{shard:03d}.json'
+        bucket = load_json(path) if path.exists() else {}
+        for eid, payload in updates.items():
+            if payload is None:
+                bucket.pop(eid, None)
+            else:
+                bucket[eid] = payload
+        if bucket:
+            write_json(path, bucket, compact=True)
+        elif path.exists():
+            path.unlink()
+    for etype, ents in entities.items():
+        manifest['types'][etype]['entities'] = len(ents)
+    manifest['updatedAt'] = datetime.utcnow().isoformat()
+    write_json(manifest_path, manifest)
+    return len(changes)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build per-entity drill-down payloads")
+    p.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help="Co-occurring entities kept per type")
+    p.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Target entities per shard file")
+    p.add_argument("--update-ids", nargs="*", default=None, metavar="TYPE:ID",
+                   help="Incremental update: recompute these entities (e.g. person:123) and rewrite only their shards")
+    p.add_argument("--update-articles", nargs="*", default=(), metavar="ID",
+                   help="With --update-ids: also recompute every entity mentioning these articles")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_run('build_entity_details', args)
+
+    with step_timer('Load entities and articles') as rec:
+        entities = load_entities()
+        articles_path = DATA_DIR / 'articles.json'
+        articles = load_json(articles_path) if articles_path.exists() else []
+        rec.rows_in = len(articles) + sum(len(v) for v in entities.values())
+
+    with step_timer('Index entities per article') as rec:
+        fields = ArticleFields(articles, entities)
+        rec.rows_out = len(fields.entities)
+
+    if args.update_ids is not None:
+        with step_timer('Update changed payloads') as rec:
+            keys, removed = affected_entities(entities, fields, args.update_ids, args.update_articles)
+            files = update_payloads(entities, fields, keys, removed, args)
+            rec.rows_out = len(keys) + len(removed)
+        if files is not None:
+            print(f"Updated drill-down payloads for {len(keys) + len(removed)} entities in {files} shard files -> {OUT_DIR}")
+            finish_run()
+            return
+        print("Shard layout changed; rebuilding every payload")
+
+    with step_timer('Compute drill-down payloads') as rec:
+        payloads: Dict[str, Dict[str, Dict[str, Any]]] = {etype: {} for etype in ENTITY_FILES}
+        for etype, ents in entities.items():
+            for pos, ent in enumerate(ents):
+                payloads[etype][ent['id']] = entity_payload((etype, pos), entities, fields, args.top_n)
+        rec.rows_out = sum(len(v) for v in payloads.values())
+
+    with step_timer('Write sharded payload files') as rec:
+        manifest: Dict[str, Any] = {
+            'version': PAYLOAD_VERSION,
+            'topN': args.top_n,
+            'types': {},
+            'updatedAt': datetime.utcnow().isoformat(),
+        }
+        files = 0
+        for etype, by_id in payloads.items():
+            stem = ENTITY_FILES[etype]
+            shards = type_shards(len(by_id), args.shard_size)
+            buckets: Dict[int, Dict[str, Any]] = defaultdict(dict)
+            for eid, payload in by_id.items():
+                buckets[shard_of(eid, shards)][eid] = payload
+            type_dir = OUT_DIR / stem
+            if type_dir.exists():
+                for old in type_dir.glob('*.json'):
+                    old.unlink()
+            for shard, bucket in sorted(buckets.items()):
+                write_json(type_dir / f'{shard:03d}.json', bucket, compact=True)
+                files += 1
+            manifest['types'][etype] = {'dir': stem, 'shards': shards, 'entities': len(by_id)}
+        write_json(OUT_DIR / 'manifest.json', manifest)
+        rec.rows_out = files
+
+    print(f"Wrote drill-down payloads for {sum(len(v) for v in payloads.values())} entities in {files} shard files -> {OUT_DIR}")
+    finish_run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Build the newspaper-origin x destination flow index ("which newspapers in Burkina Faso
+referenced places in Côte d'Ivoire, and when").
+
+Reads:
+- omeka-map-explorer/static/data/articles.json (article -> newspaper, country, pub_date)
+- omeka-map-explorer/static/data/entities/locations.json (location -> country, region, relatedArticleIds)
+
+An origin is a (newspaper, article country) pair; a destination is a location country or a
+location region. Cells count distinct articles per (origin, destination, year): an article
+mentioning Abidjan and Bouaké counts once for Côte d'Ivoire. Every article has exactly one
+origin and one year, so cells are additive over years, over the newspapers of a country and
+over any set of origins; article-country flows are sums of newspaper flows.
+
+Output (to omeka-map-explorer/static/data/flows/index.json, compact). Countries are
+gazetteer keys (ISO 3166-1 alpha-2, `countryKeys`), decoded with world_cache/countries.json.
+- years:         {start, end} (inclusive) or null; year columns hold year - start, and -1
+                 for undated articles
+- origins:       parallel arrays newspaper[] / country[] sorted by (country, newspaper)
+- destinations:  country[] keys; region: parallel arrays country[] / name[]
+- flows.country, flows.region: sparse matrices in CSR form by origin:
+                 offsets[o]..offsets[o + 1] index parallel arrays dest / year / count,
+                 sorted by (dest, year) within an origin
+- totals:        distinct articles per origin and year (offsets / year / count), the
+                 denominators for shares
+
+Query helper: flow_counts(index, 'country', countries=['BF'], year_from=1990, group_by='newspaper')
+-> {newspaper: {destination: articles}}; the client mirror is src/lib/api/flowIndexService.ts.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from gazetteer import COUNTRY_KEYS, country_key, country_name
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from json_io import write_json
+
+ROOT = Path(__file__).resolve().parents[1]
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
+OUT_DIR = DATA_DIR / 'flows'
+
+LEVELS = ('country', 'region')
+UNDATED = -1
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pub_year(date_str: str) -> Optional[int]:
+    """Year of a normalised YYYY[-MM[-DD]] pub_date, or None."""
+    head = (date_str or '')[:4]
+    return int(head) if len(head) == 4 and head.isdigit() else None
+
+
+def _csr(cells: Dict[Tuple[int, int, int], int], n_origins: int, with_dest: bool = True) -> Dict[str, List[int]]:
+    """Sparse (origin, dest, year) -> count cells as CSR arrays by origin."""
+    offsets = [0] * (n_origins + 1)
+    dest: List[int] = []
+    year: List[int] = []
+    count: List[int] = []
+    for (o, d, y), n in sorted(cells.items()):
+        offsets[o + 1] += 1
+        dest.append(d)
+        year.append(y)
+        count.append(n)
+    for o in range(n_origins):
+        offsets[o + 1] += offsets[o]
+    out = {'offsets': offsets, 'dest': dest, 'year': year, 'count': count}
+    if not with_dest:
+        del out['dest']
+    return out
+
+
+def build_flow_index(articles: List[Dict[str, Any]], locations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distinct-article counts per (origin, destination, year) as CSR matrices."""
+    # Article -> (origin, year); origins are indexed after sorting
+    article_origin: Dict[str, Tuple[Tuple[str, str], Optional[int]]] = {}
+    for a in articles:
+        aid = str(a.get('o:id', '')).strip()
+        if not aid or aid in article_origin:
+            continue
+        country = (a.get('country') or '').strip()
+        origin = (country_key(country) if country else '', (a.get('newspaper') or '').strip())
+        article_origin[aid] = (origin, pub_year(a.get('pub_date', '')))
+
+    # Article -> distinct destination countries / regions
+    dest_countries: Dict[str, Set[str]] = defaultdict(set)
+    dest_regions: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+    for loc in locations:
+        country = (loc.get('country') or '').strip()
+        if not country:
+            continue
+        ck = country_key(country)
+        region = (loc.get('region') or '').strip()
+        for aid in loc.get('relatedArticleIds', []) or []:
+            aid = str(aid)
+            if aid not in article_origin:
+                continue
+            dest_countries[aid].add(ck)
+            if region:
+                dest_regions[aid].add((ck, region))
+
+    origin_keys = sorted({o for o, _y in article_origin.values()})
+    origin_idx = {o: i for i, o in enumerate(origin_keys)}
+    country_keys = sorted(set().union(*dest_countries.values()) if dest_countries else set())
+    country_idx = {c: i for i, c in enumerate(country_keys)}
+    region_keys = sorted(set().union(*dest_regions.values()) if dest_regions else set())
+    region_idx = {r: i for i, r in enumerate(region_keys)}
+    years = [y for _o, y in article_origin.values() if y is not None]
+    start = min(years) if years else 0
+
+    country_cells: Dict[Tuple[int, int, int], int] = defaultdict(int)
+    region_cells: Dict[Tuple[int, int, int], int] = defaultdict(int)
+    total_cells: Dict[Tuple[int, int, int], int] = defaultdict(int)
+    for aid, (origin, year) in article_origin.items():
+        o = origin_idx[origin]
+        y = year - start if year is not None else UNDATED
+        total_cells[(o, 0, y)] += 1
+        for c in dest_countries.get(aid, ()):
+            country_cells[(o, country_idx[c], y)] += 1
+        for r in dest_regions.get(aid, ()):
+            region_cells[(o, region_idx[r], y)] += 1
+
+    n = len(origin_keys)
+    return {
+        'type': 'flow_index',
+        'countryKeys': COUNTRY_KEYS,
+        'years': {'start': start, 'end': max(years)} if years else None,
+        'origins': {
+            'newspaper': [newspaper for _c, newspaper in origin_keys],
+            'country': [country for country, _n in origin_keys],
+        },
+        'destinations': {
+            'country': country_keys,
+            'region': {'country': [c for c, _r in region_keys], 'name': [r for _c, r in region_keys]},
+        },
+        'flows': {
+            'country': _csr(country_cells, n),
+            'region': _csr(region_cells, n),
+        },
+        'totals': _csr(total_cells, n, with_dest=False),
+    }
+
+
+# ---- query helpers ----
+
+def select_origins(
+    index: Dict[str, Any],
+    newspapers: Optional[Iterable[str]] = None,
+    countries: Optional[Iterable[str]] = None,
+) -> List[int]:
+    """Origins matching any of `newspapers` and any of `countries` (names, aliases or codes)."""
+    papers = set(newspapers) if newspapers is not None else None
+    keys = {country_key(c) for c in countries} if countries is not None else None
+    origins = index['origins']
+    return [
+        o for o, (paper, country) in enumerate(zip(origins['newspaper'], origins['country']))
+        if (papers is None or paper in papers) and (keys is None or country in keys)
+    ]
+
+
+def _year_bounds(index: Dict[str, Any], year_from: Optional[int], year_to: Optional[int]) -> Optional[Tuple[int, int]]:
+    """Inclusive year-column bounds, or None for all years (undated included)."""
+    if year_from is None and year_to is None:
+        return None
+    start = index['years']['start'] if index['years'] else 0
+    lo = year_from - start if year_from is not None else 0
+    hi = year_to - start if year_to is not None else 1 << 30
+    return max(lo, 0), hi
+
+
+def _group_label(index: Dict[str, Any], o: int, group_by: Optional[str]) -> str:
+    if group_by == 'newspaper':
+        return index['origins']['newspaper'][o]
+    if group_by == 'country':
+        return index['origins']['country'][o]
+    return ''
+
+
+def destination_labels(index: Dict[str, Any], level: str) -> List[str]:
+    """Destination labels: country keys, or 'KEY:Region' for regions."""
+    dests = index['destinations']
+    if level == 'country':
+        return list(dests['country'])
+    return [f'{c}:{r}' for c, r in zip(dests['region']['country'], dests['region']['name'])]
+
+
+def flow_counts(
+    index: Dict[str, Any],
+    level: str = 'country',
+    *,
+    newspapers: Optional[Iterable[str]] = None,
+    countries: Optional[Iterable[str]] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    group_by: Optional[str] = None,
+) -> Dict[str, Dict[str, int]]:
+    """{group: {destination: distinct articles}} for the selected origins and years.
+
+    group_by is 'newspaper', 'country' (article country) or None (one '' group).
+    """
+    if level not in LEVELS:
+        raise ValueError(f'level must be one of {LEVELS}, got {level!r}')
+    matrix = index['flows'][level]
+    labels = destination_labels(index, level)
+    bounds = _year_bounds(index, year_from, year_to)
+    out: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for o in select_origins(index, newspapers, countries):
+        group = out[_group_label(index, o, group_by)]
+        for k in range(matrix['offsets'][o], matrix['offsets'][o + 1]):
+            y = matrix['year'][k]
+            if bounds is None or (y != UNDATED and bounds[0] <= y <= bounds[1]):
+                group[labels[matrix['dest'][k]]] += matrix['count'][k]
+    return {g: dict(d) for g, d in out.items()}
+
+
+def origin_totals(
+    index: Dict[str, Any],
+    *,
+    newspapers: Optional[Iterable[str]] = None,
+    countries: Optional[Iterable[str]] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    group_by: Optional[str] = None,
+) -> Dict[str, int]:
+    """{group: distinct articles} of the selected origins (denominators for flow shares)."""
+    totals = index['totals']
+    bounds = _year_bounds(index, year_from, year_to)
+    out: Dict[str, int] = defaultdict(int)
+    for o in select_origins(index, newspapers, countries):
+        label = _group_label(index, o, group_by)
+        for k in range(totals['offsets'][o], totals['offsets'][o + 1]):
+            y = totals['year'][k]
+            if bounds is None or (y != UNDATED and bounds[0] <= y <= bounds[1]):
+                out[label] += totals['count'][k]
+    return dict(out)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build the newspaper origin x destination flow index")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_run('build_flow_index', args)
+
+    with step_timer('Load articles and locations') as rec:
+        articles = load_json(DATA_DIR / 'articles.json')
+        locations_path = DATA_DIR / 'entities' / 'locations.json'
+        locations = load_json(locations_path) if locations_path.exists() else []
+        rec.rows_in = len(articles) + len(locations)
+
+    with step_timer('Build flow matrices') as rec:
+        index = build_flow_index(articles, locations)
+        rec.rows_out = sum(len(m['count']) for m in index['flows'].values())
+
+    with step_timer('Write flow index'):
+        index['updatedAt'] = datetime.utcnow().isoformat()
+        out_path = OUT_DIR / 'index.json'
+        write_json(out_path, index, compact=True)
+
+    flows = flow_counts(index, 'country', group_by='country')
+    cross = sorted(
+        ((n, origin, dest) for origin, dests in flows.items() for dest, n in dests.items() if origin and dest != origin),
+        reverse=True,
+    )[:5]
+    print(f"Indexed {len(index['origins']['newspaper'])} origins x "
+          f"{len(index['destinations']['country'])} countries / {len(index['destinations']['region']['name'])} regions "
+          f"({sum(len(m['count']) for m in index['flows'].values())} cells) -> {out_path} "
+          f"({out_path.stat().st_size / 1024:.1f} KB)")
+    for n, origin, dest in cross:
+        print(f"  {country_name(origin)} -> {country_name(dest)}: {n} articles")
+    finish_run()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,8 @@ INPUT  (static JSON): omeka-map-explorer/static/data/entities/*.json
 
 OUTPUT (JSON): omeka-map-explorer/static/data/networks/global.json
     nodes: [
-        { id, type, label, count, degree, strength, labelPriority }
+        { id, type, label, count, degree, strength, pagerank, coreNumber, betweenness,
+          centrality, labelPriority }
     ]
     edges: [
         { source, target, type, weight, weightNorm, articleIds }
@@ -17,25 +18,57 @@ OUTPUT (JSON): omeka-map-explorer/static/data/networks/global.json
         weightMinConfigured, weightMinActual, weightMax,
         degree: { min, max, mean },
         strength: { min, max, mean },
-        topLabelCount, typePairs
+        topLabelCount, typePairs, adjacency: { file, nodes, entries, bytes },
+        levels: { file, levels: [{ level, nodes, edges, seconds }] },
+        centrality: { available, pagerank, coreNumber, betweenness: { samples, errorBound, check } }
     }
 
+OUTPUT (JSON): omeka-map-explorer/static/data/networks/levels/
+    Coarsened level-of-detail hierarchy (manifest.json + level_<k>.json): supernodes by
+    heavy-edge matching, summed edge weights and each supernode's children in the level
+    below, see network_coarsen.py. meta.levels lists node/edge counts and build time per
+    level.
+
+OUTPUT (binary): omeka-map-explorer/static/data/networks/global.csr.bin
+    CSR adjacency over the node order of global.json (offsets + neighbour indices +
+    weights + edge indices, neighbours sorted by weight), see network_csr.py.
+
 WHY CHANGES (Sigma integration):
     * Pre-compute node "strength" (sum of incident edge weights) for advanced sizing/coloring.
     * Provide normalized edge weight (weightNorm) to avoid recomputing on client.
     * Provide labelPriority so the client can show top-N labels without scanning.
     * Include statistical metadata (degree/strength distributions) for UI scaling heuristics.
+    * Emit a CSR adjacency so ego networks (focus/expand) are O(degree) lookups.
+    * Emit a coarsened hierarchy so the client can open on a small summary graph and
+      expand regions on demand instead of drawing every node at once.
+    * Compute PageRank, k-core numbers and (sampled) betweenness at build time, see
+      network_centrality.py; labelPriority ranks by PageRank and `centrality` (PageRank
+      scaled to 0..1) drives node sizing. Without numpy/scipy only core numbers are
+      computed and labelPriority falls back to degree * 3 + count.
 
 CLI OPTIONS (run `python build_networks.py -h`):
     --weight-min, --top-labels, --pairs, --no-cross-only
+    --betweenness-samples, --betweenness-check-max-nodes, --workers, --seed
+    --levels-target-nodes, --levels-max, --levels-max-group (0 target skips the hierarchy)
+    --report, --profile, --trace-memory (run report / cProfile, see instrumentation.py)
 """
 from __future__ import annotations
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 from statistics import fmean
 import argparse
 
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from edge_store import EdgeStore
+from json_io import write_json
+from network_centrality import (
+    HAS_SPARSE, betweenness, betweenness_check, betweenness_error_bound, core_numbers, pagerank,
+)
+from network_coarsen import DEFAULT_MAX_GROUP, DEFAULT_MAX_LEVELS, DEFAULT_TARGET_NODES, coarsen, write_levels
+from network_csr import build_csr, reorder_csr, write_csr
+
 # ------------------ Configuration ------------------
 DEFAULT_TYPE_PAIRS = [
     ("person", "organization"),
@@ -47,10 +80,13 @@ DEFAULT_TYPE_PAIRS = [
 
 DEFAULT_WEIGHT_MIN = 2  # prune weak edges (configurable)
 DEFAULT_TOP_LABELS = 60
+DEFAULT_BETWEENNESS_SAMPLES = 256  # sampled sources; 0 = exact
+DEFAULT_BETWEENNESS_CHECK_MAX_NODES = 2000  # also compute exact betweenness up to this size
 
 # ------------------ Paths ------------------
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / 'omeka-map-explorer' / 'static' / 'data'
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
 ENT_DIR = DATA_DIR / 'entities'
 OUT_DIR = DATA_DIR / 'networks'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -92,6 +128,18 @@ def parse_args():
     p.add_argument("--top-labels", type=int, default=DEFAULT_TOP_LABELS, help="How many high-priority node labels to pre-compute")
     p.add_argument("--pairs", type=str, default="", help="Comma-separated type pairs 'a-b,c-d' (override defaults)")
     p.add_argument("--no-cross-only", action="store_true", help="If set, also build same-type co-occurrence edges")
+    p.add_argument("--betweenness-samples", type=int, default=DEFAULT_BETWEENNESS_SAMPLES,
+                   help="Source nodes sampled for betweenness (0 = exact)")
+    p.add_argument("--betweenness-check-max-nodes", type=int, default=DEFAULT_BETWEENNESS_CHECK_MAX_NODES,
+                   help="Report sampled-vs-exact betweenness error when the graph has at most this many nodes (0 = never)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for betweenness")
+    p.add_argument("--seed", type=int, default=0, help="Seed for betweenness source sampling")
+    p.add_argument("--levels-target-nodes", type=int, default=DEFAULT_TARGET_NODES,
+                   help="Coarsen until the top level has at most this many supernodes (0 = no hierarchy)")
+    p.add_argument("--levels-max", type=int, default=DEFAULT_MAX_LEVELS, help="Maximum coarsened levels")
+    p.add_argument("--levels-max-group", type=int, default=DEFAULT_MAX_GROUP,
+                   help="Largest group a node may join when its neighbours are already matched")
+    add_instrumentation_args(p)
     return p.parse_args()
 
 ARGS = parse_args()
@@ -104,155 +152,217 @@ else:
 WEIGHT_MIN = ARGS.weight_min
 TOP_LABELS = ARGS.top_labels
 
-print("Loading entity files...")
-persons = load_entities('persons.json')
-organizations = load_entities('organizations.json')
-events = load_entities('events.json')
-subjects = load_entities('subjects.json')
-locations = load_entities('locations.json')
+start_run('build_networks', ARGS)
 
-print(
-    f"Loaded persons={len(persons)}, orgs={len(organizations)}, events={len(events)}, subjects={len(subjects)}, locations={len(locations)}"
-)
+with step_timer('Load entity files') as rec:
+    print("Loading entity files...")
+    persons = load_entities('persons.json')
+    organizations = load_entities('organizations.json')
+    events = load_entities('events.json')
+    subjects = load_entities('subjects.json')
+    locations = load_entities('locations.json')
+
+    print(
+        f"Loaded persons={len(persons)}, orgs={len(organizations)}, events={len(events)}, subjects={len(subjects)}, locations={len(locations)}"
+    )
+    rec.rows_in = len(persons) + len(organizations) + len(events) + len(subjects) + len(locations)
 
 # ------------------ Index ------------------
-article_to_entities: dict[str, dict[str, set[str]]] = {}
-node_info: dict[str, dict] = {}
+with step_timer('Index articles') as rec:
+    article_to_entities: dict[str, dict[str, set[str]]] = {}
+    node_info: dict[str, dict] = {}
 
-build_article_index(persons, 'person', article_to_entities, node_info)
-build_article_index(organizations, 'organization', article_to_entities, node_info)
-build_article_index(events, 'event', article_to_entities, node_info)
-build_article_index(subjects, 'subject', article_to_entities, node_info)
-build_article_index(locations, 'location', article_to_entities, node_info)
+    build_article_index(persons, 'person', article_to_entities, node_info)
+    build_article_index(organizations, 'organization', article_to_entities, node_info)
+    build_article_index(events, 'event', article_to_entities, node_info)
+    build_article_index(subjects, 'subject', article_to_entities, node_info)
+    build_article_index(locations, 'location', article_to_entities, node_info)
 
-print(f"Indexed {len(article_to_entities)} articles with at least one entity.")
+    print(f"Indexed {len(article_to_entities)} articles with at least one entity.")
+    rec.rows_out = len(article_to_entities)
 
-def accumulate_edge(aid: str, t1: str, t2: str, a_nodes: set[str], b_nodes: set[str], acc: dict):
+def accumulate_edge(article: int, edge_type: int, a_nodes: list[int], b_nodes: list[int], store: EdgeStore):
     for n1 in a_nodes:
         for n2 in b_nodes:
-            s, t = (n1, n2) if n1 < n2 else (n2, n1)
-            key = (s, t)
-            rec = acc.get(key)
-            if not rec:
-                acc[key] = {
-                    'source': s,
-                    'target': t,
-                    'type': f"{t1}-{t2}",
-                    'weight': 1,
-                    'articleIds': [aid],
-                }
-            else:
-                rec['weight'] += 1
-                if not rec['articleIds'] or rec['articleIds'][-1] != aid:
-                    rec['articleIds'].append(aid)
-
-edge_acc: dict[tuple[str, str], dict] = {}
-
-for aid, by_type in article_to_entities.items():
-    # cross-type pairs
-    for t1, t2 in TYPE_PAIRS:
-        a = by_type.get(t1)
-        b = by_type.get(t2)
-        if a and b:
-            accumulate_edge(aid, t1, t2, a, b, edge_acc)
-    # optional same-type pairs if requested
-    if ARGS.no_cross_only:
-        for t, nodeset in by_type.items():
-            if len(nodeset) < 2:
-                continue
-            # all unordered pairs inside nodeset
-            lst = sorted(nodeset)
-            for i in range(len(lst)):
-                for j in range(i + 1, len(lst)):
-                    s, t2 = lst[i], lst[j]
-                    key = (s, t2)
-                    rec = edge_acc.get(key)
-                    if not rec:
-                        edge_acc[key] = {
-                            'source': s,
-                            'target': t2,
-                            'type': f"{t}-{t}",
-                            'weight': 1,
-                            'articleIds': [aid],
-                        }
-                    else:
-                        rec['weight'] += 1
-                        if rec['articleIds'][-1] != aid:
-                            rec['articleIds'].append(aid)
-
-# Prune weak edges
-edges = [e for e in edge_acc.values() if e['weight'] >= WEIGHT_MIN]
-edges.sort(key=lambda r: r['weight'], reverse=True)
+            store.add(n1, n2, article, edge_type)
+
+with step_timer('Accumulate co-occurrence edges') as rec:
+    # Interned node/article ids and array-backed edges (see edge_store.py)
+    edge_store = EdgeStore(node_info.keys())
+    node_index = edge_store.index
+    pair_types = [(t1, t2, edge_store.edge_type(f"{t1}-{t2}")) for t1, t2 in TYPE_PAIRS]
+
+    for aid, by_type in article_to_entities.items():
+        article = edge_store.article(aid)
+        members = {t: [node_index[nid] for nid in nodeset] for t, nodeset in by_type.items()}
+        # cross-type pairs
+        for t1, t2, edge_type in pair_types:
+            a = members.get(t1)
+            b = members.get(t2)
+            if a and b:
+                accumulate_edge(article, edge_type, a, b, edge_store)
+        # optional same-type pairs if requested
+        if ARGS.no_cross_only:
+            for t, lst in members.items():
+                if len(lst) < 2:
+                    continue
+                # all unordered pairs inside the type
+                lst = sorted(lst)
+                edge_type = edge_store.edge_type(f"{t}-{t}")
+                for i in range(len(lst)):
+                    for j in range(i + 1, len(lst)):
+                        edge_store.add(lst[i], lst[j], article, edge_type)
+
+    # Prune weak edges (only surviving edges become dicts)
+    edges = edge_store.to_dicts(WEIGHT_MIN)
+    edges.sort(key=lambda r: r['weight'], reverse=True)
+    rec.rows_in = len(article_to_entities)
+    rec.rows_out = len(edges)
+    del edge_store, node_index
 
 # ------------------ Build nodes subset ------------------
-used_ids: set[str] = set()
-for e in edges:
-    used_ids.add(e['source'])
-    used_ids.add(e['target'])
-
-nodes = [node_info[nid] for nid in used_ids]
-
-# Degree & strength (sum of incident edge weights)
-degree = {nid: 0 for nid in used_ids}
-strength = {nid: 0 for nid in used_ids}
-for e in edges:
-    degree[e['source']] += 1
-    degree[e['target']] += 1
-    strength[e['source']] += e['weight']
-    strength[e['target']] += e['weight']
-for n in nodes:
-    nid = n['id']
-    n['degree'] = degree.get(nid, 0)
-    n['strength'] = strength.get(nid, 0)
-
-# Edge weight normalization
-if edges:
-    max_w = max(e['weight'] for e in edges)
-    min_w = min(e['weight'] for e in edges)
-else:
-    max_w = min_w = 1
-for e in edges:
-    e['weightNorm'] = round(e['weight'] / max_w, 6) if max_w else 0
-
-# Label priority (higher = more important) used by client for top labels
-nodes.sort(key=lambda x: (x['degree'] * 3 + x['count']), reverse=True)
-for idx, n in enumerate(nodes):
-    n['labelPriority'] = idx + 1
-
-# Truncate top labels list length (still store priority for all)
-top_label_slice = nodes[:TOP_LABELS]
-
-deg_vals = [n['degree'] for n in nodes] or [0]
-str_vals = [n['strength'] for n in nodes] or [0]
-
-output = {
-    'nodes': nodes,  # already sorted by label priority importance
-    'edges': edges,
-    'meta': {
-        'generatedAt': datetime.utcnow().isoformat() + 'Z',
-        'totalNodes': len(nodes),
-        'totalEdges': len(edges),
-        'supportedTypes': ['person', 'organization', 'event', 'subject', 'location'],
-        'weightMinConfigured': WEIGHT_MIN,
-        'weightMinActual': min_w,
-        'weightMax': max_w,
-        'degree': {
-            'min': min(deg_vals),
-            'max': max(deg_vals),
-            'mean': round(fmean(deg_vals), 3),
-        },
-        'strength': {
-            'min': min(str_vals),
-            'max': max(str_vals),
-            'mean': round(fmean(str_vals), 3),
+with step_timer('Compute node metrics') as rec:
+    used_ids: set[str] = set()
+    for e in edges:
+        used_ids.add(e['source'])
+        used_ids.add(e['target'])
+
+    nodes = [node_info[nid] for nid in sorted(used_ids)]
+
+    # Degree & strength (sum of incident edge weights)
+    degree = {nid: 0 for nid in used_ids}
+    strength = {nid: 0 for nid in used_ids}
+    for e in edges:
+        degree[e['source']] += 1
+        degree[e['target']] += 1
+        strength[e['source']] += e['weight']
+        strength[e['target']] += e['weight']
+    for n in nodes:
+        nid = n['id']
+        n['degree'] = degree.get(nid, 0)
+        n['strength'] = strength.get(nid, 0)
+
+    # Edge weight normalization
+    if edges:
+        max_w = max(e['weight'] for e in edges)
+        min_w = min(e['weight'] for e in edges)
+    else:
+        max_w = min_w = 1
+    for e in edges:
+        e['weightNorm'] = round(e['weight'] / max_w, 6) if max_w else 0
+
+    rec.rows_out = len(nodes)
+
+with step_timer('Compute centrality') as rec:
+    graph = build_csr([n['id'] for n in nodes], edges)
+    n_nodes = len(nodes)
+    centrality_meta: dict = {'available': HAS_SPARSE}
+    for n, core in zip(nodes, core_numbers(graph)):
+        n['coreNumber'] = core
+    centrality_meta['coreNumber'] = {'max': max((n['coreNumber'] for n in nodes), default=0)}
+    if HAS_SPARSE:
+        pr = pagerank(graph)
+        samples = ARGS.betweenness_samples if 0 < ARGS.betweenness_samples < n_nodes else n_nodes
+        bc = betweenness(graph, samples, seed=ARGS.seed, workers=ARGS.workers)
+        pr_max = max(pr, default=0) or 1
+        for n, p, b in zip(nodes, pr, bc):
+            n['pagerank'] = round(p, 8)
+            n['betweenness'] = round(b, 8)
+            n['centrality'] = round(p / pr_max, 6)
+        bc_meta = {
+            'samples': samples,
+            'exact': samples >= n_nodes,
+            'seed': ARGS.seed,
+            'errorBound': {'delta': 0.05, 'maxAbsError': round(betweenness_error_bound(n_nodes, samples), 6)},
+        }
+        if samples < n_nodes and n_nodes <= ARGS.betweenness_check_max_nodes:
+            exact = betweenness(graph, None, workers=ARGS.workers)
+            check = betweenness_check(bc, exact)
+            bc_meta['check'] = {k: round(v, 6) if isinstance(v, float) else v for k, v in check.items()}
+            print(f"Betweenness ({samples}/{n_nodes} sources): max abs error {check['maxAbsError']:.4g} "
+                  f"(bound {bc_meta['errorBound']['maxAbsError']:.4g}), top-{check['topK']} overlap {check['topKOverlap']:.0%}")
+        centrality_meta['pagerank'] = {'damping': 0.85}
+        centrality_meta['betweenness'] = bc_meta
+    else:
+        print("numpy/scipy not installed: skipping PageRank and betweenness (pip install scipy)")
+    rec.rows_out = n_nodes
+
+with step_timer('Assign label priority and assemble output') as rec:
+    # Label priority (higher = more important) used by client for top labels
+    if HAS_SPARSE:
+        nodes.sort(key=lambda x: (x['pagerank'], x['count']), reverse=True)
+    else:
+        nodes.sort(key=lambda x: (x['degree'] * 3 + x['count']), reverse=True)
+    for idx, n in enumerate(nodes):
+        n['labelPriority'] = idx + 1
+
+    # Truncate top labels list length (still store priority for all)
+    top_label_slice = nodes[:TOP_LABELS]
+
+    deg_vals = [n['degree'] for n in nodes] or [0]
+    str_vals = [n['strength'] for n in nodes] or [0]
+
+    output = {
+        'nodes': nodes,  # already sorted by label priority importance
+        'edges': edges,
+        'meta': {
+            'generatedAt': datetime.utcnow().isoformat() + 'Z',
+            'totalNodes': len(nodes),
+            'totalEdges': len(edges),
+            'supportedTypes': ['person', 'organization', 'event', 'subject', 'location'],
+            'weightMinConfigured': WEIGHT_MIN,
+            'weightMinActual': min_w,
+            'weightMax': max_w,
+            'degree': {
+                'min': min(deg_vals),
+                'max': max(deg_vals),
+                'mean': round(fmean(deg_vals), 3),
+            },
+            'strength': {
+                'min': min(str_vals),
+                'max': max(str_vals),
+                'mean': round(fmean(str_vals), 3),
+            },
+            'topLabelCount': TOP_LABELS,
+            'typePairs': TYPE_PAIRS,
+            'labelPriorityTop': [n['id'] for n in top_label_slice],
+            'centrality': centrality_meta,
         },
-        'topLabelCount': TOP_LABELS,
-        'typePairs': TYPE_PAIRS,
-        'labelPriorityTop': [n['id'] for n in top_label_slice],
-    },
-}
-
-(OUT_DIR / 'global.json').write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding='utf-8')
-print(
-    f"Wrote {OUT_DIR / 'global.json'} (nodes={len(nodes)}, edges={len(edges)}, maxW={max_w}, topLabels={TOP_LABELS})"
-)
+    }
+    rec.rows_out = len(nodes)
+
+with step_timer('Build CSR adjacency') as rec:
+    # Same adjacency as the centrality graph, renumbered into the label-priority order
+    csr = reorder_csr(graph, [n['id'] for n in nodes])
+    csr_bytes = write_csr(OUT_DIR / 'global.csr.bin', csr)
+    output['meta']['adjacency'] = {
+        'file': 'global.csr.bin',
+        'nodes': len(csr.node_ids),
+        'entries': len(csr.indices),
+        'bytes': csr_bytes,
+    }
+    rec.rows_out = len(csr.indices)
+
+if ARGS.levels_target_nodes > 0:
+    with step_timer('Coarsen level-of-detail hierarchy') as rec:
+        levels = coarsen(csr, target_nodes=ARGS.levels_target_nodes, max_levels=ARGS.levels_max,
+                         max_group=ARGS.levels_max_group)
+        levels_manifest = write_levels(OUT_DIR / 'levels', levels, nodes, len(edges), max_group=ARGS.levels_max_group)
+        output['meta']['levels'] = {
+            'file': 'levels/manifest.json',
+            'levels': [{k: lv[k] for k in ('level', 'nodes', 'edges', 'seconds') if k in lv}
+                       for lv in levels_manifest['levels']],
+        }
+        for lv in levels_manifest['levels']:
+            timing = f", {lv['seconds'] * 1000:.1f} ms, {lv['bytes'] / 1024:.1f} KB" if lv['level'] else ""
+            print(f"  level {lv['level']}: {lv['nodes']} nodes, {lv['edges']} edges{timing}")
+        rec.rows_in = len(nodes)
+        rec.rows_out = levels[-1].nodes if levels else len(nodes)
+
+with step_timer('Write global.json'):
+    write_json(OUT_DIR / 'global.json', output)
+    print(
+        f"Wrote {OUT_DIR / 'global.json'} (nodes={len(nodes)}, edges={len(edges)}, maxW={max_w}, topLabels={TOP_LABELS})"
+    )
+
+finish_run()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build the compressed bitmap posting index (posting_bitmaps.py) for set-algebra filtering.
+
+Reads:
+- omeka-map-explorer/static/data/articles.json (article -> pub_date, country, newspaper)
+- omeka-map-explorer/static/data/entities/*.json (entity -> relatedArticleIds)
+
+Articles are numbered in publication order and every entity ("type:id"), entity type,
+article country and newspaper gets a roaring-style bitmap over those ordinals. A combined
+filter such as "articles from Burkina Faso mentioning organization X in 1990-2000" is then
+three bitmap ANDs (the year range is a contiguous ordinal range) instead of set
+intersections over string ids.
+
+Output (omeka-map-explorer/static/data/postings/bitmaps.bin): see posting_bitmaps.py for
+the layout; the client reads it with src/lib/api/postingBitmapService.ts.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from posting_bitmaps import ENTITY_TYPES, PostingIndex
+
+ROOT = Path(__file__).resolve().parents[1]
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
+OUT_PATH = DATA_DIR / 'postings' / 'bitmaps.bin'
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build compressed bitmap posting lists")
+    p.add_argument("--output", default=str(OUT_PATH), help="Output file")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_run('build_posting_bitmaps', args)
+
+    with step_timer('Load articles and entities') as rec:
+        articles = load_json(DATA_DIR / 'articles.json')
+        entities = {}
+        for stem in ENTITY_TYPES:
+            path = DATA_DIR / 'entities' / f'{stem}.json'
+            entities[stem] = load_json(path) if path.exists() else []
+        rec.rows_in = len(articles) + sum(len(v) for v in entities.values())
+
+    with step_timer('Build bitmaps') as rec:
+        index = PostingIndex.build(articles, entities)
+        rec.rows_out = sum(len(by_key) for by_key in index.postings.values())
+
+    with step_timer('Write bitmaps'):
+        out_path = Path(args.output)
+        size = index.write(out_path)
+
+    counts = Counter({kind: len(by_key) for kind, by_key in index.postings.items()})
+    members = sum(len(b) for by_key in index.postings.values() for b in by_key.values())
+    print(f"Indexed {len(index)} articles: {', '.join(f'{n} {k}' for k, n in counts.items())} "
+          f"({members} postings) -> {out_path} ({size / 1024:.1f} KB)")
+    finish_run()
+
+
+if __name__ == '__main__':
+    main()
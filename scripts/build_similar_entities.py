@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Build the "similar entities" index: for every person, organization, event, subject and
+location, the top-K entities of any type with the most similar article footprint
+(Jaccard similarity of their relatedArticleIds), found with MinHash + LSH
+(minhash_lsh.py) instead of comparing all pairs. Unlike the co-occurrence `related`
+lists of the drill-down payloads, this ranks by overlap relative to both footprints, so
+a small entity whose articles are nearly all about one larger one ranks that one first
+and a ubiquitous entity does not crowd every list.
+
+Reads:
+- omeka-map-explorer/static/data/entities/*.json (entity -> relatedArticleIds)
+
+Output (sharded like entities/details/, see build_entity_details.py):
+    entities/similar/manifest.json            { numPerm, bands, rows, threshold, topK,
+                                                check, types: { person: { dir, shards } } }
+    entities/similar/<dir>/<shard:03d>.json   { "<entity id>": [[type, id, name, jaccard], ...] }
+jaccard is the MinHash estimate (3 decimals), best first. The `check` block holds the
+estimate error and top-K recall against exact Jaccard on --check-sample entities.
+
+Options: --top-k, --num-perm, --threshold/--fp-weight (set bands/rows), --bands/--rows,
+--max-bucket, --min-jaccard, --workers, --entity-shard-size, --check-sample, --seed
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from build_entity_details import DEFAULT_SHARD_SIZE, ENTITY_FILES, shard_of
+from instrumentation import add_instrumentation_args, add_run_info, finish_run, start_run, step_timer
+from json_io import write_json
+from minhash_lsh import (
+    DEFAULT_FP_WEIGHT, DEFAULT_MAX_BUCKET, DEFAULT_NUM_PERM, DEFAULT_THRESHOLD, build_lsh, estimate_check, minhash_signatures,
+    optimal_bands, require_numpy, top_k_similar,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
+ENT_DIR = DATA_DIR / 'entities'
+OUT_DIR = ENT_DIR / 'similar'
+
+DEFAULT_TOP_K = 10
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build MinHash/LSH similar-entity lists")
+    p.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Similar entities kept per entity")
+    p.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM, help="MinHash permutations (signature length)")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="Jaccard around which LSH switches from rejecting to keeping pairs (picks bands/rows)")
+    p.add_argument("--fp-weight", type=float, default=DEFAULT_FP_WEIGHT,
+                   help="Weight of false positives vs false negatives when picking bands/rows (0..1)")
+    p.add_argument("--bands", type=int, default=None, help="LSH bands (with --rows; overrides --threshold)")
+    p.add_argument("--rows", type=int, default=None, help="Signature rows per LSH band")
+    p.add_argument("--max-bucket", type=int, default=DEFAULT_MAX_BUCKET,
+                   help="Candidates taken per entity from one oversized LSH bucket")
+    p.add_argument("--min-jaccard", type=float, default=0.02, help="Drop neighbours estimated below this")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes over entity shards")
+    p.add_argument("--entity-shard-size", type=int, default=1024, help="Entities per worker task")
+    p.add_argument("--check-sample", type=int, default=200,
+                   help="Entities checked against exact Jaccard (0 disables the check)")
+    p.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Target entities per output file")
+    p.add_argument("--seed", type=int, default=0, help="Seed for the MinHash permutations and the check sample")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    require_numpy()
+    start_run('build_similar_entities', args)
+
+    with step_timer('Load entities') as rec:
+        keys: List[Tuple[str, str, str]] = []  # (type, id, name) per position
+        postings: List[List[str]] = []
+        for etype, stem in ENTITY_FILES.items():
+            path = ENT_DIR / f'{stem}.json'
+            for e in (load_json(path) if path.exists() else []):
+                articles = sorted({str(a) for a in e.get('relatedArticleIds', []) or []})
+                if articles:
+                    keys.append((etype, str(e.get('id')), e.get('name', '')))
+                    postings.append(articles)
+        rec.rows_in = len(keys)
+
+    if args.bands and args.rows:
+        bands, rows = args.bands, args.rows
+    else:
+        bands, rows = optimal_bands(args.num_perm, args.threshold, args.fp_weight)
+    params = {'numPerm': args.num_perm, 'bands': bands, 'rows': rows, 'threshold': args.threshold,
+              'topK': args.top_k, 'maxBucket': args.max_bucket, 'minJaccard': args.min_jaccard}
+
+    with step_timer('MinHash signatures') as rec:
+        signatures = minhash_signatures(
+            postings, num_perm=args.num_perm, seed=args.seed,
+            workers=args.workers, shard_size=args.entity_shard_size,
+        )
+        rec.rows_in = sum(len(p) for p in postings)
+        rec.rows_out = len(signatures)
+
+    with step_timer('LSH banding') as rec:
+        index = build_lsh(signatures, bands, rows, seed=args.seed)
+        sizes = index.bucket_sizes()
+        rec.rows_out = int((sizes > 1).sum())
+
+    with step_timer('Top-K similar entities') as rec:
+        results = top_k_similar(
+            signatures, index, top_k=args.top_k, max_bucket=args.max_bucket, min_jaccard=args.min_jaccard,
+            workers=args.workers, shard_size=args.entity_shard_size,
+        )
+        rec.rows_out = sum(len(r) for r in results)
+
+    check: Dict[str, Any] = {}
+    if args.check_sample > 0:
+        with step_timer('Check against exact Jaccard') as rec:
+            check = estimate_check(postings, signatures, results,
+                                   sample=args.check_sample, top_k=args.top_k,
+                                   threshold=args.threshold, index=index, max_bucket=args.max_bucket,
+                                   seed=args.seed)
+            rec.rows_out = check.get('pairsChecked', 0)
+        add_run_info('similarityCheck', check)
+
+    with step_timer('Write sharded similar-entity files') as rec:
+        by_type: Dict[str, Dict[str, List[List[Any]]]] = defaultdict(dict)
+        for (etype, eid, _name), neighbours in zip(keys, results):
+            by_type[etype][eid] = [[*keys[j][:3], round(est, 3)] for j, est in neighbours]
+        manifest: Dict[str, Any] = {
+            'version': 1,
+            **params,
+            'check': check or None,
+            'types': {},
+            'updatedAt': datetime.utcnow().isoformat(),
+        }
+        files = 0
+        for etype, stem in ENTITY_FILES.items():
+            entries = by_type.get(etype, {})
+            shards = max(1, math.ceil(len(entries) / max(1, args.shard_size)))
+            buckets: Dict[int, Dict[str, Any]] = defaultdict(dict)
+            for eid, neighbours in entries.items():
+                buckets[shard_of(eid, shards)][eid] = neighbours
+            type_dir = OUT_DIR / stem
+            if type_dir.exists():
+                for old in type_dir.glob('*.json'):
+                    old.unlink()
+            for shard, bucket in sorted(buckets.items()):
+                write_json(type_dir / f'{shard:03d}.json', bucket, compact=True)
+                files += 1
+            manifest['types'][etype] = {'dir': stem, 'shards': shards, 'entities': len(entries)}
+        write_json(OUT_DIR / 'manifest.json', manifest)
+        rec.rows_out = files
+
+    n = len(keys)
+    print(f"Similar entities for {n} entities (bands={bands} x rows={rows}, {args.num_perm} perms): "
+          f"{sum(len(r) for r in results)} links, largest LSH bucket {int(sizes.max()) if n else 0} -> {OUT_DIR}")
+    if check:
+        print(f"  vs exact Jaccard on {check['sampled']} entities: mean |err| {check['meanAbsError']}, "
+              f"p95 {check['p95AbsError']}, max {check['maxAbsError']} "
+              f"(expected std error <= {check['expectedStdError']}); recall@{args.top_k} of pairs >= "
+              f"{args.threshold}: {check['recallAtK']} over {check['recallEntities']} entities, "
+              f"LSH candidate recall {check['candidateRecall']}")
+    finish_run()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,28 +11,53 @@ INPUT:
 
 OUTPUT:
     - omeka-map-explorer/static/data/networks/spatial.json (location network with coordinates)
+    - omeka-map-explorer/static/data/networks/spatial_<level>.json for level in
+      prefecture, region, country (aggregated flow networks, same shape)
 
 The output includes:
     - nodes: locations with GPS coordinates, article counts, and network metrics
-    - edges: co-occurrence relationships between locations from shared articles
+    - edges: co-occurrence relationships between locations from shared articles,
+      with great-circle distance (distanceKm) between the endpoints
     - bounds: geographic bounds for map initialization
     - meta: generation metadata and statistics
+
+Aggregated levels group locations by their `country` / `region` / `prefecture` fields
+(locations missing a field are left out of that level). A unit is placed at the
+article-count-weighted mean of its locations' coordinates, and an edge's weight is the
+number of distinct articles mentioning locations in both units, so an article naming
+three places in Benin and one in Togo counts once for the Benin-Togo corridor.
 """
 
 from __future__ import annotations
 import json
+import math
+import os
 import argparse
 from pathlib import Path
 from datetime import datetime
 from statistics import fmean
 from typing import Dict, List, Tuple, Optional
 
+from article_fields import name_list
+from edge_store import EdgeStore
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from json_io import write_json
+
 # ------------------ Configuration ------------------
 DEFAULT_WEIGHT_MIN = 2
+EARTH_RADIUS_KM = 6371.0088
+
+# Aggregation level -> location fields forming the unit key (outermost first)
+FLOW_LEVELS = {
+    'prefecture': ('country', 'region', 'prefecture'),
+    'region': ('country', 'region'),
+    'country': ('country',),
+}
 
 # ------------------ Paths ------------------
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / 'omeka-map-explorer' / 'static' / 'data'
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
 ENT_DIR = DATA_DIR / 'entities'
 OUT_DIR = DATA_DIR / 'networks'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -41,6 +66,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Build spatial network with GPS coordinates")
     parser.add_argument("--weight-min", type=int, default=DEFAULT_WEIGHT_MIN, 
                        help="Minimum edge weight to keep")
+    add_instrumentation_args(parser)
     return parser.parse_args()
 
 def load_articles() -> List[Dict]:
@@ -63,206 +89,309 @@ def load_locations() -> List[Dict]:
     print(f"📍 Loading locations from {locations_file}")
     return json.loads(locations_file.read_text(encoding='utf-8'))
 
+def haversine_km(a: List[float], b: List[float]) -> float:
+    """Great-circle distance in km between two [lat, lng] points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+def compute_bounds(nodes: List[Dict]) -> Optional[Dict[str, float]]:
+    """Padded geographic bounds of the nodes' coordinates."""
+    if not nodes:
+        return None
+    lats = [node['coordinates'][0] for node in nodes]
+    lngs = [node['coordinates'][1] for node in nodes]
+    lat_padding = (max(lats) - min(lats)) * 0.1 or 0.1
+    lng_padding = (max(lngs) - min(lngs)) * 0.1 or 0.1
+    return {
+        'north': max(lats) + lat_padding,
+        'south': min(lats) - lat_padding,
+        'east': max(lngs) + lng_padding,
+        'west': min(lngs) - lng_padding
+    }
+
+def aggregate_flows(level: str, location_nodes: List[Dict], article_nodes: Dict[str, List[str]],
+                    weight_min: int) -> Tuple[List[Dict], List[Dict]]:
+    """Nodes and distinct-article edges of the flow network at one aggregation level."""
+    fields = FLOW_LEVELS[level]
+    unit_of: Dict[str, str] = {}
+    units: Dict[str, Dict] = {}
+    for node in location_nodes:
+        key = tuple((node.get(f) or '').strip() for f in fields)
+        if not all(key):
+            continue
+        unit_id = f"{level}:{'/'.join(key)}"
+        unit_of[node['id']] = unit_id
+        unit = units.get(unit_id)
+        if unit is None:
+            unit = units[unit_id] = {
+                'id': unit_id,
+                'type': level,
+                'level': level,
+                'label': key[-1],
+                **dict(zip(fields, key)),
+                'locations': 0,
+                '_lat': 0.0, '_lng': 0.0, '_w': 0.0,
+            }
+        w = max(1, int(node.get('count') or 0))
+        unit['locations'] += 1
+        unit['_lat'] += node['coordinates'][0] * w
+        unit['_lng'] += node['coordinates'][1] * w
+        unit['_w'] += w
+
+    counts: Dict[str, int] = {unit_id: 0 for unit_id in units}
+    edge_acc: Dict[Tuple[str, str], Dict] = {}
+    for article_id, node_ids in article_nodes.items():
+        article_units = sorted({unit_of[n] for n in node_ids if n in unit_of})
+        for unit_id in article_units:
+            counts[unit_id] += 1
+        for i, u1 in enumerate(article_units):
+            for u2 in article_units[i + 1:]:
+                edge = edge_acc.get((u1, u2))
+                if edge is None:
+                    edge = edge_acc[(u1, u2)] = {'source': u1, 'target': u2, 'weight': 0, 'articleIds': []}
+                edge['weight'] += 1
+                edge['articleIds'].append(article_id)
+
+    nodes = []
+    for unit in units.values():
+        w = unit.pop('_w')
+        unit['coordinates'] = [round(unit.pop('_lat') / w, 6), round(unit.pop('_lng') / w, 6)]
+        unit['count'] = counts[unit['id']]
+        nodes.append(unit)
+    by_id = {unit['id']: unit for unit in nodes}
+
+    edges = [edge for edge in edge_acc.values() if edge['weight'] >= weight_min]
+    edges.sort(key=lambda e: (-e['weight'], e['source'], e['target']))
+    max_weight = max((edge['weight'] for edge in edges), default=0)
+    degree = {unit_id: 0 for unit_id in by_id}
+    strength = {unit_id: 0 for unit_id in by_id}
+    for edge in edges:
+        edge['weightNorm'] = edge['weight'] / max_weight if max_weight > 0 else 0
+        edge['distanceKm'] = round(haversine_km(by_id[edge['source']]['coordinates'], by_id[edge['target']]['coordinates']), 1)
+        for end in (edge['source'], edge['target']):
+            degree[end] += 1
+            strength[end] += edge['weight']
+    for unit in nodes:
+        unit['degree'] = degree[unit['id']]
+        unit['strength'] = strength[unit['id']]
+    nodes = [unit for unit in nodes if unit['degree'] > 0]
+    nodes.sort(key=lambda u: (-u['strength'], u['id']))
+    return nodes, edges
+
 def build_spatial_network(args):
     """Build the spatial network using existing coordinate data."""
     
     print("🚀 Building spatial network...")
     
-    # Load data
-    articles = load_articles()
-    locations = load_locations()
+    with step_timer('Load articles and locations') as rec:
+        # Load data
+        articles = load_articles()
+        locations = load_locations()
     
-    if not articles or not locations:
-        print("❌ Missing required data files")
-        return
+        if not articles or not locations:
+            print("❌ Missing required data files")
+            return
     
-    print(f"📊 Loaded {len(articles)} articles and {len(locations)} locations")
+        print(f"📊 Loaded {len(articles)} articles and {len(locations)} locations")
     
-    # Build location nodes with coordinates (filter out locations without coordinates)
-    nodes = []
-    locations_with_coords = 0
+        rec.rows_in = len(articles) + len(locations)
     
-    for location in locations:
-        location_name = location.get('name', '').strip()
-        coordinates = location.get('coordinates')
+    with step_timer('Index coordinate-enabled locations') as rec:
+        # Build location nodes with coordinates (filter out locations without coordinates)
+        nodes = []
+        locations_with_coords = 0
+    
+        for location in locations:
+            location_name = location.get('name', '').strip()
+            coordinates = location.get('coordinates')
         
-        if not location_name or not coordinates:
-            continue
+            if not location_name or not coordinates:
+                continue
         
-        # Validate coordinates format
-        if not isinstance(coordinates, list) or len(coordinates) != 2:
-            continue
+            # Validate coordinates format
+            if not isinstance(coordinates, list) or len(coordinates) != 2:
+                continue
         
-        try:
-            lat, lng = float(coordinates[0]), float(coordinates[1])
-        except (ValueError, TypeError):
-            continue
+            try:
+                lat, lng = float(coordinates[0]), float(coordinates[1])
+            except (ValueError, TypeError):
+                continue
         
-        # Skip invalid coordinates
-        if abs(lat) > 90 or abs(lng) > 180:
-            continue
+            # Skip invalid coordinates
+            if abs(lat) > 90 or abs(lng) > 180:
+                continue
         
-        node = {
-            'id': f"location:{location['id']}",
-            'type': 'location',
-            'label': location_name,
-            'count': location.get('articleCount', len(location.get('relatedArticleIds', []))),
-            'coordinates': [lat, lng],  # [lat, lng]
-            'country': location.get('country', ''),
-            'region': location.get('region', ''),
-            'prefecture': location.get('prefecture', ''),
-            'relatedArticleIds': location.get('relatedArticleIds', [])
-        }
+            node = {
+                'id': f"location:{location['id']}",
+                'type': 'location',
+                'label': location_name,
+                'count': location.get('articleCount', len(location.get('relatedArticleIds', []))),
+                'coordinates': [lat, lng],  # [lat, lng]
+                'country': location.get('country', ''),
+                'region': location.get('region', ''),
+                'prefecture': location.get('prefecture', ''),
+                'relatedArticleIds': location.get('relatedArticleIds', [])
+            }
         
-        nodes.append(node)
-        locations_with_coords += 1
+            nodes.append(node)
+            locations_with_coords += 1
     
-    print(f"📍 Found {locations_with_coords} locations with valid coordinates")
+        print(f"📍 Found {locations_with_coords} locations with valid coordinates")
     
-    # Build article index for co-occurrence calculation
-    article_to_locations = {}
-    node_by_name = {node['label'].lower(): node for node in nodes}
+        # Build article index for co-occurrence calculation
+        article_to_locations = {}
+        article_nodes = {}  # every article with at least one matched location (flow aggregation)
+        node_by_name = {node['label'].lower(): node for node in nodes}
     
-    for article in articles:
-        article_id = str(article.get('o:id', ''))
-        spatial = article.get('spatial', '')
-        if not spatial:
-            continue
-        
-        # Parse locations from spatial field and match to nodes with coordinates
-        article_locations = []
-        for loc_name in spatial.split('|'):
-            loc_name = loc_name.strip()
-            if not loc_name:
+        for article in articles:
+            article_id = str(article.get('o:id', ''))
+            spatial = name_list(article.get('spatial'))
+            if not spatial:
                 continue
-            
-            # Find matching node by name
-            node = node_by_name.get(loc_name.lower())
-            if node:
-                article_locations.append(node['id'])
         
-        # Only articles with multiple locations create edges
-        if len(article_locations) > 1:
-            article_to_locations[article_id] = article_locations
-    
-    print(f"🔗 Found {len(article_to_locations)} articles with multiple coordinate-enabled locations")
-    
-    # Build edges (co-occurrence between locations)
-    edge_weights = {}
-    
-    for article_id, location_ids in article_to_locations.items():
-        # Create edges between all pairs of locations in this article
-        for i, loc1 in enumerate(location_ids):
-            for loc2 in location_ids[i + 1:]:
-                edge_key = tuple(sorted([loc1, loc2]))
-                
-                if edge_key not in edge_weights:
-                    edge_weights[edge_key] = {
-                        'source': edge_key[0],
-                        'target': edge_key[1],
-                        'weight': 0,
-                        'articleIds': []
-                    }
-                
-                edge_weights[edge_key]['weight'] += 1
-                edge_weights[edge_key]['articleIds'].append(article_id)
-    
-    # Filter edges by minimum weight
-    edges = [
-        edge for edge in edge_weights.values() 
-        if edge['weight'] >= args.weight_min
-    ]
-    
-    print(f"🔗 Created {len(edges)} edges (min weight: {args.weight_min})")
-    
-    # Calculate network metrics
-    degree = {node['id']: 0 for node in nodes}
-    strength = {node['id']: 0 for node in nodes}
-    
-    for edge in edges:
-        degree[edge['source']] += 1
-        degree[edge['target']] += 1
-        strength[edge['source']] += edge['weight']
-        strength[edge['target']] += edge['weight']
-    
-    # Add metrics to nodes
-    for node in nodes:
-        node['degree'] = degree[node['id']]
-        node['strength'] = strength[node['id']]
-    
-    # Filter out isolated nodes (nodes with no edges)
-    connected_node_ids = set()
-    for edge in edges:
-        connected_node_ids.add(edge['source'])
-        connected_node_ids.add(edge['target'])
-    
-    nodes = [node for node in nodes if node['id'] in connected_node_ids]
-    
-    print(f"📊 Final network: {len(nodes)} connected nodes, {len(edges)} edges")
-    
-    # Calculate geographic bounds
-    if nodes:
-        lats = [node['coordinates'][0] for node in nodes]
-        lngs = [node['coordinates'][1] for node in nodes]
-        bounds = {
-            'north': max(lats),
-            'south': min(lats),
-            'east': max(lngs),
-            'west': min(lngs)
-        }
+            # Match the article's locations to nodes with coordinates
+            article_locations = []
+            for loc_name in spatial:
+                # Find matching node by name
+                node = node_by_name.get(loc_name.lower())
+                if node:
+                    article_locations.append(node['id'])
         
-        # Add padding
-        lat_padding = (bounds['north'] - bounds['south']) * 0.1 or 0.1
-        lng_padding = (bounds['east'] - bounds['west']) * 0.1 or 0.1
-        bounds = {
-            'north': bounds['north'] + lat_padding,
-            'south': bounds['south'] - lat_padding,
-            'east': bounds['east'] + lng_padding,
-            'west': bounds['west'] - lng_padding
-        }
-    else:
-        bounds = None
+            if article_locations:
+                article_nodes[article_id] = article_locations
+        
+            # Only articles with multiple locations create edges
+            if len(article_locations) > 1:
+                article_to_locations[article_id] = article_locations
+    
+        print(f"🔗 Found {len(article_to_locations)} articles with multiple coordinate-enabled locations")
+    
+        rec.rows_out = len(nodes)
+    
+    with step_timer('Build edges and metrics') as rec:
+        # Build edges (co-occurrence between locations), interned and array-backed
+        edge_store = EdgeStore((node['id'] for node in nodes), dedupe_articles=False)
+        node_index = edge_store.index
+    
+        for article_id, location_ids in article_to_locations.items():
+            article = edge_store.article(article_id)
+            members = [node_index[loc] for loc in location_ids]
+            # Create edges between all pairs of locations in this article
+            for i, loc1 in enumerate(members):
+                for loc2 in members[i + 1:]:
+                    edge_store.add(loc1, loc2, article)
+    
+        # Filter edges by minimum weight (only surviving edges become dicts)
+        edges = edge_store.to_dicts(args.weight_min, with_type=False)
+        del edge_store, node_index
+    
+        print(f"🔗 Created {len(edges)} edges (min weight: {args.weight_min})")
+    
+        # Calculate network metrics
+        degree = {node['id']: 0 for node in nodes}
+        strength = {node['id']: 0 for node in nodes}
     
-    # Add normalized edge weights
-    if edges:
-        max_weight = max(edge['weight'] for edge in edges)
-        min_weight = min(edge['weight'] for edge in edges)
         for edge in edges:
-            edge['weightNorm'] = edge['weight'] / max_weight if max_weight > 0 else 0
-    
-    # Prepare output
-    output = {
-        'nodes': nodes,
-        'edges': edges,
-        'bounds': bounds,
-        'meta': {
-            'generatedAt': datetime.utcnow().isoformat() + 'Z',
-            'totalNodes': len(nodes),
-            'totalEdges': len(edges),
-            'weightMin': args.weight_min,
-            'geocodedLocations': locations_with_coords,
-            'totalLocationsInData': len(locations),
-            'geocodingSuccessRate': round(locations_with_coords / len(locations) * 100, 1) if locations else 0,
+            degree[edge['source']] += 1
+            degree[edge['target']] += 1
+            strength[edge['source']] += edge['weight']
+            strength[edge['target']] += edge['weight']
+    
+        # Add metrics to nodes
+        for node in nodes:
+            node['degree'] = degree[node['id']]
+            node['strength'] = strength[node['id']]
+    
+        # Great-circle length of each edge
+        coords_by_id = {node['id']: node['coordinates'] for node in nodes}
+        for edge in edges:
+            edge['distanceKm'] = round(haversine_km(coords_by_id[edge['source']], coords_by_id[edge['target']]), 1)
+    
+        location_nodes = nodes
+    
+        # Filter out isolated nodes (nodes with no edges)
+        connected_node_ids = set()
+        for edge in edges:
+            connected_node_ids.add(edge['source'])
+            connected_node_ids.add(edge['target'])
+    
+        nodes = [node for node in nodes if node['id'] in connected_node_ids]
+    
+        print(f"📊 Final network: {len(nodes)} connected nodes, {len(edges)} edges")
+    
+        # Calculate geographic bounds
+        bounds = compute_bounds(nodes)
+    
+        # Add normalized edge weights
+        if edges:
+            max_weight = max(edge['weight'] for edge in edges)
+            min_weight = min(edge['weight'] for edge in edges)
+            for edge in edges:
+                edge['weightNorm'] = edge['weight'] / max_weight if max_weight > 0 else 0
+    
+        rec.rows_in = len(article_to_locations)
+        rec.rows_out = len(edges)
+    
+    with step_timer('Aggregate prefecture/region/country flows') as rec:
+        flow_files = {}
+        for level in FLOW_LEVELS:
+            level_nodes, level_edges = aggregate_flows(level, location_nodes, article_nodes, args.weight_min)
+            level_bounds = compute_bounds(level_nodes)
+            flow_files[level] = f'spatial_{level}.json'
+            write_json(OUT_DIR / flow_files[level], {
+                'nodes': level_nodes,
+                'edges': level_edges,
+                'bounds': level_bounds,
+                'meta': {
+                    'generatedAt': datetime.utcnow().isoformat() + 'Z',
+                    'level': level,
+                    'groupBy': list(FLOW_LEVELS[level]),
+                    'totalNodes': len(level_nodes),
+                    'totalEdges': len(level_edges),
+                    'weightMin': args.weight_min,
+                    'weight': 'distinctArticles',
+                    'bounds': level_bounds,
+                }
+            })
+            print(f"🗺️  {level}: {len(level_nodes)} units, {len(level_edges)} edges -> {OUT_DIR / flow_files[level]}")
+        rec.rows_in = len(article_nodes)
+        rec.rows_out = len(flow_files)
+    
+    with step_timer('Write spatial.json'):
+        # Prepare output
+        output = {
+            'nodes': nodes,
+            'edges': edges,
             'bounds': bounds,
-            'articlesWithMultipleLocations': len(article_to_locations)
+            'meta': {
+                'generatedAt': datetime.utcnow().isoformat() + 'Z',
+                'totalNodes': len(nodes),
+                'totalEdges': len(edges),
+                'weightMin': args.weight_min,
+                'geocodedLocations': locations_with_coords,
+                'totalLocationsInData': len(locations),
+                'geocodingSuccessRate': round(locations_with_coords / len(locations) * 100, 1) if locations else 0,
+                'bounds': bounds,
+                'articlesWithMultipleLocations': len(article_to_locations),
+                'flowLevels': flow_files
+            }
         }
-    }
     
-    # Save output
-    output_file = OUT_DIR / 'spatial.json'
-    output_file.write_text(
-        json.dumps(output, ensure_ascii=False, indent=2),
-        encoding='utf-8'
-    )
-    
-    print(f"✅ Spatial network saved to {output_file}")
-    print(f"📊 Statistics:")
-    print(f"   - Nodes: {len(nodes)}")
-    print(f"   - Edges: {len(edges)}")
-    print(f"   - Locations with coordinates: {locations_with_coords}/{len(locations)} ({output['meta']['geocodingSuccessRate']}%)")
-    if bounds:
-        print(f"   - Geographic bounds: {bounds['south']:.2f}°S to {bounds['north']:.2f}°N, {bounds['west']:.2f}°W to {bounds['east']:.2f}°E")
+        # Save output
+        output_file = OUT_DIR / 'spatial.json'
+        write_json(output_file, output)
+    
+        print(f"✅ Spatial network saved to {output_file}")
+        print(f"📊 Statistics:")
+        print(f"   - Nodes: {len(nodes)}")
+        print(f"   - Edges: {len(edges)}")
+        print(f"   - Locations with coordinates: {locations_with_coords}/{len(locations)} ({output['meta']['geocodingSuccessRate']}%)")
+        if bounds:
+            print(f"   - Geographic bounds: {bounds['south']:.2f}°S to {bounds['north']:.2f}°N, {bounds['west']:.2f}°W to {bounds['east']:.2f}°E")
 
 if __name__ == "__main__":
     args = parse_args()
+    start_run('build_spatial_networks', args)
     build_spatial_network(args)
+    finish_run()
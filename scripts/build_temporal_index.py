@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Build the precomputed temporal index used by the timeline and date-range filters.
+
+Reads:
+- omeka-map-explorer/static/data/articles.json (article -> pub_date, country)
+- omeka-map-explorer/static/data/entities/locations.json (location -> country, relatedArticleIds)
+
+pub_date is parsed once here instead of in every consumer. Articles are sorted by date
+and stored column-wise with integer ordinals:
+  - day:   days since 1970-01-01 (same as Date.UTC(...) / 86400000 on the client)
+  - month: year * 12 + (month - 1)
+
+Because the columns are sorted, any date range is a contiguous slice:
+  - month range m1..m2: articleIds[monthOffsets[m1 - start] : monthOffsets[m2 - start + 1]]
+  - day range d1..d2:   binary search in `day` (bisect_left(d1), bisect_right(d2))
+
+Monthly histograms (dense, one slot per month from months.start to months.end) count
+distinct articles per article country (the `country` field) and per location country
+(countries of the locations an article is related to, each counted once per article).
+
+Output (to omeka-map-explorer/static/data/temporal/index.json, compact):
+- months: { start, end } inclusive month ordinals, or null when nothing is dated
+- articleIds / day / month: parallel arrays sorted by (day, id)
+- monthOffsets: length (end - start + 2), monthOffsets[0] == 0
+- undatedIds: articles whose pub_date cannot be parsed
+- monthly: { total, byArticleCountry: {country: [...]}, byLocationCountry: {country: [...]} }
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from json_io import write_json
+
+ROOT = Path(__file__).resolve().parents[1]
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
+OUT_DIR = DATA_DIR / 'temporal'
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def date_ordinals(date_str: str) -> Optional[Tuple[int, int]]:
+    """(day, month) ordinals of a normalised YYYY-MM-DD pub_date, or None if unparseable.
+
+    Partial dates were already padded to the first of the month/year by normalize_date_ymd;
+    an invalid day falls back to the first of its month.
+    """
+    s = (date_str or '').strip()
+    parts = s[:10].split('-')
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return None
+    y, m, d = (int(p) for p in parts)
+    if not 1 <= m <= 12 or y < 1:
+        return None
+    try:
+        day = date(y, m, d).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        day = date(y, m, 1).toordinal() - EPOCH_ORDINAL
+    return day, y * 12 + (m - 1)
+
+
+def month_label(month: int) -> str:
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def build_temporal_index(
+    articles: List[Dict[str, Any]],
+    article_location_countries: Dict[str, Set[str]],
+) -> Dict[str, Any]:
+    """Sort articles by date and derive month offsets and monthly histograms."""
+    dated: List[Tuple[int, int, str, str]] = []  # (day, month, id, article country)
+    undated: List[str] = []
+    seen: Set[str] = set()
+    for a in articles:
+        aid = str(a.get('o:id', '')).strip()
+        if not aid or aid in seen:
+            continue
+        seen.add(aid)
+        ords = date_ordinals(a.get('pub_date', ''))
+        if ords is None:
+            undated.append(aid)
+            continue
+        dated.append((ords[0], ords[1], aid, (a.get('country') or '').strip()))
+    dated.sort()
+
+    if not dated:
+        return {
+            'months': None,
+            'articleIds': [],
+            'day': [],
+            'month': [],
+            'monthOffsets': [0],
+            'undatedIds': undated,
+            'monthly': {'total': [], 'byArticleCountry': {}, 'byLocationCountry': {}},
+        }
+
+    start, end = dated[0][1], dated[-1][1]
+    n_months = end - start + 1
+    total = [0] * n_months
+    by_article_country: Dict[str, List[int]] = defaultdict(lambda: [0] * n_months)
+    by_location_country: Dict[str, List[int]] = defaultdict(lambda: [0] * n_months)
+    for _day, month, aid, country in dated:
+        slot = month - start
+        total[slot] += 1
+        if country:
+            by_article_country[country][slot] += 1
+        for loc_country in article_location_countries.get(aid, ()):
+            by_location_country[loc_country][slot] += 1
+
+    # offsets[i] = number of articles published before month start + i
+    offsets = [0] * (n_months + 1)
+    for i, c in enumerate(total):
+        offsets[i + 1] = offsets[i] + c
+
+    return {
+        'months': {'start': start, 'end': end, 'startLabel': month_label(start), 'endLabel': month_label(end)},
+        'articleIds': [aid for _d, _m, aid, _c in dated],
+        'day': [d for d, _m, _a, _c in dated],
+        'month': [m for _d, m, _a, _c in dated],
+        'monthOffsets': offsets,
+        'undatedIds': undated,
+        'monthly': {
+            'total': total,
+            'byArticleCountry': dict(sorted(by_article_country.items())),
+            'byLocationCountry': dict(sorted(by_location_country.items())),
+        },
+    }
+
+
+def month_slice(index: Dict[str, Any], m1: int, m2: int) -> Tuple[int, int]:
+    """[lo, hi) positions of articles published in months m1..m2 (inclusive)."""
+    months = index['months']
+    if months is None:
+        return 0, 0
+    lo = min(max(m1, months['start']), months['end'] + 1) - months['start']
+    hi = min(max(m2 + 1, months['start']), months['end'] + 1) - months['start']
+    offsets = index['monthOffsets']
+    return offsets[lo], offsets[max(lo, hi)]
+
+
+def day_slice(index: Dict[str, Any], d1: int, d2: int) -> Tuple[int, int]:
+    """[lo, hi) positions of articles published on days d1..d2 (inclusive)."""
+    days = index['day']
+    return bisect_left(days, d1), bisect_right(days, d2)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build the temporal index and monthly histograms")
+    add_instrumentation_args(p)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_run('build_temporal_index', args)
+
+    with step_timer('Load articles and locations') as rec:
+        articles = load_json(DATA_DIR / 'articles.json')
+        locations_path = DATA_DIR / 'entities' / 'locations.json'
+        locations = load_json(locations_path) if locations_path.exists() else []
+        rec.rows_in = len(articles) + len(locations)
+
+        article_location_countries: Dict[str, Set[str]] = defaultdict(set)
+        for loc in locations:
+            country = (loc.get('country') or '').strip()
+            if not country:
+                continue
+            for aid in loc.get('relatedArticleIds', []) or []:
+                article_location_countries[str(aid)].add(country)
+
+    with step_timer('Sort articles and build monthly histograms') as rec:
+        index = build_temporal_index(articles, article_location_countries)
+        rec.rows_out = len(index['articleIds'])
+
+    with step_timer('Write temporal index'):
+        index['updatedAt'] = datetime.utcnow().isoformat()
+        out_path = OUT_DIR / 'index.json'
+        write_json(out_path, index, compact=True)
+
+    months = index['months']
+    span = f"{months['startLabel']}..{months['endLabel']}" if months else 'no dated articles'
+    print(f"Indexed {len(index['articleIds'])} dated articles ({span}), {len(index['undatedIds'])} undated -> {out_path}")
+    finish_run()
+
+
+if __name__ == '__main__':
+    main()
@@ -13,24 +13,63 @@ Outputs to omeka-map-explorer/static/data/world_cache/:
 - choropleth/all_countries.json          # Global country counts
 - choropleth/by_year/*.json              # Per-year country counts  
 - choropleth/by_entity/*.json            # Per-entity-type country counts
+- countries.json                         # ISO 3166-1 alpha-2 code -> display name
 - coordinates/all_locations.json         # Pre-aggregated coordinate clusters
 - coordinates/by_country/*.json          # Country-specific coordinates
+- coordinates/postings.json              # Shared article id lists referenced by the clusters
+- frames/{month,year}/manifest.json      # Timeline playback: period range, window, chunk list
+- frames/{month,year}/NNN.json           # Keyframe + delta frames up to the next keyframe
 - metadata.json                          # Cache info and timestamps
 
+Coordinate clusters do not embed their article ids: each cluster's `postings` is an index
+into coordinates/postings.json, where every distinct article id list is stored once
+(sorted, delta-encoded integers) and shared by all_locations, by_country and
+by_article_country. The client fetches it only when it needs the ids.
+
+Timeline frames let the map animate month by month (or year by year) without loading a
+by_year file or re-aggregating per step. Frame f holds, for every marker (its position in
+all_locations.json) and every country, the articles published in the last --frame-window
+periods. Every --keyframe-interval frames a chunk file starts with a keyframe (the full
+state as [key delta, count, ...]) followed by the delta frames that lead to the next
+keyframe: per frame, markers/countries that appear (`on`, with counts), disappear (`off`)
+or change (`inc`, signed increments); a frame whose diff would outweigh the full state
+stores the state instead (`k`). The default window 0 is cumulative (the map fills up over
+time). Seeking loads one chunk; playing applies small diffs.
+
+Choropleth `counts` are keyed by ISO 3166-1 alpha-2 code (gazetteer.py; territories
+without a code keep their name) and marked `countryKeys`; countries.json is the single
+names table the client uses to map codes back to the world GeoJSON names. Country
+matching (spatial place names, article countries) and file names also go through the
+gazetteer.
+
+Only choropleth/by_entity reads the person/organization/event/subject files;
+--entity-choropleth-only rebuilds just those files for the given types
+(watch_pipeline.py after edits that leave articles.json and locations.json alone).
+
 Uses the same accurate entity-based data source as country focus.
 """
 
 from __future__ import annotations
+import argparse
+import gzip
 import json
+import os
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
-import unicodedata
 from typing import Dict, List, Set, Any, Optional
 
+from article_fields import name_list
+from gazetteer import COUNTRY_KEYS, country_code, country_file_stem, country_key, names_json
+from instrumentation import add_instrumentation_args, add_run_info, finish_run, record_rows, start_run, step_timer
+from json_io import write_json
+
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / 'omeka-map-explorer' / 'static' / 'data'
+# IWAC_DATA_DIR redirects all inputs/outputs (used by benchmark_pipeline.py on synthetic corpora)
+DATA_DIR = Path(os.environ.get('IWAC_DATA_DIR') or ROOT / 'omeka-map-explorer' / 'static' / 'data')
 CACHE_DIR = DATA_DIR / 'world_cache'
+# Entity files with a choropleth/by_entity/<type>.json (locations feed every choropleth)
+ENTITY_CHOROPLETH_TYPES = ['persons', 'organizations', 'events', 'subjects']
 
 # Create cache directories
 (CACHE_DIR / 'choropleth').mkdir(parents=True, exist_ok=True)
@@ -50,22 +89,6 @@ def load_json(path: Path):
         print(f"Error loading {path}: {e}")
         return None
 
-def save_json(path: Path, data: Any, compact: bool = False):
-    """Save JSON file, optionally compact."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open('w', encoding='utf-8') as f:
-        if compact:
-            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
-        else:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-def normalize_country_filename(country: str) -> str:
-    """Normalize country name for filenames."""
-    s = unicodedata.normalize('NFD', country)
-    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
-    s = s.replace("'", '').replace("'", '').replace('`', '').replace(' ', '_')
-    return s.lower()
-
 def extract_year(date_str: str) -> Optional[int]:
     """Extract year from date string."""
     if not date_str:
@@ -79,6 +102,71 @@ def extract_year(date_str: str) -> Optional[int]:
     except (ValueError, IndexError):
         return None
 
+class ArticlePostings:
+    """Distinct article id lists, stored once and referenced by index from the clusters.
+
+    Lists are sorted and delta-encoded ([a0, a1 - a0, a2 - a1, ...]). Omeka article ids are
+    integers; if any id is not, the lists hold indices into a sorted `ids` table instead.
+    """
+
+    def __init__(self):
+        self._index: Dict[frozenset, int] = {}
+        self.lists: List[frozenset] = []
+
+    def add(self, article_ids) -> int:
+        key = frozenset(str(a) for a in article_ids)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.lists)
+            self.lists.append(key)
+        return idx
+
+    def to_json(self) -> Dict[str, Any]:
+        all_ids = set().union(*self.lists) if self.lists else set()
+        numeric = all(a.isdigit() for a in all_ids)
+        table: List[str] = [] if numeric else sorted(all_ids)
+        position = {a: i for i, a in enumerate(table)}
+        encoded = []
+        for ids in self.lists:
+            values = sorted(int(a) for a in ids) if numeric else sorted(position[a] for a in ids)
+            encoded.append([v - prev for prev, v in zip([0] + values, values)])
+        data: Dict[str, Any] = {
+            'type': 'article_postings',
+            'encoding': 'delta' if numeric else 'delta-index',
+            'total_lists': len(encoded),
+            'lists': encoded,
+            'updatedAt': datetime.utcnow().isoformat(),
+        }
+        if table:
+            data['ids'] = table
+        return data
+
+
+def location_country_map(locations_data) -> Dict[str, str]:
+    """Location name -> country key, from the location entities."""
+    location_to_country = {}
+    for location in locations_data or []:
+        name = location.get('name', '').strip()
+        country = location.get('country', '').strip()
+        if name and country:
+            location_to_country[name] = country_key(country)
+    return location_to_country
+
+def article_countries(article: Dict[str, Any], location_to_country: Dict[str, str]) -> Set[str]:
+    """Country keys an article counts for: its own country and those of the places it mentions."""
+    countries = set()
+    direct_country = article.get('country', '').strip()
+    if direct_country:
+        countries.add(country_key(direct_country))
+    for place in name_list(article.get('spatial')):
+        # A place that is itself a country (any gazetteer alias), else its location's country
+        code = country_code(place)
+        if code:
+            countries.add(code)
+        elif place in location_to_country:
+            countries.add(location_to_country[place])
+    return countries
+
 def build_choropleth_cache():
     """Build choropleth data cache for fast country coloring."""
     print("Building choropleth cache...")
@@ -91,14 +179,7 @@ def build_choropleth_cache():
         print("Error: Could not load articles.json")
         return
     
-    # Create location-to-country mapping from location entities
-    location_to_country = {}
-    if locations_data:
-        for location in locations_data:
-            name = location.get('name', '').strip()
-            country = location.get('country', '').strip()
-            if name and country:
-                location_to_country[name] = country
+    location_to_country = location_country_map(locations_data)
     
     # Build country counts directly from articles (one count per article per country)
     country_counts = defaultdict(int)
@@ -114,34 +195,8 @@ def build_choropleth_cache():
             
         processed_articles += 1
         
-        # Get countries this article should count for
-        countries_for_article = set()
-        
-        # 1. Direct country field
-        direct_country = article.get('country', '').strip()
-        if direct_country:
-            countries_for_article.add(direct_country)
-        
-        # 2. Countries from spatial locations
-        spatial = article.get('spatial', '')
-        if spatial:
-            spatial_places = [place.strip() for place in spatial.split('|') if place.strip()]
-            for place in spatial_places:
-                # Check if this place is a known country name
-                if place in ['Bénin', 'Benin', 'Burkina Faso', 'Côte d\'Ivoire', 'Togo', 'Niger', 'Nigéria', 'Nigeria', 'Cameroun', 'Cameroon', 'Tchad', 'Chad']:
-                    # Normalize country names
-                    normalized_country = place
-                    if place in ['Bénin']: normalized_country = 'Benin'
-                    elif place in ['Nigéria']: normalized_country = 'Nigeria'
-                    elif place in ['Cameroun']: normalized_country = 'Cameroon'
-                    elif place in ['Tchad']: normalized_country = 'Chad'
-                    countries_for_article.add(normalized_country)
-                elif place in location_to_country:
-                    # Look up country for this location
-                    countries_for_article.add(location_to_country[place])
-        
         # Count this article once for each country it mentions
-        for country in countries_for_article:
+        for country in article_countries(article, location_to_country):
             country_counts[country] += 1
             
             # Year-based counts
@@ -150,17 +205,19 @@ def build_choropleth_cache():
                 country_counts_by_year[year][country] += 1
     
     print(f"  Processed {processed_articles} articles")
+    record_rows(rows_in=len(articles_data), rows_out=len(country_counts))
     
     # Save global country counts
     global_data = {
         'type': 'global_choropleth',
+        'countryKeys': COUNTRY_KEYS,
         'counts': dict(country_counts),
         'total_articles': sum(country_counts.values()),
         'total_countries': len(country_counts),
         'unique_articles_processed': processed_articles,
         'updatedAt': datetime.utcnow().isoformat()
     }
-    save_json(CACHE_DIR / 'choropleth' / 'all_countries.json', global_data, compact=True)
+    write_json(CACHE_DIR / 'choropleth' / 'all_countries.json', global_data, compact=True)
     print(f"  Saved global choropleth: {len(country_counts)} countries, {sum(country_counts.values())} article-country pairs from {processed_articles} unique articles")
     
     # Save year-based counts
@@ -168,22 +225,23 @@ def build_choropleth_cache():
         if year and len(year_counts) > 0:
             year_data = {
                 'type': 'yearly_choropleth',
+                'countryKeys': COUNTRY_KEYS,
                 'year': year,
                 'counts': dict(year_counts),
                 'total_articles': sum(year_counts.values()),
                 'total_countries': len(year_counts),
                 'updatedAt': datetime.utcnow().isoformat()
             }
-            save_json(CACHE_DIR / 'choropleth' / 'by_year' / f'{year}.json', year_data, compact=True)
+            write_json(CACHE_DIR / 'choropleth' / 'by_year' / f'{year}.json', year_data, compact=True)
     
     print(f"  Saved yearly choropleth: {len(country_counts_by_year)} years")
 
-def build_entity_choropleth_cache():
-    """Build entity-specific choropleth cache."""
+def build_entity_choropleth_cache(entity_types: Optional[List[str]] = None):
+    """Build entity-specific choropleth cache (all ENTITY_CHOROPLETH_TYPES by default)."""
     print("Building entity choropleth cache...")
     
     # Load entity data
-    entity_types = ['persons', 'organizations', 'events', 'subjects']
+    entity_types = entity_types or ENTITY_CHOROPLETH_TYPES
     articles_data = load_json(DATA_DIR / 'articles.json')
     
     if not articles_data:
@@ -191,6 +249,7 @@ def build_entity_choropleth_cache():
         return
         
     articles_by_id = {str(article['o:id']): article for article in articles_data}
+    locations_data = load_json(DATA_DIR / 'entities' / 'locations.json')
     
     for entity_type in entity_types:
         entity_file = DATA_DIR / 'entities' / f'{entity_type}.json'
@@ -208,7 +267,6 @@ def build_entity_choropleth_cache():
         
         # Count countries for these articles
         country_counts = defaultdict(int)
-        locations_data = load_json(DATA_DIR / 'entities' / 'locations.json')
         
         if locations_data:
             article_country_pairs = set()
@@ -216,6 +274,7 @@ def build_entity_choropleth_cache():
                 country = location.get('country', '').strip()
                 if not country:
                     continue
+                country = country_key(country)
                     
                 related_articles = location.get('relatedArticleIds', [])
                 for article_id in related_articles:
@@ -225,7 +284,7 @@ def build_entity_choropleth_cache():
                     if article_id_str not in entity_article_ids:
                         continue
                         
-                    pair_key = f"{article_id_str}:{country}"
+                    pair_key = (article_id_str, country)
                     if pair_key in article_country_pairs:
                         continue
                     article_country_pairs.add(pair_key)
@@ -235,27 +294,33 @@ def build_entity_choropleth_cache():
         # Save entity choropleth data
         entity_data = {
             'type': 'entity_choropleth',
+            'countryKeys': COUNTRY_KEYS,
             'entity_type': entity_type,
             'counts': dict(country_counts),
             'total_articles': sum(country_counts.values()),
             'total_countries': len(country_counts),
             'updatedAt': datetime.utcnow().isoformat()
         }
-        save_json(CACHE_DIR / 'choropleth' / 'by_entity' / f'{entity_type}.json', entity_data, compact=True)
+        write_json(CACHE_DIR / 'choropleth' / 'by_entity' / f'{entity_type}.json', entity_data, compact=True)
         print(f"  Saved {entity_type} choropleth: {len(country_counts)} countries, {sum(country_counts.values())} articles")
 
-def build_coordinates_cache():
-    """Build coordinate cluster cache for fast map marker rendering."""
+def build_coordinates_cache(postings: ArticlePostings) -> List[Dict[str, Any]]:
+    """Build coordinate cluster cache for fast map marker rendering.
+
+    Returns the location entities of the clusters in all_locations.json order; temporal
+    frames refer to markers by that position.
+    """
     print("Building coordinates cache...")
     
     # Load location entities
     locations_data = load_json(DATA_DIR / 'entities' / 'locations.json')
     if not locations_data:
         print("Error: Could not load locations data")
-        return
+        return []
     
     # Aggregate coordinates by location clusters
     coordinate_clusters = []
+    clustered_locations = []
     coordinates_by_country = defaultdict(list)
     
     for location in locations_data:
@@ -283,10 +348,11 @@ def build_coordinates_cache():
                 'region': region,
                 'prefecture': prefecture,
                 'articleCount': location.get('articleCount', 0),
-                'relatedArticleIds': location.get('relatedArticleIds', [])
+                'postings': postings.add(location.get('relatedArticleIds', []) or [])
             }
             
             coordinate_clusters.append(cluster)
+            clustered_locations.append(location)
             
             # Group by country for country-specific caches
             if country:
@@ -303,8 +369,9 @@ def build_coordinates_cache():
         'total_articles': sum(c['articleCount'] for c in coordinate_clusters),
         'updatedAt': datetime.utcnow().isoformat()
     }
-    save_json(CACHE_DIR / 'coordinates' / 'all_locations.json', global_coords_data, compact=True)
+    write_json(CACHE_DIR / 'coordinates' / 'all_locations.json', global_coords_data, compact=True)
     print(f"  Saved global coordinates: {len(coordinate_clusters)} clusters")
+    record_rows(rows_in=len(locations_data), rows_out=len(coordinate_clusters))
     
     # Save country-specific coordinate clusters
     for country, clusters in coordinates_by_country.items():
@@ -317,12 +384,13 @@ def build_coordinates_cache():
                 'total_articles': sum(c['articleCount'] for c in clusters),
                 'updatedAt': datetime.utcnow().isoformat()
             }
-            filename = normalize_country_filename(country)
-            save_json(CACHE_DIR / 'coordinates' / 'by_country' / f'{filename}.json', country_coords_data, compact=True)
+            filename = country_file_stem(country)
+            write_json(CACHE_DIR / 'coordinates' / 'by_country' / f'{filename}.json', country_coords_data, compact=True)
     
     print(f"  Saved country coordinates: {len(coordinates_by_country)} countries")
+    return clustered_locations
 
-def build_article_country_coordinates_cache():
+def build_article_country_coordinates_cache(postings: ArticlePostings):
     """Build coordinate clusters grouped by ARTICLE country (articleCountry).
 
     Semantics: For each articleCountry (country field in articles.json), include ALL location
@@ -392,9 +460,9 @@ def build_article_country_coordinates_cache():
                 'region': '',
                 'prefecture': '',
                 'articleCount': len(entry['articleIds']),
-                'relatedArticleIds': sorted(entry['articleIds'])
+                'postings': postings.add(entry['articleIds'])
             })
-        filename = normalize_country_filename(ac)
+        filename = country_file_stem(ac)
         out = {
             'type': 'article_country_coordinates',
             'articleCountry': ac,
@@ -403,8 +471,9 @@ def build_article_country_coordinates_cache():
             'total_articles': sum(c['articleCount'] for c in clusters),
             'updatedAt': datetime.utcnow().isoformat()
         }
-        save_json(CACHE_DIR / 'coordinates' / 'by_article_country' / f'{filename}.json', out, compact=True)
+        write_json(CACHE_DIR / 'coordinates' / 'by_article_country' / f'{filename}.json', out, compact=True)
     print(f"  Saved article-country coordinate clusters: {len(per_ac)} countries")
+    record_rows(rows_in=len(locations), rows_out=sum(len(b) for b in per_ac.values()))
 
 def build_article_country_choropleth_cache():
     """Build choropleth data BY article country for fast union operations.
@@ -433,14 +502,6 @@ def build_article_country_choropleth_cache():
         if article_country:
             article_to_country[article_id] = article_country
     
-    # Build location_id -> country mapping  
-    location_to_country = {}
-    for location in locations_data:
-        loc_id = str(location.get('id', ''))
-        country = (location.get('country', '') or '').strip()
-        if loc_id and country:
-            location_to_country[loc_id] = country
-    
     # Group by articleCountry: articleCountry -> {locationCountry -> set(unique_article_ids)}
     article_country_to_location_counts = defaultdict(lambda: defaultdict(set))
     
@@ -449,6 +510,7 @@ def build_article_country_choropleth_cache():
         location_country = (location.get('country', '') or '').strip()
         if not location_country:
             continue
+        location_country = country_key(location_country)
             
         related_articles = location.get('relatedArticleIds', []) or []
         for article_id in related_articles:
@@ -472,9 +534,10 @@ def build_article_country_choropleth_cache():
             total_unique_articles.update(article_ids_set)
         
         # Save to cache file
-        filename = normalize_country_filename(article_country)
+        filename = country_file_stem(article_country)
         cache_data = {
             'type': 'article_country_choropleth',
+            'countryKeys': COUNTRY_KEYS,
             'articleCountry': article_country,
             'counts': choropleth_counts,
             'total_location_countries': len(choropleth_counts),
@@ -482,50 +545,310 @@ def build_article_country_choropleth_cache():
             'updatedAt': datetime.utcnow().isoformat()
         }
         
-        save_json(CACHE_DIR / 'choropleth' / 'by_article_country' / f'{filename}.json', cache_data, compact=True)
+        write_json(CACHE_DIR / 'choropleth' / 'by_article_country' / f'{filename}.json', cache_data, compact=True)
     
     print(f"  Saved article-country choropleth cache: {len(article_country_to_location_counts)} countries")
 
+def build_postings_file(postings: ArticlePostings):
+    """Write the shared article id lists referenced by the coordinate clusters."""
+    print("Writing shared article postings...")
+    data = postings.to_json()
+    path = CACHE_DIR / 'coordinates' / 'postings.json'
+    write_json(path, data, compact=True)
+    total_ids = sum(len(ids) for ids in postings.lists)
+    print(f"  Saved {len(postings.lists)} posting lists ({total_ids} article ids, {path.stat().st_size / 1024:.1f} KB)")
+    record_rows(rows_out=len(postings.lists))
+
+
+FRAME_GRANULARITIES = ('month', 'year')
+DEFAULT_FRAME_WINDOW = 0
+DEFAULT_KEYFRAME_INTERVAL = 12
+
+def frame_period(date_str: str, granularity: str) -> Optional[int]:
+    """Period ordinal of a pub_date: the year, or year * 12 + month - 1 (as the temporal index)."""
+    year = extract_year(date_str)
+    if year is None or granularity == 'year':
+        return year
+    parts = date_str.split('-')
+    if len(parts) < 2 or not parts[1].isdigit() or not 1 <= int(parts[1]) <= 12:
+        return None
+    return year * 12 + int(parts[1]) - 1
+
+def _encode_pairs(entries) -> List[int]:
+    """Sorted (key, value) pairs as a flat [key delta, value, ...] list."""
+    out: List[int] = []
+    prev = 0
+    for key, value in entries:
+        out += [key - prev, value]
+        prev = key
+    return out
+
+def _encode_keys(keys) -> List[int]:
+    out: List[int] = []
+    prev = 0
+    for key in keys:
+        out.append(key - prev)
+        prev = key
+    return out
+
+def _advance(state: Dict[int, int], add: Dict[int, int], sub: Dict[int, int]) -> Dict[str, List[int]]:
+    """Apply one period's entering/leaving counts to `state`; returns the encoded delta."""
+    changed = sorted(set(add) | set(sub))
+    old = {k: state.get(k, 0) for k in changed}
+    for k, v in add.items():
+        state[k] = state.get(k, 0) + v
+    for k, v in sub.items():
+        state[k] -= v
+    on, off, inc = [], [], []
+    for k in changed:
+        a, b = old[k], state.get(k, 0)
+        if b == 0:
+            state.pop(k, None)
+        if a == b:
+            continue
+        if not a:
+            on.append((k, b))
+        elif not b:
+            off.append(k)
+        else:
+            inc.append((k, b - a))
+    delta: Dict[str, List[int]] = {}
+    if on:
+        delta['on'] = _encode_pairs(on)
+    if off:
+        delta['off'] = _encode_keys(off)
+    if inc:
+        delta['inc'] = _encode_pairs(inc)
+    return delta
+
+def _keyframe(location_state: Dict[int, int], country_state: Dict[int, int]) -> Dict[str, List[int]]:
+    return {'l': _encode_pairs(sorted(location_state.items())), 'c': _encode_pairs(sorted(country_state.items()))}
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, separators=(',', ':')))
+
+def _gzip_size(data: bytes) -> int:
+    return len(gzip.compress(data, compresslevel=6, mtime=0))
+
+def build_temporal_frames(
+    clustered_locations: List[Dict[str, Any]],
+    granularity: str,
+    window: int = DEFAULT_FRAME_WINDOW,
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+) -> Optional[Dict[str, Any]]:
+    """Delta frames + keyframes for timeline playback at one granularity.
+
+    Frame f is the period start + f; its state is, per marker (position in
+    all_locations.json) and per country, the distinct articles published in the last
+    `window` periods up to f (all periods up to f when window is 0). Country counts use
+    the same article -> countries rule as the choropleth, so year frames with window 1
+    equal the by_year files.
+    """
+    articles_data = load_json(DATA_DIR / 'articles.json') or []
+    locations_data = load_json(DATA_DIR / 'entities' / 'locations.json') or []
+    location_to_country = location_country_map(locations_data)
+
+    # New counts per period: period -> key -> articles
+    article_period: Dict[str, int] = {}
+    country_new: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for article in articles_data:
+        article_id = str(article.get('o:id', ''))
+        period = frame_period(article.get('pub_date', '') or '', granularity)
+        if not article_id or period is None:
+            continue
+        article_period[article_id] = period
+        for country in article_countries(article, location_to_country):
+            country_new[period][country] += 1
+    if not article_period:
+        return None
+    country_keys = sorted({c for counts in country_new.values() for c in counts})
+    country_index = {c: i for i, c in enumerate(country_keys)}
+    country_add = {p: {country_index[c]: n for c, n in counts.items()} for p, counts in country_new.items()}
+    location_add: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for pos, location in enumerate(clustered_locations):
+        for article_id in {str(a) for a in location.get('relatedArticleIds', []) or []}:
+            period = article_period.get(article_id)
+            if period is not None:
+                location_add[period][pos] += 1
+
+    start, end = min(article_period.values()), max(article_period.values())
+    frames = end - start + 1
+    out_dir = CACHE_DIR / 'frames' / granularity
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob('*.json'):
+        old.unlink()
+
+    location_state: Dict[int, int] = {}
+    country_state: Dict[int, int] = {}
+    chunks: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    snapshot_chunk: List[Dict[str, List[int]]] = []
+    sizes = {'bytes': 0, 'gzipBytes': 0, 'snapshotBytes': 0, 'snapshotGzipBytes': 0, 'fullFrames': 0}
+
+    def flush():
+        path = out_dir / f"{len(chunks):03d}.json"
+        write_json(path, current, compact=True)
+        data = path.read_bytes()
+        sizes['bytes'] += len(data)
+        sizes['gzipBytes'] += _gzip_size(data)
+        # The alternative: a full state for every frame, chunked the same way
+        packed = json.dumps(snapshot_chunk, separators=(',', ':')).encode('utf-8')
+        sizes['snapshotBytes'] += len(packed)
+        sizes['snapshotGzipBytes'] += _gzip_size(packed)
+        snapshot_chunk.clear()
+        chunks.append({'file': path.name, 'frame': current['frame'], 'deltas': len(current['deltas']), 'bytes': len(data)})
+
+    empty: Dict[int, int] = {}
+    for f in range(frames):
+        period = start + f
+        leaving = period - window if window > 0 else None
+        delta = {}
+        location_delta = _advance(location_state, location_add.get(period, empty),
+                                  location_add.get(leaving, empty) if leaving is not None else empty)
+        country_delta = _advance(country_state, country_add.get(period, empty),
+                                 country_add.get(leaving, empty) if leaving is not None else empty)
+        if location_delta:
+            delta['l'] = location_delta
+        if country_delta:
+            delta['c'] = country_delta
+        snapshot = _keyframe(location_state, country_state)
+        if current is not None:
+            # With a short window most markers turn over every period; a full state ('k')
+            # is then smaller than the diff, and the player just replaces its state
+            if _json_size(delta) > _json_size({'k': snapshot}):
+                delta = {'k': snapshot}
+                sizes['fullFrames'] += 1
+            current['deltas'].append(delta)
+        if f % keyframe_interval == 0:
+            if current is not None:
+                flush()
+            current = {'frame': f, 'period': period, 'keyframe': snapshot, 'deltas': []}
+        snapshot_chunk.append(snapshot)
+    flush()
+    if granularity == 'year':
+        # What playback costs today: one choropleth/by_year file per year
+        by_year = list((CACHE_DIR / 'choropleth' / 'by_year').glob('*.json'))
+        sizes['byYearBytes'] = sum(f.stat().st_size for f in by_year)
+        sizes['byYearGzipBytes'] = sum(_gzip_size(f.read_bytes()) for f in by_year)
+
+    manifest = {
+        'type': 'temporal_frames',
+        'granularity': granularity,
+        'period': 'year' if granularity == 'year' else 'year * 12 + month - 1',
+        'window': window,
+        'start': start,
+        'end': end,
+        'frames': frames,
+        'keyframeInterval': keyframe_interval,
+        'locations': 'coordinates/all_locations.json',
+        'countryKeys': COUNTRY_KEYS,
+        'countries': country_keys,
+        'chunks': chunks,
+        'sizes': sizes,
+        'updatedAt': datetime.utcnow().isoformat(),
+    }
+    write_json(out_dir / 'manifest.json', manifest, compact=True)
+    record_rows(rows_in=len(article_period), rows_out=frames)
+    print(f"  Saved {granularity} frames: {frames} frames in {len(chunks)} chunks, "
+          f"{sizes['bytes'] / 1024:.1f} KB ({sizes['gzipBytes'] / 1024:.1f} KB gzip) vs "
+          f"{sizes['snapshotBytes'] / 1024:.1f} KB ({sizes['snapshotGzipBytes'] / 1024:.1f} KB gzip) as full snapshots")
+    return manifest
+
+
+def build_country_names():
+    """Write the names table that decodes the country keys of the choropleth files."""
+    write_json(CACHE_DIR / 'countries.json', names_json(), compact=True)
+    print("  Saved country names table")
+
+
 def build_metadata():
     """Rebuild metadata file after generating caches."""
     metadata = {
-        'cache_version': '1.1',
+        'cache_version': '1.4',
         'generated_at': datetime.utcnow().isoformat(),
         'generator': 'build_world_map_cache.py',
         'description': 'Precomputed world map data for fast rendering',
+        'countryKeys': COUNTRY_KEYS,
         'structure': {
+            'countries.json': 'Country names table: choropleth counts are keyed by ISO 3166-1 alpha-2 code',
             'choropleth': {
                 'all_countries.json': 'Global country counts for choropleth coloring',
                 'by_year/': 'Yearly country counts',
                 'by_entity/': 'Entity-type specific country counts',
                 'by_article_country/': 'Article-country specific choropleth data with deduplication'
             },
+            'frames': {
+                '<granularity>/manifest.json': 'Timeline playback frames (month/year): period range, window, chunk list, sizes',
+                '<granularity>/NNN.json': 'One keyframe (full marker/country counts) + delta frames up to the next keyframe'
+            },
             'coordinates': {
                 'all_locations.json': 'Pre-aggregated coordinate clusters for markers',
                 'by_country/': 'Country-specific coordinate clusters',
-                'by_article_country/': 'Coordinate clusters grouped by article country (union semantics)'
+                'by_article_country/': 'Coordinate clusters grouped by article country (union semantics)',
+                'postings.json': 'Shared article id lists; clusters reference them by index (postings)'
             }
         },
         'usage': {
             'choropleth': 'Load appropriate file based on current filters to color world map',
-            'coordinates': 'Load clusters to render map markers without real-time aggregation'
+            'coordinates': 'Load clusters to render map markers without real-time aggregation',
+            'frames': 'Seek to the nearest keyframe, then apply delta frames to animate the timeline'
         }
     }
-    save_json(CACHE_DIR / 'metadata.json', metadata, compact=False)
-    print("  Saved cache metadata (v1.1)")
+    write_json(CACHE_DIR / 'metadata.json', metadata)
+    print("  Saved cache metadata (v1.4)")
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Build precomputed world map cache")
+    p.add_argument('--frame-granularity', nargs='*', choices=FRAME_GRANULARITIES, default=list(FRAME_GRANULARITIES),
+                   help="Timeline frame sets to build (none: skip frames)")
+    p.add_argument('--frame-window', type=int, default=DEFAULT_FRAME_WINDOW,
+                   help="Periods summed into each frame (0: cumulative up to the frame)")
+    p.add_argument('--keyframe-interval', type=int, default=DEFAULT_KEYFRAME_INTERVAL,
+                   help="Frames between keyframes (one chunk file each)")
+    p.add_argument('--entity-choropleth-only', nargs='+', choices=ENTITY_CHOROPLETH_TYPES, default=None,
+                   metavar='TYPE', help="Only rebuild choropleth/by_entity/<TYPE>.json (watch_pipeline.py after entity edits)")
+    add_instrumentation_args(p)
+    return p.parse_args()
 
 def main():
     """Main execution function."""
+    args = parse_args()
+    start_run('build_world_map_cache', args)
     print(f"Building world map cache in {CACHE_DIR}")
     print("=" * 50)
     
+    if args.entity_choropleth_only:
+        with step_timer('Entity choropleth cache'):
+            build_entity_choropleth_cache(args.entity_choropleth_only)
+        finish_run()
+        return
+    
     # Build all cache components
-    build_choropleth_cache()
-    build_entity_choropleth_cache() 
-    build_coordinates_cache()
-    build_article_country_coordinates_cache()
-    build_article_country_choropleth_cache()
-    build_metadata()
+    with step_timer('Choropleth cache'):
+        build_choropleth_cache()
+    with step_timer('Entity choropleth cache'):
+        build_entity_choropleth_cache()
+    postings = ArticlePostings()
+    with step_timer('Coordinates cache'):
+        clustered_locations = build_coordinates_cache(postings)
+    with step_timer('Article-country coordinates cache'):
+        build_article_country_coordinates_cache(postings)
+    with step_timer('Shared article postings'):
+        build_postings_file(postings)
+    with step_timer('Article-country choropleth cache'):
+        build_article_country_choropleth_cache()
+    for granularity in args.frame_granularity:
+        with step_timer(f'Temporal frames ({granularity})'):
+            frames = build_temporal_frames(clustered_locations, granularity,
+                                           window=max(0, args.frame_window),
+                                           keyframe_interval=max(1, args.keyframe_interval))
+        if frames:
+            add_run_info(f'frames.{granularity}', {'frames': frames['frames'], 'chunks': len(frames['chunks']),
+                                                   **frames['sizes']})
+    with step_timer('Country names table'):
+        build_country_names()
+    with step_timer('Metadata'):
+        build_metadata()
     
     print("=" * 50)
     print(f"World map cache build complete!")
@@ -535,6 +858,7 @@ def main():
     cache_files = list(CACHE_DIR.rglob('*.json'))
     total_size = sum(f.stat().st_size for f in cache_files)
     print(f"Generated {len(cache_files)} cache files ({total_size / 1024:.1f} KB total)")
+    finish_run()
 
 if __name__ == '__main__':
     main()
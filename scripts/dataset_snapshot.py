@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Local dataset snapshots for the fetch step (offline, revision-pinned exports).
+
+A snapshot directory holds one sub-directory per subset with Parquet or Arrow files,
+as produced by `huggingface-cli download --repo-type dataset` or by
+generate_synthetic_corpus.py --snapshot:
+
+    <snapshot>/
+      REVISION              # revision hash (optional, see snapshot_revision)
+      articles/*.parquet    # or *.arrow (IPC file or stream format)
+      index/*.parquet
+
+Files are read one row group (Parquet) or record batch (Arrow) at a time. Every unit
+gets a content fingerprint computed from its raw bytes without decoding (Parquet column
+chunks are hashed straight from the file), so the fetch step can reuse the transformed
+rows of unchanged units from its cache and only re-transform the ones that changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc  # type: ignore  # noqa: F401
+    import pyarrow.parquet as pq  # type: ignore
+    _HAS_PYARROW = True
+except Exception:  # pragma: no cover - optional, validated at runtime
+    _HAS_PYARROW = False
+
+REVISION_FILE = "REVISION"
+SNAPSHOT_SUFFIXES = (".parquet", ".arrow")
+_COMMIT_HASH = re.compile(r"^[0-9a-f]{40}$")
+
+
+@dataclass
+class SnapshotUnit:
+    """One row group / record batch of a snapshot file."""
+
+    file: Path
+    index: int
+    num_rows: int
+    fingerprint: str
+    _load: Callable[[], Any]  # -> pyarrow Table / RecordBatch
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return self._load().to_pylist()
+
+    def table(self) -> Any:
+        """The unit as Arrow data, for the batched fetch transforms."""
+        return self._load()
+
+
+def require_pyarrow() -> None:
+    if not _HAS_PYARROW:
+        raise RuntimeError("pyarrow is required for snapshot mode. Please install: pip install pyarrow")
+
+
+def subset_files(snapshot_dir: Path, subset: str) -> List[Path]:
+    """Data files of a subset, in name order (sub-directory, or files named <subset>*.ext)."""
+    sub = snapshot_dir / subset
+    if sub.is_dir():
+        files = [p for p in sub.rglob("*") if p.suffix in SNAPSHOT_SUFFIXES]
+    else:
+        files = [p for p in snapshot_dir.glob(f"{subset}*") if p.suffix in SNAPSHOT_SUFFIXES]
+    return sorted(files)
+
+
+def snapshot_revision(snapshot_dir: Path, subsets: List[str]) -> str:
+    """Revision of a snapshot.
+
+    In order: the REVISION file, the directory name when it is a hub commit hash
+    (huggingface_hub stores snapshots under snapshots/<commit>/), otherwise a digest of
+    the data files' names, sizes and modification times.
+    """
+    rev_file = snapshot_dir / REVISION_FILE
+    if rev_file.exists():
+        rev = rev_file.read_text(encoding="utf-8").strip()
+        if rev:
+            return rev
+    if _COMMIT_HASH.match(snapshot_dir.name):
+        return snapshot_dir.name
+    h = hashlib.sha1()
+    for subset in subsets:
+        for p in subset_files(snapshot_dir, subset):
+            st = p.stat()
+            h.update(f"{p.relative_to(snapshot_dir).as_posix()}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return f"files-{h.hexdigest()}"
+
+
+def _parquet_units(path: Path) -> Iterator[SnapshotUnit]:
+    pf = pq.ParquetFile(path)
+    meta = pf.metadata
+    with path.open("rb") as raw:
+        for i in range(meta.num_row_groups):
+            rg = meta.row_group(i)
+            h = hashlib.sha1()
+            h.update(pf.schema_arrow.to_string().encode("utf-8"))
+            for c in range(rg.num_columns):
+                col = rg.column(c)
+                start = col.data_page_offset
+                if col.has_dictionary_page and col.dictionary_page_offset is not None:
+                    start = min(start, col.dictionary_page_offset)
+                raw.seek(start)
+                h.update(raw.read(col.total_compressed_size))
+            yield SnapshotUnit(
+                file=path,
+                index=i,
+                num_rows=rg.num_rows,
+                fingerprint=h.hexdigest(),
+                _load=lambda i=i: pf.read_row_group(i),
+            )
+
+
+def _open_ipc(path: Path):
+    source = pa.memory_map(str(path), "r")
+    try:
+        reader = pa.ipc.open_file(source)
+        return [reader.get_batch(i) for i in range(reader.num_record_batches)]
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return list(pa.ipc.open_stream(source))
+
+
+def _arrow_units(path: Path) -> Iterator[SnapshotUnit]:
+    schema_bytes: Optional[bytes] = None
+    for i, batch in enumerate(_open_ipc(path)):
+        if schema_bytes is None:
+            schema_bytes = batch.schema.to_string().encode("utf-8")
+        h = hashlib.sha1(schema_bytes)
+        for column in batch.columns:
+            for buf in column.buffers():
+                if buf is not None:
+                    h.update(buf)
+        yield SnapshotUnit(
+            file=path,
+            index=i,
+            num_rows=batch.num_rows,
+            fingerprint=h.hexdigest(),
+            _load=lambda batch=batch: batch,
+        )
+
+
+def iter_units(snapshot_dir: Path, subset: str) -> Iterator[SnapshotUnit]:
+    """Row groups / record batches of a subset, in file and row order."""
+    require_pyarrow()
+    files = subset_files(snapshot_dir, subset)
+    if not files:
+        raise FileNotFoundError(f"No Parquet/Arrow files for subset '{subset}' in {snapshot_dir}")
+    for path in files:
+        if path.suffix == ".parquet":
+            yield from _parquet_units(path)
+        else:
+            yield from _arrow_units(path)
+
+
+def write_snapshot(
+    snapshot_dir: Path,
+    subsets: Dict[str, List[Dict[str, Any]]],
+    *,
+    row_group_size: int = 2_000,
+    revision: Optional[str] = None,
+) -> str:
+    """Write rows as a Parquet snapshot (one file per subset) and record its revision.
+
+    Without an explicit revision, the revision is a digest of the written files.
+    """
+    require_pyarrow()
+    h = hashlib.sha1()
+    for subset, rows in subsets.items():
+        out = snapshot_dir / subset / "0000.parquet"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.Table.from_pylist(rows), out, row_group_size=row_group_size)
+        h.update(out.read_bytes())
+    rev = revision or h.hexdigest()
+    (snapshot_dir / REVISION_FILE).write_text(rev + "\n", encoding="utf-8")
+    return rev
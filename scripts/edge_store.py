@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compact co-occurrence edge accumulator shared by build_networks.py and
+build_spatial_networks.py.
+
+Instead of one dict per edge keyed by a tuple of node-id strings, node and article ids
+are interned to integers and an edge is a slot in parallel arrays:
+
+    key = source_index * node_count + target_index   (packed int -> slot)
+    weights[slot], types[slot], last_article[slot]    (array.array columns)
+    ref_slots / ref_articles                          (append-only article reference log)
+
+Nodes are interned in sorted id order, so the (source, target) orientation by index is
+the same as the string order the dict-based builders used. Dicts are only created for
+the edges that survive pruning, in `to_dicts`, with the same keys, values and order as
+before (slots are in first-seen order; article ids in append order).
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, List
+
+
+class EdgeStore:
+    def __init__(self, node_ids: Iterable[str], *, dedupe_articles: bool = True):
+        self.node_ids: List[str] = sorted(set(node_ids))
+        self.index: Dict[str, int] = {nid: i for i, nid in enumerate(self.node_ids)}
+        self.article_ids: List[str] = []
+        self._article_index: Dict[str, int] = {}
+        self.type_names: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        # Skip an article reference when the edge's previous reference is the same article
+        self.dedupe_articles = dedupe_articles
+        self._n = max(1, len(self.node_ids))
+        self._slots: Dict[int, int] = {}
+        self._keys = array('q')
+        self.weights = array('I')
+        self.types = array('H')
+        self._last_article = array('q')
+        self._ref_slots = array('I')
+        self._ref_articles = array('I')
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def article(self, aid: str) -> int:
+        """Interned index of an article id."""
+        idx = self._article_index.get(aid)
+        if idx is None:
+            idx = self._article_index[aid] = len(self.article_ids)
+            self.article_ids.append(aid)
+        return idx
+
+    def edge_type(self, name: str) -> int:
+        """Interned index of an edge type label (e.g. 'person-organization')."""
+        idx = self._type_index.get(name)
+        if idx is None:
+            idx = self._type_index[name] = len(self.type_names)
+            self.type_names.append(name)
+        return idx
+
+    def add(self, a: int, b: int, article: int, edge_type: int = 0) -> None:
+        """Count one co-occurrence of nodes a and b (interned) in an article."""
+        key = a * self._n + b if a <= b else b * self._n + a
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.weights)
+            self._keys.append(key)
+            self.weights.append(1)
+            self.types.append(edge_type)
+            self._last_article.append(article)
+        else:
+            self.weights[slot] += 1
+            if self.dedupe_articles and self._last_article[slot] == article:
+                return
+            self._last_article[slot] = article
+        self._ref_slots.append(slot)
+        self._ref_articles.append(article)
+
+    def to_dicts(self, weight_min: int = 1, *, with_type: bool = True) -> List[Dict[str, Any]]:
+        """Edges with weight >= weight_min as {source, target[, type], weight, articleIds}."""
+        kept = [slot for slot, w in enumerate(self.weights) if w >= weight_min]
+        # Group the reference log by slot (stable, so article order is preserved)
+        position = {slot: i for i, slot in enumerate(kept)}
+        refs: List[List[str]] = [[] for _ in kept]
+        article_ids = self.article_ids
+        for slot, art in zip(self._ref_slots, self._ref_articles):
+            i = position.get(slot)
+            if i is not None:
+                refs[i].append(article_ids[art])
+
+        out: List[Dict[str, Any]] = []
+        n, node_ids = self._n, self.node_ids
+        for i, slot in enumerate(kept):
+            s, t = divmod(self._keys[slot], n)
+            edge: Dict[str, Any] = {'source': node_ids[s], 'target': node_ids[t]}
+            if with_type:
+                edge['type'] = self.type_names[self.types[slot]]
+            edge['weight'] = self.weights[slot]
+            edge['articleIds'] = refs[i]
+            out.append(edge)
+        return out
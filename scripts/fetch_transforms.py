@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Row transforms of the fetch step: raw dataset rows -> articles.json / index.json records.
+
+Two paths with identical output:
+  - per row:  transform_articles_row / transform_index_row on a row dict, resolving the
+              column aliases of every field on every row
+  - batched:  transform_articles_batch / transform_index_batch on a column batch, either
+              {column: [values]} (Dataset.iter, rows_to_columns) or a pyarrow Table /
+              RecordBatch (Dataset.with_format("arrow"), snapshot row groups). Aliases are
+              resolved once per schema; Arrow columns are converted with compute kernels
+              where the result provably matches the row path (dates normalised once per
+              distinct value via dictionary encoding, name lists taken straight from the
+              list column when no element needs stripping) and fall back to the Python
+              column helpers otherwise.
+
+pyarrow is only imported when an Arrow batch is transformed, so importing this module
+(and preprocess_all.py) stays cheap.
+"""
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from article_fields import name_list
+
+
+def to_name_list(value: Any) -> List[str]:
+    """Normalise a raw list-valued field (subject/spatial) to a list of non-empty names."""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        names = []
+        for v in value:
+            if v is None:
+                continue
+            if isinstance(v, (dict, list, tuple, set)):
+                names.append(json.dumps(v, ensure_ascii=False))
+            else:
+                names.append(str(v).strip())
+        return [n for n in names if n]
+    if isinstance(value, dict):
+        if all(not isinstance(v, (dict, list, tuple, set)) for v in value.values()):
+            return [str(v).strip() for v in value.values() if v is not None and str(v).strip()]
+        return [json.dumps(value, ensure_ascii=False)]
+    # Already joined upstream: legacy pipe-separated string
+    return name_list(str(value))
+
+
+_ISO_YMD = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+ISO_YMD_PATTERN = r"^\d{4}-\d{2}-\d{2}$"  # the same test as an Arrow (RE2) kernel
+_ISO_YM = re.compile(r"^(\d{4})-(\d{2})$")
+_ISO_Y = re.compile(r"^(\d{4})$")
+_DMY_SLASH = re.compile(r"^(\d{1,2})\/(\d{1,2})\/(\d{4})$")
+
+
+def normalize_date_ymd(value: Any) -> str:
+    if value is None:
+        return ""
+    s = str(value).strip()
+    if not s:
+        return ""
+
+    m = _ISO_YMD.match(s)
+    if m:
+        return s
+    m = _ISO_YM.match(s)
+    if m:
+        y, mth = m.groups()
+        return f"{y}-{mth}-01"
+    m = _ISO_Y.match(s)
+    if m:
+        (y,) = m.groups()
+        return f"{y}-01-01"
+    m = _DMY_SLASH.match(s)
+    if m:
+        d, mth, y = m.groups()
+        return f"{int(y):04d}-{int(mth):02d}-{int(d):02d}"
+    return s
+
+
+def get_first_non_empty(row: Dict[str, Any], keys: Iterable[str]) -> Any:
+    for k in keys:
+        if k in row:
+            v = row[k]
+            if v is None:
+                continue
+            if isinstance(v, (list, tuple, set, dict)) and not v:
+                continue
+            return v
+    return None
+
+
+# Column aliases per output field, in lookup order (shared by the row and batch paths)
+ID_KEYS = ("o:id", "o_id", "id")
+ARTICLE_ALIASES = {
+    "title": ("title", "dcterms:title", "Titre"),
+    "newspaper": ("newspaper", "dcterms:publisher", "publisher"),
+    "country": ("country", "pays", "Country"),
+}
+DATE_KEYS = ("pub_date", "date", "dcterms:date")
+SUBJECT_KEYS = ("subject", "dcterms:subject")
+SPATIAL_KEYS = ("spatial", "dcterms:spatial")
+INDEX_ALIASES = {
+    "Titre": ("Titre", "title", "dcterms:title"),
+    "Type": ("Type", "type"),
+    "Coordonnées": ("Coordonnées", "coordinates", "coordonnees", "curation:coordinates"),
+}
+
+
+def transform_articles_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "o:id": str(get_first_non_empty(row, ID_KEYS)) or "",
+        "title": str(get_first_non_empty(row, ARTICLE_ALIASES["title"])) or "",
+        "newspaper": str(get_first_non_empty(row, ARTICLE_ALIASES["newspaper"])) or "",
+        "country": str(get_first_non_empty(row, ARTICLE_ALIASES["country"])) or "",
+        "pub_date": normalize_date_ymd(get_first_non_empty(row, DATE_KEYS)) or "",
+        "subject": to_name_list(get_first_non_empty(row, SUBJECT_KEYS)),
+        "spatial": to_name_list(get_first_non_empty(row, SPATIAL_KEYS)),
+    }
+
+
+def _to_index_id(oid: Any) -> Optional[int]:
+    try:
+        return int(oid) if oid is not None and str(oid).strip() else None
+    except Exception:
+        return None
+
+
+def transform_index_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "o:id": _to_index_id(get_first_non_empty(row, ID_KEYS)),  # keep numeric if possible
+        "Titre": str(get_first_non_empty(row, INDEX_ALIASES["Titre"])) or "",
+        "Type": str(get_first_non_empty(row, INDEX_ALIASES["Type"])) or "",
+        "Coordonnées": str(get_first_non_empty(row, INDEX_ALIASES["Coordonnées"])) or "",
+    }
+
+
+# -------------------------
+# Batched transforms
+# -------------------------
+
+DEFAULT_TRANSFORM_BATCH = 10_000
+
+
+@lru_cache(maxsize=None)
+def _present_aliases(columns: Tuple[str, ...], keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(k for k in keys if k in columns)
+
+
+def _is_empty(v: Any) -> bool:
+    return v is None or (isinstance(v, (list, tuple, set, dict)) and not v)
+
+
+def first_non_empty_column(batch: Dict[str, List[Any]], keys: Tuple[str, ...], n: int) -> List[Any]:
+    """Column-wise get_first_non_empty: per row, the first alias whose value is non-empty."""
+    present = _present_aliases(tuple(batch), keys)
+    if not present:
+        return [None] * n
+    out = list(batch[present[0]])
+    missing = [i for i, v in enumerate(out) if _is_empty(v)]
+    for key in present[1:]:
+        if not missing:
+            break
+        col = batch[key]
+        still = []
+        for i in missing:
+            v = col[i]
+            if _is_empty(v):
+                still.append(i)
+            else:
+                out[i] = v
+        missing = still
+    for i in missing:
+        out[i] = None
+    return out
+
+
+def normalize_date_column(values: List[Any]) -> List[str]:
+    """normalize_date_ymd(v) or "" for a column, computed once per distinct string."""
+    memo: Dict[str, str] = {}
+    out = []
+    for v in values:
+        if type(v) is str:
+            r = memo.get(v)
+            if r is None:
+                r = memo[v] = normalize_date_ymd(v) or ""
+        else:
+            r = normalize_date_ymd(v) or ""
+        out.append(r)
+    return out
+
+
+def _name_list_column(values: List[Any]) -> List[List[str]]:
+    out = []
+    for v in values:
+        if type(v) is list and all(type(x) is str for x in v):
+            out.append([t for t in (x.strip() for x in v) if t])
+        else:
+            out.append(to_name_list(v))
+    return out
+
+
+class _ColumnBatch:
+    """Field resolution on a {column: [values]} batch."""
+
+    def __init__(self, batch: Dict[str, List[Any]]) -> None:
+        self.batch = batch
+        self.n = len(next(iter(batch.values()))) if batch else 0
+
+    def _python(self, keys: Tuple[str, ...]) -> List[Any]:
+        return first_non_empty_column(self.batch, keys, self.n)
+
+    def values(self, keys: Tuple[str, ...]) -> List[Any]:
+        return self._python(keys)
+
+    def strings(self, keys: Tuple[str, ...]) -> Iterable[str]:
+        return map(str, self._python(keys))
+
+    def dates(self, keys: Tuple[str, ...]) -> List[str]:
+        return normalize_date_column(self._python(keys))
+
+    def names(self, keys: Tuple[str, ...]) -> List[List[str]]:
+        return _name_list_column(self._python(keys))
+
+
+def _arrow():
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    return pa, pc
+
+
+class _ArrowBatch(_ColumnBatch):
+    """Field resolution on a pyarrow Table / RecordBatch with compute kernels.
+
+    Each accessor returns exactly what the Python column path would; when a field's
+    columns are not in a shape the kernels handle (several list-typed aliases, floats,
+    structs, names that need stripping) it converts just those columns and falls back.
+    """
+
+    def __init__(self, batch: Any) -> None:
+        self.arrow = batch
+        self.n = batch.num_rows
+        self.columns = tuple(batch.schema.names)
+        self.pa, self.pc = _arrow()
+
+    def _column(self, name: str) -> Any:
+        col = self.arrow.column(name)
+        return col.combine_chunks() if hasattr(col, "combine_chunks") else col
+
+    def _python(self, keys: Tuple[str, ...]) -> List[Any]:
+        present = _present_aliases(self.columns, keys)
+        return first_non_empty_column({k: self._column(k).to_pylist() for k in present}, keys, self.n)
+
+    def _field(self, keys: Tuple[str, ...]) -> Any:
+        """The field as one Arrow array, if only nulls have to be skipped between aliases."""
+        present = _present_aliases(self.columns, keys)
+        if not present:
+            return self.pa.nulls(self.n, self.pa.string())
+        cols = [self._column(k) for k in present]
+        if len(cols) == 1:
+            return cols[0]
+        types = {c.type for c in cols}
+        t = cols[0].type
+        if len(types) == 1 and (self.pa.types.is_string(t) or self.pa.types.is_large_string(t) or self.pa.types.is_integer(t)):
+            return self.pc.coalesce(*cols)
+        return None
+
+    def _is_string(self, arr: Any) -> bool:
+        return self.pa.types.is_string(arr.type) or self.pa.types.is_large_string(arr.type)
+
+    def values(self, keys: Tuple[str, ...]) -> List[Any]:
+        arr = self._field(keys)
+        if arr is not None and (self._is_string(arr) or self.pa.types.is_integer(arr.type)):
+            return arr.to_pylist()
+        return self._python(keys)
+
+    def strings(self, keys: Tuple[str, ...]) -> Iterable[str]:
+        arr = self._field(keys)
+        if arr is not None and self.pa.types.is_integer(arr.type):
+            arr = self.pc.cast(arr, self.pa.string())
+        if arr is None or not self._is_string(arr):
+            return super().strings(keys)
+        return self.pc.fill_null(arr, "None").to_pylist() if arr.null_count else arr.to_pylist()
+
+    def dates(self, keys: Tuple[str, ...]) -> List[str]:
+        arr = self._field(keys)
+        if arr is None or not self._is_string(arr):
+            return super().dates(keys)
+        # YYYY-MM-DD values are already normalised (RE2 \d is ASCII, a subset of Python's
+        # \d, and an anchored match leaves nothing to strip); only the rest go through
+        # normalize_date_ymd, once per distinct value
+        pa, pc = self.pa, self.pc
+        other = pc.invert(pc.fill_null(pc.match_substring_regex(arr, ISO_YMD_PATTERN), False))
+        if pc.any(other).as_py():
+            rest = pc.filter(arr, other)
+            encoded = pc.dictionary_encode(rest)
+            normalised = [normalize_date_ymd(v) or "" for v in encoded.dictionary.to_pylist()]
+            arr = pc.replace_with_mask(arr, other, pa.array(normalised, arr.type).take(encoded.indices))
+        return pc.fill_null(arr, "").to_pylist() if arr.null_count else arr.to_pylist()
+
+    def names(self, keys: Tuple[str, ...]) -> List[List[str]]:
+        arr = self._field(keys)
+        pa, pc = self.pa, self.pc
+        if (
+            arr is None
+            or not (pa.types.is_list(arr.type) or pa.types.is_large_list(arr.type))
+            or not (pa.types.is_string(arr.type.value_type) or pa.types.is_large_string(arr.type.value_type))
+        ):
+            return super().names(keys)
+        if arr.null_count:
+            arr = pc.fill_null(arr, pa.scalar([], arr.type))
+        values = arr.flatten()
+        if len(values):
+            # to_name_list strips each name and drops empty ones: only take the list
+            # column as is when no name is null, empty or starts/ends with whitespace
+            if values.null_count or pc.min(pc.utf8_length(values)).as_py() == 0:
+                return super().names(keys)
+            edges = pc.unique(pa.concat_arrays([pc.utf8_slice_codeunits(values, 0, 1),
+                                                pc.utf8_slice_codeunits(values, -1)]))
+            if any(c.isspace() for c in edges.to_pylist()):
+                return super().names(keys)
+        offsets = arr.offsets.to_pylist()
+        names = values.to_pylist()
+        base = offsets[0]
+        return [names[lo - base:hi - base] for lo, hi in zip(offsets, offsets[1:])]
+
+
+def _batch(batch: Any) -> _ColumnBatch:
+    return _ColumnBatch(batch) if isinstance(batch, dict) else _ArrowBatch(batch)
+
+
+def transform_articles_batch(batch: Any) -> List[Dict[str, Any]]:
+    """transform_articles_row over a column batch (dict of lists or pyarrow Table/RecordBatch)."""
+    b = _batch(batch)
+    ids = b.strings(ID_KEYS)
+    titles, newspapers, countries = (b.strings(ARTICLE_ALIASES[f]) for f in ("title", "newspaper", "country"))
+    dates = b.dates(DATE_KEYS)
+    subjects = b.names(SUBJECT_KEYS)
+    spatials = b.names(SPATIAL_KEYS)
+    return [
+        {"o:id": i, "title": t, "newspaper": p, "country": c, "pub_date": d, "subject": sj, "spatial": sp}
+        for i, t, p, c, d, sj, sp in zip(ids, titles, newspapers, countries, dates, subjects, spatials)
+    ]
+
+
+def transform_index_batch(batch: Any) -> List[Dict[str, Any]]:
+    """transform_index_row over a column batch (dict of lists or pyarrow Table/RecordBatch)."""
+    b = _batch(batch)
+    ids = [v if type(v) is int else _to_index_id(v) for v in b.values(ID_KEYS)]
+    titles, types, coords = (b.strings(INDEX_ALIASES[f]) for f in ("Titre", "Type", "Coordonnées"))
+    return [
+        {"o:id": i, "Titre": t, "Type": ty, "Coordonnées": c}
+        for i, t, ty, c in zip(ids, titles, types, coords)
+    ]
+
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Row dicts -> column batch; a column missing from a row reads as None."""
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for k in row:
+            columns.setdefault(k)
+    return {k: [row.get(k) for row in rows] for k in columns}
+
+
+def iter_batches(ds: Any, batch_size: int = DEFAULT_TRANSFORM_BATCH) -> Iterator[Any]:
+    """Batches for the *_batch transforms: pyarrow Tables for a datasets.Dataset
+    (with_format("arrow")), column dicts for any other iterable of row dicts."""
+    if hasattr(ds, "with_format") and hasattr(ds, "column_names"):
+        yield from ds.with_format("arrow").iter(batch_size=batch_size)
+        return
+    rows: List[Dict[str, Any]] = []
+    for row in ds:
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield rows_to_columns(rows)
+            rows = []
+    if rows:
+        yield rows_to_columns(rows)
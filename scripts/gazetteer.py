@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+ISO 3166-1 country gazetteer shared by the build scripts and the query server.
+
+Every country is identified by its alpha-2 code. Display names are the Natural Earth
+`name` values used by maps/world_countries.geojson (and therefore by the `country` field
+that add-countries writes onto locations); aliases cover English long forms, French
+names as they appear in the IWAC `spatial` field, historical names and the alpha-3 code.
+
+    country_code('Bénin')          -> 'BJ'     (any alias, code, case/diacritics-insensitive)
+    country_name('BJ')             -> 'Benin'  (display name; unknown keys pass through)
+    country_name('Nigéria')        -> 'Nigeria'
+    country_key('Tchad')           -> 'TD'     (compact output key; unknown names stay names)
+    country_file_stem('Côte d’Ivoire') -> 'cote_divoire'
+
+Lookups are dict hits: raw strings are memoised, so hot loops over article places pay
+for diacritic folding once per distinct string. Outputs keyed by country_key carry
+`countryKeys: COUNTRY_KEYS` and are decoded with the single names table written by
+build_world_map_cache.py (world_cache/countries.json).
+
+Territories without an ISO code (N. Cyprus, Somaliland, ...) are not listed; they keep
+their display name as key. Kosovo uses the widely adopted user-assigned code XK.
+"""
+from __future__ import annotations
+
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+COUNTRY_KEYS = 'iso2'  # ISO 3166-1 alpha-2
+
+# (alpha-2, alpha-3, display name, aliases)
+COUNTRIES: Tuple[Tuple[str, str, str, Tuple[str, ...]], ...] = (
+    ('AF', 'AFG', 'Afghanistan', ()),
+    ('AL', 'ALB', 'Albania', ('Albanie',)),
+    ('DZ', 'DZA', 'Algeria', ('Algérie',)),
+    ('AD', 'AND', 'Andorra', ('Andorre',)),
+    ('AO', 'AGO', 'Angola', ()),
+    ('AG', 'ATG', 'Antigua and Barb.', ('Antigua and Barbuda', 'Antigua-et-Barbuda')),
+    ('AQ', 'ATA', 'Antarctica', ('Antarctique',)),
+    ('AR', 'ARG', 'Argentina', ('Argentine',)),
+    ('AM', 'ARM', 'Armenia', ('Arménie',)),
+    ('AU', 'AUS', 'Australia', ('Australie',)),
+    ('AT', 'AUT', 'Austria', ('Autriche',)),
+    ('AZ', 'AZE', 'Azerbaijan', ('Azerbaïdjan',)),
+    ('BS', 'BHS', 'Bahamas', ()),
+    ('BH', 'BHR', 'Bahrain', ('Bahreïn',)),
+    ('BD', 'BGD', 'Bangladesh', ()),
+    ('BB', 'BRB', 'Barbados', ('Barbade',)),
+    ('BY', 'BLR', 'Belarus', ('Biélorussie', 'Bélarus')),
+    ('BE', 'BEL', 'Belgium', ('Belgique',)),
+    ('BZ', 'BLZ', 'Belize', ()),
+    ('BJ', 'BEN', 'Benin', ('Bénin', 'Dahomey')),
+    ('BT', 'BTN', 'Bhutan', ('Bhoutan',)),
+    ('BO', 'BOL', 'Bolivia', ('Bolivie',)),
+    ('BA', 'BIH', 'Bosnia and Herz.', ('Bosnia and Herzegovina', 'Bosnie-Herzégovine')),
+    ('BW', 'BWA', 'Botswana', ()),
+    ('BR', 'BRA', 'Brazil', ('Brésil',)),
+    ('BN', 'BRN', 'Brunei', ('Brunei Darussalam',)),
+    ('BG', 'BGR', 'Bulgaria', ('Bulgarie',)),
+    ('BF', 'BFA', 'Burkina Faso', ('Burkina', 'Haute-Volta', 'Upper Volta')),
+    ('BI', 'BDI', 'Burundi', ()),
+    ('CV', 'CPV', 'Cabo Verde', ('Cape Verde', 'Cap-Vert')),
+    ('KH', 'KHM', 'Cambodia', ('Cambodge',)),
+    ('CM', 'CMR', 'Cameroon', ('Cameroun',)),
+    ('CA', 'CAN', 'Canada', ()),
+    ('CF', 'CAF', 'Central African Rep.', ('Central African Republic', 'République centrafricaine', 'Centrafrique', 'RCA')),
+    ('TD', 'TCD', 'Chad', ('Tchad',)),
+    ('CL', 'CHL', 'Chile', ('Chili',)),
+    ('CN', 'CHN', 'China', ('Chine',)),
+    ('CO', 'COL', 'Colombia', ('Colombie',)),
+    ('KM', 'COM', 'Comoros', ('Comores',)),
+    ('CG', 'COG', 'Congo', ('Republic of the Congo', 'République du Congo', 'Congo-Brazzaville')),
+    ('CD', 'COD', 'Dem. Rep. Congo', (
+        'Democratic Republic of the Congo', 'DR Congo', 'République démocratique du Congo', 'RDC',
+        'Congo-Kinshasa', 'Zaïre',
+    )),
+    ('CR', 'CRI', 'Costa Rica', ()),
+    ('CI', 'CIV', "Côte d'Ivoire", ('Ivory Coast',)),
+    ('HR', 'HRV', 'Croatia', ('Croatie',)),
+    ('CU', 'CUB', 'Cuba', ()),
+    ('CY', 'CYP', 'Cyprus', ('Chypre',)),
+    ('CZ', 'CZE', 'Czechia', ('Czech Republic', 'Czech Rep.', 'Tchéquie', 'République tchèque')),
+    ('DK', 'DNK', 'Denmark', ('Danemark',)),
+    ('DJ', 'DJI', 'Djibouti', ()),
+    ('DM', 'DMA', 'Dominica', ('Dominique',)),
+    ('DO', 'DOM', 'Dominican Rep.', ('Dominican Republic', 'République dominicaine')),
+    ('EC', 'ECU', 'Ecuador', ('Équateur',)),
+    ('EG', 'EGY', 'Egypt', ('Égypte',)),
+    ('SV', 'SLV', 'El Salvador', ()),
+    ('GQ', 'GNQ', 'Eq. Guinea', ('Equatorial Guinea', 'Guinée équatoriale')),
+    ('ER', 'ERI', 'Eritrea', ('Érythrée',)),
+    ('EE', 'EST', 'Estonia', ('Estonie',)),
+    ('SZ', 'SWZ', 'eSwatini', ('Swaziland',)),
+    ('ET', 'ETH', 'Ethiopia', ('Éthiopie',)),
+    ('FK', 'FLK', 'Falkland Is.', ('Falkland Islands', 'Îles Malouines')),
+    ('FJ', 'FJI', 'Fiji', ('Fidji',)),
+    ('FI', 'FIN', 'Finland', ('Finlande',)),
+    ('FR', 'FRA', 'France', ()),
+    ('TF', 'ATF', 'Fr. S. Antarctic Lands', ('French Southern and Antarctic Lands',)),
+    ('GA', 'GAB', 'Gabon', ()),
+    ('GM', 'GMB', 'Gambia', ('The Gambia', 'Gambie')),
+    ('GE', 'GEO', 'Georgia', ('Géorgie',)),
+    ('DE', 'DEU', 'Germany', ('Allemagne',)),
+    ('GH', 'GHA', 'Ghana', ()),
+    ('GR', 'GRC', 'Greece', ('Grèce',)),
+    ('GL', 'GRL', 'Greenland', ('Groenland',)),
+    ('GD', 'GRD', 'Grenada', ()),
+    ('GT', 'GTM', 'Guatemala', ()),
+    ('GN', 'GIN', 'Guinea', ('Guinée', 'Guinée-Conakry')),
+    ('GW', 'GNB', 'Guinea-Bissau', ('Guinée-Bissau',)),
+    ('GY', 'GUY', 'Guyana', ()),
+    ('HT', 'HTI', 'Haiti', ()),
+    ('HN', 'HND', 'Honduras', ()),
+    ('HK', 'HKG', 'Hong Kong', ()),
+    ('HU', 'HUN', 'Hungary', ('Hongrie',)),
+    ('IS', 'ISL', 'Iceland', ('Islande',)),
+    ('IN', 'IND', 'India', ('Inde',)),
+    ('ID', 'IDN', 'Indonesia', ('Indonésie',)),
+    ('IR', 'IRN', 'Iran', ()),
+    ('IQ', 'IRQ', 'Iraq', ('Irak',)),
+    ('IE', 'IRL', 'Ireland', ('Irlande',)),
+    ('IL', 'ISR', 'Israel', ()),
+    ('IT', 'ITA', 'Italy', ('Italie',)),
+    ('JM', 'JAM', 'Jamaica', ('Jamaïque',)),
+    ('JP', 'JPN', 'Japan', ('Japon',)),
+    ('JO', 'JOR', 'Jordan', ('Jordanie',)),
+    ('KZ', 'KAZ', 'Kazakhstan', ()),
+    ('KE', 'KEN', 'Kenya', ()),
+    ('KI', 'KIR', 'Kiribati', ()),
+    ('XK', 'XKX', 'Kosovo', ()),
+    ('KW', 'KWT', 'Kuwait', ('Koweït',)),
+    ('KG', 'KGZ', 'Kyrgyzstan', ('Kirghizistan',)),
+    ('LA', 'LAO', 'Laos', ()),
+    ('LV', 'LVA', 'Latvia', ('Lettonie',)),
+    ('LB', 'LBN', 'Lebanon', ('Liban',)),
+    ('LS', 'LSO', 'Lesotho', ()),
+    ('LR', 'LBR', 'Liberia', ()),
+    ('LY', 'LBY', 'Libya', ('Libye',)),
+    ('LI', 'LIE', 'Liechtenstein', ()),
+    ('LT', 'LTU', 'Lithuania', ('Lituanie',)),
+    ('LU', 'LUX', 'Luxembourg', ()),
+    ('MG', 'MDG', 'Madagascar', ()),
+    ('MW', 'MWI', 'Malawi', ()),
+    ('MY', 'MYS', 'Malaysia', ('Malaisie',)),
+    ('MV', 'MDV', 'Maldives', ()),
+    ('ML', 'MLI', 'Mali', ()),
+    ('MT', 'MLT', 'Malta', ('Malte',)),
+    ('MR', 'MRT', 'Mauritania', ('Mauritanie',)),
+    ('MU', 'MUS', 'Mauritius', ('Île Maurice',)),
+    ('MX', 'MEX', 'Mexico', ('Mexique',)),
+    ('MD', 'MDA', 'Moldova', ('Moldavie',)),
+    ('MC', 'MCO', 'Monaco', ()),
+    ('MN', 'MNG', 'Mongolia', ('Mongolie',)),
+    ('ME', 'MNE', 'Montenegro', ('Monténégro',)),
+    ('MA', 'MAR', 'Morocco', ('Maroc',)),
+    ('MZ', 'MOZ', 'Mozambique', ()),
+    ('MM', 'MMR', 'Myanmar', ('Birmanie', 'Burma')),
+    ('NA', 'NAM', 'Namibia', ('Namibie',)),
+    ('NP', 'NPL', 'Nepal', ()),
+    ('NL', 'NLD', 'Netherlands', ('Pays-Bas',)),
+    ('NC', 'NCL', 'New Caledonia', ('Nouvelle-Calédonie',)),
+    ('NZ', 'NZL', 'New Zealand', ('Nouvelle-Zélande',)),
+    ('NI', 'NIC', 'Nicaragua', ()),
+    ('NE', 'NER', 'Niger', ()),
+    ('NG', 'NGA', 'Nigeria', ()),
+    ('KP', 'PRK', 'North Korea', ('Corée du Nord',)),
+    ('MK', 'MKD', 'North Macedonia', ('Macedonia', 'Macédoine', 'Macédoine du Nord')),
+    ('NO', 'NOR', 'Norway', ('Norvège',)),
+    ('OM', 'OMN', 'Oman', ()),
+    ('PK', 'PAK', 'Pakistan', ()),
+    ('PS', 'PSE', 'Palestine', ('Palestinian Territories', 'Territoires palestiniens')),
+    ('PA', 'PAN', 'Panama', ()),
+    ('PG', 'PNG', 'Papua New Guinea', ('Papouasie-Nouvelle-Guinée',)),
+    ('PY', 'PRY', 'Paraguay', ()),
+    ('PE', 'PER', 'Peru', ('Pérou',)),
+    ('PH', 'PHL', 'Philippines', ()),
+    ('PL', 'POL', 'Poland', ('Pologne',)),
+    ('PT', 'PRT', 'Portugal', ()),
+    ('PR', 'PRI', 'Puerto Rico', ('Porto Rico',)),
+    ('QA', 'QAT', 'Qatar', ()),
+    ('RO', 'ROU', 'Romania', ('Roumanie',)),
+    ('RU', 'RUS', 'Russia', ('Russian Federation', 'Russie')),
+    ('RW', 'RWA', 'Rwanda', ()),
+    ('WS', 'WSM', 'Samoa', ()),
+    ('SM', 'SMR', 'San Marino', ('Saint-Marin',)),
+    ('ST', 'STP', 'São Tomé and Principe', ('Sao Tomé-et-Principe',)),
+    ('SA', 'SAU', 'Saudi Arabia', ('Arabie saoudite',)),
+    ('SN', 'SEN', 'Senegal', ()),
+    ('RS', 'SRB', 'Serbia', ('Serbie',)),
+    ('SC', 'SYC', 'Seychelles', ()),
+    ('SL', 'SLE', 'Sierra Leone', ()),
+    ('SG', 'SGP', 'Singapore', ('Singapour',)),
+    ('SK', 'SVK', 'Slovakia', ('Slovaquie',)),
+    ('SI', 'SVN', 'Slovenia', ('Slovénie',)),
+    ('SB', 'SLB', 'Solomon Is.', ('Solomon Islands', 'Îles Salomon')),
+    ('SO', 'SOM', 'Somalia', ('Somalie',)),
+    ('ZA', 'ZAF', 'South Africa', ('Afrique du Sud',)),
+    ('KR', 'KOR', 'South Korea', ('Corée du Sud',)),
+    ('SS', 'SSD', 'S. Sudan', ('South Sudan', 'Soudan du Sud')),
+    ('ES', 'ESP', 'Spain', ('Espagne',)),
+    ('LK', 'LKA', 'Sri Lanka', ()),
+    ('SD', 'SDN', 'Sudan', ('Soudan',)),
+    ('SR', 'SUR', 'Suriname', ()),
+    ('SE', 'SWE', 'Sweden', ('Suède',)),
+    ('CH', 'CHE', 'Switzerland', ('Suisse',)),
+    ('SY', 'SYR', 'Syria', ('Syrie',)),
+    ('TW', 'TWN', 'Taiwan', ()),
+    ('TJ', 'TJK', 'Tajikistan', ('Tadjikistan',)),
+    ('TZ', 'TZA', 'Tanzania', ('Tanzanie',)),
+    ('TH', 'THA', 'Thailand', ('Thaïlande',)),
+    ('TL', 'TLS', 'Timor-Leste', ('East Timor', 'Timor oriental')),
+    ('TG', 'TGO', 'Togo', ()),
+    ('TO', 'TON', 'Tonga', ()),
+    ('TT', 'TTO', 'Trinidad and Tobago', ('Trinité-et-Tobago',)),
+    ('TN', 'TUN', 'Tunisia', ('Tunisie',)),
+    ('TR', 'TUR', 'Turkey', ('Türkiye', 'Turquie')),
+    ('TM', 'TKM', 'Turkmenistan', ('Turkménistan',)),
+    ('UG', 'UGA', 'Uganda', ('Ouganda',)),
+    ('UA', 'UKR', 'Ukraine', ()),
+    ('AE', 'ARE', 'United Arab Emirates', ('Émirats arabes unis', 'UAE', 'EAU')),
+    ('GB', 'GBR', 'United Kingdom', ('Royaume-Uni', 'Great Britain', 'Grande-Bretagne', 'UK')),
+    ('US', 'USA', 'United States of America', ('United States', 'États-Unis', "États-Unis d'Amérique")),
+    ('UY', 'URY', 'Uruguay', ()),
+    ('UZ', 'UZB', 'Uzbekistan', ('Ouzbékistan',)),
+    ('VU', 'VUT', 'Vanuatu', ()),
+    ('VA', 'VAT', 'Vatican', ('Vatican City', 'Holy See', 'Saint-Siège')),
+    ('VE', 'VEN', 'Venezuela', ()),
+    ('VN', 'VNM', 'Vietnam', ('Viet Nam',)),
+    ('EH', 'ESH', 'W. Sahara', ('Western Sahara', 'Sahara occidental')),
+    ('YE', 'YEM', 'Yemen', ('Yémen',)),
+    ('ZM', 'ZMB', 'Zambia', ('Zambie',)),
+    ('ZW', 'ZWE', 'Zimbabwe', ()),
+)
+
+NAMES: Dict[str, str] = {code: name for code, _a3, name, _aliases in COUNTRIES}
+
+
+def fold(name: str) -> str:
+    """Comparison form: no diacritics, casefolded, apostrophes dropped, '-'/'.'/'_' as spaces."""
+    s = unicodedata.normalize('NFD', name)
+    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
+    s = s.replace("'", '').replace('’', '').replace('`', '')
+    s = s.replace('-', ' ').replace('.', ' ').replace('_', ' ')
+    return ' '.join(s.casefold().split())
+
+
+def country_filename(name: str) -> str:
+    """File name stem for a country (diacritics and apostrophes stripped, spaces -> '_')."""
+    s = unicodedata.normalize('NFD', name)
+    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
+    s = s.replace("'", '').replace('’', '').replace('`', '')
+    return '_'.join(s.split()).lower()
+
+
+def _build_index() -> Tuple[Dict[str, str], Dict[str, str]]:
+    by_fold: Dict[str, str] = {}
+    by_code: Dict[str, str] = {}
+    for code, alpha3, name, aliases in COUNTRIES:
+        by_code[code] = by_code[alpha3] = code
+        for alias in (name, *aliases):
+            key = fold(alias)
+            if by_fold.setdefault(key, code) != code:
+                raise ValueError(f"Gazetteer alias {alias!r} maps to {by_fold[key]} and {code}")
+    return by_fold, by_code
+
+
+_BY_FOLD, _BY_CODE = _build_index()
+_RESOLVED: Dict[str, Optional[str]] = {}  # raw string -> code (memoised lookups)
+FILENAMES: Dict[str, str] = {code: country_filename(name) for code, name in NAMES.items()}
+
+
+def country_code(name: str) -> Optional[str]:
+    """Alpha-2 code for a display name, alias or alpha-2/alpha-3 code; None if unknown."""
+    try:
+        return _RESOLVED[name]
+    except KeyError:
+        pass
+    s = (name or '').strip()
+    code = _BY_CODE.get(s) if s.isupper() else None
+    if code is None:
+        code = _BY_FOLD.get(fold(s))
+    _RESOLVED[name] = code
+    return code
+
+
+def country_name(key: str) -> str:
+    """Display name for a code or any alias; unknown values are returned stripped."""
+    code = country_code(key)
+    return NAMES[code] if code else (key or '').strip()
+
+
+def country_key(name: str) -> str:
+    """Compact output key: the alpha-2 code, or the stripped name for unlisted territories."""
+    return country_code(name) or (name or '').strip()
+
+
+def country_file_stem(name: str) -> str:
+    """country_filename of the display name (precomputed for listed countries)."""
+    code = country_code(name)
+    return FILENAMES[code] if code else country_filename(name)
+
+
+def names_json() -> Dict[str, object]:
+    """The names table file (world_cache/countries.json) the client uses to decode keys."""
+    return {
+        'type': 'country_names',
+        'countryKeys': COUNTRY_KEYS,
+        'names': dict(NAMES),
+        'alpha3': {code: a3 for code, a3, _name, _aliases in COUNTRIES},
+    }
+
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic IWAC corpus for scaling tests and benchmarks.
+
+The corpus mimics the shape of the Hugging Face export so every downstream script can run
+on it unchanged:
+  - raw rows as the dataset delivers them (subject/spatial as lists, dates in the mixed
+    formats accepted by normalize_date_ymd: YYYY-MM-DD, YYYY-MM, YYYY, DD/MM/YYYY)
+  - articles.json / index.json produced from those rows with the same
+    transform_articles_row / transform_index_row used by the fetch step
+  - maps/: the administrative GeoJSON layers plus world_countries.geojson (the real file
+    when available, otherwise countries dissolved from the admin layers)
+
+Entity names are French with diacritics (Traoré, Ouédraogo, Côte d'Ivoire, Événements),
+locations carry `Coordonnées` inside West Africa, and both entity popularity and article
+dates are skewed (Zipf-like mentions, more recent years) like the real collection.
+
+Scale factor 1 matches the current dataset (~11.5k articles, ~4.6k index entries).
+Articles grow linearly with the scale; entity vocabularies grow with scale**0.5, since new
+articles mostly mention already-known people and places.
+
+Usage:
+  python scripts/generate_synthetic_corpus.py --scale 10 --out-dir /tmp/iwac_x10
+  python scripts/generate_synthetic_corpus.py --scale 1 --out-dir /tmp/iwac_x1 --raw-only
+  python scripts/generate_synthetic_corpus.py --export-from-raw /tmp/iwac_x1
+  python scripts/generate_synthetic_corpus.py --scale 0.1 --out-dir /tmp/iwac_fixture --snapshot --raw-only
+
+--snapshot also writes the raw rows as a Parquet snapshot (<out-dir>/snapshot, with a
+REVISION file) for `preprocess_all.py --steps fetch --snapshot <out-dir>/snapshot`.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+from dataset_snapshot import write_snapshot
+from json_io import write_json, write_jsonl
+from fetch_transforms import transform_articles_row, transform_index_row
+from preprocess_all import default_paths, setup_logging
+
+# Sizes of the current dataset (scale 1)
+BASE_ARTICLES = 11_500
+BASE_ENTITIES = {
+    "Personnes": 2_700,
+    "Organisations": 410,
+    "Événements": 235,
+    "Sujets": 215,
+    "Lieux": 680,
+    "Notices d'autorité": 310,
+}
+ENTITY_GROWTH = 0.5
+ZIPF_EXPONENT = 1.1
+
+# (south, north, west, east) — Benin, Burkina Faso, Côte d'Ivoire, Togo and neighbours
+WEST_AFRICA_BBOX = (4.5, 15.0, -8.5, 3.9)
+
+ARTICLE_COUNTRIES = ["Burkina Faso", "Benin", "Togo", "Côte d'Ivoire", "Niger", "Nigeria"]
+ARTICLE_COUNTRY_WEIGHTS = [0.34, 0.22, 0.14, 0.18, 0.07, 0.05]
+NEWSPAPERS = {
+    "Burkina Faso": ["Sidwaya", "L'Observateur Paalga", "Le Pays", "L'Événement"],
+    "Benin": ["La Nation", "Ehuzu", "Le Matinal", "Fraternité"],
+    "Togo": ["Togo-Presse", "La Nouvelle Marche", "Le Combat du Peuple"],
+    "Côte d'Ivoire": ["Fraternité Matin", "Le Patriote", "Notre Voie", "Soir Info"],
+    "Niger": ["Le Sahel", "Le Républicain"],
+    "Nigeria": ["Islam Hebdo", "Le Lien"],
+}
+
+FIRST_NAMES = [
+    "Abdoulaye", "Aminata", "Boubacar", "Chérif", "Fatoumata", "Hadja", "Ibrahima", "Issouf",
+    "Mariam", "Moussa", "Ousmane", "Saïdou", "Souleymane", "Aïcha", "Adama", "Tidiane",
+    "Mamadou", "Ismaël", "Djénéba", "Kadidia", "Séni", "Hamidou", "Lassina", "Yacouba",
+    "Zénabou", "Rasmané", "Idrissa", "Néma", "Bachir", "Ramatou",
+]
+LAST_NAMES = [
+    "Traoré", "Ouédraogo", "Diallo", "Koné", "Sawadogo", "Cissé", "Touré", "Bamba", "Kaboré",
+    "Sanogo", "Coulibaly", "Diabaté", "Zoungrana", "Bâ", "Dicko", "Sylla", "Yéo", "Fofana",
+    "Kéita", "Maïga", "Adébayo", "Alassane", "Tchédré", "Gbédji", "Sérémé", "Nacro",
+]
+ORG_TEMPLATES = [
+    "Association des {who} musulmans de {place}",
+    "Union islamique de {place}",
+    "Conseil supérieur des imams de {place}",
+    "Communauté musulmane de {place}",
+    "Mouvement sunnite de {place}",
+    "Fédération des associations islamiques de {place}",
+    "Ligue des prédicateurs de {place}",
+]
+ORG_WHO = ["élèves", "étudiants", "femmes", "jeunes", "commerçants", "imams", "prédicateurs"]
+EVENT_TEMPLATES = [
+    "Tabaski {year}",
+    "Ramadan {year}",
+    "Pèlerinage à La Mecque {year}",
+    "Mawlid {year}",
+    "Conférence islamique de {place} {year}",
+    "Congrès national des associations islamiques {year}",
+    "Élection présidentielle {year}",
+]
+SUBJECT_WORDS = [
+    "Éducation islamique", "Médersa", "Zakât", "Pèlerinage", "Laïcité", "Soufisme",
+    "Wahhabisme", "Confréries", "Radio islamique", "Jeûne", "Mosquée", "Prédication",
+    "Femmes musulmanes", "Jeunesse", "Finance islamique", "Dialogue interreligieux",
+    "Arabe", "Coran", "Tidjaniyya", "Qadiriyya", "Hajj", "Fêtes religieuses",
+    "Extrémisme violent", "Santé", "Politique", "Développement", "Charia", "Mariage",
+]
+PLACE_PREFIX = ["Ou", "Ko", "Ba", "Di", "Ka", "Tcha", "Sé", "Bo", "Ga", "Dja", "Ni", "Za", "Fa", "Ma", "Lo", "Pa", "Dé", "Gué", "Sa", "To"]
+PLACE_MID = ["ga", "dou", "lo", "ré", "kè", "ma", "ba", "ni", "ta", "so", ""]
+PLACE_SUFFIX = ["gou", "ssa", "kro", "dé", "bé", "na", "mé", "fla", "ra", "gbo", "kou", "ya"]
+PLACE_QUALIFIERS = ["", "-Centre", "-Nord", "-Sud", "-Gare", " Kpota", "-Plage", " Zongo"]
+
+
+def _unique_names(candidates: Iterator[str], n: int) -> List[str]:
+    """Take n distinct names from an endless candidate stream, numbering repeats."""
+    seen: Dict[str, int] = {}
+    out: List[str] = []
+    for name in candidates:
+        if len(out) >= n:
+            break
+        k = seen.get(name, 0)
+        seen[name] = k + 1
+        out.append(name if k == 0 else f"{name} {k + 1}")
+    return out
+
+
+def _place_names(rng: random.Random) -> Iterator[str]:
+    while True:
+        base = rng.choice(PLACE_PREFIX) + rng.choice(PLACE_MID) + rng.choice(PLACE_SUFFIX)
+        yield base + rng.choice(PLACE_QUALIFIERS)
+
+
+def _person_names(rng: random.Random) -> Iterator[str]:
+    while True:
+        first = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.3:
+            first = f"{first} {rng.choice(FIRST_NAMES)}"
+        yield f"{first} {rng.choice(LAST_NAMES)}"
+
+
+def _org_names(rng: random.Random, places: Sequence[str]) -> Iterator[str]:
+    while True:
+        yield rng.choice(ORG_TEMPLATES).format(who=rng.choice(ORG_WHO), place=rng.choice(places))
+
+
+def _event_names(rng: random.Random, places: Sequence[str]) -> Iterator[str]:
+    while True:
+        yield rng.choice(EVENT_TEMPLATES).format(year=rng.randint(1961, 2025), place=rng.choice(places))
+
+
+def _subject_names(rng: random.Random) -> Iterator[str]:
+    yield from SUBJECT_WORDS
+    while True:
+        a, b = rng.sample(SUBJECT_WORDS, 2)
+        yield f"{a} et {b.lower()}"
+
+
+def _coordinates(rng: random.Random) -> str:
+    south, north, west, east = WEST_AFRICA_BBOX
+    lat = round(rng.uniform(south, north), 5)
+    lng = round(rng.uniform(west, east), 5)
+    r = rng.random()
+    if r < 0.03:
+        return ""  # ungeocoded place
+    if r < 0.10:
+        return f"({lat}, {lng})"
+    if r < 0.15:
+        return f"[{lat},{lng}]"
+    return f"{lat}, {lng}"
+
+
+def _raw_date(rng: random.Random) -> str:
+    # Coverage 1961-2025, skewed towards recent decades
+    year = 2025 - int(abs(rng.gauss(0, 18))) % 65
+    month, day = rng.randint(1, 12), rng.randint(1, 28)
+    r = rng.random()
+    if r < 0.80:
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    if r < 0.90:
+        return f"{day}/{month}/{year}"
+    if r < 0.96:
+        return f"{year:04d}-{month:02d}"
+    return f"{year:04d}"
+
+
+def _zipf_cum_weights(n: int) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** ZIPF_EXPONENT) for rank in range(1, n + 1)))
+
+
+def generate_raw_corpus(scale: float, seed: int = 42) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (raw article rows, raw index rows) as the dataset export would provide them."""
+    rng = random.Random(seed)
+    vocab_scale = scale ** ENTITY_GROWTH
+    sizes = {t: max(1, round(n * vocab_scale)) for t, n in BASE_ENTITIES.items()}
+
+    places = _unique_names(_place_names(rng), sizes["Lieux"])
+    names_by_type: Dict[str, List[str]] = {
+        "Lieux": places,
+        "Personnes": _unique_names(_person_names(rng), sizes["Personnes"]),
+        "Organisations": _unique_names(_org_names(rng, places), sizes["Organisations"]),
+        "Événements": _unique_names(_event_names(rng, places), sizes["Événements"]),
+        "Sujets": _unique_names(_subject_names(rng), sizes["Sujets"]),
+        "Notices d'autorité": _unique_names(_person_names(rng), sizes["Notices d'autorité"]),
+    }
+
+    index_rows: List[Dict[str, Any]] = []
+    oid = itertools.count(1)
+    for etype, names in names_by_type.items():
+        for name in names:
+            row: Dict[str, Any] = {"o:id": next(oid), "Titre": name, "Type": etype, "Coordonnées": None}
+            if etype == "Lieux":
+                row["Coordonnées"] = _coordinates(rng)
+            index_rows.append(row)
+
+    # Popularity ranks are a random permutation so popular names are not alphabetical
+    popularity = {t: rng.sample(names, len(names)) for t, names in names_by_type.items()}
+    cum_weights = {t: _zipf_cum_weights(len(names)) for t, names in names_by_type.items()}
+    subject_types = ["Personnes", "Organisations", "Événements", "Sujets"]
+    subject_type_weights = [0.45, 0.2, 0.1, 0.25]
+
+    def pick(etype: str, k: int) -> List[str]:
+        chosen = rng.choices(popularity[etype], cum_weights=cum_weights[etype], k=k)
+        return list(dict.fromkeys(chosen))
+
+    articles: List[Dict[str, Any]] = []
+    first_article_id = next(oid) + 10_000
+    for i in range(round(BASE_ARTICLES * scale)):
+        country = rng.choices(ARTICLE_COUNTRIES, weights=ARTICLE_COUNTRY_WEIGHTS)[0]
+        n_places = min(int(rng.expovariate(0.55)), 12)
+        n_subjects = 1 + min(int(rng.expovariate(0.3)), 20)
+        subjects: List[str] = []
+        for etype in rng.choices(subject_types, weights=subject_type_weights, k=n_subjects):
+            subjects.extend(pick(etype, 1))
+        articles.append({
+            "o:id": first_article_id + i,
+            "title": f"Article {first_article_id + i} — {rng.choice(SUBJECT_WORDS)}",
+            "newspaper": rng.choice(NEWSPAPERS[country]),
+            "country": country,
+            "pub_date": _raw_date(rng),
+            "subject": list(dict.fromkeys(subjects)),
+            "spatial": pick("Lieux", n_places),
+        })
+    return articles, index_rows
+
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def export_corpus(raw_articles: List[Dict[str, Any]], raw_index: List[Dict[str, Any]], out_dir: Path, *, compact: bool = False) -> None:
+    """Write articles.json / index.json exactly as step_fetch would from these rows."""
+    with step_timer("Transform and write articles/index") as rec:
+        articles_rows = [transform_articles_row(r) for r in raw_articles]
+        index_rows = [transform_index_row(r) for r in raw_index]
+        write_json(out_dir / "articles.json", articles_rows, compact=compact)
+        write_json(out_dir / "index.json", index_rows, compact=compact)
+        rec.rows_in = len(raw_articles) + len(raw_index)
+        rec.rows_out = len(articles_rows) + len(index_rows)
+
+
+def prepare_maps(out_dir: Path, maps_dir: Path) -> None:
+    """Copy admin layers and provide a world_countries.geojson for the add-countries step."""
+    target = out_dir / "maps"
+    target.mkdir(parents=True, exist_ok=True)
+    for src in maps_dir.glob("*.geojson"):
+        shutil.copyfile(src, target / src.name)
+    if (target / "world_countries.geojson").exists():
+        return
+    # Fallback: dissolve each target country's top admin layer into one country polygon
+    import shapely  # deferred: only needed when the real world layer is absent
+    from preprocess_all import load_admin_layers
+
+    features = []
+    for country, layers in load_admin_layers(target).items():
+        geom = shapely.union_all(layers[0][1].geoms)
+        features.append({"type": "Feature", "properties": {"name": country}, "geometry": shapely.geometry.mapping(geom)})
+    with (target / "world_countries.geojson").open("w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+    logging.warning("world_countries.geojson not found in %s; wrote dissolved admin layers instead", maps_dir)
+
+
+def parse_args() -> argparse.Namespace:
+    paths = default_paths(Path(__file__).resolve())
+    p = argparse.ArgumentParser(description="Generate a synthetic IWAC corpus")
+    p.add_argument("--scale", type=float, default=1.0, help="Corpus size relative to the current dataset (1-100)")
+    p.add_argument("--out-dir", default=None, help="Output data directory (required unless --export-from-raw)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--maps-dir", default=str(paths["maps_dir"]), help="Directory with the administrative GeoJSON files to copy")
+    p.add_argument("--no-maps", action="store_true", help="Do not copy map layers")
+    p.add_argument("--compact", action="store_true", help="Write compact (minified) JSON")
+    p.add_argument("--raw-only", action="store_true", help="Only write raw rows (articles_raw.jsonl, index_raw.jsonl)")
+    p.add_argument("--export-from-raw", default=None, help="Transform existing raw rows in this directory into articles.json/index.json")
+    p.add_argument("--snapshot", action="store_true", help="Also write the raw rows as a Parquet snapshot to <out-dir>/snapshot")
+    p.add_argument("--row-group-size", type=int, default=2_000, help="Rows per Parquet row group for --snapshot")
+    p.add_argument("--log-level", default="INFO")
+    add_instrumentation_args(p)
+    args = p.parse_args()
+    if not args.out_dir and not args.export_from_raw:
+        p.error("--out-dir is required")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(args.log_level)
+    start_run("generate_synthetic_corpus", args)
+
+    if args.export_from_raw:
+        data_dir = Path(args.export_from_raw)
+        with step_timer("Read raw rows") as rec:
+            raw_articles = read_jsonl(data_dir / "articles_raw.jsonl")
+            raw_index = read_jsonl(data_dir / "index_raw.jsonl")
+            rec.rows_in = len(raw_articles) + len(raw_index)
+        export_corpus(raw_articles, raw_index, data_dir, compact=args.compact)
+        finish_run()
+        return
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with step_timer(f"Generate raw corpus (scale {args.scale:g})") as rec:
+        raw_articles, raw_index = generate_raw_corpus(args.scale, args.seed)
+        write_jsonl(out_dir / "articles_raw.jsonl", raw_articles)
+        write_jsonl(out_dir / "index_raw.jsonl", raw_index)
+        rec.rows_out = len(raw_articles) + len(raw_index)
+    if args.snapshot:
+        with step_timer("Write Parquet snapshot"):
+            revision = write_snapshot(
+                out_dir / "snapshot",
+                {"articles": raw_articles, "index": raw_index},
+                row_group_size=args.row_group_size,
+            )
+            logging.info("Snapshot revision %s -> %s", revision, out_dir / "snapshot")
+    if not args.raw_only:
+        export_corpus(raw_articles, raw_index, out_dir, compact=args.compact)
+    if not args.no_maps:
+        with step_timer("Prepare map layers"):
+            prepare_maps(out_dir, Path(args.maps_dir))
+
+    logging.info("Synthetic corpus: %d articles, %d index rows -> %s", len(raw_articles), len(raw_index), out_dir)
+    finish_run()
+
+
+if __name__ == "__main__":
+    main()
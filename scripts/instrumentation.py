@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Step instrumentation and run reports for the preprocessing pipeline and build scripts.
+
+Every script wraps its stages in `step_timer(name)`. Each step records:
+  - wall and CPU time
+  - memory: process RSS high-water mark (POSIX) and, with --trace-memory, the
+    tracemalloc peak of Python allocations made during the step
+  - input/output row counts (via `record_rows`)
+  - files and bytes written (via `record_output`, called by the JSON writers)
+
+When a run is started with a report path, all steps are collected into a JSON run
+report. With --profile, each top-level step also runs under cProfile and its stats are
+dumped to <profile-dir>/<script>.<step>.prof (view with `python -m pstats`, snakeviz or
+flameprof to get a flamegraph); the hottest functions are summarised in the report.
+
+Usage in a script:
+    from instrumentation import add_instrumentation_args, finish_run, start_run, step_timer
+
+    args = parser.parse_args()            # after add_instrumentation_args(parser)
+    start_run("build_networks", args)
+    with step_timer("Load entities") as rec:
+        ...
+        rec.rows_in = len(rows)
+    finish_run()
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import io
+import json
+import logging
+import platform
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource  # POSIX only
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_REPORT_DIR = Path(__file__).resolve().parent / "logs"
+TOP_FUNCTIONS = 15
+
+
+def _rss_high_water_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "step"
+
+
+@dataclass
+class StepRecord:
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_high_water_bytes: Optional[int] = None
+    py_peak_bytes: Optional[int] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    outputs: List[Path] = field(default_factory=list)
+    bytes_written: int = 0
+    profile_path: Optional[Path] = None
+    top_functions: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_output(self, path: Path) -> None:
+        self.outputs.append(Path(path))
+
+    def to_json(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "name": self.name,
+            "wallSeconds": round(self.wall_s, 4),
+            "cpuSeconds": round(self.cpu_s, 4),
+            "rssHighWaterBytes": self.rss_high_water_bytes,
+            "pyPeakBytes": self.py_peak_bytes,
+            "rowsIn": self.rows_in,
+            "rowsOut": self.rows_out,
+            "filesWritten": len(set(self.outputs)),
+            "bytesWritten": self.bytes_written,
+        }
+        if self.profile_path is not None:
+            out["profile"] = str(self.profile_path)
+            out["topFunctions"] = self.top_functions
+        return out
+
+
+class RunReport:
+    """Collects StepRecords for one script invocation."""
+
+    def __init__(
+        self,
+        script: str,
+        *,
+        report_path: Optional[Path] = None,
+        profile_dir: Optional[Path] = None,
+        trace_memory: bool = False,
+    ) -> None:
+        self.script = script
+        self.report_path = report_path
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.steps: List[StepRecord] = []
+        self.info: Dict[str, Any] = {}
+        self.started_at = datetime.utcnow()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "script": self.script,
+            "startedAt": self.started_at.isoformat() + "Z",
+            "wallSeconds": round(time.perf_counter() - self._wall_start, 4),
+            "cpuSeconds": round(time.process_time() - self._cpu_start, 4),
+            "rssHighWaterBytes": _rss_high_water_bytes(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "argv": sys.argv[1:],
+            "steps": [s.to_json() for s in self.steps],
+            **self.info,
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+        logging.info("Run report -> %s", path)
+
+
+_ACTIVE: Optional[RunReport] = None
+_STACK: List[StepRecord] = []
+
+
+def add_instrumentation_args(parser: argparse.ArgumentParser) -> None:
+    """Add --report/--profile/--trace-memory to a script's CLI."""
+    parser.add_argument(
+        "--report",
+        nargs="?",
+        const="",
+        default=None,
+        help="Write a JSON run report (default path: scripts/logs/<script>_report.json)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=str(DEFAULT_REPORT_DIR / "profiles"),
+        default=None,
+        help="Run each step under cProfile and dump .prof files to this directory",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Track per-step Python allocation peaks with tracemalloc (slower)",
+    )
+
+
+def start_run(script: str, args: Optional[argparse.Namespace] = None) -> RunReport:
+    """Begin collecting steps for `script`, configured from parsed CLI args if given."""
+    global _ACTIVE
+    report_path: Optional[Path] = None
+    profile_dir: Optional[Path] = None
+    trace_memory = False
+    if args is not None:
+        report_arg = getattr(args, "report", None)
+        if report_arg is not None:
+            report_path = Path(report_arg) if report_arg else DEFAULT_REPORT_DIR / f"{script}_report.json"
+        profile_arg = getattr(args, "profile", None)
+        if profile_arg:
+            profile_dir = Path(profile_arg)
+            # A profile run is only useful with its report
+            report_path = report_path or DEFAULT_REPORT_DIR / f"{script}_report.json"
+        trace_memory = bool(getattr(args, "trace_memory", False))
+    _ACTIVE = RunReport(script, report_path=report_path, profile_dir=profile_dir, trace_memory=trace_memory)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _ACTIVE
+
+
+def finish_run() -> Optional[RunReport]:
+    """Write the active report (if a path was configured) and stop collecting."""
+    global _ACTIVE
+    report = _ACTIVE
+    _ACTIVE = None
+    if report is None:
+        return None
+    if report.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if report.report_path is not None:
+        report.write(report.report_path)
+    return report
+
+
+def record_output(path: Path) -> None:
+    """Attribute a written file to the innermost running step (no-op outside steps)."""
+    if _STACK:
+        _STACK[-1].add_output(path)
+
+
+def add_run_info(key: str, value: Any) -> None:
+    """Attach a script-specific top-level field to the active report (no-op without one)."""
+    if _ACTIVE is not None:
+        _ACTIVE.info[key] = value
+
+
+def record_rows(rows_in: Optional[int] = None, rows_out: Optional[int] = None) -> None:
+    """Set row counts on the innermost running step (no-op outside steps)."""
+    if not _STACK:
+        return
+    if rows_in is not None:
+        _STACK[-1].rows_in = rows_in
+    if rows_out is not None:
+        _STACK[-1].rows_out = rows_out
+
+
+def _summarise_profile(profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, lineno, func), (_cc, ncalls, tottime, cumtime, _callers) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({
+            "function": f"{Path(filename).name}:{lineno}({func})",
+            "calls": ncalls,
+            "tottime": round(tottime, 4),
+            "cumtime": round(cumtime, 4),
+        })
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+@contextmanager
+def step_timer(name: str) -> Iterator[StepRecord]:
+    """Time a pipeline step, logging start/end and recording it in the active run report."""
+    rec = StepRecord(name=name)
+    report = _ACTIVE
+    nested = bool(_STACK)
+    profiler: Optional[cProfile.Profile] = None
+    if report is not None and report.profile_dir is not None and not nested:
+        profiler = cProfile.Profile()
+    tracing = report is not None and report.trace_memory and tracemalloc.is_tracing()
+    if tracing and not nested:
+        tracemalloc.reset_peak()
+
+    _STACK.append(rec)
+    logging.info("▶️  Start: %s", name)
+    wall0 = time.perf_counter()
+    cpu0 = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield rec
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        rec.wall_s = time.perf_counter() - wall0
+        rec.cpu_s = time.process_time() - cpu0
+        rec.rss_high_water_bytes = _rss_high_water_bytes()
+        if tracing:
+            rec.py_peak_bytes = tracemalloc.get_traced_memory()[1]
+        rec.bytes_written = sum(p.stat().st_size for p in set(rec.outputs) if p.exists())
+        _STACK.pop()
+        if _STACK:
+            # Nested steps also count towards their parent
+            _STACK[-1].outputs.extend(rec.outputs)
+        if profiler is not None and report is not None and report.profile_dir is not None:
+            report.profile_dir.mkdir(parents=True, exist_ok=True)
+            rec.profile_path = report.profile_dir / f"{report.script}.{_slug(name)}.prof"
+            profiler.dump_stats(str(rec.profile_path))
+            rec.top_functions = _summarise_profile(profiler)
+        if report is not None and not nested:
+            report.steps.append(rec)
+        logging.info("✅ Done: %s (%.2fs)", name, rec.wall_s)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+JSON serialisation layer shared by every preprocessing/build script.
+
+Two output modes, matching what the scripts have always written:
+  - pretty:  json.dumps(data, ensure_ascii=False, indent=2)
+  - compact: json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+Backends: orjson, msgspec or the stdlib `json` module. The fastest installed one is
+used unless IWAC_JSON_BACKEND (or set_backend) selects one explicitly. Output is
+byte-identical across backends for the same mode: the fast encoders only differ from
+the stdlib in how they spell floats that Python prints in exponent form (1e-05, 1e+16),
+and those tokens are re-rendered with repr() before writing. Non-finite floats (NaN,
+Infinity) are written as null by every backend, as orjson and msgspec do, so the output
+is always valid JSON.
+
+Writers stream: top-level containers (and the containers directly inside them, e.g. the
+`nodes`/`edges` arrays of a network) are emitted structurally and only their items are
+encoded in one go, so a multi-MB document is never materialised as a single string.
+JsonArrayWriter goes further and accepts items as they are produced, one at a time or
+in batches (write_many: one encoder call per batch).
+
+Usage:
+    from json_io import write_json, open_json_array
+
+    write_json(path, data, compact=True)
+    with open_json_array(path) as out:
+        for row in rows:
+            out.write(transform(row))
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List
+
+from instrumentation import record_output
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec  # type: ignore
+except ImportError:  # pragma: no cover - optional accelerator
+    msgspec = None  # type: ignore[assignment]
+
+STREAM_DEPTH = 2  # container levels emitted structurally by write_json
+WRITE_BUFFER = 1 << 20
+
+Encoder = Callable[[Any, bool], bytes]
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of obj with NaN/Infinity floats replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _dumps_stdlib(obj: Any, compact: bool) -> str:
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    return json.dumps(obj, ensure_ascii=False, indent=2, allow_nan=False)
+
+
+def _encode_stdlib(obj: Any, compact: bool) -> bytes:
+    try:
+        text = _dumps_stdlib(obj, compact)
+    except ValueError:  # a non-finite float: only then pay for the copy
+        text = _dumps_stdlib(_finite(obj), compact)
+    return text.encode("utf-8")
+
+
+def _encode_orjson(obj: Any, compact: bool) -> bytes:
+    opts = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+    return _canonical_floats(orjson.dumps(obj, option=opts))
+
+
+def _encode_msgspec(obj: Any, compact: bool) -> bytes:
+    buf = msgspec.json.encode(obj)
+    if not compact:
+        buf = msgspec.json.format(buf, indent=2)
+    return _canonical_floats(buf)
+
+
+_ENCODERS: Dict[str, Encoder] = {"json": _encode_stdlib}
+if orjson is not None:
+    _ENCODERS["orjson"] = _encode_orjson
+if msgspec is not None:
+    _ENCODERS["msgspec"] = _encode_msgspec
+
+# The fast encoders write exponent floats as e.g. 1e16 / 1e-7 and tiny ones as 0.00001,
+# where repr() gives 1e+16 / 1e-07 / 1e-05. Candidates are located with bytes.find on a
+# copy with every digit mapped to '0' (a few ms even on multi-MB buffers) and only count
+# when they form a whole number token in value position; only then is the exact pass run.
+_DIGITS_TO_ZERO = bytes(0x30 if 0x30 <= i <= 0x39 else i for i in range(256))
+_HINTS = (b"0e", b".0000")
+_NUM_CHARS = frozenset(b"0123456789.-")
+_BEFORE = frozenset(b":,[ \n")
+_AFTER = frozenset(b",]} \n")
+_CANDIDATE = re.compile(rb"-?(?:\d+(?:\.\d+)?e[-+]?\d+|0\.0000\d+)")
+# Strings are matched (and skipped) first so numbers inside them are never touched.
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|(?<![\d.])-?\d+(?:\.\d+)?[eE][-+]?\d+|(?<![\d.])-?0\.0000\d+')
+
+
+def _has_odd_floats(buf: bytes) -> bool:
+    digits = buf.translate(_DIGITS_TO_ZERO)
+    for hint in _HINTS:
+        i = digits.find(hint)
+        while i != -1:
+            start = i
+            while start and buf[start - 1] in _NUM_CHARS:
+                start -= 1
+            m = _CANDIDATE.match(buf, start)
+            if (
+                m is not None
+                and m.end() > i
+                and (start == 0 or buf[start - 1] in _BEFORE)
+                and (m.end() == len(buf) or buf[m.end()] in _AFTER)
+            ):
+                return True
+            i = digits.find(hint, i + 1)
+    return False
+
+
+def _canonical_floats(buf: bytes) -> bytes:
+    """Re-spell floats the way Python's repr does (both are shortest round-trip forms)."""
+    if not _has_odd_floats(buf):
+        return buf
+
+    def fix(m: "re.Match[bytes]") -> bytes:
+        tok = m.group(0)
+        if tok[:1] == b'"':
+            return tok
+        return repr(float(tok)).encode("ascii")
+
+    return _TOKEN.sub(fix, buf)
+
+
+def available_backends() -> List[str]:
+    return list(_ENCODERS)
+
+
+def _default_backend() -> str:
+    requested = os.environ.get("IWAC_JSON_BACKEND", "auto").strip().lower()
+    if requested in _ENCODERS:
+        return requested
+    for name in ("orjson", "msgspec", "json"):
+        if name in _ENCODERS:
+            return name
+    return "json"
+
+
+_BACKEND = _default_backend()
+
+
+def get_backend() -> str:
+    return _BACKEND
+
+
+def set_backend(name: str) -> str:
+    """Select a backend by name ('auto' picks the fastest installed). Returns the active one."""
+    global _BACKEND
+    if name == "auto":
+        _BACKEND = next(n for n in ("orjson", "msgspec", "json") if n in _ENCODERS)
+    elif name in _ENCODERS:
+        _BACKEND = name
+    else:
+        raise ValueError(f"JSON backend {name!r} is not available (installed: {', '.join(_ENCODERS)})")
+    return _BACKEND
+
+
+def dumps(obj: Any, *, compact: bool = False) -> bytes:
+    """Encode a whole document with the active backend."""
+    return _ENCODERS[_BACKEND](obj, compact)
+
+
+def _iter_chunks(obj: Any, compact: bool, depth: int, level: int, encode: Encoder) -> Iterator[bytes]:
+    """Yield the encoding of obj piecewise, identical to encode(obj) as a whole."""
+    if depth <= 0 or not isinstance(obj, (dict, list, tuple)) or not obj:
+        buf = encode(obj, compact)
+        if not compact and level:
+            buf = buf.replace(b"\n", b"\n" + b"  " * level)
+        yield buf
+        return
+
+    is_dict = isinstance(obj, dict)
+    open_, close = (b"{", b"}") if is_dict else (b"[", b"]")
+    if compact:
+        sep, key_sep, first, last = b",", b":", b"", b""
+    else:
+        inner = b"\n" + b"  " * (level + 1)
+        sep, key_sep, first, last = b"," + inner, b": ", inner, b"\n" + b"  " * level
+    yield open_ + first
+    items: Iterable[Any] = obj.items() if is_dict else obj
+    for i, item in enumerate(items):
+        if i:
+            yield sep
+        if is_dict:
+            key, value = item
+            yield encode(key if isinstance(key, str) else _key_str(key), True) + key_sep
+        else:
+            value = item
+        yield from _iter_chunks(value, compact, depth - 1, level + 1, encode)
+    yield last + close
+
+
+def _key_str(key: Any) -> str:
+    # Same coercion as the stdlib encoder for non-string keys
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, float):
+        return repr(key)
+    return str(key)
+
+
+def write_json(path: Path, data: Any, *, compact: bool = False) -> None:
+    """Write data to path (creating parents), streaming top-level containers."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encode = _ENCODERS[_BACKEND]
+    with path.open("wb", buffering=WRITE_BUFFER) as f:
+        for chunk in _iter_chunks(data, compact, STREAM_DEPTH, 0, encode):
+            f.write(chunk)
+    record_output(path)
+
+
+class JsonArrayWriter:
+    """Incrementally writes a top-level JSON array, one item at a time.
+
+    The bytes are identical to write_json(path, list_of_items) in the same mode.
+    """
+
+    def __init__(self, f: BinaryIO, *, compact: bool = False) -> None:
+        self._f = f
+        self._compact = compact
+        self._encode = _ENCODERS[_BACKEND]
+        self.count = 0
+
+    def write(self, item: Any) -> None:
+        if self.count == 0:
+            self._f.write(b"[" if self._compact else b"[\n  ")
+        else:
+            self._f.write(b"," if self._compact else b",\n  ")
+        buf = self._encode(item, self._compact)
+        if not self._compact:
+            buf = buf.replace(b"\n", b"\n  ")
+        self._f.write(buf)
+        self.count += 1
+
+    def write_many(self, items: List[Any]) -> None:
+        """Write a batch of items with one encoder call (same bytes as write() per item)."""
+        if not items:
+            return
+        buf = self._encode(list(items), self._compact)
+        if self._compact:
+            body, lead = buf[1:-1], (b"[" if self.count == 0 else b",")
+        else:
+            body, lead = buf[4:-2], (b"[\n  " if self.count == 0 else b",\n  ")  # drop "[\n  " and "\n]"
+        self._f.write(lead)
+        self._f.write(body)
+        self.count += len(items)
+
+    def close(self) -> None:
+        if self.count == 0:
+            self._f.write(b"[]")
+        else:
+            self._f.write(b"]" if self._compact else b"\n]")
+
+
+@contextmanager
+def open_json_array(path: Path, *, compact: bool = False) -> Iterator[JsonArrayWriter]:
+    """Context manager yielding a JsonArrayWriter bound to path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb", buffering=WRITE_BUFFER) as f:
+        writer = JsonArrayWriter(f, compact=compact)
+        yield writer
+        writer.close()
+    record_output(path)
+
+
+def write_jsonl(path: Path, rows: Iterable[Any]) -> int:
+    """Write one compact JSON document per line; returns the number of rows."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encode = _ENCODERS[_BACKEND]
+    n = 0
+    with path.open("wb", buffering=WRITE_BUFFER) as f:
+        for row in rows:
+            f.write(encode(row, True))
+            f.write(b"\n")
+            n += 1
+    record_output(path)
+    return n
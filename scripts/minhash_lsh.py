@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+MinHash signatures and LSH banding over sets of article ids, for "related entities by
+article footprint" without comparing every pair of entities.
+
+- MinHash: signature[i] = min over the set of h_i(x), h_i(x) = (a_i * x + b_i) mod P with
+  P = 2^31 - 1 and x the article id (integer ids as is, other ids via crc32). For two sets
+  Pr[sig_A[i] == sig_B[i]] = Jaccard(A, B), so the fraction of equal components is an
+  unbiased estimate with standard error sqrt(J (1 - J) / num_perm).
+- LSH: the first bands * rows components are cut into `bands` bands of `rows`; entities
+  whose band values are identical in at least one band become candidates. A pair with
+  Jaccard s is a candidate with probability 1 - (1 - s^rows)^bands, an S-curve around
+  (1 / bands)^(1 / rows); `optimal_bands` picks bands/rows minimising the weighted false
+  positive and false negative areas around a target threshold. False positives only
+  cost an extra signature comparison, so the default weighting favours recall.
+- Buckets are bounded: in a bucket with more than `max_bucket` members (typically many
+  entities that share one rare article and so have identical signatures) each entity
+  only takes the `max_bucket` members around it in bucket order. Work per entity is at
+  most bands * max_bucket candidates, so the whole query is O(n * bands * max_bucket)
+  rather than O(n^2).
+
+Signatures and queries are independent per entity, so both run over entity shards
+(contiguous ranges of entity positions) in a process pool (forked workers sharing the
+postings / signature arrays; in-process where fork is unavailable).
+
+numpy is required (`HAS_NUMPY`).
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+    HAS_NUMPY = True
+except Exception:  # pragma: no cover - optional, validated at runtime
+    HAS_NUMPY = False
+
+PRIME = (1 << 31) - 1
+DEFAULT_NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_FP_WEIGHT = 0.1  # missing a similar pair costs more than scoring an extra candidate
+DEFAULT_MAX_BUCKET = 64
+HASH_BLOCK = 1 << 22  # permutations x postings evaluated per numpy block
+
+
+def require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise RuntimeError("numpy is required for MinHash/LSH. Please install: pip install numpy")
+
+
+def article_hash(article_id: str) -> int:
+    """Article id as an integer in [0, P)."""
+    value = int(article_id) if article_id.isdigit() else zlib.crc32(article_id.encode('utf-8'))
+    return value % PRIME
+
+
+def optimal_bands(num_perm: int, threshold: float, fp_weight: float = DEFAULT_FP_WEIGHT) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows <= num_perm minimising the weighted FP/FN areas."""
+    require_numpy()
+    best: Tuple[float, int, int] = (math.inf, 1, num_perm)
+    trapezoid = getattr(np, 'trapezoid', None) or np.trapz  # numpy < 2.0
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = trapezoid(1 - (1 - below ** rows) ** bands, below)
+            fn = trapezoid((1 - above ** rows) ** bands, above)
+            error = fp_weight * fp + (1 - fp_weight) * fn
+            if error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+# ---- shard pool ----
+
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(state: Dict[str, Any]) -> None:
+    _WORKER_STATE.update(state)
+
+
+def _run_shard(task: Tuple[Callable[..., Any], int, int]) -> Any:
+    fn, lo, hi = task
+    return fn(_WORKER_STATE, lo, hi)
+
+
+def map_shards(
+    fn: Callable[[Dict[str, Any], int, int], Any],
+    state: Dict[str, Any],
+    n: int,
+    *,
+    shard_size: int,
+    workers: int = 1,
+) -> List[Any]:
+    """fn(state, lo, hi) over entity ranges [lo, hi), in order."""
+    ranges = [(lo, min(lo + shard_size, n)) for lo in range(0, n, max(1, shard_size))]
+    # Forked workers inherit `state`; build scripts are module-level, so spawning a worker
+    # would re-run them. Without fork the shards run in-process.
+    if workers > 1 and len(ranges) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(state,)) as pool:
+            return list(pool.map(_run_shard, [(fn, lo, hi) for lo, hi in ranges]))
+    return [fn(state, lo, hi) for lo, hi in ranges]
+
+
+# ---- signatures ----
+
+def _signature_shard(state: Dict[str, Any], lo: int, hi: int):
+    values, offsets, a, b = state['values'], state['offsets'], state['a'], state['b']
+    start, end = int(offsets[lo]), int(offsets[hi])
+    chunk = values[start:end]
+    starts = offsets[lo:hi] - start
+    out = np.empty((hi - lo, len(a)), dtype=np.uint32)
+    step = max(1, HASH_BLOCK // max(1, len(chunk)))
+    for p in range(0, len(a), step):
+        h = (a[p:p + step, None] * chunk[None, :] + b[p:p + step, None]) % PRIME
+        out[:, p:p + step] = np.minimum.reduceat(h, starts, axis=1).T
+    return out
+
+
+def minhash_signatures(
+    postings: Sequence[Sequence[str]],
+    *,
+    num_perm: int = DEFAULT_NUM_PERM,
+    seed: int = 0,
+    workers: int = 1,
+    shard_size: int = 1024,
+):
+    """(n, num_perm) uint32 signatures of non-empty article id sets."""
+    require_numpy()
+    if any(len(p) == 0 for p in postings):
+        raise ValueError("MinHash needs non-empty sets")
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in postings])
+    values = np.fromiter((article_hash(x) for p in postings for x in p), dtype=np.uint64, count=int(offsets[-1]))
+    state = {'values': values, 'offsets': offsets, 'a': a, 'b': b}
+    parts = map_shards(_signature_shard, state, len(postings), shard_size=shard_size, workers=workers)
+    return np.concatenate(parts) if parts else np.empty((0, num_perm), dtype=np.uint32)
+
+
+# ---- LSH index and queries ----
+
+@dataclass
+class LSHIndex:
+    """Per band: entity positions sorted by band key, and each entity's place in that order."""
+
+    bands: int
+    rows: int
+    order: Any      # (bands, n) entity positions grouped by equal band key
+    position: Any   # (bands, n) index of each entity in `order`
+    group_start: Any  # (bands, n) first index of the entity's bucket in `order`
+    group_end: Any    # (bands, n) one past the last index of the bucket
+
+    def bucket_sizes(self):
+        return self.group_end - self.group_start
+
+
+def build_lsh(signatures, bands: int, rows: int, *, seed: int = 0) -> LSHIndex:
+    require_numpy()
+    n = signatures.shape[0]
+    if bands * rows > signatures.shape[1]:
+        raise ValueError(f"bands * rows ({bands * rows}) exceeds num_perm ({signatures.shape[1]})")
+    mix = np.random.default_rng(seed + 1).integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+    order = np.empty((bands, n), dtype=np.int64)
+    position = np.empty((bands, n), dtype=np.int64)
+    group_start = np.empty((bands, n), dtype=np.int64)
+    group_end = np.empty((bands, n), dtype=np.int64)
+    idx = np.arange(n)
+    for band in range(bands):
+        # Band key: the band's rows mixed into one uint64 (wrapping); collisions only add candidates
+        cols = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (cols * mix).sum(axis=1, dtype=np.uint64)
+        o = np.argsort(keys, kind='stable')
+        sorted_keys = keys[o]
+        boundary = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], boundary))
+        ends = np.concatenate((boundary, [n]))
+        group = np.repeat(np.arange(len(starts)), ends - starts)
+        order[band] = o
+        position[band, o] = idx
+        group_start[band, o] = starts[group]
+        group_end[band, o] = ends[group]
+    return LSHIndex(bands, rows, order, position, group_start, group_end)
+
+
+def candidates(index: LSHIndex, i: int, max_bucket: int = DEFAULT_MAX_BUCKET):
+    """Distinct candidate positions for entity i (excluding i)."""
+    half = max_bucket // 2
+    parts = []
+    for band in range(index.bands):
+        s, e = index.group_start[band, i], index.group_end[band, i]
+        if e - s <= 1:
+            continue
+        if e - s > max_bucket:
+            s = min(max(s, index.position[band, i] - half), e - max_bucket)
+            e = s + max_bucket
+        parts.append(index.order[band, s:e])
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    found = np.unique(np.concatenate(parts))
+    return found[found != i]
+
+
+def _query_shard(state: Dict[str, Any], lo: int, hi: int) -> List[List[Tuple[int, float]]]:
+    sig, index, top_k, max_bucket, min_jaccard = (
+        state['signatures'], state['index'], state['top_k'], state['max_bucket'], state['min_jaccard'])
+    out: List[List[Tuple[int, float]]] = []
+    for i in range(lo, hi):
+        cand = candidates(index, i, max_bucket)
+        if len(cand) == 0:
+            out.append([])
+            continue
+        est = (sig[cand] == sig[i]).mean(axis=1)
+        keep = est >= min_jaccard
+        cand, est = cand[keep], est[keep]
+        if len(cand) > top_k:
+            sel = np.argpartition(-est, top_k - 1)[:top_k]
+            cand, est = cand[sel], est[sel]
+        ranked = sorted(zip(cand.tolist(), est.tolist()), key=lambda t: (-t[1], t[0]))
+        out.append(ranked)
+    return out
+
+
+def top_k_similar(
+    signatures,
+    index: LSHIndex,
+    *,
+    top_k: int = 10,
+    max_bucket: int = DEFAULT_MAX_BUCKET,
+    min_jaccard: float = 0.0,
+    workers: int = 1,
+    shard_size: int = 1024,
+) -> List[List[Tuple[int, float]]]:
+    """Per entity: up to top_k (position, estimated Jaccard) among its LSH candidates."""
+    state = {'signatures': signatures, 'index': index, 'top_k': top_k,
+             'max_bucket': max_bucket, 'min_jaccard': max(min_jaccard, 1e-12)}
+    parts = map_shards(_query_shard, state, signatures.shape[0], shard_size=shard_size, workers=workers)
+    return [row for part in parts for row in part]
+
+
+# ---- validation ----
+
+def exact_jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def estimate_check(
+    postings: Sequence[Sequence[str]],
+    signatures,
+    results: List[List[Tuple[int, float]]],
+    *,
+    sample: int = 200,
+    top_k: int = 10,
+    threshold: float = 0.0,
+    index: Optional[LSHIndex] = None,
+    max_bucket: int = DEFAULT_MAX_BUCKET,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Estimate error and top-K recall against exact Jaccard on a sample of entities.
+
+    - estimate error: |estimate - exact| over the sampled entities' reported neighbours
+    - recallAtK: share of each sampled entity's exact top-K with Jaccard >= threshold
+      (found by scanning every entity that shares an article with it; ties at the K-th
+      value all count) that the LSH top-K contains; pairs below the LSH threshold are
+      only found by chance, so they are not counted against it
+    - candidateRecall (with `index`): share of the sampled entities' pairs with Jaccard
+      >= threshold that LSH proposes as candidates, before the top-K cut
+    """
+    require_numpy()
+    n = len(postings)
+    if n == 0:
+        return {'sampled': 0}
+    rng = np.random.default_rng(seed)
+    picked = sorted(rng.choice(n, size=min(sample, n), replace=False).tolist())
+    sets = [set(p) for p in postings]
+    by_article: Dict[str, List[int]] = {}
+    for pos, s in enumerate(sets):
+        for aid in s:
+            by_article.setdefault(aid, []).append(pos)
+
+    errors: List[float] = []
+    recalls: List[float] = []
+    true_pairs = found_pairs = 0
+    num_perm = signatures.shape[1]
+    for i in picked:
+        for j, est in results[i]:
+            errors.append(abs(est - exact_jaccard(sets[i], sets[j])))
+        overlapping = {j for aid in sets[i] for j in by_article[aid] if j != i}
+        exact = sorted(((exact_jaccard(sets[i], sets[j]), j) for j in overlapping), key=lambda t: (-t[0], t[1]))
+        exact = [(jac, j) for jac, j in exact if jac >= threshold]
+        if index is not None and exact:
+            proposed = set(candidates(index, i, max_bucket).tolist())
+            true_pairs += len(exact)
+            found_pairs += sum(1 for _jac, j in exact if j in proposed)
+        # Ties at the K-th value make any of the tied entities a correct answer
+        if exact:
+            kth = exact[min(top_k, len(exact)) - 1][0]
+            truth = {j for jac, j in exact if jac >= kth}
+            found = {j for j, _est in results[i]}
+            want = min(top_k, len(exact))
+            recalls.append(min(len(found & truth), want) / want)
+    err = np.array(errors) if errors else np.zeros(1)
+    return {
+        'sampled': len(picked),
+        'pairsChecked': len(errors),
+        'meanAbsError': round(float(err.mean()), 4),
+        'p95AbsError': round(float(np.percentile(err, 95)), 4),
+        'maxAbsError': round(float(err.max()), 4),
+        # worst-case standard error of a single estimate (J = 0.5)
+        'expectedStdError': round(math.sqrt(0.25 / num_perm), 4),
+        'recallAtK': round(float(np.mean(recalls)), 4) if recalls else None,
+        'recallEntities': len(recalls),
+        'candidateRecall': round(found_pairs / true_pairs, 4) if true_pairs else None,
+    }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Node centrality for the co-occurrence networks, computed on the CSR adjacency
+(network_csr.py) so the client never has to run graph algorithms.
+
+- pagerank:     weighted PageRank by power iteration on the sparse transition matrix
+- core_numbers: k-core number (unweighted), Batagelj-Zaversnik bucket algorithm, O(m)
+- betweenness:  shortest-path (hop) betweenness, normalised like networkx for undirected
+                graphs. Brandes' algorithm in algebraic form: a batch of sources is
+                expanded level by level with one sparse matrix product per level (path
+                counts forward, dependencies backward). With `samples` < n the sources
+                are a uniform sample and the sum is scaled by n / samples; batches run
+                in a process pool (forked workers; in-process where fork is unavailable).
+
+Sampling error: for normalised betweenness, each sampled source contributes a term in
+[0, n / (n - 1)], so by Hoeffding's inequality and a union bound over the n nodes
+    max_v |estimate(v) - exact(v)| <= n / (n - 1) * sqrt(ln(2n / delta) / (2 * samples))
+with probability at least 1 - delta (`betweenness_error_bound`). `betweenness_check`
+measures the actual error against exact betweenness, which is affordable on small graphs.
+
+numpy and scipy are optional: without them only core numbers are available
+(`HAS_SPARSE` tells callers which metrics can be computed).
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from network_csr import CSRAdjacency
+
+try:
+    import numpy as np  # type: ignore
+    import scipy.sparse as sp  # type: ignore
+    HAS_SPARSE = True
+except Exception:  # pragma: no cover - optional, validated at runtime
+    HAS_SPARSE = False
+
+DEFAULT_DAMPING = 0.85
+DEFAULT_BATCH = 64  # sources expanded together per sparse product
+DEFAULT_DELTA = 0.05
+
+
+def require_sparse() -> None:
+    if not HAS_SPARSE:
+        raise RuntimeError("numpy and scipy are required for PageRank/betweenness. Please install: pip install scipy")
+
+
+def _matrix(csr: CSRAdjacency, weighted: bool):
+    n = len(csr.node_ids)
+    offsets = np.frombuffer(csr.offsets, dtype=np.uint32).astype(np.int64)
+    indices = np.frombuffer(csr.indices, dtype=np.uint32).astype(np.int64)
+    if weighted:
+        data = np.frombuffer(csr.weights, dtype=np.uint32).astype(np.float64)
+    else:
+        data = np.ones(len(indices), dtype=np.float64)
+    return sp.csr_matrix((data, indices, offsets), shape=(n, n))
+
+
+# ------------------ PageRank ------------------
+def pagerank(
+    csr: CSRAdjacency,
+    damping: float = DEFAULT_DAMPING,
+    tol: float = 1e-10,
+    max_iter: int = 200,
+) -> List[float]:
+    """Weighted PageRank (sums to 1); isolated nodes redistribute uniformly."""
+    require_sparse()
+    n = len(csr.node_ids)
+    if n == 0:
+        return []
+    A = _matrix(csr, weighted=True)
+    strength = np.asarray(A.sum(axis=1)).ravel()
+    dangling = strength == 0
+    inv = np.divide(1.0, strength, out=np.zeros(n), where=~dangling)
+    # x_{t+1} = d * (A^T (x / s) + dangling mass / n) + (1 - d) / n
+    At = A.T.tocsr()
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        nxt = damping * (At @ (x * inv) + x[dangling].sum() / n) + (1.0 - damping) / n
+        if np.abs(nxt - x).sum() < tol:
+            x = nxt
+            break
+        x = nxt
+    return (x / x.sum()).tolist()
+
+
+# ------------------ k-core ------------------
+def core_numbers(csr: CSRAdjacency) -> List[int]:
+    """k-core number of every node (Batagelj & Zaversnik 2003)."""
+    n = len(csr.node_ids)
+    offsets, indices = csr.offsets, csr.indices
+    deg = [offsets[i + 1] - offsets[i] for i in range(n)]
+    max_deg = max(deg, default=0)
+    # Bucket sort nodes by degree
+    bin_start = [0] * (max_deg + 2)
+    for d in deg:
+        bin_start[d + 1] += 1
+    for d in range(1, max_deg + 2):
+        bin_start[d] += bin_start[d - 1]
+    pos = [0] * n
+    order = [0] * n
+    fill = bin_start[:]
+    for v in range(n):
+        pos[v] = fill[deg[v]]
+        order[pos[v]] = v
+        fill[deg[v]] += 1
+    for i in range(n):
+        v = order[i]
+        for j in range(offsets[v], offsets[v + 1]):
+            u = indices[j]
+            if deg[u] > deg[v]:
+                du = deg[u]
+                pu = pos[u]
+                pw = bin_start[du]
+                w = order[pw]
+                if u != w:
+                    order[pu], order[pw] = w, u
+                    pos[u], pos[w] = pw, pu
+                bin_start[du] += 1
+                deg[u] -= 1
+    return deg
+
+
+# ------------------ Betweenness ------------------
+_WORKER_MATRIX = None
+
+
+def _init_worker(offsets: bytes, indices: bytes, n: int) -> None:
+    global _WORKER_MATRIX
+    off = np.frombuffer(offsets, dtype=np.uint32).astype(np.int64)
+    idx = np.frombuffer(indices, dtype=np.uint32).astype(np.int64)
+    _WORKER_MATRIX = sp.csr_matrix((np.ones(len(idx)), idx, off), shape=(n, n))
+
+
+def _brandes_batch(A, sources: Sequence[int]):
+    """Sum over `sources` of the Brandes dependencies delta_s(v)."""
+    n = A.shape[0]
+    b = len(sources)
+    cols = np.arange(b)
+    sigma = np.zeros((n, b))
+    depth = np.full((n, b), -1, dtype=np.int32)
+    sigma[sources, cols] = 1.0
+    depth[sources, cols] = 0
+    frontier = np.zeros((n, b))
+    frontier[sources, cols] = 1.0
+    level = 0
+    # Forward: shortest-path counts, one level of all BFS trees per product
+    while True:
+        reach = A @ frontier
+        new = (reach > 0) & (depth < 0)
+        if not new.any():
+            break
+        level += 1
+        depth[new] = level
+        sigma[new] = reach[new]
+        frontier = np.where(new, reach, 0.0)
+    # Backward: delta_v = sigma_v * sum_{w child of v} (1 + delta_w) / sigma_w
+    delta = np.zeros((n, b))
+    for d in range(level, 1, -1):
+        at_d = depth == d
+        w = np.where(at_d, (1.0 + delta) / np.where(at_d, sigma, 1.0), 0.0)
+        back = A @ w
+        parent = depth == d - 1
+        delta[parent] += sigma[parent] * back[parent]
+    return delta.sum(axis=1)
+
+
+def _brandes_task(sources: Sequence[int]):
+    return _brandes_batch(_WORKER_MATRIX, sources)
+
+
+def betweenness(
+    csr: CSRAdjacency,
+    samples: Optional[int] = None,
+    *,
+    seed: int = 0,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH,
+) -> List[float]:
+    """Normalised betweenness; exact when samples is None or >= n."""
+    require_sparse()
+    n = len(csr.node_ids)
+    if n < 3:
+        return [0.0] * n
+    if samples is None or samples >= n:
+        sources = list(range(n))
+    else:
+        sources = sorted(random.Random(seed).sample(range(n), max(1, samples)))
+    batches = [sources[i:i + batch_size] for i in range(0, len(sources), batch_size)]
+
+    total = np.zeros(n)
+    # Workers are forked: build_networks.py is a module-level script, so a spawned worker
+    # re-importing __main__ would rerun it. Without fork the batches run in-process.
+    if workers > 1 and len(batches) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        init = (bytes(csr.offsets), bytes(csr.indices), n)
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=init) as pool:
+            for part in pool.map(_brandes_task, batches):
+                total += part
+    else:
+        A = _matrix(csr, weighted=False)
+        for batch in batches:
+            total += _brandes_batch(A, batch)
+
+    # Every undirected pair is counted from both ends; scale samples to all sources
+    scale = (n / len(sources)) / ((n - 1) * (n - 2))
+    return (total * scale).tolist()
+
+
+def betweenness_error_bound(n: int, samples: int, delta: float = DEFAULT_DELTA) -> float:
+    """Hoeffding/union bound on the max absolute error of sampled normalised betweenness."""
+    if n < 3 or samples >= n:
+        return 0.0
+    return n / (n - 1) * math.sqrt(math.log(2 * n / delta) / (2 * samples))
+
+
+def betweenness_check(estimate: Sequence[float], exact: Sequence[float], top_k: int = 20) -> Dict[str, Any]:
+    """Empirical error of an estimate against exact betweenness."""
+    n = len(exact)
+    if n == 0:
+        return {'maxAbsError': 0.0, 'meanAbsError': 0.0, 'topKOverlap': 1.0}
+    errors = [abs(a - b) for a, b in zip(estimate, exact)]
+    k = min(top_k, n)
+    top_est = set(sorted(range(n), key=lambda i: -estimate[i])[:k])
+    top_exact = set(sorted(range(n), key=lambda i: -exact[i])[:k])
+    return {
+        'maxAbsError': max(errors),
+        'meanAbsError': sum(errors) / n,
+        'topK': k,
+        'topKOverlap': len(top_est & top_exact) / k,
+    }
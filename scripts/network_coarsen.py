@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Multi-level coarsening of the co-occurrence network (build_networks.py) for
+level-of-detail rendering: the client draws the coarsest level first and expands a
+supernode into its children from the next finer level on demand.
+
+Each level is built from the one below by heavy-edge matching on the CSR adjacency
+(network_csr.py): nodes are visited from the lowest degree up and paired with their
+heaviest still-unmatched neighbour, the weight divided by the neighbour's size in base
+nodes so a grown hub does not keep swallowing its neighbourhood. A node whose
+neighbours are all taken joins the heaviest neighbouring group that has fewer than
+`max_group` members, so the leaves around a hub collapse into it instead of surviving
+as singletons. Edge weights between groups are summed; edges inside a group become the
+supernode's `internal` weight.
+
+Coarsening stops at `target_nodes`, after `max_levels`, or when a level removes less
+than `min_reduction` of the nodes (the rest is disconnected or saturated).
+
+Output (networks/levels/):
+    manifest.json   {version, method, maxGroup, baseNodes, levels: [{level, file, nodes,
+                     edges, seconds, bytes}, ...]}   level 0 is global.json itself
+    nodes.json      {id, label, type, count, centrality}   the global.json nodes as
+                     parallel arrays, so expanding a level-1 supernode needs neither
+                     global.json nor its edges (the links come from global.csr.bin)
+    level_<k>.json  {level, nodes: {label, type, size, internal, strength, rep},
+                     edges: {source, target, weight},
+                     children: {offsets, index}}   parallel arrays
+`children` lists the level k-1 node indices merged into each supernode (level 0 indices
+are positions in global.json `nodes`); `rep` is the highest-priority base node of the
+supernode (its position in global.json) and lends the supernode its label and type;
+`size` counts base nodes.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from json_io import write_json
+from network_csr import CSRAdjacency, build_csr
+
+COARSEN_VERSION = 2  # 2: nodes.json
+DEFAULT_TARGET_NODES = 150
+DEFAULT_MAX_LEVELS = 8
+DEFAULT_MAX_GROUP = 8
+DEFAULT_MIN_REDUCTION = 0.05
+
+
+@dataclass
+class CoarseLevel:
+    level: int
+    groups: List[List[int]]  # level-1 node indices per supernode
+    rep: List[int]  # base node index per supernode
+    size: List[int]
+    internal: List[int]
+    strength: List[int]
+    source: List[int]
+    target: List[int]
+    weight: List[int]
+    seconds: float
+
+    @property
+    def nodes(self) -> int:
+        return len(self.groups)
+
+    @property
+    def edges(self) -> int:
+        return len(self.source)
+
+
+def heavy_edge_groups(
+    csr: CSRAdjacency,
+    max_group: int = DEFAULT_MAX_GROUP,
+    size: Optional[Sequence[int]] = None,
+) -> List[List[int]]:
+    """Partition the nodes by heavy-edge matching (plus absorption into matched neighbours).
+
+    A node pairs with the unmatched neighbour u maximising weight / size(u), or else joins
+    the neighbouring group g maximising weight / group_size(g), where sizes count base
+    nodes per supernode (all 1 without `size`), so a grown hub does not keep swallowing
+    its neighbourhood.
+    """
+    n = len(csr.node_ids)
+    offsets, indices, weights = csr.offsets, csr.indices, csr.weights
+    size = size or [1] * n
+    group = [-1] * n
+    groups: List[List[int]] = []
+    group_size: List[int] = []
+    for v in sorted(range(n), key=lambda i: (offsets[i + 1] - offsets[i], i)):
+        if group[v] >= 0:
+            continue
+        best, best_score = -1, 0.0
+        absorb, absorb_score = -1, 0.0
+        for j in range(offsets[v], offsets[v + 1]):
+            u = indices[j]
+            if u == v:
+                continue
+            g = group[u]
+            if g < 0:
+                score = weights[j] / size[u]
+                if score > best_score:
+                    best, best_score = u, score
+            elif len(groups[g]) < max_group:
+                score = weights[j] / group_size[g]
+                if score > absorb_score:
+                    absorb, absorb_score = g, score
+        if best >= 0:
+            group[v] = group[best] = len(groups)
+            groups.append([v, best])
+            group_size.append(size[v] + size[best])
+        elif absorb >= 0:
+            group[v] = absorb
+            groups[absorb].append(v)
+            group_size[absorb] += size[v]
+        else:
+            group[v] = len(groups)
+            groups.append([v])
+            group_size.append(size[v])
+    return groups
+
+
+def contract(
+    csr: CSRAdjacency,
+    groups: List[List[int]],
+    key: Sequence[int],
+) -> Tuple[List[List[int]], List[int], List[Tuple[int, int, int]]]:
+    """Order groups by their smallest `key` (base priority) and sum the edges between them.
+
+    Returns (groups, internal weight per group, [(s, t, weight)] heaviest first).
+    """
+    groups = sorted((sorted(g, key=lambda i: key[i]) for g in groups), key=lambda g: key[g[0]])
+    parent = [0] * len(csr.node_ids)
+    for gi, members in enumerate(groups):
+        for v in members:
+            parent[v] = gi
+    internal = [0] * len(groups)
+    summed: Dict[Tuple[int, int], int] = {}
+    offsets, indices, weights = csr.offsets, csr.indices, csr.weights
+    for v in range(len(csr.node_ids)):
+        gv = parent[v]
+        for j in range(offsets[v], offsets[v + 1]):
+            u = indices[j]
+            if u <= v:  # each undirected edge once
+                continue
+            gu = parent[u]
+            if gu == gv:
+                internal[gv] += weights[j]
+            else:
+                pair = (gv, gu) if gv < gu else (gu, gv)
+                summed[pair] = summed.get(pair, 0) + weights[j]
+    edges = sorted(((s, t, w) for (s, t), w in summed.items()), key=lambda e: (-e[2], e[0], e[1]))
+    return groups, internal, edges
+
+
+def coarsen(
+    csr: CSRAdjacency,
+    *,
+    target_nodes: int = DEFAULT_TARGET_NODES,
+    max_levels: int = DEFAULT_MAX_LEVELS,
+    max_group: int = DEFAULT_MAX_GROUP,
+    min_reduction: float = DEFAULT_MIN_REDUCTION,
+) -> List[CoarseLevel]:
+    """Levels 1..L above the base graph (node i of `csr` has priority i)."""
+    levels: List[CoarseLevel] = []
+    rep = list(range(len(csr.node_ids)))
+    size = [1] * len(rep)
+    internal = [0] * len(rep)
+    while len(levels) < max_levels and len(csr.node_ids) > target_nodes:
+        started = time.perf_counter()
+        groups, inner, edges = contract(csr, heavy_edge_groups(csr, max_group, size), rep)
+        if len(groups) > len(csr.node_ids) * (1 - min_reduction):
+            break
+        rep = [rep[g[0]] for g in groups]
+        size = [sum(size[v] for v in g) for g in groups]
+        internal = [w + sum(internal[v] for v in g) for g, w in zip(groups, inner)]
+        strength = [0] * len(groups)
+        for s, t, w in edges:
+            strength[s] += w
+            strength[t] += w
+        csr = build_csr([str(i) for i in range(len(groups))],
+                        [{'source': str(s), 'target': str(t), 'weight': w} for s, t, w in edges])
+        levels.append(CoarseLevel(
+            level=len(levels) + 1, groups=groups, rep=rep, size=size, internal=internal, strength=strength,
+            source=[e[0] for e in edges], target=[e[1] for e in edges], weight=[e[2] for e in edges],
+            seconds=time.perf_counter() - started,
+        ))
+    return levels
+
+
+def write_levels(
+    out_dir: Path,
+    levels: List[CoarseLevel],
+    base_nodes: Sequence[Dict[str, Any]],
+    base_edges: int,
+    *,
+    max_group: int = DEFAULT_MAX_GROUP,
+) -> Dict[str, Any]:
+    """Write level_<k>.json files, nodes.json and the manifest; stale level files are removed."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob('level_*.json'):
+        old.unlink()
+    write_json(out_dir / 'nodes.json', {
+        field: [n.get(field, default) for n in base_nodes]
+        for field, default in (('id', ''), ('label', ''), ('type', ''), ('count', 0), ('centrality', 0))
+    }, compact=True)
+    entries: List[Dict[str, Any]] = [
+        {'level': 0, 'file': '../global.json', 'nodes': len(base_nodes), 'edges': base_edges},
+    ]
+    for lv in levels:
+        offsets = [0]
+        index: List[int] = []
+        for members in lv.groups:
+            index.extend(members)
+            offsets.append(len(index))
+        path = out_dir / f'level_{lv.level}.json'
+        write_json(path, {
+            'level': lv.level,
+            'nodes': {
+                'label': [base_nodes[r].get('label', '') for r in lv.rep],
+                'type': [base_nodes[r].get('type', '') for r in lv.rep],
+                'size': lv.size,
+                'internal': lv.internal,
+                'strength': lv.strength,
+                'rep': lv.rep,
+            },
+            'edges': {'source': lv.source, 'target': lv.target, 'weight': lv.weight},
+            'children': {'offsets': offsets, 'index': index},
+        }, compact=True)
+        entries.append({
+            'level': lv.level, 'file': path.name, 'nodes': lv.nodes, 'edges': lv.edges,
+            'seconds': round(lv.seconds, 4), 'bytes': path.stat().st_size,
+        })
+    manifest = {
+        'version': COARSEN_VERSION,
+        'method': 'heavy-edge-matching',
+        'maxGroup': max_group,
+        'baseNodes': 'nodes.json',
+        'levels': entries,
+    }
+    write_json(out_dir / 'manifest.json', manifest, compact=True)
+    return manifest
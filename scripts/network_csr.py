@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Compressed-sparse-row adjacency for the co-occurrence networks (build_networks.py).
+
+Node i is the i-th entry of global.json `nodes`. The neighbours of node i are
+    indices[offsets[i]:offsets[i + 1]]
+sorted by weight (descending, ties by neighbour index), with the parallel arrays
+`weights` (edge weight) and `edges` (index into global.json `edges`, for articleIds).
+Every undirected edge is stored in both directions, so top-k neighbours and 1/2-hop
+ego networks are O(degree) lookups without scanning the edge list.
+
+Binary layout (networks/global.csr.bin, little-endian uint32 throughout, so the client
+can view each section as a Uint32Array without copying):
+    magic "CSR1" | node count n | entry count m | reserved
+    offsets[n + 1] | indices[m] | weights[m] | edges[m]
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"CSR1"
+HEADER_WORDS = 4  # magic, n, m, reserved
+
+
+def _u32(values: Iterable[int] = ()) -> array:
+    return array("I", values)
+
+
+@dataclass
+class CSRAdjacency:
+    node_ids: List[str]
+    offsets: array
+    indices: array  # neighbour node indices
+    weights: array
+    edges: array
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self._index:
+            self._index = {nid: i for i, nid in enumerate(self.node_ids)}
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        return self._index.get(node_id)
+
+    def degree(self, node_id: str) -> int:
+        i = self._index.get(node_id)
+        return 0 if i is None else self.offsets[i + 1] - self.offsets[i]
+
+    def neighbors(self, node_id: str, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Up to k strongest neighbours of a node as (node id, weight); all when k is None."""
+        i = self._index.get(node_id)
+        if i is None:
+            return []
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        if k is not None:
+            hi = min(hi, lo + max(0, k))
+        return [(self.node_ids[self.indices[j]], self.weights[j]) for j in range(lo, hi)]
+
+    def ego_network(self, node_id: str, hops: int = 1, k: Optional[int] = None) -> Dict[str, Any]:
+        """Nodes within `hops` of node_id (following each node's top-k neighbours) and the
+        edges among them, as {'nodes': [id, ...], 'edges': [edge index, ...]}."""
+        start = self._index.get(node_id)
+        if start is None:
+            return {'nodes': [], 'edges': []}
+        seen = {start}
+        order = [start]
+        frontier = [start]
+        for _ in range(max(0, hops)):
+            nxt = []
+            for i in frontier:
+                lo, hi = self.offsets[i], self.offsets[i + 1]
+                if k is not None:
+                    hi = min(hi, lo + max(0, k))
+                for j in range(lo, hi):
+                    nb = self.indices[j]
+                    if nb not in seen:
+                        seen.add(nb)
+                        order.append(nb)
+                        nxt.append(nb)
+            frontier = nxt
+        # Induced edges: each is stored twice, keep it from its lower-index endpoint
+        edge_ids = [
+            self.edges[j]
+            for i in order
+            for j in range(self.offsets[i], self.offsets[i + 1])
+            if self.indices[j] in seen and i < self.indices[j]
+        ]
+        return {'nodes': [self.node_ids[i] for i in order], 'edges': sorted(edge_ids)}
+
+
+def build_csr(node_ids: Sequence[str], edges: Sequence[Dict[str, Any]]) -> CSRAdjacency:
+    """CSR adjacency of an undirected edge list ({source, target, weight}) over node_ids."""
+    index = {nid: i for i, nid in enumerate(node_ids)}
+    n = len(node_ids)
+    rows: List[List[Tuple[int, int, int]]] = [[] for _ in range(n)]  # (-weight, neighbour, edge)
+    for e_idx, e in enumerate(edges):
+        s, t, w = index[e['source']], index[e['target']], int(e['weight'])
+        rows[s].append((-w, t, e_idx))
+        rows[t].append((-w, s, e_idx))
+
+    offsets = _u32([0])
+    indices, weights, edge_ref = _u32(), _u32(), _u32()
+    for row in rows:
+        row.sort()
+        for neg_w, nb, e_idx in row:
+            indices.append(nb)
+            weights.append(-neg_w)
+            edge_ref.append(e_idx)
+        offsets.append(len(indices))
+    return CSRAdjacency(list(node_ids), offsets, indices, weights, edge_ref, index)
+
+
+
+def reorder_csr(csr: CSRAdjacency, node_ids: Sequence[str]) -> CSRAdjacency:
+    """The same adjacency over a permutation of its nodes (e.g. after sorting global.json
+    nodes), without going back to the edge list; equal to build_csr over node_ids."""
+    new_index = {nid: i for i, nid in enumerate(node_ids)}
+    if len(new_index) != len(csr.node_ids) or any(nid not in new_index for nid in csr.node_ids):
+        raise ValueError("node_ids must be a permutation of the adjacency's nodes")
+    remap = [new_index[nid] for nid in csr.node_ids]
+    offsets = _u32([0])
+    indices, weights, edge_ref = _u32(), _u32(), _u32()
+    for nid in node_ids:
+        old = csr.index_of(nid)
+        lo, hi = csr.offsets[old], csr.offsets[old + 1]
+        row = sorted((-csr.weights[j], remap[csr.indices[j]], csr.edges[j]) for j in range(lo, hi))
+        for neg_w, nb, e_idx in row:
+            indices.append(nb)
+            weights.append(-neg_w)
+            edge_ref.append(e_idx)
+        offsets.append(len(indices))
+    return CSRAdjacency(list(node_ids), offsets, indices, weights, edge_ref, new_index)
+
+def _little_endian(arr: array) -> array:
+    if sys.byteorder == "little":
+        return arr
+    swapped = array(arr.typecode, arr)
+    swapped.byteswap()
+    return swapped
+
+
+def write_csr(path: Path, csr: CSRAdjacency) -> int:
+    """Write the binary layout; returns bytes written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = _u32([len(csr.node_ids), len(csr.indices), 0])
+    with path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(_little_endian(header).tobytes())
+        for arr in (csr.offsets, csr.indices, csr.weights, csr.edges):
+            f.write(_little_endian(arr).tobytes())
+    return path.stat().st_size
+
+
+def load_csr(path: Path, node_ids: Sequence[str]) -> CSRAdjacency:
+    """Read a binary CSR file; node_ids are the global.json node ids in file order."""
+    data = path.read_bytes()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a CSR adjacency file")
+    words = _little_endian(array("I", data[4:]))
+    n, m = words[0], words[1]
+    if n != len(node_ids):
+        raise ValueError(f"{path} has {n} nodes, expected {len(node_ids)}")
+    pos = HEADER_WORDS - 1
+    sections = []
+    for size in (n + 1, m, m, m):
+        sections.append(words[pos:pos + size])
+        pos += size
+    return CSRAdjacency(list(node_ids), *sections)
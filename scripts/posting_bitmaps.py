@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Compressed bitmap posting lists over dense article ordinals.
+
+Articles get ordinals 0..n-1 in publication order (date, then id; undated first), so a
+year or date range is a contiguous ordinal range. Every entity, entity type, article
+country and newspaper has a Bitmap of the ordinals of the articles it covers, and
+combined filters are bitmap algebra:
+
+    idx = PostingIndex.load(path)   # or PostingIndex.build(articles, entities)
+    hits = idx.country('Burkina Faso') & idx.entity('organization:123') & idx.years(1990, 2000)
+    hits -= idx.entity('person:45')            # AND NOT
+    idx.article_ids_of(hits)                   # -> ['14551', ...]
+
+In memory a Bitmap is a Python int used as a bitset (AND/OR/ANDNOT run in C over
+machine words). The serialised form is roaring-style: ordinals are split into chunks of
+2^16 by their high 16 bits, and each chunk is stored as whichever container is smallest:
+    array   sorted uint16 low bits           (2 bytes per member)
+    bitmap  8192-byte bitset                 (dense chunks)
+    run     (start, length - 1) uint16 pairs (contiguous ranges, e.g. years)
+
+Bitmap bytes (little-endian):
+    uint16 container count, then per container:
+    uint16 key | uint8 kind (0 array, 1 bitmap, 2 run) | uint16 count - 1 | payload
+where count is the cardinality for array/bitmap containers and the number of runs for
+run containers.
+
+File layout (postings/bitmaps.bin):
+    magic "IWPB" | uint32 version | uint32 header length | header JSON (utf-8) | bitmaps
+The header JSON holds:
+    articleIds   ordinal -> article id; signed deltas of the integer ids when
+                 articleIdEncoding is 'delta', plain strings when 'string'
+    undated      number of undated articles (ordinals 0..undated-1)
+    days         dated ordinals as flat [day delta, count, ...] runs, day = days since
+                 1970-01-01 (same day ordinal as the temporal index)
+    years        {year: [lo, hi)} ordinal ranges
+    postings     {kind: {keys: [...], lengths: [...]}}; bitmaps follow the header back to
+                 back in this order (kinds: entity, entityType, country, newspaper)
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import struct
+from datetime import date, timedelta
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"IWPB"
+VERSION = 1
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+BITMAP_CONTAINER_BYTES = CHUNK_SIZE // 8
+ARRAY, BITSET, RUN = 0, 1, 2
+EPOCH = date(1970, 1, 1)
+
+# entities/<stem>.json -> entity type used in entity keys ("person:123", as in networks)
+ENTITY_TYPES = {
+    'persons': 'person',
+    'organizations': 'organization',
+    'events': 'event',
+    'subjects': 'subject',
+    'locations': 'location',
+}
+KINDS = ('entity', 'entityType', 'country', 'newspaper')
+
+# Set-bit positions of every byte value, for iterating a bitset
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+
+class Bitmap:
+    """Set of article ordinals backed by an int bitset."""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> 'Bitmap':
+        ordinals = list(ordinals)
+        if not ordinals:
+            return cls()
+        buf = bytearray(max(ordinals) // 8 + 1)
+        for o in ordinals:
+            buf[o >> 3] |= 1 << (o & 7)
+        return cls(int.from_bytes(buf, 'little'))
+
+    @classmethod
+    def range(cls, lo: int, hi: int) -> 'Bitmap':
+        """Ordinals in [lo, hi)."""
+        return cls(((1 << (hi - lo)) - 1) << lo) if hi > lo else cls()
+
+    def __and__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap(self.bits & other.bits)
+
+    def __or__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap(self.bits | other.bits)
+
+    def __sub__(self, other: 'Bitmap') -> 'Bitmap':
+        """AND NOT."""
+        return Bitmap(self.bits & ~other.bits)
+
+    def __xor__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap(self.bits ^ other.bits)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __contains__(self, ordinal: int) -> bool:
+        return ordinal >= 0 and (self.bits >> ordinal) & 1 == 1
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Bitmap) and self.bits == other.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f'Bitmap(cardinality={len(self)})'
+
+    def __iter__(self) -> Iterator[int]:
+        data = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, 'little')
+        for i, byte in enumerate(data):
+            if byte:
+                base = i << 3
+                for b in _BYTE_BITS[byte]:
+                    yield base + b
+
+    def to_ordinals(self) -> List[int]:
+        return list(self)
+
+    # ---- roaring-style serialisation ----
+
+    def to_bytes(self) -> bytes:
+        out = [b'']
+        count = 0
+        bits, key = self.bits, 0
+        while bits:
+            chunk = bits & ((1 << CHUNK_SIZE) - 1)
+            if chunk:
+                out.append(_encode_container(key, chunk))
+                count += 1
+            bits >>= CHUNK_SIZE
+            key += 1
+        out[0] = struct.pack('<H', count)
+        return b''.join(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> 'Bitmap':
+        (count,) = struct.unpack_from('<H', data, offset)
+        pos = offset + 2
+        bits = 0
+        for _ in range(count):
+            key, kind, n = struct.unpack_from('<HBH', data, pos)
+            pos += 5
+            n += 1
+            if kind == ARRAY:
+                lows = struct.unpack_from(f'<{n}H', data, pos)
+                pos += 2 * n
+                chunk = Bitmap.from_ordinals(lows).bits
+            elif kind == BITSET:
+                chunk = int.from_bytes(data[pos:pos + BITMAP_CONTAINER_BYTES], 'little')
+                pos += BITMAP_CONTAINER_BYTES
+            elif kind == RUN:
+                pairs = struct.unpack_from(f'<{2 * n}H', data, pos)
+                pos += 4 * n
+                chunk = 0
+                for start, length in zip(pairs[::2], pairs[1::2]):
+                    chunk |= ((1 << (length + 1)) - 1) << start
+            else:
+                raise ValueError(f'unknown container kind {kind}')
+            bits |= chunk << (key << CHUNK_BITS)
+        return cls(bits)
+
+
+def _runs(chunk: int) -> List[Tuple[int, int]]:
+    """(start, length) runs of set bits in a chunk."""
+    runs = []
+    pos = 0
+    while chunk:
+        low = (chunk & -chunk).bit_length() - 1  # first set bit
+        chunk >>= low
+        pos += low
+        length = (~chunk & (chunk + 1)).bit_length() - 1  # trailing ones
+        runs.append((pos, length))
+        chunk >>= length
+        pos += length
+    return runs
+
+
+def _encode_container(key: int, chunk: int) -> bytes:
+    card = chunk.bit_count()
+    array_bytes = 2 * card
+    # Run starts are the set bits whose lower neighbour is clear; count them before
+    # walking the runs, which only pays off when the run container wins
+    run_bytes = 4 * (chunk & ~(chunk << 1)).bit_count()
+    if run_bytes < min(array_bytes, BITMAP_CONTAINER_BYTES):
+        runs = _runs(chunk)
+        payload = struct.pack(f'<{2 * len(runs)}H', *(v for s, l in runs for v in (s, l - 1)))
+        return struct.pack('<HBH', key, RUN, len(runs) - 1) + payload
+    if array_bytes <= BITMAP_CONTAINER_BYTES:
+        lows = list(Bitmap(chunk))
+        return struct.pack('<HBH', key, ARRAY, card - 1) + struct.pack(f'<{card}H', *lows)
+    return struct.pack('<HBH', key, BITSET, card - 1) + chunk.to_bytes(BITMAP_CONTAINER_BYTES, 'little')
+
+
+def _date_key(value: Any) -> str:
+    """YYYY-MM-DD (partial dates pinned to the start of the period); '' when unparseable."""
+    s = str(value or '').strip()[:10]
+    if len(s) == 4:
+        s = f'{s}-01-01'
+    elif len(s) == 7:
+        s = f'{s}-01'
+    try:
+        return date.fromisoformat(s).isoformat()
+    except ValueError:
+        return ''
+
+
+def _year(date_key: str) -> Optional[int]:
+    return int(date_key[:4]) if date_key else None
+
+
+def _encode_days(dates: List[str]) -> List[int]:
+    """Dated ordinals as flat [day delta, count, ...] runs (day = days since 1970-01-01)."""
+    out: List[int] = []
+    prev_day, prev_key = 0, None
+    for d in dates:
+        if not d:
+            continue
+        if d == prev_key:
+            out[-1] += 1
+            continue
+        day = (date.fromisoformat(d) - EPOCH).days
+        out += [day - prev_day, 1]
+        prev_day, prev_key = day, d
+    return out
+
+
+def _decode_days(runs: List[int], undated: int) -> List[str]:
+    dates = [''] * undated
+    day = 0
+    for delta, count in zip(runs[::2], runs[1::2]):
+        day += delta
+        dates += [(EPOCH + timedelta(days=day)).isoformat()] * count
+    return dates
+
+
+def _encode_ids(article_ids: List[str]) -> Tuple[str, List[Any]]:
+    """Integer ids as signed deltas in ordinal order; other ids as strings."""
+    if not all(a.isdigit() for a in article_ids):
+        return 'string', list(article_ids)
+    values = [int(a) for a in article_ids]
+    return 'delta', [v - prev for prev, v in zip([0] + values, values)]
+
+
+def _decode_ids(encoding: str, values: List[Any]) -> List[str]:
+    if encoding == 'string':
+        return [str(v) for v in values]
+    out, total = [], 0
+    for v in values:
+        total += v
+        out.append(str(total))
+    return out
+
+
+@dataclass
+class PostingIndex:
+    article_ids: List[str]
+    dates: List[str]  # ordinal -> YYYY-MM-DD key ('' when undated); non-decreasing
+    postings: Dict[str, Dict[str, Bitmap]]
+    year_ranges: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    _ordinal: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self._ordinal:
+            self._ordinal = {aid: i for i, aid in enumerate(self.article_ids)}
+        if not self.year_ranges:
+            for i, d in enumerate(self.dates):
+                y = _year(d)
+                if y is not None:
+                    lo, _ = self.year_ranges.get(y, (i, i))
+                    self.year_ranges[y] = (lo, i + 1)
+
+    # ---- construction ----
+
+    @classmethod
+    def build(cls, articles: List[Dict[str, Any]], entities: Dict[str, List[Dict[str, Any]]]) -> 'PostingIndex':
+        """Index articles.json rows and entities/<stem>.json records (by file stem)."""
+        seen: Dict[str, str] = {}
+        for a in articles:
+            aid = str(a.get('o:id', '')).strip()
+            if aid and aid not in seen:
+                seen[aid] = _date_key(a.get('pub_date'))
+        order = sorted(seen, key=lambda aid: (seen[aid], int(aid) if aid.isdigit() else 0, aid))
+        ordinal = {aid: i for i, aid in enumerate(order)}
+
+        members: Dict[str, Dict[str, List[int]]] = {kind: {} for kind in KINDS}
+        for a in articles:
+            i = ordinal.get(str(a.get('o:id', '')).strip())
+            if i is None:
+                continue
+            for kind, value in (('country', a.get('country')), ('newspaper', a.get('newspaper'))):
+                value = (value or '').strip()
+                if value:
+                    members[kind].setdefault(value, []).append(i)
+        for stem, records in entities.items():
+            etype = ENTITY_TYPES.get(stem, stem)
+            of_type = members['entityType'].setdefault(etype, [])
+            for rec in records:
+                ids = [ordinal[a] for a in map(str, rec.get('relatedArticleIds') or []) if a in ordinal]
+                members['entity'][f"{etype}:{rec.get('id')}"] = ids
+                of_type.extend(ids)
+        postings = {
+            kind: {key: Bitmap.from_ordinals(ords) for key, ords in sorted(by_key.items())}
+            for kind, by_key in members.items()
+        }
+        return cls(order, [seen[aid] for aid in order], postings, _ordinal=ordinal)
+
+    # ---- lookups ----
+
+    def __len__(self) -> int:
+        return len(self.article_ids)
+
+    def all(self) -> Bitmap:
+        return Bitmap.range(0, len(self.article_ids))
+
+    def get(self, kind: str, key: str) -> Bitmap:
+        return self.postings.get(kind, {}).get(key, Bitmap())
+
+    def entity(self, key: str) -> Bitmap:
+        """Articles mentioning an entity, keyed "type:id" (e.g. "organization:123")."""
+        return self.get('entity', key)
+
+    def entity_type(self, name: str) -> Bitmap:
+        """Articles mentioning any entity of a type ('person' or the file stem 'persons')."""
+        return self.get('entityType', ENTITY_TYPES.get(name, name))
+
+    def country(self, name: str) -> Bitmap:
+        return self.get('country', name)
+
+    def newspaper(self, name: str) -> Bitmap:
+        return self.get('newspaper', name)
+
+    def any_of(self, kind: str, keys: Iterable[str]) -> Bitmap:
+        out = Bitmap()
+        for key in keys:
+            out |= self.get(kind, key)
+        return out
+
+    def dates_between(self, start: str = '', end: str = '') -> Bitmap:
+        """Articles with start <= date key <= end (YYYY-MM-DD; empty = unbounded)."""
+        first_dated = bisect.bisect_right(self.dates, '')
+        lo = bisect.bisect_left(self.dates, start, lo=first_dated) if start else first_dated
+        hi = bisect.bisect_right(self.dates, end, lo=first_dated) if end else len(self.dates)
+        return Bitmap.range(lo, hi)
+
+    def years(self, start: Optional[int] = None, end: Optional[int] = None) -> Bitmap:
+        """Articles published in [start, end] (inclusive years; None = unbounded)."""
+        return self.dates_between(f'{start:04d}-01-01' if start is not None else '',
+                                  f'{end:04d}-12-31' if end is not None else '')
+
+    def ordinal_of(self, article_id: str) -> Optional[int]:
+        return self._ordinal.get(str(article_id))
+
+    def article_ids_of(self, bitmap: Bitmap) -> List[str]:
+        return [self.article_ids[i] for i in bitmap]
+
+    # ---- serialisation ----
+
+    def to_bytes(self) -> bytes:
+        blobs: List[bytes] = []
+        directory: Dict[str, Dict[str, List[Any]]] = {}
+        for kind, by_key in self.postings.items():
+            keys, lengths = [], []
+            for key, bitmap in by_key.items():
+                blob = bitmap.to_bytes()
+                keys.append(key)
+                lengths.append(len(blob))
+                blobs.append(blob)
+            directory[kind] = {'keys': keys, 'lengths': lengths}
+        id_encoding, ids = _encode_ids(self.article_ids)
+        header = json.dumps({
+            'version': VERSION,
+            'articleCount': len(self.article_ids),
+            'articleIdEncoding': id_encoding,
+            'articleIds': ids,
+            'undated': sum(1 for d in self.dates if not d),
+            'days': _encode_days(self.dates),
+            'years': {str(y): list(r) for y, r in sorted(self.year_ranges.items())},
+            'postings': directory,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return MAGIC + struct.pack('<II', VERSION, len(header)) + header + b''.join(blobs)
+
+    def write(self, path: Path) -> int:
+        """Write the serialised index; returns bytes written."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_bytes()
+        path.write_bytes(data)
+        return len(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PostingIndex':
+        if data[:4] != MAGIC:
+            raise ValueError('not a posting bitmap file')
+        version, header_len = struct.unpack_from('<II', data, 4)
+        if version != VERSION:
+            raise ValueError(f'unsupported posting bitmap version {version}')
+        start = 12 + header_len
+        header = json.loads(data[12:start].decode('utf-8'))
+        postings: Dict[str, Dict[str, Bitmap]] = {}
+        offset = start
+        # Bitmaps are stored back to back in directory order
+        for kind, entry in header['postings'].items():
+            postings[kind] = {}
+            for key, length in zip(entry['keys'], entry['lengths']):
+                postings[kind][key] = Bitmap.from_bytes(data, offset)
+                offset += length
+        years = {int(y): (r[0], r[1]) for y, r in header['years'].items()}
+        dates = _decode_days(header['days'], header['undated'])
+        return cls(_decode_ids(header['articleIdEncoding'], header['articleIds']), dates, postings, years)
+
+    @classmethod
+    def load(cls, path: Path) -> 'PostingIndex':
+        return cls.from_bytes(path.read_bytes())
@@ -3,14 +3,25 @@ r"""
 Unified preprocessing pipeline for IWAC Spatial Overview.
 
 This script orchestrates the full data preparation flow:
-  1) Export dataset subsets to JSON (articles.json, index.json)
+  1) Export dataset subsets to JSON (articles.json, index.json); article subject/spatial
+     are arrays of names (--pipe-strings writes the legacy " | " strings)
   2) Enrich index.json locations with Country via world_countries.geojson
   3) Build entity files (entities/*.json) with precomputed relationships
+  4) Write the date-sharded article store (articles/: manifest, id -> shard table and
+     per-period shards of minimal table rows) for paginated tables; see article_shards.py
 
 Key features:
   - Structured logging to console and optional file
   - Step timers and result summaries
-  - Flexible CLI to run specific steps and control I/O paths
+  - Optional JSON run report (--report) with per-step time, memory, rows and bytes,
+    and per-step cProfile dumps (--profile); see instrumentation.py
+  - Flexible CLI to run specific steps and control I/O paths; steps live in a registry
+    (register_step) and import heavy dependencies (datasets, pyarrow, numpy/shapely) only
+    when they run, so `--steps entities` starts without them. --timing-imports logs the
+    module-level and per-step lazy import times.
+  - Offline snapshot mode (--snapshot): export from a local Parquet/Arrow snapshot,
+    skipped when its revision matches the last export, otherwise re-transforming only
+    the row groups that changed; see dataset_snapshot.py
 
 Usage (PowerShell):
   # Activate venv (optional) and install deps from scripts/requirements.txt
@@ -26,53 +37,93 @@ Usage (PowerShell):
 
   # Customize output dir and log file
   # python scripts/preprocess_all.py --out-dir "omeka-map-explorer/static/data" --log-file "scripts/logs/preprocess.log"
+
+  # Write a run report (scripts/logs/preprocess_all_report.json) and per-step cProfile dumps
+  # python scripts/preprocess_all.py --report --profile
+
+  # Re-shard articles by month, at most 1000 articles per shard
+  # python scripts/preprocess_all.py --steps article-shards --shard-period month --shard-max-rows 1000
+
+  # Export from a local snapshot, failing if it is not at the pinned revision
+  # python scripts/preprocess_all.py --steps fetch --snapshot path/to/snapshot --revision <hash>
 """
 
 from __future__ import annotations
 
+import time
+
+_MODULE_T0 = time.perf_counter()
+
 import argparse
+import importlib
 import json
 import logging
-import re
-import time
-from contextlib import contextmanager
+import os
+import sys
 from datetime import datetime
 import shutil
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import article_shards
+from article_fields import name_list, to_legacy_article
+from fetch_transforms import (
+    DEFAULT_TRANSFORM_BATCH, iter_batches, transform_articles_batch, transform_articles_row, transform_index_batch,
+    transform_index_row,
+)
+from instrumentation import add_instrumentation_args, add_run_info, finish_run, start_run, step_timer
+from json_io import open_json_array, write_json, write_jsonl
+
+# Heavy dependencies (datasets, pyarrow via dataset_snapshot, numpy/shapely) are imported
+# by the steps that need them, so e.g. `--steps entities` never pays for them.
+MODULE_IMPORT_SECONDS = time.perf_counter() - _MODULE_T0
+IMPORT_TIMINGS: List[Dict[str, Any]] = []
+_CURRENT_STEP: Optional[str] = None
+
+np: Any = None
+shapely: Any = None
+_HAS_SHAPELY: Optional[bool] = None  # unknown until a geo step asks
+
+
+def lazy_import(name: str) -> Any:
+    """Import `name` on first use, recording its wall time and module count for --timing-imports."""
+    if name in sys.modules:
+        return sys.modules[name]
+    before = len(sys.modules)
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMINGS.append({
+        "module": name,
+        "step": _CURRENT_STEP,
+        "seconds": round(time.perf_counter() - t0, 4),
+        "modulesLoaded": len(sys.modules) - before,
+    })
+    return module
+
+
+def geo_available() -> bool:
+    """Import numpy and shapely>=2 into this module on first call; False if unavailable."""
+    global np, shapely, _HAS_SHAPELY
+    if _HAS_SHAPELY is None:
+        try:
+            np = lazy_import("numpy")
+            shapely = lazy_import("shapely")
+            _HAS_SHAPELY = hasattr(shapely, "STRtree") and hasattr(shapely, "contains_xy")
+        except Exception:
+            _HAS_SHAPELY = False
+    return _HAS_SHAPELY
 
-# Optional imports; some steps only need these lazily
-try:
-    from datasets import Dataset, DatasetDict, load_dataset  # type: ignore
-except Exception:  # pragma: no cover - optional, validated at runtime
-    Dataset = object  # type: ignore
-    DatasetDict = dict  # type: ignore
-    load_dataset = None  # type: ignore
 
-try:
-    from shapely.geometry import Point, shape  # type: ignore
-    from shapely.prepared import prep  # type: ignore
-    _HAS_SHAPELY = True
-except Exception:
-    _HAS_SHAPELY = False
+def _require_geo() -> None:
+    if not geo_available():
+        raise RuntimeError("shapely>=2 is required for add-countries step. Install with: pip install shapely")
 
 
 # -------------------------
 # Logging & timing utilities
 # -------------------------
 
-@contextmanager
-def step_timer(name: str) -> Iterator[float]:
-    start = time.perf_counter()
-    logging.info(f"▶️  Start: %s", name)
-    try:
-        yield start
-    finally:
-        dur = time.perf_counter() - start
-        logging.info(f"✅ Done: %s (%.2fs)", name, dur)
-
-
 def setup_logging(level: str = "INFO", log_file: Optional[Path] = None) -> None:
     lvl = getattr(logging, level.upper(), logging.INFO)
     handlers: List[logging.Handler] = [
@@ -92,16 +143,6 @@ def setup_logging(level: str = "INFO", log_file: Optional[Path] = None) -> None:
     )
 
 
-def _dump_json(path: Path, data: Any, compact: bool = False) -> None:
-    """Write JSON to disk, optionally compact (no whitespace) for smaller files."""
-    if compact:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
-    else:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 # -------------------------
 # Paths & CLI
 # -------------------------
@@ -129,7 +170,7 @@ def default_paths(script_path: Path) -> Dict[str, Path]:
 # Step 1: Dataset export
 # -------------------------
 
-def _pick_first_split(ds_dict: DatasetDict):  # type: ignore[override]
+def _pick_first_split(ds_dict: Any):
     if isinstance(ds_dict, dict):
         if "train" in ds_dict:
             return ds_dict["train"]
@@ -139,13 +180,16 @@ def _pick_first_split(ds_dict: DatasetDict):  # type: ignore[override]
     return ds_dict  # type: ignore[return-value]
 
 
-def load_subset(dataset_id: str, subset_name: str):
-    if load_dataset is None:
-        raise RuntimeError("datasets is not installed. Please install: pip install datasets")
+def load_subset(dataset_id: str, subset_name: str, revision: Optional[str] = None):
+    try:
+        datasets = lazy_import("datasets")
+    except Exception:
+        raise RuntimeError("datasets is not installed. Please install: pip install datasets") from None
+    load_dataset, DatasetDict = datasets.load_dataset, datasets.DatasetDict
 
     # Try config style first
     try:
-        ds_dict = load_dataset(dataset_id, subset_name)  # type: ignore[misc]
+        ds_dict = load_dataset(dataset_id, subset_name, revision=revision)  # type: ignore[misc]
         if isinstance(ds_dict, (dict, DatasetDict)):
             return _pick_first_split(ds_dict)
         return ds_dict
@@ -153,100 +197,7 @@ def load_subset(dataset_id: str, subset_name: str):
         pass
 
     # Then try split style
-    return load_dataset(dataset_id, split=subset_name)  # type: ignore[misc]
-
-
-def to_pipe_separated(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, (list, tuple, set)):
-        parts = []
-        for v in value:
-            if v is None:
-                continue
-            if isinstance(v, (dict, list, tuple, set)):
-                parts.append(json.dumps(v, ensure_ascii=False))
-            else:
-                parts.append(str(v))
-        return " | ".join(p for p in parts if p)
-    if isinstance(value, dict):
-        if all(not isinstance(v, (dict, list, tuple, set)) for v in value.values()):
-            return " | ".join(str(v) for v in value.values() if v is not None)
-        return json.dumps(value, ensure_ascii=False)
-    return str(value)
-
-
-_ISO_YMD = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
-_ISO_YM = re.compile(r"^(\d{4})-(\d{2})$")
-_ISO_Y = re.compile(r"^(\d{4})$")
-_DMY_SLASH = re.compile(r"^(\d{1,2})\/(\d{1,2})\/(\d{4})$")
-
-
-def normalize_date_ymd(value: Any) -> str:
-    if value is None:
-        return ""
-    s = str(value).strip()
-    if not s:
-        return ""
-
-    m = _ISO_YMD.match(s)
-    if m:
-        return s
-    m = _ISO_YM.match(s)
-    if m:
-        y, mth = m.groups()
-        return f"{y}-{mth}-01"
-    m = _ISO_Y.match(s)
-    if m:
-        (y,) = m.groups()
-        return f"{y}-01-01"
-    m = _DMY_SLASH.match(s)
-    if m:
-        d, mth, y = m.groups()
-        return f"{int(y):04d}-{int(mth):02d}-{int(d):02d}"
-    return s
-
-
-def get_first_non_empty(row: Dict[str, Any], keys: Iterable[str]) -> Any:
-    for k in keys:
-        if k in row:
-            v = row[k]
-            if v is None:
-                continue
-            if isinstance(v, (list, tuple, set, dict)) and not v:
-                continue
-            return v
-    return None
-
-
-def transform_articles_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "o:id": str(get_first_non_empty(row, ["o:id", "o_id", "id"])) or "",
-        "title": str(get_first_non_empty(row, ["title", "dcterms:title", "Titre"])) or "",
-        "newspaper": str(get_first_non_empty(row, ["newspaper", "dcterms:publisher", "publisher"])) or "",
-        "country": str(get_first_non_empty(row, ["country", "pays", "Country"])) or "",
-        "pub_date": normalize_date_ymd(get_first_non_empty(row, ["pub_date", "date", "dcterms:date"])) or "",
-        "subject": to_pipe_separated(get_first_non_empty(row, ["subject", "dcterms:subject"])) or "",
-        "spatial": to_pipe_separated(get_first_non_empty(row, ["spatial", "dcterms:spatial"])) or "",
-    }
-
-
-def transform_index_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    oid = get_first_non_empty(row, ["o:id", "o_id", "id"])  # keep numeric if possible
-    try:
-        oid_num: Optional[int] = int(oid) if oid is not None and str(oid).strip() else None
-    except Exception:
-        oid_num = None
-
-    return {
-        "o:id": oid_num if oid_num is not None else None,
-        "Titre": str(get_first_non_empty(row, ["Titre", "title", "dcterms:title"])) or "",
-        "Type": str(get_first_non_empty(row, ["Type", "type"])) or "",
-        "Coordonnées": str(
-            get_first_non_empty(row, ["Coordonnées", "coordinates", "coordonnees", "curation:coordinates"])
-        )
-        or "",
-    }
+    return load_dataset(dataset_id, split=subset_name, revision=revision)  # type: ignore[misc]
 
 
 @dataclass
@@ -255,32 +206,191 @@ class FetchResult:
     index_count: int
     articles_path: Path
     index_path: Path
-
-
-def step_fetch(dataset_id: str, out_dir: Path, *, compact: bool = False) -> FetchResult:
+    revision: Optional[str] = None
+    skipped: bool = False
+
+
+FETCH_CACHE_DIR = ".fetch_cache"
+FETCH_STATE_FILE = "state.json"  # last snapshot export (revision, options, counts)
+FETCH_CACHE_VERSION = 2  # bump when transform_*_row output changes to invalidate cached row groups
+FETCH_SUBSETS = {"articles": transform_articles_row, "index": transform_index_row}
+FETCH_BATCH_TRANSFORMS = {"articles": transform_articles_batch, "index": transform_index_batch}
+
+
+def step_fetch(
+    dataset_id: str,
+    out_dir: Path,
+    *,
+    compact: bool = False,
+    revision: Optional[str] = None,
+    pipe_strings: bool = False,
+    transform_batch: int = DEFAULT_TRANSFORM_BATCH,
+) -> FetchResult:
+    """Export the hub subsets; transform_batch rows are transformed at a time through the
+    batched (Arrow) transforms, 0 transforms row by row (same output, slower)."""
     out_dir.mkdir(parents=True, exist_ok=True)
+    emit = to_legacy_article if pipe_strings else None
+    # The outputs no longer come from the snapshot recorded by step_fetch_snapshot: forget
+    # that export so a later --snapshot run re-exports instead of skipping (the cached
+    # row groups stay valid and are reused)
+    (out_dir / FETCH_CACHE_DIR / FETCH_STATE_FILE).unlink(missing_ok=True)
 
-    with step_timer("Export dataset subsets to JSON"):
-        articles_ds = load_subset(dataset_id, "articles")
-        index_ds = load_subset(dataset_id, "index")
-
-        # Transform rows (ensure iteration works for Dataset/DatasetDict or plain lists)
-        articles_rows = [transform_articles_row(r) for r in articles_ds]  # type: ignore[arg-type]
-        index_rows = [transform_index_row(r) for r in index_ds]  # type: ignore[arg-type]
+    with step_timer("Export dataset subsets to JSON") as rec:
+        articles_ds = load_subset(dataset_id, "articles", revision)
+        index_ds = load_subset(dataset_id, "index", revision)
 
+        # Transform rows while streaming them to disk (works for Dataset/DatasetDict or plain lists)
         articles_path = out_dir / "articles.json"
         index_path = out_dir / "index.json"
-        _dump_json(articles_path, articles_rows, compact)
-        _dump_json(index_path, index_rows, compact)
+        with open_json_array(articles_path, compact=compact) as articles_out:
+            if transform_batch > 0:
+                for batch in iter_batches(articles_ds, transform_batch):
+                    rows = transform_articles_batch(batch)
+                    articles_out.write_many([emit(row) for row in rows] if emit else rows)
+            else:
+                for r in articles_ds:  # type: ignore[union-attr]
+                    row = transform_articles_row(r)
+                    articles_out.write(emit(row) if emit else row)
+        with open_json_array(index_path, compact=compact) as index_out:
+            if transform_batch > 0:
+                for batch in iter_batches(index_ds, transform_batch):
+                    index_out.write_many(transform_index_batch(batch))
+            else:
+                for r in index_ds:  # type: ignore[union-attr]
+                    index_out.write(transform_index_row(r))
+        rec.rows_in = len(articles_ds) + len(index_ds)  # type: ignore[arg-type]
+        rec.rows_out = articles_out.count + index_out.count
 
-        logging.info("Wrote %d articles -> %s", len(articles_rows), articles_path)
-        logging.info("Wrote %d index entries -> %s", len(index_rows), index_path)
+        logging.info("Wrote %d articles -> %s", articles_out.count, articles_path)
+        logging.info("Wrote %d index entries -> %s", index_out.count, index_path)
 
         return FetchResult(
-            articles_count=len(articles_rows),
-            index_count=len(index_rows),
+            articles_count=articles_out.count,
+            index_count=index_out.count,
             articles_path=articles_path,
             index_path=index_path,
+            revision=revision,
+        )
+
+
+def _read_cached_rows(path: Path) -> List[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def step_fetch_snapshot(
+    snapshot_dir: Path,
+    out_dir: Path,
+    *,
+    compact: bool = False,
+    revision: Optional[str] = None,
+    force: bool = False,
+    pipe_strings: bool = False,
+    transform_batch: int = DEFAULT_TRANSFORM_BATCH,
+) -> FetchResult:
+    """Export from a local snapshot, reusing unchanged row groups from the fetch cache.
+
+    The cache (<out_dir>/.fetch_cache) holds the transformed rows of every row group keyed
+    by its content fingerprint, plus state.json with the revision of the last export.
+    Cached rows are always structured; pipe_strings only changes what is written.
+    Changed units are transformed as whole Arrow row groups by the batched transforms
+    unless transform_batch is 0 (row by row; the output is the same).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    articles_path = out_dir / "articles.json"
+    index_path = out_dir / "index.json"
+    cache_dir = out_dir / FETCH_CACHE_DIR
+    state_path = cache_dir / FETCH_STATE_FILE
+    dataset_snapshot = lazy_import("dataset_snapshot")
+
+    with step_timer("Export dataset snapshot to JSON") as rec:
+        current = dataset_snapshot.snapshot_revision(snapshot_dir, list(FETCH_SUBSETS))
+        if revision and current != revision:
+            raise RuntimeError(f"Snapshot {snapshot_dir} is at revision {current}, expected {revision}")
+
+        state: Dict[str, Any] = {}
+        if state_path.exists():
+            with state_path.open("r", encoding="utf-8") as f:
+                state = json.load(f)
+        if state.get("cacheVersion") != FETCH_CACHE_VERSION:
+            for subset in FETCH_SUBSETS:
+                shutil.rmtree(cache_dir / subset, ignore_errors=True)
+            state = {}
+        unchanged = (
+            state.get("revision") == current
+            and state.get("compact") == compact
+            and state.get("pipeStrings", False) == pipe_strings
+            and articles_path.exists()
+            and index_path.exists()
+        )
+        if unchanged and not force:
+            logging.info("Snapshot revision %s unchanged since last export; skipping", current)
+            rec.rows_in = rec.rows_out = 0
+            return FetchResult(
+                articles_count=state.get("counts", {}).get("articles", 0),
+                index_count=state.get("counts", {}).get("index", 0),
+                articles_path=articles_path,
+                index_path=index_path,
+                revision=current,
+                skipped=True,
+            )
+
+        # Forget the previous export before the outputs are reopened: if this run is
+        # interrupted, the half-written files must not pass for that revision next time
+        state_path.unlink(missing_ok=True)
+        counts: Dict[str, int] = {}
+        fingerprints: Dict[str, List[str]] = {}
+        transformed = reused = 0
+        for subset, transform in FETCH_SUBSETS.items():
+            subset_cache = cache_dir / subset
+            subset_cache.mkdir(parents=True, exist_ok=True)
+            keep: List[str] = []
+            emit = to_legacy_article if pipe_strings and subset == "articles" else None
+            with open_json_array(out_dir / f"{subset}.json", compact=compact) as out:
+                for unit in dataset_snapshot.iter_units(snapshot_dir, subset):
+                    cached = subset_cache / f"{unit.fingerprint}.jsonl"
+                    if cached.exists():
+                        rows = _read_cached_rows(cached)
+                        reused += 1
+                    else:
+                        if transform_batch > 0:
+                            rows = FETCH_BATCH_TRANSFORMS[subset](unit.table())
+                        else:
+                            rows = [transform(r) for r in unit.rows()]
+                        write_jsonl(cached, rows)
+                        transformed += 1
+                    out.write_many([emit(row) for row in rows] if emit else rows)
+                    keep.append(unit.fingerprint)
+            for stale in subset_cache.glob("*.jsonl"):
+                if stale.stem not in keep:
+                    stale.unlink()
+            counts[subset] = out.count
+            fingerprints[subset] = keep
+
+        write_json(state_path, {
+            "cacheVersion": FETCH_CACHE_VERSION,
+            "revision": current,
+            "snapshot": str(snapshot_dir),
+            "compact": compact,
+            "pipeStrings": pipe_strings,
+            "counts": counts,
+            "rowGroups": fingerprints,
+            "exportedAt": datetime.utcnow().isoformat() + "Z",
+        })
+        rec.rows_in = rec.rows_out = sum(counts.values())
+        logging.info(
+            "Snapshot %s: re-transformed %d row groups, reused %d unchanged",
+            current, transformed, reused,
+        )
+        logging.info("Wrote %d articles -> %s", counts["articles"], articles_path)
+        logging.info("Wrote %d index entries -> %s", counts["index"], index_path)
+
+        return FetchResult(
+            articles_count=counts["articles"],
+            index_count=counts["index"],
+            articles_path=articles_path,
+            index_path=index_path,
+            revision=current,
         )
 
 
@@ -306,41 +416,6 @@ def parse_coordinates(coord_str: str) -> Optional[Tuple[float, float]]:
         return None
 
 
-def load_world_countries(geojson_path: Path) -> List[Dict[str, Any]]:
-    with geojson_path.open("r", encoding="utf-8") as f:
-        world_data = json.load(f)
-    countries: List[Dict[str, Any]] = []
-    for feature in world_data.get("features", []):
-        props = feature.get("properties", {})
-        name = props.get("name")
-        geom = feature.get("geometry")
-        if not name or not geom:
-            continue
-        try:
-            shp = shape(geom)
-            countries.append({
-                "name": name,
-                "geometry": prep(shp),  # prepared for fast contains
-                "properties": props,
-            })
-        except Exception as e:
-            logging.warning("Failed to prepare geometry for %s: %s", name, e)
-    logging.info("Loaded %d countries from %s", len(countries), geojson_path)
-    return countries
-
-
-def find_country_for_coordinates(lat: float, lng: float, countries: List[Dict[str, Any]]) -> Optional[str]:
-    pt = Point(lng, lat)
-    for c in countries:
-        try:
-            if c["geometry"].contains(pt):
-                return c["name"]
-        except Exception:
-            # ignore and continue
-            continue
-    return None
-
-
 @dataclass
 class CountryResult:
     processed: int
@@ -349,140 +424,274 @@ class CountryResult:
     updated_index_path: Path
 
 
-def _load_named_polygons(geojson_path: Path, name_keys: List[str]) -> List[Dict[str, Any]]:
-    """Load polygons with a name extracted from properties using the first matching key.
+# Administrative layers per target country: (level, file name, property keys for the label).
+# Levels are listed parent-first; each level is resolved among the children of the previous one.
+ADMIN_LAYER_SPECS: Dict[str, List[Tuple[str, str, List[str]]]] = {
+    "Benin": [
+        ("region", "benin_regions.geojson", ["name", "NAME", "NAME_1"]),
+        ("prefecture", "benin_prefectures.geojson", ["name", "NAME", "NAME_2"]),
+    ],
+    "Burkina Faso": [
+        ("region", "burkina_faso_regions.geojson", ["name", "NAME", "NAME_1"]),
+        ("prefecture", "burkina_faso_prefectures.geojson", ["name", "NAME", "NAME_2"]),
+    ],
+    "Togo": [
+        ("region", "togo_regions.geojson", ["name", "NAME", "NAME_1"]),
+        # togo prefectures store prefecture in shape2
+        ("prefecture", "togo_prefectures.geojson", ["shape2", "name", "NAME_2"]),
+    ],
+    "Côte d'Ivoire": [
+        # Cote d'Ivoire regions file uses shape2 for the region label
+        ("region", "cote_divoire_regions.geojson", ["shape2", "name", "NAME", "NAME_1"]),
+    ],
+}
 
-    Returns a list of dicts: {"name": str, "geometry": prepared geometry, "properties": props}
+
+@dataclass
+class AdminLayer:
+    """Polygons of one administrative level, indexed for bulk point queries.
+
+    `parent` maps each feature to the index of the enclosing feature in the parent
+    layer (-1 when unknown); `children` is the inverse mapping on the parent side.
     """
+
+    names: List[str]
+    geoms: Any  # numpy array of shapely geometries (prepared in place)
+    tree: Any  # shapely.STRtree over geoms
+    parent: Optional[Any] = None
+    children: Optional[List[List[int]]] = None
+
+
+def load_admin_layer(geojson_path: Path, name_keys: List[str]) -> AdminLayer:
+    """Load a GeoJSON layer as an STRtree-backed AdminLayer (feature order preserved)."""
+    _require_geo()
     with geojson_path.open("r", encoding="utf-8") as f:
         data = json.load(f)
-    items: List[Dict[str, Any]] = []
+    names: List[str] = []
+    geoms: List[Any] = []
     for feature in data.get("features", []):
         props = feature.get("properties", {}) or {}
-        raw_name: Optional[str] = None
-        for k in name_keys:
-            if k in props and props[k]:
-                raw_name = str(props[k])
-                break
+        raw_name = next((str(props[k]) for k in name_keys if k in props and props[k]), None)
         geom = feature.get("geometry")
         if not raw_name or not geom:
             continue
         try:
-            shp = shape(geom)
-            items.append({
-                "name": raw_name,
-                "geometry": prep(shp),
-                "properties": props,
-            })
+            geoms.append(shapely.geometry.shape(geom))
+            names.append(raw_name)
         except Exception as e:
-            logging.warning("Failed to prepare geometry for %s in %s: %s", raw_name, geojson_path.name, e)
-    logging.info("Loaded %d features from %s", len(items), geojson_path)
-    return items
+            logging.warning("Failed to load geometry for %s in %s: %s", raw_name, geojson_path.name, e)
+    arr = np.array(geoms, dtype=object)
+    shapely.prepare(arr)
+    logging.info("Loaded %d features from %s", len(names), geojson_path)
+    return AdminLayer(names=names, geoms=arr, tree=shapely.STRtree(arr))
+
+
+def link_parent_layer(child: AdminLayer, parent: AdminLayer) -> None:
+    """Assign each child feature to the parent feature containing its representative point."""
+    reps = shapely.point_on_surface(child.geoms)
+    child.parent = _first_match(parent, shapely.get_y(reps), shapely.get_x(reps), "intersects")
+    parent.children = [[] for _ in parent.names]
+    for c_idx, p_idx in enumerate(child.parent.tolist()):
+        if p_idx >= 0:
+            parent.children[p_idx].append(c_idx)
+
+
+_XY_PREDICATES = {"contains": "contains_xy", "intersects": "intersects_xy"}
 
 
-def _find_name_for_point(lat: float, lng: float, features: List[Dict[str, Any]]) -> Optional[str]:
-    pt = Point(lng, lat)
-    for f in features:
+def _first_match(layer: AdminLayer, lats: Any, lngs: Any, predicate: str) -> Any:
+    """Index of the first feature of `layer` satisfying `predicate` for each point (-1 if none).
+
+    The STRtree only produces bounding-box candidates; the exact test then runs as one
+    vectorised *_xy call against the prepared polygons (STRtree predicates would prepare
+    the points instead, which is far slower for detailed boundaries). "First" follows
+    feature order, matching the original sequential scan.
+    """
+    result = np.full(len(lats), -1, dtype=np.int64)
+    if len(lats) == 0:
+        return result
+    pt_idx, geom_idx = layer.tree.query(shapely.points(lngs, lats))
+    hit = getattr(shapely, _XY_PREDICATES[predicate])(layer.geoms[geom_idx], lngs[pt_idx], lats[pt_idx])
+    pt_idx, geom_idx = pt_idx[hit], geom_idx[hit]
+    if pt_idx.size:
+        order = np.lexsort((geom_idx, pt_idx))
+        pt_sorted = pt_idx[order]
+        uniq, first = np.unique(pt_sorted, return_index=True)
+        result[uniq] = geom_idx[order][first]
+    return result
+
+
+def _resolve_children(
+    layer: AdminLayer,
+    parent_idx: Any,
+    parent_children: Optional[List[List[int]]],
+    lats: Any,
+    lngs: Any,
+) -> Any:
+    """Resolve points against `layer`, testing only children of each point's parent feature.
+
+    Points whose parent is unknown, or that fall in none of its children (border slivers,
+    unlinked features), fall back to a single tree query over the whole layer.
+    """
+    result = np.full(len(lats), -1, dtype=np.int64)
+    if parent_children is not None:
+        order = np.argsort(parent_idx, kind="stable")
+        sorted_parents = parent_idx[order]
+        bounds = np.flatnonzero(np.diff(sorted_parents)) + 1
+        for group in np.split(order, bounds):
+            if not group.size or parent_idx[group[0]] < 0:
+                continue
+            for c_idx in parent_children[parent_idx[group[0]]]:
+                pending = group[result[group] < 0]
+                if not pending.size:
+                    break
+                hit = shapely.intersects_xy(layer.geoms[c_idx], lngs[pending], lats[pending])
+                result[pending[hit]] = c_idx
+    missing = np.flatnonzero(result < 0)
+    if missing.size:
+        result[missing] = _first_match(layer, lats[missing], lngs[missing], "intersects")
+    return result
+
+
+def load_country_layers(maps_dir: Path, country: str) -> List[Tuple[str, AdminLayer]]:
+    """Load one country's ADMIN_LAYER_SPECS levels from maps_dir, each linked to its parent."""
+    loaded: List[Tuple[str, AdminLayer]] = []
+    for level, filename, name_keys in ADMIN_LAYER_SPECS[country]:
+        path = maps_dir / filename
+        if not path.exists():
+            logging.warning("Admin layer missing for %s (%s): %s", country, level, path)
+            continue
+        layer = load_admin_layer(path, name_keys)
+        if loaded:
+            link_parent_layer(layer, loaded[-1][1])
+        loaded.append((level, layer))
+    return loaded
+
+
+def load_admin_layers(maps_dir: Path) -> Dict[str, List[Tuple[str, AdminLayer]]]:
+    """Load ADMIN_LAYER_SPECS from maps_dir, linking each level to its parent level."""
+    layers: Dict[str, List[Tuple[str, AdminLayer]]] = {}
+    for country in ADMIN_LAYER_SPECS:
+        loaded = load_country_layers(maps_dir, country)
+        if loaded:
+            layers[country] = loaded
+    return layers
+
+
+def classify_points_bulk(
+    lats: Any,
+    lngs: Any,
+    countries: AdminLayer,
+    admin_layers: Dict[str, List[Tuple[str, AdminLayer]]],
+) -> Tuple[List[Optional[str]], Dict[str, List[Optional[str]]]]:
+    """Resolve Country and nested admin names for arrays of WGS84 coordinates.
+
+    Countries use `contains` semantics (as before); admin levels use `intersects` so
+    points on internal boundaries still resolve.
+    Returns (country per point, {level: name per point}).
+    """
+    _require_geo()
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    n = len(lats)
+    country_idx = _first_match(countries, lats, lngs, "contains")
+    country_names = [countries.names[i] if i >= 0 else None for i in country_idx.tolist()]
+    levels: Dict[str, List[Optional[str]]] = {}
+
+    for country, layers in admin_layers.items():
         try:
-            # intersects includes boundary; more robust than contains for points on borders
-            if f["geometry"].intersects(pt):
-                return f["name"]
-        except Exception:
+            c_idx = countries.names.index(country)
+        except ValueError:
             continue
-    return None
+        sel = np.flatnonzero(country_idx == c_idx)
+        if not sel.size:
+            continue
+        parent_idx = np.full(sel.size, -1, dtype=np.int64)
+        parent_children: Optional[List[List[int]]] = None
+        for level, layer in layers:
+            idx = _resolve_children(layer, parent_idx, parent_children, lats[sel], lngs[sel])
+            out = levels.setdefault(level, [None] * n)
+            for pos, f_idx in zip(sel.tolist(), idx.tolist()):
+                if f_idx >= 0:
+                    out[pos] = layer.names[f_idx]
+            parent_idx, parent_children = idx, layer.children
+    return country_names, levels
+
+
+def split_located_rows(location_rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[float], List[float]]:
+    """Location rows with parseable coordinates plus their lat/lng arrays.
+
+    Rows without coordinates are reset in place (empty Country, no Region/Prefecture).
+    """
+    located: List[Dict[str, Any]] = []
+    lats: List[float] = []
+    lngs: List[float] = []
+    for row in location_rows:
+        coords = parse_coordinates(row.get("Coordonnées", "") or "")
+        if coords:
+            located.append(row)
+            lats.append(coords[0])
+            lngs.append(coords[1])
+        else:
+            row["Country"] = ""
+            # Remove admin fields if no coordinates
+            row.pop("Region", None)
+            row.pop("Prefecture", None)
+    return located, lats, lngs
+
+
+def apply_admin_fields(
+    located: List[Dict[str, Any]],
+    country_names: List[Optional[str]],
+    levels: Dict[str, List[Optional[str]]],
+) -> int:
+    """Write Country/Region/Prefecture from classify_points_bulk onto rows; returns matches."""
+    regions = levels.get("region", [None] * len(located))
+    prefectures = levels.get("prefecture", [None] * len(located))
+    matched = 0
+    for row, country, region_val, pref_val in zip(located, country_names, regions, prefectures):
+        row["Country"] = country or ""
+        if country:
+            matched += 1
+        # Region/Prefecture only exist for target countries; drop stale values elsewhere
+        if region_val:
+            row["Region"] = region_val
+        else:
+            row.pop("Region", None)
+        if pref_val:
+            row["Prefecture"] = pref_val
+        else:
+            row.pop("Prefecture", None)
+    return matched
 
 
 def step_add_countries(index_path: Path, world_geojson: Path, maps_dir: Optional[Path] = None, *, compact: bool = False) -> CountryResult:
-    if not _HAS_SHAPELY:
-        raise RuntimeError("shapely is required for add-countries step. Install with: pip install shapely")
+    _require_geo()
     if not world_geojson.exists():
         raise FileNotFoundError(f"world_countries.geojson not found at {world_geojson}")
 
-    with step_timer("Add Country/Region/Prefecture to locations in index.json"):
-        countries = load_world_countries(world_geojson)
+    with step_timer("Add Country/Region/Prefecture to locations in index.json") as rec:
+        countries = load_admin_layer(world_geojson, ["name"])
         with index_path.open("r", encoding="utf-8") as f:
             index_rows: List[Dict[str, Any]] = json.load(f)
 
-    # Note: backup creation removed to keep output directory minimal and avoid extra files
-
-        # Preload administrative layers if maps_dir is provided
-        admin_layers: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
         if maps_dir is None:
             # Try to infer maps_dir from index_path (../maps relative to data dir)
             potential = index_path.parent / "maps"
             if potential.exists():
                 maps_dir = potential
-        if maps_dir is not None:
-            try:
-                admin_layers = {
-                    "Benin": {
-                        "region": _load_named_polygons(maps_dir / "benin_regions.geojson", ["name", "NAME", "NAME_1"]),
-                        "prefecture": _load_named_polygons(maps_dir / "benin_prefectures.geojson", ["name", "NAME", "NAME_2"]),
-                    },
-                    "Burkina Faso": {
-                        "region": _load_named_polygons(maps_dir / "burkina_faso_regions.geojson", ["name", "NAME", "NAME_1"]),
-                        "prefecture": _load_named_polygons(maps_dir / "burkina_faso_prefectures.geojson", ["name", "NAME", "NAME_2"]),
-                    },
-                    "Togo": {
-                        "region": _load_named_polygons(maps_dir / "togo_regions.geojson", ["name", "NAME", "NAME_1"]),
-                        # togo prefectures store prefecture in shape2
-                        "prefecture": _load_named_polygons(maps_dir / "togo_prefectures.geojson", ["shape2", "name", "NAME_2"]),
-                    },
-                    "Côte d'Ivoire": {
-                        # Cote d'Ivoire regions file uses shape2 for the region label
-                        "region": _load_named_polygons(maps_dir / "cote_divoire_regions.geojson", ["shape2", "name", "NAME", "NAME_1"]),
-                    },
-                }
-            except FileNotFoundError as e:
-                logging.warning("Some admin layer files are missing: %s", e)
-
-        processed = matched = skipped = 0
-        TARGET_COUNTRIES = {"Benin", "Burkina Faso", "Togo", "Côte d'Ivoire"}
-        for row in index_rows:
-            if row.get("Type") != "Lieux":
-                skipped += 1
-                continue
-            coord_str = row.get("Coordonnées", "") or ""
-            coords = parse_coordinates(coord_str)
-            if coords:
-                lat, lng = coords
-                country = find_country_for_coordinates(lat, lng, countries)
-                row["Country"] = country or ""
-                if country:
-                    matched += 1
-                    # Enrich with Region/Prefecture only for target countries
-                    if country in TARGET_COUNTRIES:
-                        layers = admin_layers.get(country)
-                        if layers:
-                            try:
-                                region_val = None
-                                pref_val = None
-                                if "region" in layers:
-                                    region_val = _find_name_for_point(lat, lng, layers["region"])
-                                if "prefecture" in layers:
-                                    pref_val = _find_name_for_point(lat, lng, layers["prefecture"])
-                                if region_val:
-                                    row["Region"] = region_val
-                                else:
-                                    row.pop("Region", None)
-                                if pref_val:
-                                    row["Prefecture"] = pref_val
-                                else:
-                                    row.pop("Prefecture", None)
-                            except Exception as e:
-                                logging.debug("Admin match failed for %s at (%s,%s): %s", country, lat, lng, e)
-                    else:
-                        # Ensure we don't carry empty fields for non-target countries
-                        row.pop("Region", None)
-                        row.pop("Prefecture", None)
-            else:
-                row["Country"] = ""
-                # Remove admin fields if no coordinates
-                row.pop("Region", None)
-                row.pop("Prefecture", None)
-            processed += 1
+        admin_layers = load_admin_layers(maps_dir) if maps_dir is not None else {}
+
+        location_rows = [row for row in index_rows if row.get("Type") == "Lieux"]
+        skipped = len(index_rows) - len(location_rows)
+        located, lats, lngs = split_located_rows(location_rows)
+        country_names, levels = classify_points_bulk(lats, lngs, countries, admin_layers)
+        matched = apply_admin_fields(located, country_names, levels)
+        processed = len(location_rows)
+        rec.rows_in = len(index_rows)
+        rec.rows_out = processed
 
-        _dump_json(index_path, index_rows, compact)
+        write_json(index_path, index_rows, compact=compact)
 
         logging.info("Processed %d locations, matched %d countries, skipped %d non-locations", processed, matched, skipped)
     return CountryResult(processed=processed, matched=matched, skipped_non_locations=skipped, updated_index_path=index_path)
@@ -492,14 +701,77 @@ def step_add_countries(index_path: Path, world_geojson: Path, maps_dir: Optional
 # Step 3: Entities
 # -------------------------
 
-def parse_pipe_list(s: str) -> List[str]:
-    if not s:
-        return []
-    return [item.strip() for item in s.split("|") if item.strip()]
+ENTITY_TYPE_FILES = {
+    "Personnes": "persons",
+    "Organisations": "organizations",
+    "Événements": "events",
+    "Sujets": "subjects",
+    "Lieux": "locations",
+}
+
+
+def build_entities(articles: List[Dict[str, Any]], index_data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Entity records per output file (persons, organizations, ...), sorted by name."""
+    # Build entity -> article IDs map (from article spatial and subject fields)
+    entity_articles: Dict[str, set[str]] = {}
+    for a in articles:
+        aid = str(a.get("o:id", ""))
+        # Add spatial entities (locations)
+        for spatial in name_list(a.get("spatial")):
+            entity_articles.setdefault(spatial, set()).add(aid)
+        # Add subject entities (persons, organizations, events, subjects)
+        for subj in name_list(a.get("subject")):
+            entity_articles.setdefault(subj, set()).add(aid)
+
+    entities_by_file: Dict[str, List[Dict[str, Any]]] = {v: [] for v in ENTITY_TYPE_FILES.values()}
+
+    for entry in index_data:
+        etype = entry.get("Type", "")
+        if etype not in ENTITY_TYPE_FILES:
+            continue
+        name = entry.get("Titre", "")
+        eid = str(entry.get("o:id", ""))
+        related = sorted(entity_articles.get(name, set()))
+        if not related:
+            continue
+
+        record: Dict[str, Any] = {
+            "id": eid,
+            "name": name,
+            "relatedArticleIds": related,
+            "articleCount": len(related),
+        }
+        if etype == "Lieux":
+            coordinates_str = (entry.get("Coordonnées", "") or "").strip()
+            country = (entry.get("Country", "") or "").strip()
+            region = (entry.get("Region", "") or "").strip()
+            prefecture = (entry.get("Prefecture", "") or "").strip()
+            coords: Optional[List[float]] = None
+            pc = parse_coordinates(coordinates_str)
+            if pc is not None:
+                coords = [pc[0], pc[1]]
+            # Only add non-empty fields to reduce file size
+            loc_extra: Dict[str, Any] = {"coordinatesRaw": coordinates_str}
+            if coords is not None:
+                loc_extra["coordinates"] = coords
+            if country:
+                loc_extra["country"] = country
+            if region:
+                loc_extra["region"] = region
+            if prefecture:
+                loc_extra["prefecture"] = prefecture
+            record.update(loc_extra)
+
+        entities_by_file[ENTITY_TYPE_FILES[etype]].append(record)
+
+    # Sort entities by name for stable output
+    for items in entities_by_file.values():
+        items.sort(key=lambda x: x["name"])  # type: ignore[no-any-return]
+    return entities_by_file
 
 
 def step_entities(data_dir: Path, entities_dir: Path, *, compact: bool = False) -> Dict[str, int]:
-    with step_timer("Build entity files from articles/index"):
+    with step_timer("Build entity files from articles/index") as rec:
         articles_path = data_dir / "articles.json"
         index_path = data_dir / "index.json"
         with articles_path.open("r", encoding="utf-8") as fa:
@@ -507,83 +779,142 @@ def step_entities(data_dir: Path, entities_dir: Path, *, compact: bool = False)
         with index_path.open("r", encoding="utf-8") as fi:
             index_data: List[Dict[str, Any]] = json.load(fi)
 
-        # Build entity -> article IDs map (from article spatial and subject fields)
-        entity_articles: Dict[str, set[str]] = {}
-        for a in articles:
-            aid = str(a.get("o:id", ""))
-            # Add spatial entities (locations)
-            for spatial in parse_pipe_list(a.get("spatial", "")):
-                entity_articles.setdefault(spatial, set()).add(aid)
-            # Add subject entities (persons, organizations, events, subjects)
-            for subj in parse_pipe_list(a.get("subject", "")):
-                entity_articles.setdefault(subj, set()).add(aid)
-
-        # Types mapping
-        type_to_file = {
-            "Personnes": "persons",
-            "Organisations": "organizations",
-            "Événements": "events",
-            "Sujets": "subjects",
-            "Lieux": "locations",
-        }
-
-        entities_by_file: Dict[str, List[Dict[str, Any]]] = {v: [] for v in type_to_file.values()}
+        rec.rows_in = len(articles) + len(index_data)
 
-        for entry in index_data:
-            etype = entry.get("Type", "")
-            if etype not in type_to_file:
-                continue
-            name = entry.get("Titre", "")
-            eid = str(entry.get("o:id", ""))
-            related = sorted(entity_articles.get(name, set()))
-            if not related:
-                continue
-
-            record: Dict[str, Any] = {
-                "id": eid,
-                "name": name,
-                "relatedArticleIds": related,
-                "articleCount": len(related),
-            }
-            if etype == "Lieux":
-                coordinates_str = (entry.get("Coordonnées", "") or "").strip()
-                country = (entry.get("Country", "") or "").strip()
-                region = (entry.get("Region", "") or "").strip()
-                prefecture = (entry.get("Prefecture", "") or "").strip()
-                coords: Optional[List[float]] = None
-                pc = parse_coordinates(coordinates_str)
-                if pc is not None:
-                    coords = [pc[0], pc[1]]
-                # Only add non-empty fields to reduce file size
-                loc_extra: Dict[str, Any] = {"coordinatesRaw": coordinates_str}
-                if coords is not None:
-                    loc_extra["coordinates"] = coords
-                if country:
-                    loc_extra["country"] = country
-                if region:
-                    loc_extra["region"] = region
-                if prefecture:
-                    loc_extra["prefecture"] = prefecture
-                record.update(loc_extra)
-
-            entities_by_file[type_to_file[etype]].append(record)
-
-        # Sort entities by name for stable output
-        for items in entities_by_file.values():
-            items.sort(key=lambda x: x["name"])  # type: ignore[no-any-return]
+        entities_by_file = build_entities(articles, index_data)
 
         # Write files
         entities_dir.mkdir(parents=True, exist_ok=True)
         counts: Dict[str, int] = {}
         for fname, entities in entities_by_file.items():
             out_path = entities_dir / f"{fname}.json"
-            _dump_json(out_path, entities, compact)
+            write_json(out_path, entities, compact=compact)
             counts[fname] = len(entities)
             logging.info("Saved %d %s -> %s", len(entities), fname, out_path)
+        rec.rows_out = sum(counts.values())
 
         return counts
 
 
+def step_article_shards(
+    data_dir: Path,
+    *,
+    period: str = article_shards.DEFAULT_PERIOD,
+    min_rows: int = article_shards.DEFAULT_MIN_ROWS,
+    max_rows: int = article_shards.DEFAULT_MAX_ROWS,
+) -> article_shards.ShardReport:
+    with step_timer("Write date-sharded article store") as rec:
+        articles_path = data_dir / "articles.json"
+        with articles_path.open("r", encoding="utf-8") as fa:
+            articles: List[Dict[str, Any]] = json.load(fa)
+        rec.rows_in = len(articles)
+
+        # Shards are fetched by the browser, so always compact
+        report = article_shards.write_article_shards(
+            articles, data_dir / "articles",
+            period=period, min_rows=min_rows, max_rows=max_rows, articles_json=articles_path,
+        )
+        rec.rows_out = report.rows
+        logging.info("Article shards -> %s\n%s", data_dir / "articles", report.summary())
+        add_run_info("articleShards", report.to_dict())
+        return report
+
+
+# -------------------------
+# Step registry
+# -------------------------
+
+@dataclass
+class Step:
+    """A pipeline step: `run(args, paths)` returns totals to merge into the run summary.
+
+    Steps import their heavy dependencies themselves (lazy_import / geo_available), so
+    registering a step costs nothing until it is selected.
+    """
+
+    name: str
+    description: str
+    run: Callable[[argparse.Namespace, Dict[str, Path]], Dict[str, Any]]
+
+
+STEPS: Dict[str, Step] = {}
+
+
+def register_step(name: str, description: str) -> Callable:
+    """Register a step under `name`; registration order is pipeline order."""
+    def decorator(fn: Callable[[argparse.Namespace, Dict[str, Path]], Dict[str, Any]]):
+        STEPS[name] = Step(name=name, description=description, run=fn)
+        return fn
+    return decorator
+
+
+@register_step("fetch", "Export dataset subsets to articles.json and index.json")
+def _run_fetch(args: argparse.Namespace, paths: Dict[str, Path]) -> Dict[str, Any]:
+    if args.snapshot:
+        res = step_fetch_snapshot(
+            Path(args.snapshot).resolve(), paths["data_dir"],
+            compact=args.compact, revision=args.revision, force=args.force_fetch,
+            pipe_strings=args.pipe_strings, transform_batch=args.transform_batch,
+        )
+    else:
+        res = step_fetch(
+            args.dataset_id, paths["data_dir"],
+            compact=args.compact, revision=args.revision, pipe_strings=args.pipe_strings,
+            transform_batch=args.transform_batch,
+        )
+    return {"articles": res.articles_count, "index": res.index_count}
+
+
+@register_step("add-countries", "Add Country/Region/Prefecture to index.json locations")
+def _run_add_countries(args: argparse.Namespace, paths: Dict[str, Path]) -> Dict[str, Any]:
+    index_path = paths["data_dir"] / "index.json"
+    if not index_path.exists():
+        raise FileNotFoundError(f"index.json not found at {index_path}; run 'fetch' step first or provide correct --out-dir")
+    res = step_add_countries(index_path, paths["world_geojson"], paths.get("maps_dir"), compact=args.compact)
+    return {
+        "locationsProcessed": res.processed,
+        "countriesMatched": res.matched,
+        "nonLocationsSkipped": res.skipped_non_locations,
+    }
+
+
+@register_step("entities", "Build entities/*.json with precomputed relationships")
+def _run_entities(args: argparse.Namespace, paths: Dict[str, Path]) -> Dict[str, Any]:
+    counts = step_entities(paths["data_dir"], paths["entities_dir"], compact=args.compact)
+    return {f"entities_{k}": v for k, v in counts.items()}
+
+
+@register_step("article-shards", "Write the date-sharded article store (articles/) for paginated tables")
+def _run_article_shards(args: argparse.Namespace, paths: Dict[str, Path]) -> Dict[str, Any]:
+    report = step_article_shards(
+        paths["data_dir"],
+        period=args.shard_period, min_rows=args.shard_min_rows, max_rows=args.shard_max_rows,
+    )
+    return {"articleShards": report.shards, "articleShardBytes": report.shard_bytes}
+
+
+def log_import_timings(startup_seconds: float) -> None:
+    """--timing-imports: module-level import cost plus each lazily imported dependency."""
+    lines = [f"  {'module imports (startup)':<34} {MODULE_IMPORT_SECONDS:8.3f} s"]
+    for t in IMPORT_TIMINGS:
+        label = f"{t['module']} [{t['step'] or '-'}]"
+        lines.append(f"  {label:<34} {t['seconds']:8.3f} s  (+{t['modulesLoaded']} modules)")
+    lines.append(f"  {'interpreter start -> first step':<34} {startup_seconds:8.3f} s")
+    logging.info("Import timings:\n%s", "\n".join(lines))
+
+
+def _process_uptime() -> Optional[float]:
+    """Seconds since this process started (Linux /proc only), for the startup figure."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            start_ticks = int(f.read().rsplit(b")", 1)[1].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
 # -------------------------
 # CLI & main
 # -------------------------
@@ -594,60 +925,100 @@ def parse_args() -> argparse.Namespace:
 
     p = argparse.ArgumentParser(description="Unified preprocessing pipeline for IWAC Spatial Overview")
     p.add_argument("--dataset-id", default=DATASET_ID_DEFAULT, help="Hugging Face dataset ID")
+    p.add_argument("--snapshot", default=None, help="Export from a local Parquet/Arrow snapshot directory instead of the hub")
+    p.add_argument("--revision", default=None, help="Pin the dataset revision (hub: passed to load_dataset; snapshot: must match)")
+    p.add_argument("--force-fetch", action="store_true", help="Re-export a snapshot even if its revision is unchanged")
+    p.add_argument(
+        "--pipe-strings",
+        action="store_true",
+        help="Write article subject/spatial as legacy ' | '-joined strings instead of arrays",
+    )
+    p.add_argument(
+        "--transform-batch",
+        type=int,
+        default=DEFAULT_TRANSFORM_BATCH,
+        help="Rows per batch for the Arrow-native fetch transforms (hub mode; snapshots use whole "
+        "row groups); 0 transforms row by row",
+    )
     p.add_argument("--out-dir", default=str(paths["data_dir"]), help="Output directory for articles.json and index.json")
     p.add_argument("--world-geojson", default=str(paths["world_geojson"]), help="Path to world_countries.geojson")
     p.add_argument("--entities-dir", default=str(paths["entities_dir"]), help="Output directory for entities/*.json")
     p.add_argument("--maps-dir", default=str(paths["maps_dir"]), help="Directory containing administrative GeoJSON files")
     p.add_argument("--compact", action="store_true", help="Write compact (minified) JSON to reduce file size")
+    p.add_argument(
+        "--shard-period",
+        choices=sorted(article_shards.PERIODS),
+        default=article_shards.DEFAULT_PERIOD,
+        help="article-shards: publication period per shard",
+    )
+    p.add_argument(
+        "--shard-min-rows",
+        type=int,
+        default=article_shards.DEFAULT_MIN_ROWS,
+        help="article-shards: merge consecutive periods until a shard has this many articles",
+    )
+    p.add_argument(
+        "--shard-max-rows",
+        type=int,
+        default=article_shards.DEFAULT_MAX_ROWS,
+        help="article-shards: split periods with more articles than this into equal parts",
+    )
     p.add_argument(
         "--steps",
         nargs="*",
-        choices=["fetch", "add-countries", "entities"],
-        help="Limit to specific steps (default: run all in order)",
+        choices=list(STEPS),
+        help="Limit to specific steps (default: run all in order): "
+        + "; ".join(f"{s.name}: {s.description}" for s in STEPS.values()),
+    )
+    p.add_argument(
+        "--timing-imports",
+        action="store_true",
+        help="Log module-level and per-step lazy import times (like python -X importtime, per dependency)",
     )
     p.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
     p.add_argument("--log-file", default=None, help="Optional log file path")
+    add_instrumentation_args(p)
     return p.parse_args()
 
 
 def main() -> None:
+    global _CURRENT_STEP
     args = parse_args()
     log_file = Path(args.log_file) if args.log_file else None
     setup_logging(args.log_level, log_file)
 
-    data_dir = Path(args.out_dir).resolve()
-    world_geojson = Path(args.world_geojson).resolve()
-    entities_dir = Path(args.entities_dir).resolve()
-    maps_dir = Path(args.maps_dir).resolve() if getattr(args, "maps_dir", None) else None
+    paths: Dict[str, Path] = {
+        "data_dir": Path(args.out_dir).resolve(),
+        "world_geojson": Path(args.world_geojson).resolve(),
+        "entities_dir": Path(args.entities_dir).resolve(),
+    }
+    if getattr(args, "maps_dir", None):
+        paths["maps_dir"] = Path(args.maps_dir).resolve()
 
-    selected_steps = args.steps or ["fetch", "add-countries", "entities"]
-
-    script_path = Path(__file__).resolve()
-    paths = default_paths(script_path)
+    selected_steps = [name for name in STEPS if not args.steps or name in args.steps]
 
     totals: Dict[str, Any] = {}
 
     logging.info("Preprocess pipeline starting | steps=%s", ",".join(selected_steps))
+    start_run("preprocess_all", args)
+    startup_seconds = _process_uptime()
+    if args.timing_imports and startup_seconds is None:
+        startup_seconds = time.perf_counter() - _MODULE_T0
 
-    if "fetch" in selected_steps:
-        res = step_fetch(args.dataset_id, data_dir, compact=args.compact)
-        totals["articles"] = res.articles_count
-        totals["index"] = res.index_count
-
-    if "add-countries" in selected_steps:
-        index_path = data_dir / "index.json"
-        if not index_path.exists():
-            raise FileNotFoundError(f"index.json not found at {index_path}; run 'fetch' step first or provide correct --out-dir")
-        res2 = step_add_countries(index_path, world_geojson, maps_dir, compact=args.compact)
-        totals["locationsProcessed"] = res2.processed
-        totals["countriesMatched"] = res2.matched
-        totals["nonLocationsSkipped"] = res2.skipped_non_locations
-
-    if "entities" in selected_steps:
-        counts = step_entities(data_dir, entities_dir, compact=args.compact)
-        totals.update({f"entities_{k}": v for k, v in counts.items()})
+    for name in selected_steps:
+        _CURRENT_STEP = name
+        totals.update(STEPS[name].run(args, paths))
+    _CURRENT_STEP = None
 
     logging.info("All steps complete: %s", json.dumps(totals, ensure_ascii=False))
+    if args.timing_imports:
+        log_import_timings(startup_seconds)
+    add_run_info("imports", {
+        "moduleImportSeconds": round(MODULE_IMPORT_SECONDS, 4),
+        "startupSeconds": round(startup_seconds, 4) if startup_seconds is not None else None,
+        "lazy": IMPORT_TIMINGS,
+    })
+    finish_run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,706 @@
+#!/usr/bin/env python3
+"""
+Local aggregate query server for the dashboard (development/testing).
+
+The precomputed world_cache files only cover fixed filter combinations (all articles,
+one year, one entity type, one article country). This asyncio HTTP service (stdlib only)
+loads articles.json, entities/*.json and networks/global.json once, builds bitmap posting
+lists (posting_bitmaps.py: article country, newspaper, entity, entity type; articles are
+numbered by publication date so date ranges are ordinal ranges) and answers aggregates
+for any combination of filters:
+
+  GET /api/choropleth   country (ISO alpha-2 key, see gazetteer.py) -> distinct article count
+  GET /api/coordinates  coordinate clusters (same shape as world_cache clusters)
+  GET /api/subnetwork   co-occurrence subnetwork restricted to the matching articles
+  GET /api/metrics      request counts, cache hit rate, latency percentiles
+  GET /data/<path>      static files from the data directory (drop-in for static/data)
+
+Filter parameters (all optional, combined with AND):
+  country=Benin,Togo        article country (any of); any gazetteer alias or ISO code works
+  newspaper=...             newspaper (any of)
+  entity=person:123         entity mentioned; repeat or comma-separate for "all of".
+                            The type may be a network type (person), a file stem
+                            (persons) or an index type (Personnes).
+  entityType=persons        articles mentioning any entity of these types (any of)
+  from=YYYY-MM-DD, to=...   publication date range (inclusive); or yearStart/yearEnd
+
+Responses are cached in an LRU keyed by the normalised filter (sorted, de-duplicated,
+canonical country/type names, dates widened to full days), so `country=togo,Benin` and
+`country=Benin&country=Togo` share an entry.
+
+Choropleth counts follow the precomputed file the same filter would have used: without a
+country/entity/entityType filter an article counts for its own country plus the countries
+of its places (choropleth/all_countries.json, by_year/); otherwise only for the countries of
+the locations that mention it (by_article_country/, by_entity/).
+
+Usage:
+  python scripts/query_server.py                       # http://127.0.0.1:8765
+  python scripts/query_server.py --data-dir /tmp/corpus --port 9000 --cache-size 512
+  # dashboard: VITE_IWAC_QUERY_SERVER=http://127.0.0.1:8765 npm run dev
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import calendar
+import json
+import logging
+import mimetypes
+import os
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from article_fields import name_list
+from gazetteer import COUNTRY_KEYS, country_code, country_key, fold
+from json_io import dumps
+from posting_bitmaps import Bitmap, PostingIndex
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = ROOT / 'omeka-map-explorer' / 'static' / 'data'
+
+# entities/<stem>.json -> network node type (build_networks.py) and index type (index.json)
+ENTITY_TYPES = {
+    'persons': ('person', 'Personnes'),
+    'organizations': ('organization', 'Organisations'),
+    'events': ('event', 'Événements'),
+    'subjects': ('subject', 'Sujets'),
+    'locations': ('location', 'Lieux'),
+}
+LATENCY_WINDOW = 1000  # samples kept per endpoint for percentiles
+MAX_HEADER_BYTES = 64 * 1024
+
+
+def _date_key(value: Any) -> str:
+    """Sortable YYYY-MM-DD key; partial dates are pinned to the start of the period."""
+    s = str(value or '').strip()[:10]
+    if len(s) == 4:
+        s = f'{s}-01-01'
+    elif len(s) == 7:
+        s = f'{s}-01'
+    return _iso_date(s, value).isoformat()
+
+
+def _end_date_key(value: str) -> str:
+    """Inclusive upper bound: partial dates are pinned to the end of the period."""
+    s = value.strip()[:10]
+    if len(s) == 4:
+        s = f'{s}-12-31'
+    elif len(s) == 7:
+        first = _iso_date(f'{s}-01', value)
+        return first.replace(day=calendar.monthrange(first.year, first.month)[1]).isoformat()
+    return _iso_date(s, value).isoformat()
+
+
+def _iso_date(s: str, value: Any) -> date:
+    try:
+        return date.fromisoformat(s)
+    except ValueError:
+        raise QueryError(f'invalid date: {value!r} (expected YYYY, YYYY-MM or YYYY-MM-DD)') from None
+
+
+def load_json(path: Path):
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ------------------ Corpus indexes ------------------
+
+@dataclass
+class Location:
+    key: str  # rounded "lat,lng" (world_cache coordinate key)
+    lat: float
+    lng: float
+    id: str
+    name: str
+    country: str
+    region: str
+    prefecture: str
+    articles: List[int]
+
+
+@dataclass
+class QueryFilter:
+    """Normalised filter; `key()` is the LRU cache key."""
+
+    countries: Tuple[str, ...] = ()
+    newspapers: Tuple[str, ...] = ()
+    entities: Tuple[str, ...] = ()
+    entity_types: Tuple[str, ...] = ()
+    date_from: str = ''
+    date_to: str = ''
+
+    def key(self) -> Tuple[Any, ...]:
+        return (self.countries, self.newspapers, self.entities, self.entity_types, self.date_from, self.date_to)
+
+    def to_json(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for name, value in (('countries', self.countries), ('newspapers', self.newspapers),
+                            ('entities', self.entities), ('entityTypes', self.entity_types),
+                            ('from', self.date_from), ('to', self.date_to)):
+            if value:
+                out[name] = list(value) if isinstance(value, tuple) else value
+        return out
+
+    @property
+    def location_semantics(self) -> bool:
+        return bool(self.countries or self.entities or self.entity_types)
+
+
+class QueryError(ValueError):
+    """Invalid query parameter (answered with 400)."""
+
+
+class CorpusIndex:
+    """Posting lists over interned article indices, built once at startup."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        t0 = time.perf_counter()
+        articles = load_json(data_dir / 'articles.json')
+        records: Dict[str, List[Dict[str, Any]]] = {}
+        for stem in ENTITY_TYPES:
+            path = data_dir / 'entities' / f'{stem}.json'
+            records[stem] = load_json(path) if path.exists() else []
+        # Article ordinals and filter postings come from the bitmap index
+        self.bitmaps = PostingIndex.build(articles, records)
+        self.article_ids: List[str] = self.bitmaps.article_ids
+        by_id = {aid: i for i, aid in enumerate(self.article_ids)}
+        self.all_articles = frozenset(range(len(self.article_ids)))
+        self.article_country = [''] * len(self.article_ids)
+        spatial: List[List[str]] = [[] for _ in self.article_ids]
+        seen: Set[int] = set()
+        for article in articles:
+            i = by_id.get(str(article.get('o:id', '')).strip())
+            if i is None or i in seen:
+                continue
+            seen.add(i)
+            self.article_country[i] = (article.get('country') or '').strip()
+            spatial[i] = name_list(article.get('spatial'))
+
+        # Entities: article ordinals per "type:id"; locations also feed the aggregates
+        self.by_entity: Dict[str, List[int]] = {}
+        self.locations: List[Location] = []
+        location_country_by_name: Dict[str, str] = {}
+        self.loc_countries: List[Set[str]] = [set() for _ in self.article_ids]
+        for stem, (node_type, _index_type) in ENTITY_TYPES.items():
+            for rec in records[stem]:
+                ids = [by_id[str(a)] for a in rec.get('relatedArticleIds') or [] if str(a) in by_id]
+                self.by_entity[f"{node_type}:{rec.get('id')}"] = ids
+                if stem == 'locations':
+                    self._add_location(rec, ids, location_country_by_name)
+
+        # Choropleth country sets per article (see module docstring)
+        self.global_countries: List[Tuple[str, ...]] = []
+        for i, places in enumerate(spatial):
+            countries = {country_key(self.article_country[i])} if self.article_country[i] else set()
+            for place in places:
+                code = country_code(place)
+                if code:
+                    countries.add(code)
+                elif place in location_country_by_name:
+                    countries.add(location_country_by_name[place])
+            self.global_countries.append(tuple(countries))
+
+        # Canonical spellings for user-supplied names (countries by gazetteer key, then folded)
+        self.country_names: Dict[str, str] = {}
+        for c in (*self.bitmaps.postings['country'], *(loc.country for loc in self.locations if loc.country)):
+            self.country_names.setdefault(country_key(c), c)
+            self.country_names.setdefault(fold(c), c)
+        self.newspaper_names = {fold(n): n for n in self.bitmaps.postings['newspaper']}
+        self.type_names: Dict[str, str] = {}
+        for stem, (node_type, index_type) in ENTITY_TYPES.items():
+            for alias in (stem, node_type, index_type):
+                self.type_names[fold(alias)] = stem
+
+        self.network = self._load_network(by_id)
+        self.load_seconds = time.perf_counter() - t0
+
+    def _add_location(self, rec: Dict[str, Any], ids: List[int], country_by_name: Dict[str, str]) -> None:
+        name = (rec.get('name') or '').strip()
+        country = (rec.get('country') or '').strip()
+        if name and country:
+            country_by_name[name] = country_key(country)
+        if country:
+            key = country_key(country)
+            for i in ids:
+                self.loc_countries[i].add(key)
+        coords = rec.get('coordinates')
+        if not coords or not isinstance(coords, list) or len(coords) != 2:
+            return
+        try:
+            lat, lng = float(coords[0]), float(coords[1])
+        except (TypeError, ValueError):
+            return
+        if lat < -90 or lat > 90 or lng < -180 or lng > 180:
+            return
+        self.locations.append(Location(
+            key=f'{lat:.4f},{lng:.4f}', lat=lat, lng=lng, id=str(rec.get('id', '')), name=name,
+            country=country, region=(rec.get('region') or '').strip(),
+            prefecture=(rec.get('prefecture') or '').strip(), articles=ids,
+        ))
+
+    def _load_network(self, by_id: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        path = self.data_dir / 'networks' / 'global.json'
+        if not path.exists():
+            logging.warning('No %s: /api/subnetwork is unavailable', path)
+            return None
+        data = load_json(path)
+        nodes = {n['id']: {k: v for k, v in n.items()} for n in data.get('nodes', [])}
+        edges = []
+        edges_by_article: Dict[int, List[int]] = defaultdict(list)
+        for e in data.get('edges', []):
+            e_idx = len(edges)
+            ids = {by_id[a] for a in e.get('articleIds', []) if a in by_id}
+            for i in ids:
+                edges_by_article[i].append(e_idx)
+            edges.append({'source': e['source'], 'target': e['target'], 'type': e.get('type'),
+                          'weight': e.get('weight', len(ids))})
+        return {'nodes': nodes, 'edges': edges, 'edgesByArticle': edges_by_article}
+
+    # ---- filter parsing ----
+
+    def parse_filter(self, params: Dict[str, List[str]]) -> QueryFilter:
+        def values(*names: str) -> List[str]:
+            out: List[str] = []
+            for name in names:
+                for raw in params.get(name, []):
+                    out.extend(v.strip() for v in raw.split(',') if v.strip())
+            return out
+
+        countries = sorted({
+            self.country_names.get(country_key(c)) or self.country_names.get(fold(c), c)
+            for c in values('country', 'countries')
+        })
+        newspapers = sorted({self.newspaper_names.get(fold(n), n) for n in values('newspaper', 'newspapers')})
+        entity_types = sorted({self._entity_type(t) for t in values('entityType', 'entityTypes')})
+        entities = sorted({self._entity_key(e) for e in values('entity', 'entities')})
+
+        date_from = _date_key(values('from')[0]) if values('from') else ''
+        date_to = _end_date_key(values('to')[0]) if values('to') else ''
+        if values('yearStart'):
+            date_from = max(date_from, f"{self._year(values('yearStart')[0])}-01-01")
+        if values('yearEnd'):
+            year_end = f"{self._year(values('yearEnd')[0])}-12-31"
+            date_to = min(date_to, year_end) if date_to else year_end
+        return QueryFilter(tuple(countries), tuple(newspapers), tuple(entities), tuple(entity_types), date_from, date_to)
+
+    @staticmethod
+    def _year(value: str) -> int:
+        try:
+            return int(value)
+        except ValueError:
+            raise QueryError(f'invalid year: {value!r}') from None
+
+    def _entity_type(self, value: str) -> str:
+        stem = self.type_names.get(fold(value))
+        if stem is None:
+            raise QueryError(f'unknown entity type: {value!r}')
+        return stem
+
+    def _entity_key(self, value: str) -> str:
+        type_part, sep, entity_id = value.rpartition(':')
+        if not sep or not type_part:
+            raise QueryError(f'entity must look like type:id, got {value!r}')
+        return f'{ENTITY_TYPES[self._entity_type(type_part)][0]}:{entity_id}'
+
+    # ---- matching ----
+
+    def match(self, flt: QueryFilter) -> frozenset:
+        """Article ordinals matching every part of the filter (bitmap intersections)."""
+        bm = self.bitmaps
+        parts: List[Bitmap] = []
+        if flt.countries:
+            parts.append(bm.any_of('country', flt.countries))
+        if flt.newspapers:
+            parts.append(bm.any_of('newspaper', flt.newspapers))
+        if flt.entity_types:
+            parts.append(bm.any_of('entityType', (ENTITY_TYPES[t][0] for t in flt.entity_types)))
+        parts.extend(bm.entity(key) for key in flt.entities)
+        if flt.date_from or flt.date_to:
+            parts.append(bm.dates_between(flt.date_from, flt.date_to))
+        if not parts:
+            return self.all_articles
+        result = parts[0]
+        for part in parts[1:]:
+            result &= part
+        return frozenset(result)
+
+    # ---- aggregates ----
+
+    def choropleth(self, flt: QueryFilter) -> Dict[str, Any]:
+        matched = self.match(flt)
+        country_sets = self.loc_countries if flt.location_semantics else self.global_countries
+        counts: Dict[str, int] = defaultdict(int)
+        for i in matched:
+            for country in country_sets[i]:
+                counts[country] += 1
+        return {
+            'type': 'query_choropleth',
+            'countryKeys': COUNTRY_KEYS,
+            'filter': flt.to_json(),
+            'counts': dict(sorted(counts.items())),
+            'total_articles': sum(counts.values()),
+            'total_countries': len(counts),
+            'matched_articles': len(matched),
+        }
+
+    def coordinates(self, flt: QueryFilter, *, with_ids: bool = False) -> Dict[str, Any]:
+        """Clusters per rounded coordinate; an article counts once per cluster."""
+        matched = self.match(flt)
+        everything = matched is self.all_articles
+        buckets: Dict[str, Dict[str, Any]] = {}
+        for loc in self.locations:
+            ids = loc.articles if everything else [i for i in loc.articles if i in matched]
+            if not ids:
+                continue
+            entry = buckets.get(loc.key)
+            if entry is None:
+                entry = buckets[loc.key] = {'loc': loc, 'locs': [], 'articles': set()}
+            entry['locs'].append(loc)
+            entry['articles'].update(ids)
+        clusters = []
+        for key, entry in buckets.items():
+            locs: List[Location] = entry['locs']
+            single = locs[0] if len(locs) == 1 else None
+            countries = {l.country for l in locs}
+            cluster = {
+                'id': single.id if single else key.replace(',', '_'),
+                'label': min((l.name for l in locs if l.name), default=key),
+                'coordinates': [locs[0].lat, locs[0].lng],
+                'country': countries.pop() if len(countries) == 1 else 'MIXED',
+                'region': single.region if single else '',
+                'prefecture': single.prefecture if single else '',
+                'articleCount': len(entry['articles']),
+            }
+            if with_ids:
+                cluster['relatedArticleIds'] = sorted(self.article_ids[i] for i in entry['articles'])
+            clusters.append(cluster)
+        return {
+            'type': 'query_coordinates',
+            'filter': flt.to_json(),
+            'clusters': clusters,
+            'total_clusters': len(clusters),
+            'total_articles': sum(c['articleCount'] for c in clusters),
+            'matched_articles': len(matched),
+        }
+
+    def subnetwork(self, flt: QueryFilter, *, weight_min: int = 1, limit: int = 500,
+                   focus: Optional[str] = None) -> Dict[str, Any]:
+        """Edges of the global network re-weighted by the matching articles.
+
+        Without a filter the stored weights are kept; otherwise an edge's weight is the number
+        of matching articles it was built from. `focus` keeps the ego network of one node.
+        """
+        if self.network is None:
+            raise QueryError('networks/global.json not found')
+        matched = self.match(flt)
+        edges = self.network['edges']
+        if matched is self.all_articles:
+            weights = {e_idx: e['weight'] for e_idx, e in enumerate(edges)}
+        else:
+            weights = defaultdict(int)
+            edges_by_article = self.network['edgesByArticle']
+            for i in matched:
+                for e_idx in edges_by_article.get(i, ()):
+                    weights[e_idx] += 1
+        kept = [e_idx for e_idx, w in weights.items() if w >= weight_min]
+        if focus:
+            ego = {focus}
+            for e_idx in kept:
+                e = edges[e_idx]
+                if e['source'] == focus or e['target'] == focus:
+                    ego.add(e['source'])
+                    ego.add(e['target'])
+            kept = [e_idx for e_idx in kept if edges[e_idx]['source'] in ego and edges[e_idx]['target'] in ego]
+        kept.sort(key=lambda e_idx: (-weights[e_idx], e_idx))
+        truncated = len(kept) > limit > 0
+        if limit > 0:
+            kept = kept[:limit]
+
+        out_edges = []
+        node_ids: Dict[str, None] = {}
+        for e_idx in kept:
+            e = edges[e_idx]
+            out_edges.append({'source': e['source'], 'target': e['target'], 'type': e['type'], 'weight': weights[e_idx]})
+            node_ids[e['source']] = None
+            node_ids[e['target']] = None
+        nodes = []
+        for nid in node_ids:
+            node = dict(self.network['nodes'].get(nid, {'id': nid}))
+            if matched is not self.all_articles:
+                node['count'] = sum(1 for i in self.by_entity.get(nid, ()) if i in matched)
+            nodes.append(node)
+        return {
+            'type': 'query_subnetwork',
+            'filter': flt.to_json(),
+            'nodes': nodes,
+            'edges': out_edges,
+            'meta': {'totalNodes': len(nodes), 'totalEdges': len(out_edges), 'truncated': truncated,
+                     'weightMin': weight_min, 'focus': focus, 'matched_articles': len(matched)},
+        }
+
+
+# ------------------ Cache and metrics ------------------
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Tuple[Any, ...], bytes]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[bytes]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple[Any, ...], value: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'maxsize': self.maxsize,
+            'bytes': sum(len(v) for v in self._data.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / total, 4) if total else None,
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    hits: int = 0
+    errors: int = 0
+    latency_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    compute_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def to_json(self) -> Dict[str, Any]:
+        lat = sorted(self.latency_ms)
+        comp = sorted(self.compute_ms)
+        return {
+            'requests': self.requests,
+            'cacheHits': self.hits,
+            'errors': self.errors,
+            'latencyMs': {
+                'p50': round(_percentile(lat, 0.5), 3),
+                'p95': round(_percentile(lat, 0.95), 3),
+                'p99': round(_percentile(lat, 0.99), 3),
+                'max': round(lat[-1], 3) if lat else 0.0,
+                'mean': round(sum(lat) / len(lat), 3) if lat else 0.0,
+            },
+            'computeMs': {
+                'p50': round(_percentile(comp, 0.5), 3),
+                'p95': round(_percentile(comp, 0.95), 3),
+                'max': round(comp[-1], 3) if comp else 0.0,
+            },
+            'samples': len(lat),
+        }
+
+
+# ------------------ HTTP ------------------
+
+class QueryServer:
+    ENDPOINTS = ('choropleth', 'coordinates', 'subnetwork')
+
+    def __init__(self, index: CorpusIndex, cache_size: int):
+        self.index = index
+        self.cache = LRUCache(cache_size)
+        self.metrics: Dict[str, EndpointMetrics] = defaultdict(EndpointMetrics)
+        self.started = time.time()
+
+    def _query(self, endpoint: str, params: Dict[str, List[str]]) -> Tuple[bytes, bool]:
+        """(JSON body, served from cache) for an /api/<endpoint> query."""
+        flt = self.index.parse_filter(params)
+        extra: Tuple[Any, ...] = ()
+        if endpoint == 'coordinates':
+            extra = (params.get('ids', ['0'])[0] in ('1', 'true'),)
+        elif endpoint == 'subnetwork':
+            try:
+                extra = (int(params.get('weightMin', ['1'])[0]), int(params.get('limit', ['500'])[0]),
+                         params.get('focus', [''])[0] or None)
+            except ValueError:
+                raise QueryError('weightMin and limit must be integers') from None
+        key = (endpoint, flt.key(), extra)
+        body = self.cache.get(key)
+        if body is not None:
+            return body, True
+        t0 = time.perf_counter()
+        if endpoint == 'choropleth':
+            result = self.index.choropleth(flt)
+        elif endpoint == 'coordinates':
+            result = self.index.coordinates(flt, with_ids=extra[0])
+        else:
+            result = self.index.subnetwork(flt, weight_min=extra[0], limit=extra[1], focus=extra[2])
+        body = dumps(result, compact=True)
+        self.metrics[endpoint].compute_ms.append((time.perf_counter() - t0) * 1000)
+        self.cache.put(key, body)
+        return body, False
+
+    def metrics_json(self) -> Dict[str, Any]:
+        return {
+            'uptimeSeconds': round(time.time() - self.started, 1),
+            'indexLoadSeconds': round(self.index.load_seconds, 3),
+            'articles': len(self.index.article_ids),
+            'cache': self.cache.stats(),
+            'endpoints': {name: m.to_json() for name, m in sorted(self.metrics.items())},
+        }
+
+    def handle(self, method: str, target: str) -> Tuple[int, str, bytes, Dict[str, str]]:
+        """Route a request; returns (status, content type, body, extra headers)."""
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        params = parse_qs(parts.query, keep_blank_values=False)
+        if method == 'OPTIONS':
+            return 204, 'text/plain', b'', {}
+        if method not in ('GET', 'HEAD'):
+            return 405, 'application/json', dumps({'error': 'method not allowed'}, compact=True), {}
+        if path.startswith('/api/'):
+            endpoint = path[len('/api/'):].strip('/')
+            if endpoint == 'metrics':
+                return 200, 'application/json', dumps(self.metrics_json(), compact=True), {}
+            if endpoint not in self.ENDPOINTS:
+                return 404, 'application/json', dumps({'error': f'unknown endpoint {endpoint!r}'}, compact=True), {}
+            m = self.metrics[endpoint]
+            t0 = time.perf_counter()
+            m.requests += 1
+            try:
+                body, hit = self._query(endpoint, params)
+            except QueryError as e:
+                m.errors += 1
+                return 400, 'application/json', dumps({'error': str(e)}, compact=True), {}
+            m.hits += hit
+            elapsed = (time.perf_counter() - t0) * 1000
+            m.latency_ms.append(elapsed)
+            return 200, 'application/json', body, {'X-Cache': 'HIT' if hit else 'MISS',
+                                                   'Server-Timing': f'query;dur={elapsed:.3f}'}
+        if path.startswith('/data/'):
+            return self._static(path[len('/data/'):])
+        return 404, 'application/json', dumps({'error': 'not found'}, compact=True), {}
+
+    def _static(self, rel: str) -> Tuple[int, str, bytes, Dict[str, str]]:
+        root = self.index.data_dir.resolve()
+        file = (root / rel).resolve()
+        if root not in file.parents or not file.is_file():
+            return 404, 'application/json', dumps({'error': 'not found'}, compact=True), {}
+        ctype = mimetypes.guess_type(file.name)[0] or 'application/octet-stream'
+        if file.suffix == '.geojson':
+            ctype = 'application/geo+json'
+        return 200, ctype, file.read_bytes(), {}
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be skipped, so the connection cannot be reused
+                    status, ctype, extra = 400, 'application/json', {}
+                    body = dumps({'error': 'invalid Content-Length'}, compact=True)
+                    headers['connection'] = 'close'
+                else:
+                    if length:
+                        await reader.readexactly(length)
+                    status, ctype, body, extra = self.handle(method.upper(), target)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                response = [
+                    f'HTTP/1.1 {status} {_REASONS.get(status, "OK")}',
+                    f'Content-Type: {ctype}',
+                    f'Content-Length: {len(body)}',
+                    'Access-Control-Allow-Origin: *',
+                    'Access-Control-Allow-Methods: GET, HEAD, OPTIONS',
+                    'Cache-Control: no-cache',
+                    f'Connection: {"keep-alive" if keep_alive else "close"}',
+                ]
+                response += [f'{k}: {v}' for k, v in extra.items()]
+                writer.write(('\r\n'.join(response) + '\r\n\r\n').encode('latin-1'))
+                if method.upper() != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                logging.debug('%s %s -> %d (%d bytes)', method, target, status, len(body))
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+async def serve(server: QueryServer, host: str, port: int) -> None:
+    srv = await asyncio.start_server(server.serve_client, host, port, limit=MAX_HEADER_BYTES)
+    addrs = ', '.join(f'http://{s.getsockname()[0]}:{s.getsockname()[1]}' for s in srv.sockets)
+    logging.info('Query server listening on %s', addrs)
+    async with srv:
+        await srv.serve_forever()
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description='Local aggregate query server for the dashboard')
+    p.add_argument('--data-dir', default=os.environ.get('IWAC_DATA_DIR') or str(DEFAULT_DATA_DIR),
+                   help='Directory with articles.json, entities/ and networks/')
+    p.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    p.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    p.add_argument('--cache-size', type=int, default=256, help='LRU entries (responses) kept in memory; 0 disables')
+    p.add_argument('--log-level', default='INFO', help='Logging level (DEBUG, INFO, WARNING, ERROR)')
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO),
+                        format='%(asctime)s | %(levelname)s | %(message)s')
+    index = CorpusIndex(Path(args.data_dir))
+    logging.info('Indexed %d articles, %d entities, %d coordinate locations in %.2fs',
+                 len(index.article_ids), len(index.by_entity), len(index.locations), index.load_seconds)
+    try:
+        asyncio.run(serve(QueryServer(index, args.cache_size), args.host, args.port))
+    except KeyboardInterrupt:
+        logging.info('Stopped')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Snapshot mode of the fetch step (preprocess_all.step_fetch_snapshot) on a small
+Parquet fixture written by generate_synthetic_corpus / dataset_snapshot."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import preprocess_all  # noqa: E402
+from dataset_snapshot import write_snapshot  # noqa: E402
+from fetch_transforms import DEFAULT_TRANSFORM_BATCH, transform_articles_row, transform_index_row  # noqa: E402
+from generate_synthetic_corpus import generate_raw_corpus  # noqa: E402
+
+ROW_GROUP_SIZE = 50
+
+
+@pytest.fixture(scope="module")
+def raw_corpus():
+    articles, index = generate_raw_corpus(0.02, seed=7)  # ~230 articles, ~5 row groups
+    return articles, index
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path, raw_corpus):
+    articles, index = raw_corpus
+    snap = tmp_path / "snapshot"
+    write_snapshot(snap, {"articles": articles, "index": index}, row_group_size=ROW_GROUP_SIZE, revision="rev-1")
+    return snap
+
+
+def _read(path: Path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class _CountingTransforms(dict):
+    """FETCH_BATCH_TRANSFORMS that counts the row groups each subset transforms."""
+
+    def __init__(self, base):
+        super().__init__()
+        self.calls = {subset: 0 for subset in base}
+        for subset, fn in base.items():
+            self[subset] = self._wrap(subset, fn)
+
+    def _wrap(self, subset, fn):
+        def counted(table):
+            self.calls[subset] += 1
+            return fn(table)
+        return counted
+
+
+@pytest.mark.parametrize("transform_batch", [0, DEFAULT_TRANSFORM_BATCH])
+def test_snapshot_export_matches_row_transforms(tmp_path, snapshot, raw_corpus, transform_batch):
+    articles, index = raw_corpus
+    out = tmp_path / "data"
+    res = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True, transform_batch=transform_batch)
+
+    assert not res.skipped
+    assert res.revision == "rev-1"
+    assert _read(out / "articles.json") == [transform_articles_row(r) for r in articles]
+    assert _read(out / "index.json") == [transform_index_row(r) for r in index]
+
+
+def test_second_run_at_same_revision_skips(tmp_path, snapshot, raw_corpus):
+    out = tmp_path / "data"
+    first = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+    written = (out / "articles.json").stat().st_mtime_ns
+
+    second = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+    assert second.skipped
+    assert (second.articles_count, second.index_count) == (first.articles_count, first.index_count)
+    assert (out / "articles.json").stat().st_mtime_ns == written
+
+    # Another output option is a different export
+    assert not preprocess_all.step_fetch_snapshot(snapshot, out, compact=False).skipped
+
+
+def test_changed_row_group_is_the_only_one_retransformed(tmp_path, snapshot, raw_corpus, monkeypatch):
+    articles, index = raw_corpus
+    out = tmp_path / "data"
+    preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+
+    changed = [dict(r) for r in articles]
+    changed[2 * ROW_GROUP_SIZE + 3]["title"] = "Titre modifié"
+    write_snapshot(snapshot, {"articles": changed, "index": index}, row_group_size=ROW_GROUP_SIZE, revision="rev-2")
+
+    counting = _CountingTransforms(preprocess_all.FETCH_BATCH_TRANSFORMS)
+    monkeypatch.setattr(preprocess_all, "FETCH_BATCH_TRANSFORMS", counting)
+    res = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+
+    assert not res.skipped
+    assert counting.calls == {"articles": 1, "index": 0}
+    assert _read(out / "articles.json") == [transform_articles_row(r) for r in changed]
+    state = _read(out / preprocess_all.FETCH_CACHE_DIR / preprocess_all.FETCH_STATE_FILE)
+    assert state["revision"] == "rev-2"
+    assert len(list((out / preprocess_all.FETCH_CACHE_DIR / "articles").glob("*.jsonl"))) == len(state["rowGroups"]["articles"])
+
+
+def test_hub_export_invalidates_snapshot_state(tmp_path, snapshot, raw_corpus, monkeypatch):
+    articles, index = raw_corpus
+    out = tmp_path / "data"
+    preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+
+    hub_rows = {"articles": articles[:10], "index": index[:10]}
+    monkeypatch.setattr(preprocess_all, "load_subset", lambda dataset_id, subset, revision=None: hub_rows[subset])
+    preprocess_all.step_fetch("hub/dataset", out, compact=True)
+    assert len(_read(out / "articles.json")) == 10
+
+    res = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+    assert not res.skipped
+    assert _read(out / "articles.json") == [transform_articles_row(r) for r in articles]
+
+
+def test_interrupted_export_is_not_skipped(tmp_path, snapshot, raw_corpus, monkeypatch):
+    articles, index = raw_corpus
+    out = tmp_path / "data"
+    preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+
+    read_cached = preprocess_all._read_cached_rows
+
+    def interrupted(path):
+        if path.parent.name == "index":
+            raise KeyboardInterrupt
+        return read_cached(path)
+
+    monkeypatch.setattr(preprocess_all, "_read_cached_rows", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        preprocess_all.step_fetch_snapshot(snapshot, out, compact=True, force=True)
+    monkeypatch.undo()
+
+    res = preprocess_all.step_fetch_snapshot(snapshot, out, compact=True)
+    assert not res.skipped
+    assert _read(out / "index.json") == [transform_index_row(r) for r in index]
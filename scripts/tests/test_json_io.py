@@ -0,0 +1,51 @@
+"""Backend-independent output of the JSON layer (json_io.py)."""
+from __future__ import annotations
+
+import json
+import math
+
+import pytest
+
+import json_io
+
+DOC = {
+    'nodes': [{'id': 'a', 'score': float('nan')}, {'id': 'b', 'score': 0.5}],
+    'edges': [[1, float('inf')], [2, -float('inf')]],
+    'small': 1e-05,
+}
+
+
+@pytest.fixture(params=json_io.available_backends())
+def backend(request):
+    previous = json_io.get_backend()
+    json_io.set_backend(request.param)
+    yield request.param
+    json_io.set_backend(previous)
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_non_finite_floats_are_null(backend, compact):
+    buf = json_io.dumps(DOC, compact=compact)
+    assert b'NaN' not in buf and b'Infinity' not in buf
+    parsed = json.loads(buf)  # strict JSON
+    assert parsed['nodes'][0]['score'] is None
+    assert parsed['edges'] == [[1, None], [2, None]]
+    assert parsed['small'] == 1e-05
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_backends_write_identical_bytes(tmp_path, compact):
+    outputs = {}
+    previous = json_io.get_backend()
+    try:
+        for name in json_io.available_backends():
+            json_io.set_backend(name)
+            path = tmp_path / f'{name}.json'
+            json_io.write_json(path, DOC, compact=compact)
+            with json_io.open_json_array(tmp_path / f'{name}_array.json', compact=compact) as out:
+                out.write({'v': math.nan})
+                out.write_many([{'v': 1.0}, {'v': -math.inf}])
+            outputs[name] = path.read_bytes() + (tmp_path / f'{name}_array.json').read_bytes()
+    finally:
+        json_io.set_backend(previous)
+    assert len(set(outputs.values())) == 1, sorted(outputs)
@@ -0,0 +1,77 @@
+"""Request validation of the query server (query_server.py)."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from query_server import CorpusIndex, QueryError, QueryServer, _date_key, _end_date_key
+
+ARTICLES = [
+    {'o:id': 1, 'pub_date': '2020-02-10', 'country': 'Benin', 'newspaper': 'La Nation', 'spatial': 'Cotonou'},
+    {'o:id': 2, 'pub_date': '2021-06-01', 'country': 'Togo', 'newspaper': 'Togo Presse', 'spatial': 'Lomé'},
+]
+LOCATIONS = [
+    {'id': 10, 'name': 'Cotonou', 'relatedArticleIds': [1], 'articleCount': 1,
+     'coordinates': [6.37, 2.39], 'country': 'Benin'},
+]
+
+
+@pytest.fixture()
+def server(tmp_path):
+    (tmp_path / 'entities').mkdir()
+    (tmp_path / 'articles.json').write_text(json.dumps(ARTICLES), encoding='utf-8')
+    (tmp_path / 'entities' / 'locations.json').write_text(json.dumps(LOCATIONS), encoding='utf-8')
+    return QueryServer(CorpusIndex(tmp_path), cache_size=8)
+
+
+@pytest.mark.parametrize('value, start, end', [
+    ('2020', '2020-01-01', '2020-12-31'),
+    ('2020-02', '2020-02-01', '2020-02-29'),
+    ('2021-02', '2021-02-01', '2021-02-28'),
+    ('2020-02-10', '2020-02-10', '2020-02-10'),
+])
+def test_partial_dates_are_widened(value, start, end):
+    assert _date_key(value) == start
+    assert _end_date_key(value) == end
+
+
+@pytest.mark.parametrize('value', ['2020-13', '2020-02-30', 'abcd', '2020-1-1'])
+def test_invalid_dates_are_rejected(value):
+    with pytest.raises(QueryError):
+        _date_key(value)
+    with pytest.raises(QueryError):
+        _end_date_key(value)
+
+
+def test_invalid_date_is_a_bad_request(server):
+    status, _ctype, body, _extra = server.handle('GET', '/api/choropleth?from=2020-13-01')
+    assert status == 400
+    assert 'invalid date' in json.loads(body)['error']
+    status, *_ = server.handle('GET', '/api/choropleth?from=2020-02&to=2020-02')
+    assert status == 200
+
+
+def _exchange(server: QueryServer, request: bytes) -> bytes:
+    async def run() -> bytes:
+        srv = await asyncio.start_server(server.serve_client, '127.0.0.1', 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            return response
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('length', ['abc', '-5'])
+def test_bad_content_length_is_a_bad_request(server, length):
+    response = _exchange(server, f'GET /api/choropleth HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode())
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 400 ')
+    assert b'Connection: close' in head
+    assert json.loads(body) == {'error': 'invalid Content-Length'}
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the IWAC data pipeline: keep inputs resident, rebuild only what changed.
+
+Polls the static/data inputs (articles.json, index.json, entities/*.json, maps/*.geojson)
+and on a change runs just the dependent work:
+
+  maps/<country layer>.geojson  -> reload that country's admin layers and re-classify
+                                   only the points currently in that country
+  maps/world_countries.geojson  -> reload the country layer, re-classify all points
+  index.json (external edit)    -> re-classify only new points / changed coordinates
+  articles.json / index.json    -> rebuild entities in memory, write only the entity
+                                   files whose content changed
+  articles.json                 -> rewrite the date-sharded article store (articles/)
+  any changed file              -> rerun the downstream scripts that read it (DOWNSTREAM)
+
+Entity files are diffed against the resident records, and a save that changes no
+record triggers nothing. When only entity files changed (plan_targets):
+  - targets that read only entity membership (ids, relatedArticleIds) skip edits to
+    other fields such as names
+  - the drill-down payloads are recomputed for the changed entities and those sharing
+    an article with them, rewriting only their shard files
+  - the world cache rebuilds only the by_entity choropleths whose membership changed
+
+Parsed articles/index rows, the prepared (STRtree-indexed) geometries and the last
+entity records stay in memory between rebuilds. Downstream scripts run in worker
+processes forked from the watcher, so numpy/scipy/shapely and the shared modules are
+already imported; up to --jobs of them run at once. Where fork is unavailable they run
+in-process one after another. Files the watcher writes itself are not treated as input
+changes.
+
+Usage:
+  python scripts/watch_pipeline.py
+  python scripts/watch_pipeline.py --data-dir /tmp/corpus --maps-dir /tmp/corpus/maps --jobs 4
+  python scripts/watch_pipeline.py --initial-build --once   # build everything once and exit
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import article_shards
+import preprocess_all as pp
+from json_io import write_json
+from posting_bitmaps import ENTITY_TYPES
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ENTITY_FILES = tuple(f"entities/{stem}.json" for stem in pp.ENTITY_TYPE_FILES.values())
+# Imported before forking workers so downstream scripts find them loaded
+PRELOAD_MODULES = (
+    "numpy", "scipy.sparse", "shapely",
+    "article_fields", "instrumentation", "json_io", "edge_store", "network_csr", "network_centrality",
+)
+
+# Above this many changed entities a full drill-down build is as cheap as the update
+DETAILS_UPDATE_MAX = 500
+
+MEMBERSHIP_FIELDS = frozenset({"id", "relatedArticleIds"})
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+# (changed entity ids, articles they mention before/after, record fields that changed)
+EntityDelta = Tuple[Set[str], Set[str], Set[str]]
+
+
+@dataclass(frozen=True)
+class Target:
+    """A downstream script and the data files (relative to the data dir) it reads."""
+
+    script: str
+    inputs: Tuple[str, ...]
+    args: Tuple[str, ...] = ()
+    # Reads only entity ids and relatedArticleIds from the entity files
+    membership_only: bool = False
+
+
+DOWNSTREAM: Dict[str, Target] = {
+    "country-focus": Target("build_country_focus_counts.py", ("articles.json", "entities/locations.json")),
+    "temporal-index": Target("build_temporal_index.py", ("articles.json", "entities/locations.json")),
+    "entity-details": Target("build_entity_details.py", ("articles.json", *ENTITY_FILES)),
+    # The exact-Jaccard check is a build-time report, not needed while iterating
+    "similar-entities": Target("build_similar_entities.py", ENTITY_FILES, ("--check-sample", "0")),
+    "world-cache": Target("build_world_map_cache.py", ("articles.json", *ENTITY_FILES)),
+    # The exact-betweenness error report is a build-time check, not needed while iterating
+    "networks": Target("build_networks.py", ENTITY_FILES, ("--betweenness-check-max-nodes", "0")),
+    "spatial-networks": Target("build_spatial_networks.py", ("articles.json", "entities/locations.json")),
+    "posting-bitmaps": Target("build_posting_bitmaps.py", ("articles.json", *ENTITY_FILES), membership_only=True),
+    "flow-index": Target("build_flow_index.py", ("articles.json", "entities/locations.json")),
+}
+
+
+def load_json(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def entity_delta(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> EntityDelta:
+    """Added, removed or edited entity records: their ids, articles and changed fields."""
+    before = {str(e.get("id")): e for e in old}
+    after = {str(e.get("id")): e for e in new}
+    ids: Set[str] = set()
+    articles: Set[str] = set()
+    fields: Set[str] = set()
+    for eid in before.keys() | after.keys():
+        a, b = before.get(eid), after.get(eid)
+        if a == b:
+            continue
+        ids.add(eid)
+        if a is None or b is None:
+            fields.update(a or b)
+        else:
+            fields.update(k for k in a.keys() | b.keys() if a.get(k) != b.get(k))
+        for record in (a, b):
+            if record:
+                articles.update(str(aid) for aid in record.get("relatedArticleIds") or ())
+    return ids, articles, fields
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# -------------------------
+# Resident pipeline state
+# -------------------------
+
+class ResidentPipeline:
+    """Articles, index rows, admin geometries and entity records kept in memory."""
+
+    def __init__(self, data_dir: Path, maps_dir: Path, world_geojson: Path, *, compact: bool = False):
+        self.data_dir = data_dir
+        self.maps_dir = maps_dir
+        self.world_geojson = world_geojson
+        self.compact = compact
+        self.articles: List[Dict[str, Any]] = []
+        self.index_rows: List[Dict[str, Any]] = []
+        self.countries: Optional[pp.AdminLayer] = None
+        self.admin_layers: Dict[str, List[Tuple[str, pp.AdminLayer]]] = {}
+        self.entities: Dict[str, List[Dict[str, Any]]] = {}
+        # Entity records changed since the watcher last cleared it, per file stem
+        self.entity_deltas: Dict[str, EntityDelta] = {}
+        # Paths written by the watcher since the last poll (not input changes)
+        self.written: Dict[Path, Optional[Signature]] = {}
+        self._layer_country = {
+            filename: country
+            for country, specs in pp.ADMIN_LAYER_SPECS.items()
+            for _level, filename, _keys in specs
+        }
+
+    @property
+    def index_path(self) -> Path:
+        return self.data_dir / "index.json"
+
+    @property
+    def articles_path(self) -> Path:
+        return self.data_dir / "articles.json"
+
+    def _write(self, path: Path, data: Any) -> None:
+        write_json(path, data, compact=self.compact)
+        self.written[path] = _signature(path)
+
+    def load(self) -> None:
+        """Parse every input once and bring index.json/entities up to date."""
+        self.articles = load_json(self.articles_path) if self.articles_path.exists() else []
+        self.index_rows = load_json(self.index_path) if self.index_path.exists() else []
+        if pp.geo_available() and self.world_geojson.exists():
+            self.countries = pp.load_admin_layer(self.world_geojson, ["name"])
+            self.admin_layers = pp.load_admin_layers(self.maps_dir)
+        else:
+            logging.warning("shapely or %s missing: admin fields are not recomputed", self.world_geojson)
+        for stem in pp.ENTITY_TYPE_FILES.values():
+            path = self.data_dir / "entities" / f"{stem}.json"
+            self.entities[stem] = load_json(path) if path.exists() else []
+        changed = self.classify(self._location_rows(self.index_rows))
+        if changed:
+            self._write(self.index_path, self.index_rows)
+        self.rebuild_entities()
+
+    @staticmethod
+    def _location_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [row for row in rows if row.get("Type") == "Lieux"]
+
+    def classify(self, rows: List[Dict[str, Any]]) -> int:
+        """Re-run add-countries on these location rows; returns how many rows changed."""
+        if self.countries is None or not rows:
+            return 0
+        before = [(row.get("Country"), row.get("Region"), row.get("Prefecture")) for row in rows]
+        located, lats, lngs = pp.split_located_rows(rows)
+        country_names, levels = pp.classify_points_bulk(lats, lngs, self.countries, self.admin_layers)
+        pp.apply_admin_fields(located, country_names, levels)
+        after = [(row.get("Country"), row.get("Region"), row.get("Prefecture")) for row in rows]
+        return sum(1 for b, a in zip(before, after) if b != a)
+
+    def maps_changed(self, paths: Set[Path]) -> Tuple[int, int]:
+        """Reload changed layers and re-classify affected points; (points, rows changed)."""
+        if not pp.geo_available():
+            return 0, 0
+        locations = self._location_rows(self.index_rows)
+        if self.world_geojson in paths:
+            self.countries = pp.load_admin_layer(self.world_geojson, ["name"])
+            affected = locations
+        else:
+            touched = {self._layer_country[p.name] for p in paths if p.name in self._layer_country}
+            for country in touched:
+                layers = pp.load_country_layers(self.maps_dir, country)
+                if layers:
+                    self.admin_layers[country] = layers
+                else:
+                    self.admin_layers.pop(country, None)
+            affected = [row for row in locations if row.get("Country") in touched]
+        changed = self.classify(affected)
+        if changed:
+            self._write(self.index_path, self.index_rows)
+        return len(affected), changed
+
+    def index_changed(self) -> Tuple[int, int]:
+        """Take an externally edited index.json; only new/moved points are re-classified."""
+        previous = {str(row.get("o:id")): row for row in self._location_rows(self.index_rows)}
+        self.index_rows = load_json(self.index_path)
+        affected: List[Dict[str, Any]] = []
+        carried = 0
+        for row in self._location_rows(self.index_rows):
+            old = previous.get(str(row.get("o:id")))
+            if old is not None and old.get("Coordonnées") == row.get("Coordonnées") and "Country" in old:
+                for field in ("Country", "Region", "Prefecture"):
+                    if field in old:
+                        if row.get(field) != old[field]:
+                            carried += 1
+                        row[field] = old[field]
+                    else:
+                        row.pop(field, None)
+            else:
+                affected.append(row)
+        changed = self.classify(affected)
+        if changed or carried:
+            self._write(self.index_path, self.index_rows)
+        return len(affected), changed
+
+    def articles_changed(self) -> None:
+        self.articles = load_json(self.articles_path)
+
+    def _record_delta(self, stem: str, records: List[Dict[str, Any]]) -> int:
+        delta = entity_delta(self.entities.get(stem, []), records)
+        for seen, new in zip(self.entity_deltas.setdefault(stem, (set(), set(), set())), delta):
+            seen |= new
+        self.entities[stem] = records
+        return len(delta[0])
+
+    def entities_edited(self, stems: List[str]) -> int:
+        """Take externally edited entity files; returns how many records changed."""
+        changed = 0
+        for stem in stems:
+            path = self.data_dir / "entities" / f"{stem}.json"
+            changed += self._record_delta(stem, load_json(path) if path.exists() else [])
+        return changed
+
+    def rebuild_entities(self) -> List[str]:
+        """Rebuild entity records in memory; write and return the files whose content changed."""
+        changed: List[str] = []
+        for stem, records in pp.build_entities(self.articles, self.index_rows).items():
+            path = self.data_dir / "entities" / f"{stem}.json"
+            if records != self.entities.get(stem) or not path.exists():
+                self._record_delta(stem, records)
+                self._write(path, records)
+                changed.append(f"entities/{stem}.json")
+        return changed
+
+    def rebuild_article_shards(self) -> int:
+        """Rewrite articles/ (manifest, id table, shards) from the resident articles."""
+        report = article_shards.write_article_shards(
+            self.articles, self.data_dir / "articles", articles_json=self.articles_path,
+        )
+        return report.shards
+
+
+# -------------------------
+# Downstream runner
+# -------------------------
+
+def preload_modules() -> None:
+    for name in PRELOAD_MODULES:
+        with contextlib.suppress(Exception):
+            importlib.import_module(name)
+
+
+def _run_script(script: str, args: Tuple[str, ...], data_dir: str, quiet: bool) -> None:
+    os.environ["IWAC_DATA_DIR"] = data_dir
+    sys.argv = [script, *args]
+    if quiet:
+        logging.disable(logging.INFO)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                runpy.run_path(str(SCRIPTS_DIR / script), run_name="__main__")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _worker(script: str, args: Tuple[str, ...], data_dir: str, quiet: bool) -> None:
+    try:
+        _run_script(script, args, data_dir, quiet)
+    except SystemExit as e:
+        sys.exit(e.code)
+    except BaseException:
+        logging.exception("%s failed", script)
+        sys.exit(1)
+
+
+def run_targets(
+    names: List[str], data_dir: Path, *, jobs: int, quiet: bool,
+    extra_args: Optional[Dict[str, Tuple[str, ...]]] = None,
+) -> Dict[str, Tuple[bool, float]]:
+    """Run downstream targets (with extra_args appended per target); returns {name: (ok, seconds)}."""
+    results: Dict[str, Tuple[bool, float]] = {}
+    extra_args = extra_args or {}
+    if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        pending = list(names)
+        running: Dict[str, Tuple[Any, float]] = {}
+        while pending or running:
+            while pending and len(running) < jobs:
+                name = pending.pop(0)
+                target = DOWNSTREAM[name]
+                args = (*target.args, *extra_args.get(name, ()))
+                proc = ctx.Process(target=_worker, args=(target.script, args, str(data_dir), quiet))
+                proc.start()
+                running[name] = (proc, time.perf_counter())
+            for name, (proc, t0) in list(running.items()):
+                if not proc.is_alive():
+                    proc.join()
+                    results[name] = (proc.exitcode == 0, time.perf_counter() - t0)
+                    del running[name]
+            time.sleep(0.005)
+        return results
+    for name in names:
+        target = DOWNSTREAM[name]
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            _run_script(target.script, (*target.args, *extra_args.get(name, ())), str(data_dir), quiet)
+        except SystemExit as e:
+            ok = not e.code
+        except Exception:
+            logging.exception("%s failed", target.script)
+            ok = False
+        results[name] = (ok, time.perf_counter() - t0)
+    return results
+
+
+def dependent_targets(changed: Set[str]) -> List[str]:
+    return [name for name, target in DOWNSTREAM.items() if changed.intersection(target.inputs)]
+
+
+def plan_targets(changed: Set[str], deltas: Dict[str, EntityDelta]) -> Dict[str, Tuple[str, ...]]:
+    """Targets to run for these changed inputs, with extra arguments narrowing them to the change."""
+    plan: Dict[str, Tuple[str, ...]] = {name: () for name in dependent_targets(changed)}
+    if not plan or not changed <= set(ENTITY_FILES):
+        return plan
+    membership = sorted(stem for stem, (_, _, fields) in deltas.items() if fields & MEMBERSHIP_FIELDS)
+    for name in list(plan):
+        if DOWNSTREAM[name].membership_only and not membership:
+            del plan[name]
+    keys = [f"{ENTITY_TYPES[stem]}:{eid}" for stem, (ids, _, _) in sorted(deltas.items()) for eid in sorted(ids)]
+    if "entity-details" in plan and len(keys) <= DETAILS_UPDATE_MAX:
+        articles = sorted(set().union(*(articles for _, articles, _ in deltas.values())))
+        plan["entity-details"] = ("--update-ids", *keys, "--update-articles", *articles)
+    if "world-cache" in plan and "entities/locations.json" not in changed:
+        # Without locations.json edits only the by_entity choropleths can change
+        if membership:
+            plan["world-cache"] = ("--entity-choropleth-only", *membership)
+        else:
+            del plan["world-cache"]
+    return plan
+
+
+# -------------------------
+# Watch loop
+# -------------------------
+
+class Watcher:
+    def __init__(self, pipeline: ResidentPipeline, *, jobs: int, quiet: bool, interval: float):
+        self.pipeline = pipeline
+        self.jobs = jobs
+        self.quiet = quiet
+        self.interval = interval
+        self.state: Dict[Path, Optional[Signature]] = {}
+
+    def watched_paths(self) -> List[Path]:
+        data_dir, maps_dir = self.pipeline.data_dir, self.pipeline.maps_dir
+        paths = [data_dir / "articles.json", data_dir / "index.json"]
+        paths += sorted((data_dir / "entities").glob("*.json"))
+        paths += sorted(maps_dir.glob("*.geojson"))
+        if self.pipeline.world_geojson not in paths:
+            paths.append(self.pipeline.world_geojson)
+        return paths
+
+    def poll(self) -> Set[Path]:
+        """Paths whose signature changed since the last poll, ignoring the watcher's own writes."""
+        current = {p: _signature(p) for p in self.watched_paths()}
+        for p in set(self.state) - set(current):
+            current[p] = None
+        changed = {p for p, sig in current.items() if self.state.get(p) != sig}
+        written = self.pipeline.written
+        changed = {p for p in changed if not (p in written and written[p] == current[p])}
+        written.clear()
+        self.state = current
+        return changed
+
+    def rebuild(self, changed: Set[Path], t_detect: float) -> None:
+        pipeline = self.pipeline
+        data_dir = pipeline.data_dir
+        rel = {p.relative_to(data_dir).as_posix() for p in changed if p.is_relative_to(data_dir)}
+        notes: List[str] = []
+        index_dirty = False
+        pipeline.entity_deltas.clear()
+
+        edited = sorted(Path(f).stem for f in rel.intersection(ENTITY_FILES))
+        if edited:
+            notes.append(f"{', '.join(edited)} re-read, {pipeline.entities_edited(edited)} records changed")
+
+        map_paths = {p for p in changed if p.suffix == ".geojson"}
+        if map_paths:
+            points, rows = pipeline.maps_changed(map_paths)
+            notes.append(f"add-countries {points} points ({rows} changed)")
+            index_dirty = index_dirty or rows > 0
+        if "index.json" in rel:
+            points, rows = pipeline.index_changed()
+            notes.append(f"index.json re-read, {points} points classified ({rows} changed)")
+            index_dirty = True
+        if "articles.json" in rel:
+            pipeline.articles_changed()
+            notes.append(f"articles.json re-read, {pipeline.rebuild_article_shards()} article shards")
+
+        written: Set[str] = set()
+        if index_dirty or "articles.json" in rel:
+            files = pipeline.rebuild_entities()
+            written.update(files)
+            notes.append(f"entities: {', '.join(Path(f).stem for f in files) or 'unchanged'}")
+
+        # Entity files saved without a record change trigger nothing
+        changed_inputs = (rel | written) - {
+            f for f in ENTITY_FILES if not pipeline.entity_deltas.get(Path(f).stem, (set(), set(), set()))[0]
+        }
+        plan = plan_targets(changed_inputs, pipeline.entity_deltas)
+        scoped = [name for name, extra in plan.items() if extra]
+        if scoped:
+            notes.append(f"scoped: {', '.join(scoped)}")
+        t_prep = time.perf_counter()
+        results = run_targets(list(plan), data_dir, jobs=self.jobs, quiet=self.quiet, extra_args=plan) if plan else {}
+        total = time.perf_counter() - t_detect
+        timings = ", ".join(f"{n} {s:.2f}s{'' if ok else ' FAILED'}" for n, (ok, s) in results.items())
+        logging.info(
+            "Rebuilt in %.2fs after %s | %s | prepare %.2fs | %s",
+            total, ", ".join(sorted(p.name for p in changed)), "; ".join(notes) or "-",
+            t_prep - t_detect, timings or "no downstream targets",
+        )
+
+    def run(self, *, once: bool = False) -> None:
+        self.poll()
+        if once:
+            return
+        logging.info("Watching %s (maps: %s); Ctrl+C to stop", self.pipeline.data_dir, self.pipeline.maps_dir)
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed = self.poll()
+                if not changed:
+                    continue
+                t_detect = time.perf_counter()
+                # Let multi-step saves settle before reading
+                while True:
+                    time.sleep(self.interval / 2)
+                    more = self.poll()
+                    if not more:
+                        break
+                    changed |= more
+                try:
+                    self.rebuild(changed, t_detect)
+                except Exception:
+                    logging.exception("Rebuild failed; waiting for the next change")
+        except KeyboardInterrupt:
+            logging.info("Stopped")
+
+
+def parse_args() -> argparse.Namespace:
+    paths = pp.default_paths(Path(__file__).resolve())
+    p = argparse.ArgumentParser(description="Watch pipeline inputs and rebuild dependent outputs")
+    p.add_argument("--data-dir", default=os.environ.get("IWAC_DATA_DIR") or str(paths["data_dir"]),
+                   help="Directory with articles.json, index.json and entities/")
+    p.add_argument("--maps-dir", default=None, help="Directory with the GeoJSON layers (default: <data-dir>/maps)")
+    p.add_argument("--world-geojson", default=None, help="World countries layer (default: <maps-dir>/world_countries.geojson)")
+    p.add_argument("--compact", action="store_true", help="Write index.json/entities as compact JSON")
+    p.add_argument("--interval", type=float, default=0.2, help="Polling interval in seconds")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Downstream scripts run concurrently")
+    p.add_argument("--initial-build", action="store_true", help="Run every downstream script once at startup")
+    p.add_argument("--once", action="store_true", help="Exit after startup (with --initial-build: a one-shot build)")
+    p.add_argument("--verbose", action="store_true", help="Show downstream script output")
+    p.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    pp.setup_logging(args.log_level)
+    data_dir = Path(args.data_dir).resolve()
+    maps_dir = Path(args.maps_dir).resolve() if args.maps_dir else data_dir / "maps"
+    world_geojson = Path(args.world_geojson).resolve() if args.world_geojson else maps_dir / "world_countries.geojson"
+
+    t0 = time.perf_counter()
+    preload_modules()
+    pipeline = ResidentPipeline(data_dir, maps_dir, world_geojson, compact=args.compact)
+    pipeline.load()
+    logging.info(
+        "Loaded %d articles, %d index rows, %d admin countries in %.2fs",
+        len(pipeline.articles), len(pipeline.index_rows), len(pipeline.admin_layers), time.perf_counter() - t0,
+    )
+    watcher = Watcher(pipeline, jobs=max(1, args.jobs), quiet=not args.verbose, interval=args.interval)
+    if args.initial_build:
+        t1 = time.perf_counter()
+        pipeline.rebuild_article_shards()
+        results = run_targets(list(DOWNSTREAM), data_dir, jobs=watcher.jobs, quiet=watcher.quiet)
+        logging.info("Initial build in %.2fs: %s", time.perf_counter() - t1,
+                     ", ".join(f"{n} {s:.2f}s{'' if ok else ' FAILED'}" for n, (ok, s) in results.items()))
+    watcher.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()